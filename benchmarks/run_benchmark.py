@@ -0,0 +1,315 @@
+"""
+전략/주문 흐름 성능 측정 (벤치마크)
+
+가짜 한국투자증권 서버(tests/mock_kis_server.py)를 켜고
+종목 수를 1, 10, 50, 200개로 늘려 가며 다음 세 가지를 실행합니다.
+- strategy: 종목마다 무상태_무한매수법() 실행 (조회 + 주문 계산)
+- main: 종목마다 trading_bot.main() 전체 흐름 실행 (LIVE 모드, 가짜 서버에 실제 주문)
+        종목 정보 파일(INSTRUMENT_CACHE_PATH)이 이미 있는 상태 (지난 실행의 캐시를 이어 받은 경우)
+- main_cold: main과 같지만 종목 정보 파일이 없는 상태 (첫 실행, 캐시가 없거나 만료된 경우)
+
+측정 항목:
+- wall_time_seconds: 걸린 시간 (초)
+- kis_calls: 가짜 서버가 받은 API 호출 수
+- peak_memory_kib: 최대 메모리 사용량 (tracemalloc, KiB)
+- orders_per_second: 초당 주문 수 (strategy는 계산된 주문, main은 접수된 주문)
+
+결과는 JSON으로 저장하고, 저장해 둔 기준값(baseline.json)과 비교하여
+기준보다 느려지거나(허용 비율 초과) API 호출이 늘어난 항목을 표시합니다.
+
+사용 예:
+    python benchmarks/run_benchmark.py
+    python benchmarks/run_benchmark.py --sizes 1,10 --latency 0.05
+    python benchmarks/run_benchmark.py --update-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "tests"))
+from mock_kis_server import MockKisServer
+
+DEFAULT_BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+# 걸린 시간 차이가 이보다 작으면 측정 오차로 보고 성능 저하로 표시하지 않습니다 (초)
+MIN_TIME_DIFF_SECONDS = 0.1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="가짜 KIS 서버를 상대로 전략/주문 흐름 성능을 측정합니다.")
+    parser.add_argument("--sizes", default="1,10,50,200", help="측정할 종목 수 (쉼표로 구분)")
+    parser.add_argument("--modes", default="strategy,main,main_cold", help="측정할 흐름 (strategy, main, main_cold)")
+    parser.add_argument("--latency", type=float, default=0.02, help="가짜 서버 응답 지연 (초)")
+    parser.add_argument("--calls-per-second", type=int, default=None,
+                        help="봇의 초당 API 호출 한도 (기본: API_CALLS_PER_SECOND 설정값)")
+    parser.add_argument("--output", default=None, help="결과 JSON 경로 (기본: LOG_DIR/benchmark.json)")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE_PATH), help="비교할 기준값 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.20, help="기준보다 이 비율 이상 나빠지면 성능 저하로 표시")
+    parser.add_argument("--update-baseline", action="store_true", help="이번 결과를 기준값으로 저장")
+    return parser.parse_args()
+
+
+def _free_port():
+    """비어 있는 포트를 하나 고릅니다."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _symbols(count):
+    return [f"SYM{index:03d}" for index in range(1, count + 1)]
+
+
+def _build_server(symbols, latency):
+    """
+    종목 수만큼 시세를 만든 가짜 서버를 준비합니다.
+
+    짝수 번째 종목은 보유 중(익절/평단/큰수 주문), 홀수 번째 종목은 미보유(초기 진입)로 만듭니다.
+    """
+    server = MockKisServer(cash=1_000_000_000, latency=latency)
+    today = datetime.now().strftime("%Y%m%d")
+
+    for index, symbol in enumerate(symbols):
+        open_price = 20.0 + index % 50
+        server.set_market(symbol, open_price=open_price, last_price=open_price * 1.01)
+
+        if index % 2 == 1:
+            server.set_holding(symbol, quantity=8, avg_price=open_price * 0.99)
+            server.add_filled_order(symbol, "SELL", 6, open_price * 1.1, ord_dt=today, ord_tmd="050000")
+            server.add_filled_order(symbol, "BUY", 4, open_price * 0.98, ord_dt=today, ord_tmd="060000")
+            server.add_filled_order(symbol, "BUY", 4, open_price, ord_dt=today, ord_tmd="070000")
+
+    return server
+
+
+def _run_strategy(symbols):
+    """종목마다 전략을 실행하고 계산된 주문 수를 돌려줍니다."""
+    from strategy import 무상태_무한매수법
+
+    order_count = 0
+    for symbol in symbols:
+        result = 무상태_무한매수법(symbol, "NAS", splits=40, take_profit_rate=0.10, big_buy_range=0.10)
+        order_count += len(result["orders"])
+    return order_count
+
+
+def _run_main(symbols, server):
+    """종목마다 trading_bot.main()을 LIVE 모드로 실행하고 접수된 주문 수를 돌려줍니다."""
+    import trading_bot
+
+    orders_before = server.call_counts.get("TTTT1002U", 0)
+    trading_bot.TRADE_MODE = "LIVE"
+    trading_bot.EXCHANGE = "NAS"
+
+    for symbol in symbols:
+        trading_bot.SYMBOL = symbol
+        try:
+            trading_bot.main()
+        except SystemExit:
+            pass
+
+    return server.call_counts.get("TTTT1002U", 0) - orders_before
+
+
+def run_scenario(mode, size, latency, port):
+    """
+    흐름 하나를 종목 수 size로 실행하고 측정 결과를 돌려줍니다.
+    """
+    import authentication
+    from metrics import reset_metrics
+    from tracing import reset_trace
+    from instruments import load_instruments, get_instrument
+
+    symbols = _symbols(size)
+    server = _build_server(symbols, latency)
+    server.start(port=port)
+
+    # 앞 실행의 주문 저널이 남아 있으면 "이미 접수된 주문"으로 보고 건너뛰므로 지웁니다
+    if os.path.exists(os.environ["JOURNAL_PATH"]):
+        os.remove(os.environ["JOURNAL_PATH"])
+
+    # 종목 정보 파일: main은 지난 실행에서 저장해 둔 파일이 있는 상태로, main_cold는 파일이 없는 상태로 측정합니다
+    if os.path.exists(os.environ["INSTRUMENT_CACHE_PATH"]):
+        os.remove(os.environ["INSTRUMENT_CACHE_PATH"])
+    if mode == "main":
+        authentication._cached_token = None
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_instruments()
+            for symbol in symbols:
+                get_instrument(symbol, "NAS")
+        server.call_counts.clear()
+
+    # 실행마다 토큰 발급부터 다시 시작합니다 (새 서버는 예전 토큰을 모릅니다)
+    authentication._cached_token = None
+    reset_metrics()
+    reset_trace()
+
+    try:
+        tracemalloc.start()
+        started_at = time.perf_counter()
+
+        # 봇이 출력하는 내용은 측정에 방해가 되므로 숨깁니다
+        with contextlib.redirect_stdout(io.StringIO()):
+            if mode == "strategy":
+                order_count = _run_strategy(symbols)
+            else:
+                order_count = _run_main(symbols, server)
+
+        wall_time = time.perf_counter() - started_at
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        server.stop()
+
+    return {
+        "mode": mode,
+        "symbols": size,
+        "wall_time_seconds": round(wall_time, 4),
+        "kis_calls": sum(server.call_counts.values()),
+        "kis_calls_by_tr_id": dict(sorted(server.call_counts.items())),
+        "rate_limited": server.rate_limited_count,
+        "orders": order_count,
+        "orders_per_second": round(order_count / wall_time, 3) if wall_time > 0 else 0.0,
+        "peak_memory_kib": round(peak_bytes / 1024, 1)
+    }
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """
+    기준값과 비교하여 항목별 변화율과 성능 저하 여부를 돌려줍니다.
+
+    - 걸린 시간 / 최대 메모리: 기준보다 tolerance 비율 이상 늘면 저하
+      (걸린 시간은 MIN_TIME_DIFF_SECONDS 이상 늘어난 경우만)
+    - API 호출 수: 같은 조건이면 항상 같아야 하므로 하나라도 늘면 저하
+    """
+    baseline_by_key = {f"{item['mode']}:{item['symbols']}": item for item in baseline.get("results", [])}
+    comparisons = []
+
+    for result in results:
+        key = f"{result['mode']}:{result['symbols']}"
+        base = baseline_by_key.get(key)
+        if base is None:
+            continue
+
+        changes = {}
+        regressions = []
+        for metric in ("wall_time_seconds", "peak_memory_kib", "kis_calls"):
+            if not base.get(metric):
+                continue
+            change = (result[metric] - base[metric]) / base[metric]
+            changes[metric] = round(change, 4)
+
+            limit = 0.0 if metric == "kis_calls" else tolerance
+            if metric == "wall_time_seconds" and result[metric] - base[metric] < MIN_TIME_DIFF_SECONDS:
+                continue
+            if change > limit:
+                regressions.append(metric)
+
+        comparisons.append({"key": key, "changes": changes, "regressions": regressions})
+
+    return comparisons
+
+
+def main():
+    args = parse_args()
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+
+    # 봇의 설정은 import 전에 환경변수로 정합니다 (가짜 서버 주소, 기록 파일은 임시 폴더로)
+    temp_folder = tempfile.mkdtemp(prefix="benchmark_")
+    port = _free_port()
+    os.environ["KIS_DOMAIN"] = f"http://127.0.0.1:{port}"
+    os.environ["KIS_APP_KEY"] = "benchmark"
+    os.environ["KIS_APP_SECRET"] = "benchmark"
+    os.environ["KIS_ACCOUNT_NO"] = "12345678"
+    os.environ["NOTIFY_BACKENDS"] = "file"
+    os.environ["NOTIFY_FILE_PATH"] = os.path.join(temp_folder, "notifications.jsonl")
+    os.environ["NOTIFY_RETRY_PATH"] = os.path.join(temp_folder, "notify_retry.jsonl")
+    os.environ["JOURNAL_PATH"] = os.path.join(temp_folder, "order_journal.jsonl")
+    os.environ["LEDGER_PATH"] = os.path.join(temp_folder, "fills.jsonl")
+    os.environ["INSTRUMENT_CACHE_PATH"] = os.path.join(temp_folder, "instruments.json")
+    os.environ["FILL_TRACK_SECONDS"] = "0"
+    output_path = args.output or os.path.join(os.getenv("LOG_DIR") or "logs", "benchmark.json")
+    os.environ["LOG_DIR"] = temp_folder
+    if args.calls_per_second:
+        os.environ["API_CALLS_PER_SECOND"] = str(args.calls_per_second)
+
+    sys.path.insert(0, str(ROOT / "src"))
+    sys.path.insert(0, str(ROOT))
+
+    from config import API_CALLS_PER_SECOND
+
+    # 처음 import하는 시간이 첫 측정에 섞이지 않도록 미리 불러 둡니다
+    import strategy
+    import trading_bot
+
+    print(f"벤치마크: 종목 수 {sizes}, 흐름 {modes}, 응답 지연 {args.latency * 1000:.0f}ms, 초당 호출 한도 {API_CALLS_PER_SECOND}")
+
+    results = []
+    for mode in modes:
+        for size in sizes:
+            result = run_scenario(mode, size, args.latency, port)
+            results.append(result)
+            print(
+                f"  {mode:8s} {size:4d}종목: {result['wall_time_seconds']:8.2f}초, "
+                f"API {result['kis_calls']:5d}회, 주문 {result['orders']:4d}건 ({result['orders_per_second']:.1f}건/초), "
+                f"최대 메모리 {result['peak_memory_kib']:.0f}KiB"
+            )
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": {
+            "latency_seconds": args.latency,
+            "api_calls_per_second": API_CALLS_PER_SECOND,
+            "python": sys.version.split()[0]
+        },
+        "results": results
+    }
+
+    has_regression = False
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+
+        if baseline.get("settings", {}).get("latency_seconds") != args.latency:
+            print(f"\n⚠️ 기준값과 응답 지연 설정이 다릅니다 (기준 {baseline.get('settings', {}).get('latency_seconds')}초).")
+
+        report["comparison"] = compare_with_baseline(results, baseline, args.tolerance)
+
+        print(f"\n[기준값 비교] ({args.baseline})")
+        for comparison in report["comparison"]:
+            changes = ", ".join(f"{metric} {change:+.1%}" for metric, change in comparison["changes"].items())
+            mark = "❌ 성능 저하" if comparison["regressions"] else "✓"
+            print(f"  {mark} {comparison['key']}: {changes}")
+            if comparison["regressions"]:
+                has_regression = True
+
+    output_folder = os.path.dirname(output_path)
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\n결과 저장: {output_path}")
+
+    if args.update_baseline:
+        report.pop("comparison", None)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+        print(f"기준값 저장: {args.baseline}")
+
+    return 1 if has_regression and not args.update_baseline else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+분봉 다운로드 실행 파일
+
+종목의 1분봉을 받아 BARS_DIR/거래소/종목/YYYYMMDD.bin 파일에 이어 씁니다.
+API는 최근 이틀 정도의 분봉만 주므로, 장 마감 후 매일 실행해서 분봉을 모으세요.
+이미 저장된 분봉은 다시 받지 않습니다.
+
+사용 예:
+    python download_bars.py                 # SYMBOL / EXCHANGE 설정의 종목
+    python download_bars.py TQQQ:NAS SOXL:AMS
+"""
+
+import sys
+sys.path.append("src")
+
+from config import SYMBOL, EXCHANGE, LOG_DIR
+from scanner import parse_universe
+from minute_bars import download_minute_bars
+from metrics import export_metrics, print_summary
+
+
+def main():
+    """명령행의 종목(없으면 SYMBOL)의 분봉을 받습니다."""
+    universe = parse_universe(",".join(sys.argv[1:])) or [(SYMBOL, EXCHANGE)]
+    failed = []
+
+    for symbol, exchange_code in universe:
+        try:
+            written = download_minute_bars(symbol, exchange_code)
+        except Exception as e:
+            print(f"✗ {symbol}({exchange_code}) 분봉 받기 실패: {str(e)}")
+            failed.append(symbol)
+            continue
+
+        summary = ", ".join(f"{trade_date} {count}개" for trade_date, count in written.items()) or "새 분봉 없음"
+        print(f"✓ {symbol}({exchange_code}): {summary}")
+
+    print_summary()
+    try:
+        export_metrics(LOG_DIR)
+    except OSError as e:
+        print(f"⚠️ API 호출 통계 저장 실패: {e}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+장 마감 전 주문 재평가 실행 파일
+
+trading_bot.py는 장 마감 몇 시간 전에 한 번 실행되어 그때의 현재가로 주문을 넣습니다.
+이 프로그램은 장 마감 INTRADAY_WINDOW_MINUTES분 전부터 INTRADAY_INTERVAL_SECONDS초마다
+실시간 시세로 주문 계획을 다시 세우고, 주문이 달라졌을 때만 정정/신규/취소 주문을 보냅니다.
+LOC 주문 접수가 마감되기 전(장 마감 INTRADAY_CUTOFF_MINUTES분 전)에 종료합니다.
+
+trading_bot.py가 LIVE 모드로 넣은 주문은 주문 저널에서 읽어 와서 새로 넣지 않고 정정합니다.
+"""
+
+import os
+import sys
+sys.path.append("src")
+
+from config import SYMBOL, EXCHANGE, TRADE_MODE, SPLITS, TAKE_PROFIT, BIG_BUY_RANGE, LOG_DIR
+from intraday import run_intraday_loop
+from realtime import RealtimePriceClient
+from notifier import notify, flush_notifications
+from metrics import export_metrics, print_summary
+from tracing import export_trace
+from instruments import load_instruments, get_instrument
+
+
+def main():
+    """
+    실시간 시세를 받으면서 장 마감 전 재평가를 실행합니다.
+
+    실시간 시세 연결이 안 되면 매번 현재가 조회 API로 대신합니다.
+    """
+    print("\n" + "="*60)
+    print("장 마감 전 주문 재평가 시작")
+    print("="*60)
+    print(f"종목 코드: {SYMBOL}, 거래소: {EXCHANGE}, 거래 모드: {TRADE_MODE}")
+
+    load_instruments()
+    instrument = get_instrument(SYMBOL, EXCHANGE)
+
+    client = RealtimePriceClient()
+    client.subscribe(SYMBOL, EXCHANGE)
+    client.start()
+
+    try:
+        summary = run_intraday_loop(
+            symbol=SYMBOL,
+            exchange_code=EXCHANGE,
+            order_exchange_code=instrument.order_exchange,
+            splits=SPLITS,
+            take_profit_rate=TAKE_PROFIT,
+            big_buy_range=BIG_BUY_RANGE,
+            trade_mode=TRADE_MODE,
+            price_book=client.price_book
+        )
+
+        if summary["failed"]:
+            message = f"⚠️ 재평가 중 주문 실패 {len(summary['failed'])}건\n"
+            message += "\n".join(f"{comment} {action}: {error}" for action, comment, error in summary["failed"])
+            notify(message, event_type="order_failed", data={"failed": len(summary["failed"])})
+
+    except Exception as e:
+        print(f"✗ 재평가 중 에러 발생: {str(e)}")
+        notify(f"🚨 재평가 중 에러 발생\n\n{str(e)}", event_type="error", data={"error": str(e)})
+        sys.exit(1)
+
+    finally:
+        client.stop()
+
+        print_summary()
+        try:
+            export_metrics(LOG_DIR)
+        except OSError as e:
+            print(f"⚠️ API 호출 통계 저장 실패: {e}")
+
+        flush_notifications()
+
+        try:
+            export_trace(os.path.join(LOG_DIR, "trace_intraday.json"))
+        except OSError as e:
+            print(f"⚠️ 트레이스 저장 실패: {e}")
+
+
+if __name__ == "__main__":
+    main()
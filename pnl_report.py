@@ -0,0 +1,111 @@
+"""
+손익 보고서 실행 파일
+
+체결 기록을 매매 사이클(첫 매수 → 전량 매도)로 나눠 사이클별 실현 손익, 보유 기간,
+사용한 분할 수와 진행 중인 사이클의 평가 손익, 연도별 원화 손익과 예상 양도소득세를 보여 줍니다.
+주문은 하지 않습니다.
+
+사용 예:
+    python pnl_report.py          # 장부(LEDGER_PATH)의 체결 기록
+    python pnl_report.py 365      # 최근 365일 체결내역을 API로 조회
+"""
+
+import sys
+from datetime import datetime, timedelta
+sys.path.append("src")
+
+from config import SYMBOL, EXCHANGE, LOG_DIR
+from ledger import read_fills
+from analytics import columns_from_ledger, columns_from_history, analyze_cycles, summarize_cycles
+from trader import get_overseas_fill_history, get_overseas_stock_quotation, get_overseas_purchase_amount
+from metrics import export_metrics, print_summary
+
+
+def load_columns():
+    """명령행에 일수가 있으면 API 체결내역을, 없으면 장부를 읽습니다."""
+    if len(sys.argv) > 1:
+        start_date = (datetime.now() - timedelta(days=int(sys.argv[1]))).strftime("%Y%m%d")
+        rows = get_overseas_fill_history(start_date=start_date)
+        print(f"체결내역 {len(rows)}건 (API, {start_date}부터)")
+        return columns_from_history(rows)
+
+    fills = read_fills()
+    print(f"체결 기록 {len(fills)}건 (장부)")
+    return columns_from_ledger(fills, EXCHANGE)
+
+
+def fetch_last_prices(columns):
+    """진행 중일 수 있는 종목의 현재가를 조회합니다. (실패한 종목은 평가하지 않음)"""
+    last_prices = {}
+    for symbol, exchange_code in sorted(set(zip(columns["symbol"], columns["exchange"]))):
+        try:
+            last_prices[symbol] = get_overseas_stock_quotation(symbol, exchange_code)["last"]
+        except Exception as e:
+            print(f"⚠️ {symbol} 현재가 조회 실패: {e}")
+    return last_prices
+
+
+def print_report(cycles, summary):
+    """사이클 표와 종목별/연도별 요약을 출력합니다."""
+    print(f"\n{'종목':<6} {'#':>3} {'시작':<10} {'보유일':>6} {'분할':>4} {'매수금액':>12} {'실현손익':>11} {'수익률':>8} {'상태':<6}")
+    for cycle in cycles:
+        if not cycle["complete"]:
+            state = "기간 밖"
+        elif cycle["closed"]:
+            state = "완료"
+        else:
+            state = f"보유 {cycle['position']}주"
+        pnl = f"{cycle['realized_pnl']:>11,.2f}" if cycle["realized_pnl"] is not None else f"{'-':>11}"
+        rate = f"{cycle['realized_return']:>+8.2%}" if cycle["realized_return"] is not None else f"{'-':>8}"
+        print(
+            f"{cycle['symbol']:<6} {cycle['cycle']:>3} {cycle['start'][:10]:<10} {cycle['holding_days']:>6.1f} "
+            f"{cycle['splits_used']:>4} {cycle['invested']:>12,.2f} {pnl} {rate} {state:<6}"
+        )
+        if cycle["unrealized_pnl"] is not None:
+            print(f"{'':>11} 평단 {cycle['avg_price']:.4f}, 평가 손익 {cycle['unrealized_pnl']:,.2f} ({cycle['unrealized_return']:+.2%})")
+
+    print("\n[종목별]")
+    for symbol, row in summary["symbols"].items():
+        win_rate = f"{row['win_rate']:.0%}" if row["win_rate"] is not None else "-"
+        holding = f"{row['avg_holding_days']:.1f}일" if row["avg_holding_days"] is not None else "-"
+        print(f"  {symbol}: 완료 {row['closed']}회 (승률 {win_rate}), 실현 손익 {row['realized_pnl']:,.2f}, 평균 보유 {holding}")
+
+    if summary["yearly_krw"]:
+        print("\n[연도별 원화 실현 손익]")
+        for year, row in summary["yearly_krw"].items():
+            print(f"  {year}: {row['realized_krw']:,}원 (예상 양도소득세 {row['tax']:,}원)")
+
+
+def main():
+    """체결 기록을 읽어 손익 보고서를 출력합니다."""
+    print("\n" + "="*60)
+    print("손익 보고서")
+    print("="*60)
+
+    try:
+        columns = load_columns()
+        last_prices = fetch_last_prices(columns)
+
+        try:
+            exrt = get_overseas_purchase_amount(SYMBOL, EXCHANGE)["exrt"]
+        except Exception as e:
+            print(f"⚠️ 환율 조회 실패 (원화 손익 생략): {e}")
+            exrt = None
+
+        cycles = analyze_cycles(columns, last_prices=last_prices, exrt=exrt)
+        print_report(cycles, summarize_cycles(cycles))
+
+    except Exception as e:
+        print(f"✗ 손익 계산 중 에러 발생: {str(e)}")
+        sys.exit(1)
+
+    finally:
+        print_summary()
+        try:
+            export_metrics(LOG_DIR)
+        except OSError as e:
+            print(f"⚠️ API 호출 통계 저장 실패: {e}")
+
+
+if __name__ == "__main__":
+    main()
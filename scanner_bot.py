@@ -0,0 +1,62 @@
+"""
+종목 스캐너 실행 파일
+
+SCAN_UNIVERSE(비어 있으면 레버리지 ETF 목록)의 모든 종목을 동시에 조회하여
+무한매수법을 돌릴 후보를 점수 순으로 보여 줍니다.
+주문은 하지 않습니다. 고른 종목은 SYMBOL / EXCHANGE 설정으로 trading_bot.py에 넘기면 됩니다.
+"""
+
+import sys
+sys.path.append("src")
+
+from config import LOG_DIR, SCAN_TOP_N
+from scanner import scan_universe
+from notifier import notify, flush_notifications
+from metrics import export_metrics, print_summary
+
+
+def print_ranking(result):
+    """스캔 결과를 표로 출력합니다."""
+    print(f"\n조회 종목: {result['scanned']}개, 실패: {len(result['failed'])}개, 걸린 시간: {result['elapsed']:.2f}초\n")
+    print(f"{'순위':>4} {'종목':<6} {'거래소':<4} {'현재가':>10} {'시가대비':>8} {'변동폭':>7} {'거래대금($)':>15} {'점수':>5}")
+    for row in result["ranked"]:
+        print(
+            f"{row['rank']:>4} {row['symbol']:<6} {row['exchange']:<4} {row['last']:>10.4f} "
+            f"{row['gap_from_open']:>+8.2%} {row['day_range']:>7.2%} {row['turnover']:>15,.0f} {row['score']:>5.2f}"
+        )
+
+    for symbol, exchange_code, error in result["failed"]:
+        print(f"⚠️ {symbol}({exchange_code}) 조회 실패: {error}")
+
+
+def main():
+    """유니버스를 스캔하고 상위 종목을 출력/알림합니다."""
+    print("\n" + "="*60)
+    print("종목 스캐너 시작")
+    print("="*60)
+
+    try:
+        result = scan_universe(top_n=SCAN_TOP_N)
+        print_ranking(result)
+
+        if result["ranked"]:
+            lines = [f"{row['rank']}. {row['symbol']} ({row['gap_from_open']:+.2%}, 점수 {row['score']:.2f})" for row in result["ranked"]]
+            notify("🔎 오늘의 후보 종목\n" + "\n".join(lines), event_type="scan", data={"symbols": [row["symbol"] for row in result["ranked"]]})
+
+    except Exception as e:
+        print(f"✗ 스캔 중 에러 발생: {str(e)}")
+        notify(f"🚨 스캔 중 에러 발생\n\n{str(e)}", event_type="error", data={"error": str(e)})
+        sys.exit(1)
+
+    finally:
+        print_summary()
+        try:
+            export_metrics(LOG_DIR)
+        except OSError as e:
+            print(f"⚠️ API 호출 통계 저장 실패: {e}")
+
+        flush_notifications()
+
+
+if __name__ == "__main__":
+    main()
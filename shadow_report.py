@@ -0,0 +1,54 @@
+"""
+그림자 전략 보고서 실행 파일
+
+trading_bot이 기록한 그림자 계획(SHADOW_PATH)을 저장해 둔 그날 분봉으로 흉내 내어
+실제 계획과 그림자 계획의 체결 수, 매수/매도 수량, 비용, 종가 기준 손익을 나란히 보여 줍니다.
+API를 호출하지 않습니다. (분봉은 download_bars.py로 먼저 받아 두세요)
+
+사용 예:
+    python shadow_report.py 20240105              # 2024-01-05 분봉, 2024-01-05에 기록한 계획
+    python shadow_report.py 20240105 2024-01-06   # 계획을 기록한 날짜가 다를 때 (한국 시각)
+"""
+
+import sys
+sys.path.append("src")
+
+from config import SYMBOL, EXCHANGE
+from minute_bars import bar_path, read_bar_columns
+from shadow import read_shadows, simulate_shadows
+
+
+def main():
+    """명령행 날짜의 분봉으로 그날 그림자 계획을 흉내 냅니다."""
+    if len(sys.argv) < 2:
+        print("사용법: python shadow_report.py YYYYMMDD [계획 기록 날짜 YYYY-MM-DD]")
+        sys.exit(1)
+
+    bar_date = sys.argv[1]
+    record_date = sys.argv[2] if len(sys.argv) > 2 else f"{bar_date[:4]}-{bar_date[4:6]}-{bar_date[6:]}"
+
+    records = read_shadows(record_date, SYMBOL)
+    if not records:
+        print(f"{record_date}에 기록한 {SYMBOL} 그림자 계획이 없습니다.")
+        sys.exit(1)
+
+    columns = read_bar_columns(bar_path(SYMBOL, EXCHANGE, bar_date))
+    if not columns["time"]:
+        print(f"{bar_date} {SYMBOL} 분봉이 없습니다. download_bars.py로 먼저 받아 두세요.")
+        sys.exit(1)
+
+    for record in records:
+        snapshot = record["snapshot"]
+        print(f"\n[{record['time']}] 현재가 ${snapshot['last_price']}, 보유 {snapshot['position_qty']}주, "
+              f"주문 가능 ${snapshot['orderable_cash']:.2f}")
+        print(f"  {'이름':<16} {'체결':>4} {'매수':>6} {'매도':>6} {'보유':>6} {'비용':>8} {'손익':>10}")
+        for outcome in simulate_shadows(record, columns):
+            if outcome["error"]:
+                print(f"  {outcome['name']:<16} {outcome['error']}")
+                continue
+            print(f"  {outcome['name']:<16} {outcome['filled']:>4} {outcome['bought']:>6} {outcome['sold']:>6} "
+                  f"{outcome['position_qty']:>6} {outcome['total_cost']:>8.2f} {outcome['trade_pnl']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# 체결 기록으로 매매 사이클과 실현/평가 손익을 분석하는 코드 (손익 분석)
+#
+# 잔고 조회(get_overseas_balance)의 eval_rate는 지금 들고 있는 주식의 수익률만 알려 줍니다.
+# 무한매수법은 "첫 매수 → 분할 매수 → 전량 익절"을 한 사이클로 반복하므로,
+# 사이클마다 얼마를 넣어서 얼마를 벌었는지, 며칠이 걸렸는지, 몇 번 나눠 샀는지를 봐야 합니다.
+#
+# 이 파일은 체결 기록(ledger.py 장부 또는 get_overseas_fill_history 결과)을
+# 열별 배열(마이크로 단위, money.py)로 바꾼 뒤 한 번에 계산합니다:
+# 1. 종목/시각 순으로 정렬하고 누적 합(accumulate)으로 체결 후 보유 수량을 구합니다
+# 2. 보유 수량이 0이 되는 체결에서 사이클을 끊습니다 (남은 체결은 진행 중인 사이클)
+# 3. 사이클마다 배열 구간의 합으로 매수/매도 금액, 비용(costs.py), 실현 손익을 구합니다
+#
+# 조회 기간 이전에 산 주식을 기간 안에 판 경우(보유 수량이 음수가 됨)에는
+# 그만큼 처음부터 들고 있던 것으로 보고, 그 사이클은 complete=False로 표시하며 손익을 계산하지 않습니다.
+from array import array
+from datetime import datetime
+from itertools import accumulate
+from costs import trade_costs, to_krw, capital_gains_tax
+from cycle_index import time_key
+from instruments import quote_exchange_code
+from money import to_units, from_units
+
+# 체결 열 이름
+FILL_COLUMNS = ("symbol", "exchange", "time", "sign", "quantity", "price", "exrt")
+
+
+def _to_datetime(time_value):
+    return datetime.strptime(str(time_value), "%Y%m%d%H%M%S")
+
+
+def _build_columns(records):
+    """(종목, 거래소, 시각, 방향, 수량, 체결가, 환율) 목록을 열별 배열로 바꿉니다."""
+    symbols, exchanges, times, signs, quantities, prices, exrts = zip(*records) if records else ([],) * 7
+    return {
+        "symbol": list(symbols),
+        "exchange": list(exchanges),
+        "time": array("q", times),
+        "sign": array("b", signs),
+        "quantity": array("q", quantities),
+        "price": array("q", prices),
+        "exrt": array("q", exrts)
+    }
+
+
+def columns_from_ledger(fills, exchange_code="NAS"):
+    """
+    장부(ledger.read_fills)의 체결 기록을 열별 배열로 바꿉니다.
+
+    Parameters:
+        fills (list): 체결 기록 (time, symbol, side, quantity, price, 선택: exchange, exrt)
+        exchange_code (str): 체결 기록에 거래소가 없을 때 쓸 시세 조회용 거래소 코드
+
+    Returns:
+        dict: FILL_COLUMNS -> 열 (symbol/exchange는 list, 나머지는 array, 가격/환율은 마이크로 단위)
+    """
+    return _build_columns([
+        (
+            fill["symbol"].upper(),
+            quote_exchange_code(fill.get("exchange") or exchange_code),
+            time_key(fill["time"]),
+            1 if fill["side"] == "BUY" else -1,
+            int(fill["quantity"]),
+            to_units(fill["price"]),
+            to_units(fill.get("exrt") or 0)
+        )
+        for fill in fills if int(fill["quantity"]) > 0
+    ])
+
+
+def columns_from_history(rows):
+    """
+    체결내역 조회(get_overseas_fill_history) 결과를 열별 배열로 바꿉니다.
+
+    체결단가(ft_ccld_unpr3)가 비어 있으면 체결금액을 체결수량으로 나눠 씁니다.
+    """
+    records = []
+    for row in rows:
+        quantity = int(row["ft_ccld_qty"] or 0)
+        if quantity <= 0:
+            continue
+        price_units = to_units(row.get("ft_ccld_unpr3") or 0) or to_units(row["ft_ccld_amt3"]) // quantity
+        records.append((
+            row["pdno"].upper(),
+            quote_exchange_code(row["ovrs_excg_cd"]),
+            time_key(row["ord_dt"] + row["ord_tmd"]),
+            1 if row["sll_buy_dvsn_cd"] == "02" else -1,
+            quantity,
+            price_units,
+            0
+        ))
+    return _build_columns(records)
+
+
+def _sorted_columns(columns):
+    """종목, 시각 순으로 정렬한 열을 돌려줍니다. (같은 시각이면 원래 순서)"""
+    symbols = columns["symbol"]
+    times = columns["time"]
+    order = sorted(range(len(times)), key=lambda index: (symbols[index], times[index]))
+
+    result = {}
+    for name, values in columns.items():
+        picked = [values[index] for index in order]
+        result[name] = picked if isinstance(values, list) else array(values.typecode, picked)
+    return result
+
+
+def _costs_by_exchange(columns):
+    """거래소별로 나눠 비용을 계산한 뒤 원래 순서의 (금액, 비용, 현금 흐름) 배열로 합칩니다."""
+    count = len(columns["time"])
+    amounts = array("q", bytes(8 * count))
+    fees = array("q", bytes(8 * count))
+    cash = array("q", bytes(8 * count))
+
+    groups = {}
+    for index, exchange_code in enumerate(columns["exchange"]):
+        groups.setdefault(exchange_code, []).append(index)
+
+    for exchange_code, indexes in groups.items():
+        if len(indexes) == count:
+            costs = trade_costs(columns["sign"], columns["quantity"], columns["price"], exchange_code, slippage_rate=0)
+        else:
+            costs = trade_costs(
+                array("b", [columns["sign"][index] for index in indexes]),
+                array("q", [columns["quantity"][index] for index in indexes]),
+                array("q", [columns["price"][index] for index in indexes]),
+                exchange_code,
+                slippage_rate=0
+            )
+        for position, index in enumerate(indexes):
+            amounts[index] = costs["amount"][position]
+            fees[index] = costs["total_cost"][position]
+            cash[index] = costs["cash"][position]
+
+    return amounts, fees, cash
+
+
+def _open_cycle_basis(signs, quantities, amounts, fees, cash, start, end):
+    """
+    진행 중인 사이클의 매입 원가(수수료 포함)와 지금까지의 실현 손익을 이동평균법으로 구합니다.
+
+    사이클 안의 체결만 돌므로 종목마다 최대 한 번, 짧은 구간만 계산합니다.
+    """
+    held = 0
+    basis = 0
+    realized = 0
+    for index in range(start, end):
+        if signs[index] > 0:
+            basis += amounts[index] + fees[index]
+            held += quantities[index]
+        else:
+            sold_basis = basis * quantities[index] // held if held else 0
+            basis -= sold_basis
+            held -= quantities[index]
+            realized += cash[index] - sold_basis
+    return basis, realized
+
+
+def analyze_cycles(columns, last_prices=None, exrt=None, as_of=None):
+    """
+    체결 기록을 매매 사이클로 나누고 사이클별 손익을 계산합니다.
+
+    Parameters:
+        columns (dict): columns_from_ledger() / columns_from_history()의 결과
+        last_prices (dict): 종목 -> 현재가 (진행 중인 사이클의 평가 손익 계산용, 없으면 평가하지 않음)
+        exrt (str | float): 체결 기록에 환율이 없을 때 쓸 기준 환율
+            (get_overseas_purchase_amount의 exrt, None이면 원화 손익을 계산하지 않음)
+        as_of (datetime): 진행 중인 사이클의 보유 기간 기준 시각 (None이면 지금)
+
+    Returns:
+        list: 사이클 목록 (종목, 시작 시각 순)
+              각 사이클의 필드 (금액은 거래 통화, float):
+              - symbol / cycle: 종목 / 종목 안에서의 사이클 번호 (1부터)
+              - start / end: 첫 체결 / 마지막 체결 시각 (진행 중이면 end는 None)
+              - closed: 보유 수량이 0이 되어 끝난 사이클인지
+              - complete: 조회 기간 안에서 시작한 사이클인지 (False이면 손익 필드는 None)
+              - holding_days: 보유 기간 (일)
+              - buys / sells: 매수 / 매도 체결 수
+              - splits_used: 매수한 날 수 (무한매수법에서 사용한 분할 수)
+              - invested / proceeds: 매수 / 매도 금액 합계
+              - fees: 비용 합계 (costs.py)
+              - realized_pnl / realized_return: 실현 손익 (비용 차감) / 매수 금액 대비 수익률
+              - position / avg_price: 남은 수량 / 남은 주식의 평균 단가 (수수료 포함)
+              - unrealized_pnl / unrealized_return: 현재가 기준 평가 손익 / 수익률
+              - realized_krw: 끝난 사이클의 원화 실현 손익 (환전 스프레드 반영, 환율이 없으면 None)
+    """
+    columns = _sorted_columns(columns)
+    count = len(columns["time"])
+    if count == 0:
+        return []
+
+    last_prices = last_prices or {}
+    as_of = as_of or datetime.now()
+    symbols = columns["symbol"]
+    times = columns["time"]
+    signs = columns["sign"]
+    quantities = columns["quantity"]
+
+    amounts, fees, cash = _costs_by_exchange(columns)
+    buy_amounts = array("q", [amount if sign > 0 else 0 for amount, sign in zip(amounts, signs)])
+    sell_amounts = array("q", [amount if sign < 0 else 0 for amount, sign in zip(amounts, signs)])
+
+    # 원화 현금 흐름 (체결마다 환율이 있으면 그 환율, 없으면 exrt)
+    krw_cash = None
+    if exrt is not None or all(columns["exrt"]):
+        default_exrt = to_units(exrt or 0)
+        rates = [from_units(rate or default_exrt) for rate in columns["exrt"]]
+        if all(rates):
+            krw_cash = to_krw(cash, rates)
+
+    # 체결 후 보유 수량 = 종목 안에서의 누적 합
+    running = array("q", accumulate(sign * quantity for sign, quantity in zip(signs, quantities)))
+    symbol_starts = [0] + [index for index in range(1, count) if symbols[index] != symbols[index - 1]]
+    symbol_ends = symbol_starts[1:] + [count]
+
+    cycles = []
+    for symbol_start, symbol_end in zip(symbol_starts, symbol_ends):
+        base = running[symbol_start - 1] if symbol_start else 0
+        positions = [value - base for value in running[symbol_start:symbol_end]]
+
+        # 기간 이전부터 들고 있던 수량 (팔린 수량이 산 수량보다 많았던 만큼)
+        opening = max(0, -min(positions))
+        ends = [symbol_start + offset for offset, position in enumerate(positions) if position + opening == 0]
+        if not ends or ends[-1] != symbol_end - 1:
+            ends.append(symbol_end - 1)
+
+        start = symbol_start
+        for number, end in enumerate(ends, start=1):
+            cycle_opening = opening if start == symbol_start else 0
+            cycles.append(_summarize_cycle(
+                symbols[start], number, start, end + 1, positions[end - symbol_start] + opening, cycle_opening,
+                times, signs, quantities, amounts, buy_amounts, sell_amounts, fees, cash, krw_cash,
+                last_prices, as_of
+            ))
+            start = end + 1
+
+    return cycles
+
+
+def _summarize_cycle(symbol, number, start, end, position, opening, times, signs, quantities, amounts,
+                     buy_amounts, sell_amounts, fees, cash, krw_cash, last_prices, as_of):
+    """체결 구간 [start, end)을 사이클 하나로 요약합니다."""
+    closed = position == 0
+    complete = opening == 0
+    invested = sum(buy_amounts[start:end])
+    started_at = _to_datetime(times[start])
+    ended_at = _to_datetime(times[end - 1]) if closed else None
+
+    cycle = {
+        "symbol": symbol,
+        "cycle": number,
+        "start": started_at.isoformat(),
+        "end": ended_at.isoformat() if ended_at else None,
+        "closed": closed,
+        "complete": complete,
+        "holding_days": round(((ended_at or as_of) - started_at).total_seconds() / 86400, 2),
+        "buys": sum(1 for sign in signs[start:end] if sign > 0),
+        "sells": sum(1 for sign in signs[start:end] if sign < 0),
+        "splits_used": len({times[index] // 1_000_000 for index in range(start, end) if signs[index] > 0}),
+        "invested": from_units(invested),
+        "proceeds": from_units(sum(sell_amounts[start:end])),
+        "fees": from_units(sum(fees[start:end])),
+        "realized_pnl": None,
+        "realized_return": None,
+        "position": position,
+        "avg_price": None,
+        "unrealized_pnl": None,
+        "unrealized_return": None,
+        "realized_krw": None
+    }
+    if not complete:
+        return cycle
+
+    if closed:
+        # 보유 수량이 0이 되었으므로 현금 흐름의 합이 곧 실현 손익입니다
+        realized = sum(cash[start:end])
+        if krw_cash is not None:
+            cycle["realized_krw"] = round(from_units(sum(krw_cash[start:end])))
+    else:
+        basis, realized = _open_cycle_basis(signs, quantities, amounts, fees, cash, start, end)
+        cycle["avg_price"] = from_units(basis // position)
+        if symbol in last_prices:
+            unrealized = to_units(last_prices[symbol]) * position - basis
+            cycle["unrealized_pnl"] = from_units(unrealized)
+            cycle["unrealized_return"] = unrealized / basis if basis else None
+
+    cycle["realized_pnl"] = from_units(realized)
+    cycle["realized_return"] = realized / invested if invested else None
+    return cycle
+
+
+def summarize_cycles(cycles):
+    """
+    사이클 목록을 종목별로 요약하고, 연도별 원화 실현 손익과 예상 양도소득세를 구합니다.
+
+    Returns:
+        dict:
+            - symbols: 종목 -> {closed, wins, win_rate, realized_pnl, avg_return,
+                               avg_holding_days, avg_splits_used, position, unrealized_pnl}
+            - yearly_krw: 연도 -> {realized_krw, tax} (끝난 사이클의 종료 연도 기준)
+    """
+    symbols = {}
+    yearly_krw = {}
+
+    for cycle in cycles:
+        summary = symbols.setdefault(cycle["symbol"], {
+            "closed": 0, "wins": 0, "realized_pnl": 0.0, "returns": [], "holding_days": [],
+            "splits_used": [], "position": 0, "unrealized_pnl": None
+        })
+        if cycle["realized_pnl"] is not None:
+            summary["realized_pnl"] += cycle["realized_pnl"]
+
+        if cycle["closed"] and cycle["complete"]:
+            summary["closed"] += 1
+            summary["wins"] += cycle["realized_pnl"] > 0
+            summary["returns"].append(cycle["realized_return"] or 0.0)
+            summary["holding_days"].append(cycle["holding_days"])
+            summary["splits_used"].append(cycle["splits_used"])
+            if cycle["realized_krw"] is not None:
+                year = cycle["end"][:4]
+                yearly_krw[year] = yearly_krw.get(year, 0) + cycle["realized_krw"]
+        elif not cycle["closed"]:
+            summary["position"] = cycle["position"]
+            summary["unrealized_pnl"] = cycle["unrealized_pnl"]
+
+    def average(values):
+        return sum(values) / len(values) if values else None
+
+    for summary in symbols.values():
+        summary["realized_pnl"] = round(summary["realized_pnl"], 6)
+        summary["win_rate"] = summary["wins"] / summary["closed"] if summary["closed"] else None
+        summary["avg_return"] = average(summary.pop("returns"))
+        summary["avg_holding_days"] = average(summary.pop("holding_days"))
+        summary["avg_splits_used"] = average(summary.pop("splits_used"))
+
+    return {
+        "symbols": symbols,
+        "yearly_krw": {
+            year: {"realized_krw": realized, "tax": capital_gains_tax(realized)}
+            for year, realized in sorted(yearly_krw.items())
+        }
+    }
@@ -1,12 +1,22 @@
 # 한국투자증권 API 인증을 담당하는 파일
 import requests
+import threading
 import time
 from config import KIS_APP_KEY, KIS_APP_SECRET, KIS_DOMAIN
+from metrics import record_api_call
+from tracing import span
 
 # 발급받은 토큰을 캐시하는 전역 변수
 # 프로그램 실행 중 한 번 발급한 토큰을 재사용하여 불필요한 API 호출을 줄입니다
 _cached_token = None
 
+# 여러 스레드가 처음에 동시에 토큰을 요청해도 한 번만 발급받도록 보호하는 잠금
+# (스캐너처럼 여러 종목을 동시에 조회할 때, 토큰이 여러 번 발급되면 앞의 토큰이 무효가 됩니다)
+_token_lock = threading.Lock()
+
+# 발급받은 실시간(WebSocket) 접속키를 캐시하는 전역 변수
+_cached_approval_key = None
+
 
 def get_access_token():
     """
@@ -37,13 +47,22 @@ def get_access_token():
         Exception: API 호출 실패 또는 필수 환경변수 미설정 시 예외 발생
     """
     
-    global _cached_token
-    
     # 캐시된 토큰이 있으면 즉시 반환합니다
     # 이렇게 하면 같은 토큰을 여러 번 요청할 때 API 호출을 하지 않아 효율적입니다
     if _cached_token is not None:
         return _cached_token
     
+    with _token_lock:
+        # 잠금을 기다리는 동안 다른 스레드가 발급을 마쳤으면 그 토큰을 씁니다
+        if _cached_token is not None:
+            return _cached_token
+        return _issue_access_token()
+
+
+def _issue_access_token():
+    """토큰 발급 API를 호출하여 _cached_token에 저장합니다. (get_access_token()의 잠금 안에서 호출)"""
+    global _cached_token
+    
     # 환경변수가 설정되어 있는지 확인
     if not KIS_APP_KEY or not KIS_APP_SECRET:
         raise Exception(
@@ -74,11 +93,23 @@ def get_access_token():
     
     while retry_count < max_retries:
         try:
-            response = requests.post(url, json=body, headers=headers, verify=False)
+            started_at = time.perf_counter()
+            with span("token", category="kis"):
+                response = requests.post(url, json=body, headers=headers, verify=False)
             
             # 응답 데이터 추출
             response_data = response.json()
             
+            # 호출 시간과 결과를 기록합니다 (토큰 발급은 tr_id가 없어 "tokenP"로 기록)
+            record_api_call(
+                "tokenP",
+                time.perf_counter() - started_at,
+                response.status_code,
+                msg_cd=response_data.get("error_code", ""),
+                response_bytes=len(response.content),
+                retries=retry_count
+            )
+            
             # API 응답에 error_code가 있는지 확인합니다
             # 성공하면 access_token이 포함되어 있습니다
             if "error_code" in response_data:
@@ -119,3 +150,70 @@ def get_access_token():
             # HTTP 통신 오류입니다
             error_msg = str(e)
             raise Exception(f"토큰 발급 실패: {error_msg}")
+
+
+def get_approval_key():
+    """
+    한국투자증권 실시간(WebSocket) 시세 접속에 필요한 접속키(approval_key)를 발급받습니다.
+    
+    REST API의 access token과는 별개의 키이며, WebSocket 접속 후
+    종목 등록/해제 메시지의 header에 넣어 보냅니다.
+    한 번 발급받은 키는 전역 변수(_cached_approval_key)에 저장되어 재사용됩니다.
+    
+    Returns:
+        str: 실시간 접속키
+    
+    Raises:
+        Exception: API 호출 실패 또는 필수 환경변수 미설정 시 예외 발생
+    """
+    
+    global _cached_approval_key
+    
+    if _cached_approval_key is not None:
+        return _cached_approval_key
+    
+    if not KIS_APP_KEY or not KIS_APP_SECRET:
+        raise Exception(
+            "환경변수 KIS_APP_KEY와 KIS_APP_SECRET이 설정되어야 합니다. "
+            ".env 파일을 확인해주세요."
+        )
+    
+    url = f"{KIS_DOMAIN}/oauth2/Approval"
+    
+    headers = {
+        "Content-Type": "application/json; charset=UTF-8"
+    }
+    
+    # 접속키 발급은 appsecret 대신 secretkey라는 이름을 사용합니다
+    body = {
+        "grant_type": "client_credentials",
+        "appkey": KIS_APP_KEY,
+        "secretkey": KIS_APP_SECRET
+    }
+    
+    try:
+        started_at = time.perf_counter()
+        with span("approval_key", category="kis"):
+            response = requests.post(url, json=body, headers=headers, verify=False)
+        
+        response_data = response.json()
+        
+        record_api_call(
+            "Approval",
+            time.perf_counter() - started_at,
+            response.status_code,
+            msg_cd=response_data.get("error_code", ""),
+            response_bytes=len(response.content)
+        )
+        
+        approval_key = response_data.get("approval_key")
+        if not approval_key:
+            error_code = response_data.get("error_code", "")
+            error_description = response_data.get("error_description", "알 수 없는 오류")
+            raise Exception(f"실시간 접속키 발급 실패: [{error_code}] {error_description}")
+        
+        _cached_approval_key = approval_key
+        return approval_key
+    
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"실시간 접속키 발급 실패: {str(e)}")
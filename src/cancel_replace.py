@@ -0,0 +1,228 @@
+# 미체결 주문을 새 가격으로 정정하거나 취소하는 코드
+#
+# 평단가나 큰수 기준가가 바뀌면, 예전 가격으로 걸어 둔 주문은 그대로 남아 있게 됩니다.
+# 이 파일은 남아 있는 주문을 새 주문 계획과 비교해서,
+# 가격이 달라진 주문은 한 번에 정정하고, 계획에서 빠진 주문은 취소합니다.
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config import API_CALLS_PER_SECOND
+from money import to_units
+from trader import revise_or_cancel_overseas_order
+
+# 전략 주문의 매수/매도 구분을 미체결 조회 API의 매도매수구분코드로 바꾸는 표
+SIDE_CODE_MAP = {
+    "SELL": "01",  # 매도
+    "BUY": "02"    # 매수
+}
+
+
+def _same_order(planned_order, original_order):
+    """계획 주문과 원래 주문의 매수/매도, 주문 유형, 주문 설명이 모두 같은지 확인합니다."""
+    return (
+        planned_order["side"] == original_order.get("side")
+        and planned_order["order_type"] == original_order.get("order_type")
+        and planned_order.get("comment", "") == original_order.get("comment", "")
+    )
+
+
+def match_open_orders(planned_orders, open_orders, symbol, known_orders=None):
+    """
+    새 주문 계획과 이미 걸려 있는 미체결 주문을 짝지어 줍니다.
+
+    미체결 조회 결과에는 주문 유형(LOC, LIMIT 등)과 주문 설명이 없으므로,
+    주문 저널에 남은 주문번호(known_orders)로 원래 주문을 찾은 뒤
+    매수/매도, 주문 유형, 주문 설명이 모두 같은 계획 주문과 짝을 짓습니다.
+    일부 체결되어 미체결 수량이 줄어든 주문도 같은 주문으로 봅니다.
+
+    저널에 없는 주문(직접 낸 주문 등)은 어떤 주문인지 알 수 없으므로 짝을 짓지 않고 건드리지 않습니다.
+    저널에 있지만 새 계획에 없는 주문은 (None, 미체결 주문)으로 돌려주어 취소하게 합니다.
+    이때 미체결 주문에는 원래 주문 설명(comment)을 붙여 둡니다.
+
+    Parameters:
+        planned_orders (list): 전략이 만든 주문 목록 (strategy의 orders)
+        open_orders (list): get_overseas_open_orders()로 조회한 미체결 주문 목록
+        symbol (str): 종목 코드 (예: "TQQQ")
+        known_orders (dict): 주문번호별 원래 주문 (주문 저널에서 복원, 없으면 아무것도 짝짓지 않음)
+
+    Returns:
+        list: (계획 주문, 미체결 주문) 짝의 목록 (계획 주문이 None이면 취소할 주문)
+    """
+    known_orders = known_orders or {}
+
+    matches = []
+    matched_orders = []
+
+    for open_order in open_orders:
+        # 같은 종목, 아직 남은 수량이 있는 봇의 주문만 봅니다
+        if open_order.get("pdno", "").upper() != symbol.upper():
+            continue
+        if int(open_order.get("nccs_qty", "0")) <= 0:
+            continue
+
+        original_order = known_orders.get(open_order["odno"])
+        if original_order is None:
+            continue
+        if open_order.get("sll_buy_dvsn_cd") != SIDE_CODE_MAP.get(original_order.get("side")):
+            continue
+
+        planned_match = None
+        for planned_order in planned_orders:
+            if any(planned_order is matched_order for matched_order in matched_orders):
+                continue
+            if _same_order(planned_order, original_order):
+                planned_match = planned_order
+                break
+
+        if planned_match is None:
+            matches.append((None, dict(open_order, comment=original_order.get("comment", ""))))
+            continue
+
+        matched_orders.append(planned_match)
+        matches.append((planned_match, open_order))
+
+    return matches
+
+
+def build_replace_requests(matches, symbol, exchange_code):
+    """
+    짝지어진 주문을 정정/취소 요청으로 만듭니다.
+
+    - 계획 주문이 없으면(None) 취소합니다.
+    - 가격이 달라진 지정가 주문은 남은(미체결) 수량으로 정정합니다.
+    - 가격이 같거나 시장가 주문(가격 없음)이면 그대로 둡니다.
+
+    Parameters:
+        matches (list): match_open_orders()의 결과
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 주문용 거래소 코드 (예: "NASD")
+
+    Returns:
+        list: 정정/취소 요청 목록
+              [{
+                  "odno": 원래 주문번호,
+                  "symbol": 종목 코드,
+                  "exchange_code": 주문용 거래소 코드,
+                  "quantity": 정정/취소 수량 (미체결 수량),
+                  "new_price": 새 가격 (None이면 취소),
+                  "comment": 주문 설명
+              }]
+    """
+    replace_requests = []
+
+    for planned_order, open_order in matches:
+        # 일부 체결된 주문은 남은 수량만 정정/취소할 수 있습니다
+        remaining_qty = int(open_order.get("nccs_qty", "0"))
+
+        if planned_order is None:
+            replace_requests.append({
+                "odno": open_order["odno"],
+                "symbol": symbol,
+                "exchange_code": exchange_code,
+                "quantity": remaining_qty,
+                "new_price": None,
+                "comment": open_order.get("comment", "")
+            })
+            continue
+
+        new_price = planned_order["price"]
+        if not new_price:
+            continue
+
+        # 가격이 같으면 그대로 두면 됩니다 (마이크로 단위 정수로 비교)
+        if to_units(open_order.get("ft_ord_unpr3", "0")) == to_units(new_price):
+            continue
+
+        replace_requests.append({
+            "odno": open_order["odno"],
+            "symbol": symbol,
+            "exchange_code": exchange_code,
+            "quantity": remaining_qty,
+            "new_price": new_price,
+            "comment": planned_order.get("comment", "")
+        })
+
+    return replace_requests
+
+
+def _submit_one(replace_request, trade_mode):
+    """
+    정정/취소 요청 1건을 보내고 결과를 딕셔너리로 돌려줍니다.
+
+    예외가 나도 다른 요청에 영향을 주지 않도록 결과에 에러를 담아 반환합니다.
+    """
+    if replace_request["new_price"] is None:
+        action = "CANCEL"
+        price = 0
+    else:
+        action = "REVISE"
+        price = replace_request["new_price"]
+
+    started_at = time.monotonic()
+
+    try:
+        response = revise_or_cancel_overseas_order(
+            symbol=replace_request["symbol"],
+            exchange_code=replace_request["exchange_code"],
+            original_odno=replace_request["odno"],
+            action=action,
+            quantity=replace_request["quantity"],
+            price=price,
+            trade_mode=trade_mode
+        )
+        new_odno = response["odno"] if response else ""
+        success = True
+        error = ""
+    except Exception as e:
+        new_odno = ""
+        success = False
+        error = str(e)
+
+    return {
+        "odno": replace_request["odno"],
+        "comment": replace_request.get("comment", ""),
+        "action": action,
+        "new_price": replace_request["new_price"],
+        "success": success,
+        "new_odno": new_odno,
+        "error": error,
+        "elapsed": time.monotonic() - started_at
+    }
+
+
+def cancel_replace_orders(replace_requests, trade_mode="DRY"):
+    """
+    여러 건의 정정/취소 요청을 동시에 보냅니다.
+
+    요청을 하나씩 차례로 보내면 건수만큼 시간이 걸리므로,
+    여러 스레드로 동시에 보내되 초당 호출 한도(rate_limiter)는 지킵니다.
+    장 마감 직전에 전체 주문을 1초 안에 새 가격으로 바꾸기 위한 기능입니다.
+
+    Parameters:
+        replace_requests (list): build_replace_requests()로 만든 요청 목록
+        trade_mode (str): 거래 모드 ("DRY" 또는 "LIVE")
+
+    Returns:
+        list: 요청별 결과 목록 (입력 순서와 같음)
+              [{
+                  "odno": 원래 주문번호,
+                  "comment": 주문 설명,
+                  "action": "REVISE" 또는 "CANCEL",
+                  "new_price": 새 가격,
+                  "success": 성공 여부,
+                  "new_odno": 정정/취소 주문번호 (LIVE 성공 시),
+                  "error": 실패 사유,
+                  "elapsed": 걸린 시간 (초)
+              }]
+    """
+    if not replace_requests:
+        return []
+
+    worker_count = min(len(replace_requests), API_CALLS_PER_SECOND)
+
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        results = list(executor.map(
+            lambda replace_request: _submit_one(replace_request, trade_mode),
+            replace_requests
+        ))
+
+    return results
@@ -11,9 +11,13 @@ KIS_APP_SECRET = os.getenv("KIS_APP_SECRET", "")
 KIS_ACCOUNT_NO = os.getenv("KIS_ACCOUNT_NO", "")
 
 # 한국투자증권 API 엔드포인트
-KIS_DOMAIN = "https://openapi.koreainvestment.com:9443"  # 실전 환경
+# KIS_DOMAIN 환경변수로 바꿀 수 있습니다 (예: 테스트용 가짜 서버 http://127.0.0.1:8999)
+KIS_DOMAIN = os.getenv("KIS_DOMAIN") or "https://openapi.koreainvestment.com:9443"  # 실전 환경
 # KIS_DOMAIN = "https://openapivts.koreainvestment.com:29443"  # 모의 환경
 
+# 한국투자증권 실시간 시세(WebSocket) 주소
+KIS_WS_DOMAIN = os.getenv("KIS_WS_DOMAIN") or "ws://ops.koreainvestment.com:21000"  # 실전 환경
+
 # 종목 정보
 SYMBOL = os.getenv("SYMBOL") or "TQQQ"  # 종목 코드 (예: TQQQ, AAPL, TSLA)
 EXCHANGE = os.getenv("EXCHANGE") or "NAS"  # 거래소 코드 (NAS: 나스닥, NYS: 뉴욕 등)
@@ -28,3 +32,103 @@ BIG_BUY_RANGE = float(os.getenv("BIG_BUY_RANGE") or "0.10")  # 큰수 상승률
 
 # 거래 모드
 TRADE_MODE = os.getenv("TRADE_MODE") or "DRY"  # 거래 모드 (DRY: 주문 정보만 출력, LIVE: 실제 주문)
+
+# API 호출 속도 제한 (실전 계좌는 초당 20건 제한, 여유를 두고 18건으로 설정)
+API_CALLS_PER_SECOND = int(os.getenv("API_CALLS_PER_SECOND") or "18")
+
+# 체결 기록 파일 (체결될 때마다 한 줄씩 추가됩니다)
+LEDGER_PATH = os.getenv("LEDGER_PATH") or "logs/fills.jsonl"
+
+# 주문 후 체결 여부를 지켜보는 시간 (초, 0이면 지켜보지 않음)
+FILL_TRACK_SECONDS = int(os.getenv("FILL_TRACK_SECONDS") or "0")
+
+# 주문 기록(저널) 파일 (주문 의도/전송/접수를 한 줄씩 남깁니다)
+JOURNAL_PATH = os.getenv("JOURNAL_PATH") or "logs/order_journal.jsonl"
+
+# 주문 API 응답을 기다리는 최대 시간 (초)
+ORDER_TIMEOUT_SECONDS = float(os.getenv("ORDER_TIMEOUT_SECONDS") or "5")
+
+# 주문 응답이 시간 초과된 뒤 주문내역에 나타나기를 기다리는 시간과 확인 간격 (초)
+# (늦게 처리된 주문이 보이기 전에 다시 보내면 같은 주문이 두 번 들어갑니다)
+ORDER_ACK_GRACE_SECONDS = float(os.getenv("ORDER_ACK_GRACE_SECONDS") or "15")
+ORDER_ACK_POLL_SECONDS = float(os.getenv("ORDER_ACK_POLL_SECONDS") or "3")
+
+# 알림 설정
+# 사용할 알림 방법 (쉼표로 구분: telegram, file, webhook)
+NOTIFY_BACKENDS = os.getenv("NOTIFY_BACKENDS") or "telegram,file"
+NOTIFY_FILE_PATH = os.getenv("NOTIFY_FILE_PATH") or "logs/notifications.jsonl"  # file 알림을 저장할 파일
+NOTIFY_WEBHOOK_URL = os.getenv("NOTIFY_WEBHOOK_URL", "")  # webhook 알림을 받을 주소
+NOTIFY_RETRY_PATH = os.getenv("NOTIFY_RETRY_PATH") or "logs/notify_retry.jsonl"  # 전송 실패 알림 보관 파일
+
+# 실행 기록(통계, 보고서 등)을 저장할 폴더
+LOG_DIR = os.getenv("LOG_DIR") or "logs"
+
+# 성능 분석(프로파일링) 설정
+# PROFILE_ENABLED=1 이면 main과 전략 함수를 cProfile/tracemalloc으로 측정하여 LOG_DIR에 보고서를 저장합니다
+PROFILE_ENABLED = (os.getenv("PROFILE_ENABLED") or "0") == "1"
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N") or "40")  # 보고서에 표시할 항목 수
+
+# 실시간 시세가 이 시간(초)보다 오래되었으면 전략은 REST API로 다시 조회합니다
+REALTIME_MAX_AGE_SECONDS = float(os.getenv("REALTIME_MAX_AGE_SECONDS") or "5")
+
+# 종목 정보(거래소, 통화, 매매 단위, 이름) 저장 파일과 다시 조회하는 주기 (일)
+INSTRUMENT_CACHE_PATH = os.getenv("INSTRUMENT_CACHE_PATH") or "logs/instruments.json"
+INSTRUMENT_CACHE_DAYS = float(os.getenv("INSTRUMENT_CACHE_DAYS") or "7")
+
+# 호가 조회 결과를 다시 쓰는 시간 (초)
+ORDER_BOOK_CACHE_SECONDS = float(os.getenv("ORDER_BOOK_CACHE_SECONDS") or "2")
+
+# 초기 진입(LIMIT) 주문 가격 기준 (last: 현재가, bid: 매수호가, ask: 매도호가, mid: 매수/매도호가의 가운데)
+ENTRY_PRICE_MODE = os.getenv("ENTRY_PRICE_MODE") or "last"
+
+# 장 마감 전 주문 재평가(intraday) 설정
+# 장 마감 INTRADAY_WINDOW_MINUTES분 전부터 INTRADAY_INTERVAL_SECONDS초마다 주문 계획을 다시 세우고,
+# LOC 주문 접수 마감 전인 장 마감 INTRADAY_CUTOFF_MINUTES분 전에 멈춥니다
+INTRADAY_INTERVAL_SECONDS = float(os.getenv("INTRADAY_INTERVAL_SECONDS") or "30")
+INTRADAY_WINDOW_MINUTES = float(os.getenv("INTRADAY_WINDOW_MINUTES") or "30")
+INTRADAY_CUTOFF_MINUTES = float(os.getenv("INTRADAY_CUTOFF_MINUTES") or "10")
+
+# 종목 스캐너(scanner) 설정
+# SCAN_UNIVERSE: 살펴볼 종목 목록 ("종목:거래소"를 쉼표로 구분, 비우면 scanner.LEVERAGED_ETFS)
+# SCAN_TOP_N: 순위표에 남길 종목 수, SCAN_WORKERS: 동시에 조회할 스레드 수 (0이면 API_CALLS_PER_SECOND)
+SCAN_UNIVERSE = os.getenv("SCAN_UNIVERSE", "")
+SCAN_TOP_N = int(os.getenv("SCAN_TOP_N") or "10")
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS") or "0")
+
+# 분봉 저장 폴더 (종목/거래소/일자별 바이너리 파일, minute_bars.py)
+BARS_DIR = os.getenv("BARS_DIR") or "logs/bars"
+
+# 매매 비용 설정 (costs.py, 시뮬레이션과 손익 계산에 사용)
+# COMMISSION_RATE: 해외주식 매매 수수료율 (매수/매도 금액 모두, 예: 0.0025 = 0.25%)
+# SEC_FEE_RATE: 미국 SEC 수수료율 (미국 주식 매도 금액에만, 1건마다 센트 단위로 올림)
+# FINRA_TAF_PER_SHARE / FINRA_TAF_MAX: 미국 FINRA 거래활동수수료 (매도 주식 1주당 / 1건 최대, 달러)
+# FX_SPREAD_RATE: 환전 스프레드 (기준 환율 exrt 대비, 환전 우대를 받으면 낮추세요)
+# SLIPPAGE_RATE: 시뮬레이션 체결가가 불리한 쪽으로 밀리는 비율 (예: 0.0005 = 0.05%)
+COMMISSION_RATE = float(os.getenv("COMMISSION_RATE") or "0.0025")
+SEC_FEE_RATE = float(os.getenv("SEC_FEE_RATE") or "0.0000278")
+FINRA_TAF_PER_SHARE = float(os.getenv("FINRA_TAF_PER_SHARE") or "0.000166")
+FINRA_TAF_MAX = float(os.getenv("FINRA_TAF_MAX") or "8.30")
+FX_SPREAD_RATE = float(os.getenv("FX_SPREAD_RATE") or "0.01")
+SLIPPAGE_RATE = float(os.getenv("SLIPPAGE_RATE") or "0")
+
+# 해외주식 양도소득세 (1년 동안 실현한 원화 이익에서 기본공제를 뺀 금액에 부과)
+CAPITAL_GAINS_TAX_RATE = float(os.getenv("CAPITAL_GAINS_TAX_RATE") or "0.22")
+CAPITAL_GAINS_DEDUCTION_KRW = int(os.getenv("CAPITAL_GAINS_DEDUCTION_KRW") or "2500000")
+
+# 사이클 색인 파일 (종목별 체결을 매도 기준으로 나눈 색인, cycle_index.py)
+CYCLE_INDEX_PATH = os.getenv("CYCLE_INDEX_PATH") or "logs/cycle_index.jsonl"
+
+# 주문 전 위험 점검 설정 (risk.py, 주문을 보내기 전에 메모리 안에서만 확인합니다)
+# RISK_PRICE_BAND: LIMIT/LOO 지정가가 현재가보다 이 비율 넘게 비싼 매수 / 싼 매도이면 주문하지 않음 (예: 0.30 = 30%, LOC는 보지 않음)
+# RISK_MAX_SYMBOL_EXPOSURE / RISK_MAX_ACCOUNT_EXPOSURE: 종목 / 계좌의 보유 금액 + 매수 주문 금액 한도 (달러, 0이면 제한 없음)
+RISK_PRICE_BAND = float(os.getenv("RISK_PRICE_BAND") or "0.30")
+RISK_MAX_SYMBOL_EXPOSURE = float(os.getenv("RISK_MAX_SYMBOL_EXPOSURE") or "0")
+RISK_MAX_ACCOUNT_EXPOSURE = float(os.getenv("RISK_MAX_ACCOUNT_EXPOSURE") or "0")
+
+# 실행별 주문 대사 보고서 파일 (계획/접수/체결을 주문번호로 맞춘 결과, reconcile.py)
+RECONCILE_PATH = os.getenv("RECONCILE_PATH") or "logs/reconcile.jsonl"
+
+# 그림자 전략 설정 (shadow.py, 같은 스냅샷으로 다른 파라미터의 주문 계획을 세워 기록만 합니다)
+# SHADOW_PARAMS: "분할수/익절률/큰수상승률"을 쉼표로 구분 (예: "20/0.05/0.10,80/0.15/0.10", 비우면 사용 안 함)
+SHADOW_PARAMS = os.getenv("SHADOW_PARAMS") or ""
+SHADOW_PATH = os.getenv("SHADOW_PATH") or "logs/shadow.jsonl"
@@ -0,0 +1,201 @@
+# 매매 비용(수수료, 세금, 슬리피지, 환전)을 계산하는 코드 (비용 모델)
+#
+# 비용을 빼지 않은 시뮬레이션 결과는 실제보다 항상 좋게 나옵니다.
+# 무한매수법은 하루에도 여러 번 나눠 사고 팔기 때문에 건당 비용이 작아도 쌓이면 커집니다.
+# 이 파일은 체결 목록을 열별 정수 배열(마이크로 단위, money.py)로 바꾼 뒤
+# 배열 전체에 한 번에 다음 비용을 계산합니다:
+# - 슬리피지: 시뮬레이션 체결가를 불리한 쪽으로 SLIPPAGE_RATE만큼 밀어서 체결한 것으로 봄
+# - 매매 수수료: 매수/매도 금액 × COMMISSION_RATE
+# - SEC 수수료: 미국 주식 매도 금액 × SEC_FEE_RATE (센트 단위로 올림)
+# - FINRA TAF: 미국 주식 매도 주식 수 × FINRA_TAF_PER_SHARE (센트 단위로 올림, 1건 최대 FINRA_TAF_MAX)
+# - 환전: 기준 환율(get_overseas_purchase_amount의 exrt)에 FX_SPREAD_RATE만큼 불리하게 환전
+# - 양도소득세: 1년 동안 실현한 원화 이익에서 기본공제를 뺀 금액 × CAPITAL_GAINS_TAX_RATE
+#
+# 시뮬레이터(fill_simulator.py) 결과와 실제 체결 기록(ledger.py, fill_tracker.py) 모두에 쓸 수 있습니다.
+from array import array
+from config import (
+    COMMISSION_RATE,
+    SEC_FEE_RATE,
+    FINRA_TAF_PER_SHARE,
+    FINRA_TAF_MAX,
+    FX_SPREAD_RATE,
+    SLIPPAGE_RATE,
+    CAPITAL_GAINS_TAX_RATE,
+    CAPITAL_GAINS_DEDUCTION_KRW
+)
+from money import PRICE_SCALE, to_units, from_units
+from instruments import get_exchange
+
+# 수수료율은 SEC 수수료율(0.0000278)처럼 마이크로 단위보다 작을 수 있으므로 1조분의 1 단위 정수로 계산합니다
+RATE_SCALE = 1_000_000_000_000
+
+# 1센트 (마이크로 단위)
+CENT = PRICE_SCALE // 100
+
+# trade_costs()가 돌려주는 배열 이름
+COST_FIELDS = ("price", "amount", "slippage", "commission", "sec_fee", "taf", "total_cost", "cash")
+
+
+def _rate_parts(rate):
+    """비율을 RATE_SCALE 단위 정수로 바꿉니다. (0.0025 → 2,500,000,000)"""
+    return round(rate * RATE_SCALE)
+
+
+def _ceil_cent(units):
+    """마이크로 단위 금액을 센트 단위로 올림합니다."""
+    return -(-units // CENT) * CENT
+
+
+def trade_arrays(trades, price_field="price"):
+    """
+    체결 목록(딕셔너리)을 비용 계산용 열별 배열로 바꿉니다.
+
+    filled가 False인 주문(시뮬레이터의 미체결 주문)과 수량이 0인 체결은 뺍니다.
+
+    Parameters:
+        trades (list): 체결 목록 (side, quantity, 가격 필드)
+        price_field (str): 체결 가격 필드 이름 (시뮬레이터 결과는 "fill_price")
+
+    Returns:
+        tuple: (방향 array('b') 매수 1 / 매도 -1, 수량 array('q'), 체결가 array('q') 마이크로 단위)
+    """
+    filled = [trade for trade in trades if trade.get("filled", True) and int(trade["quantity"]) > 0]
+    signs = array("b", [1 if trade["side"] == "BUY" else -1 for trade in filled])
+    quantities = array("q", [int(trade["quantity"]) for trade in filled])
+    price_units = array("q", [to_units(trade[price_field]) for trade in filled])
+    return signs, quantities, price_units
+
+
+def trade_costs(signs, quantities, price_units, exchange_code="NAS", slippage_rate=SLIPPAGE_RATE,
+                commission_rate=COMMISSION_RATE):
+    """
+    체결 배열 전체의 비용과 현금 흐름을 한 번에 계산합니다.
+
+    Parameters:
+        signs (array): 방향 (매수 1, 매도 -1)
+        quantities (array): 체결 수량
+        price_units (array): 체결가 (마이크로 단위)
+        exchange_code (str): 시세 조회용 거래소 코드 (미국 거래소만 SEC 수수료/FINRA TAF 부과)
+        slippage_rate (float): 체결가를 불리한 쪽으로 미는 비율 (실제 체결 기록에는 0)
+        commission_rate (float): 매매 수수료율
+
+    Returns:
+        dict: COST_FIELDS -> array('q') (모두 거래 통화의 마이크로 단위)
+              - price: 슬리피지를 반영한 체결가
+              - amount: 체결 금액 (체결가 × 수량)
+              - slippage: 슬리피지로 더 낸(덜 받은) 금액
+              - commission / sec_fee / taf: 수수료
+              - total_cost: 슬리피지를 뺀 수수료 합계
+              - cash: 계좌 현금 변화 (매수는 음수, 매도는 양수, 수수료 반영)
+    """
+    us_fees = get_exchange(exchange_code)["currency"] == "USD"
+    slippage_parts = _rate_parts(slippage_rate)
+    commission_parts = _rate_parts(commission_rate)
+    sec_parts = _rate_parts(SEC_FEE_RATE) if us_fees else 0
+    taf_per_share = to_units(FINRA_TAF_PER_SHARE) if us_fees else 0
+    taf_max = to_units(FINRA_TAF_MAX)
+
+    # 1주당 슬리피지 (매수는 비싸게, 매도는 싸게 체결)
+    slip = [price * slippage_parts // RATE_SCALE for price in price_units]
+    prices = array("q", [price + sign * offset for price, sign, offset in zip(price_units, signs, slip)])
+    amounts = array("q", [price * quantity for price, quantity in zip(prices, quantities)])
+    slippage = array("q", [offset * quantity for offset, quantity in zip(slip, quantities)])
+    commission = array("q", [amount * commission_parts // RATE_SCALE for amount in amounts])
+
+    # SEC 수수료와 FINRA TAF는 매도에만 붙습니다
+    sec_fee = array("q", [
+        _ceil_cent(amount * sec_parts // RATE_SCALE) if sign < 0 else 0
+        for amount, sign in zip(amounts, signs)
+    ])
+    taf = array("q", [
+        min(_ceil_cent(quantity * taf_per_share), taf_max) if sign < 0 else 0
+        for quantity, sign in zip(quantities, signs)
+    ])
+
+    total_cost = array("q", map(sum, zip(commission, sec_fee, taf)))
+    cash = array("q", [-sign * amount - cost for sign, amount, cost in zip(signs, amounts, total_cost)])
+
+    return {
+        "price": prices,
+        "amount": amounts,
+        "slippage": slippage,
+        "commission": commission,
+        "sec_fee": sec_fee,
+        "taf": taf,
+        "total_cost": total_cost,
+        "cash": cash
+    }
+
+
+def fill_costs(trades, exchange_code="NAS", price_field="price", slippage_rate=0):
+    """
+    체결 목록(실제 체결 기록 또는 시뮬레이터 결과)의 비용을 계산합니다.
+
+    실제 체결가에는 이미 슬리피지가 들어 있으므로 기본값은 0입니다.
+    시뮬레이터 결과에는 price_field="fill_price", slippage_rate=SLIPPAGE_RATE를 넘기세요.
+
+    Returns:
+        dict: trade_costs()의 결과
+    """
+    signs, quantities, price_units = trade_arrays(trades, price_field)
+    return trade_costs(signs, quantities, price_units, exchange_code, slippage_rate)
+
+
+def to_krw(cash_units, exrt, fx_spread_rate=FX_SPREAD_RATE):
+    """
+    외화 현금 흐름을 원화로 바꿉니다. (환전 스프레드 반영)
+
+    외화가 필요한 매수(음수)는 기준 환율보다 비싸게 사고,
+    외화가 생기는 매도(양수)는 기준 환율보다 싸게 판 것으로 봅니다.
+
+    Parameters:
+        cash_units (array): 외화 현금 흐름 (마이크로 단위, trade_costs()의 cash)
+        exrt (str | float | list): 기준 환율 (get_overseas_purchase_amount의 exrt),
+            체결마다 다르면 cash_units와 같은 길이의 목록
+        fx_spread_rate (float): 환전 스프레드
+
+    Returns:
+        array('q'): 원화 현금 흐름 (마이크로 단위)
+    """
+    if isinstance(exrt, (str, int, float)):
+        rates = [to_units(exrt)] * len(cash_units)
+    else:
+        rates = [to_units(rate) for rate in exrt]
+
+    spread_parts = _rate_parts(fx_spread_rate)
+    buy_factor = RATE_SCALE + spread_parts
+    sell_factor = RATE_SCALE - spread_parts
+
+    return array("q", [
+        cash * rate * (buy_factor if cash < 0 else sell_factor) // (PRICE_SCALE * RATE_SCALE)
+        for cash, rate in zip(cash_units, rates)
+    ])
+
+
+def summarize_costs(costs):
+    """
+    trade_costs()의 결과를 항목별 합계(float)로 요약합니다. (보고/알림용)
+
+    Returns:
+        dict: trades(체결 수)와 COST_FIELDS 중 price를 뺀 항목별 합계
+    """
+    summary = {"trades": len(costs["amount"])}
+    for field in COST_FIELDS[1:]:
+        summary[field] = from_units(sum(costs[field]))
+    return summary
+
+
+def capital_gains_tax(realized_krw, tax_rate=CAPITAL_GAINS_TAX_RATE, deduction_krw=CAPITAL_GAINS_DEDUCTION_KRW):
+    """
+    1년 동안 실현한 원화 손익에 대한 해외주식 양도소득세를 돌려줍니다. (원, 버림)
+
+    Examples:
+        >>> capital_gains_tax(3_500_000)
+        220000
+        >>> capital_gains_tax(-1_000_000)
+        0
+    """
+    taxable = int(realized_krw) - deduction_krw
+    if taxable <= 0:
+        return 0
+    return taxable * _rate_parts(tax_rate) // RATE_SCALE
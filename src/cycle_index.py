@@ -0,0 +1,291 @@
+# 종목별 체결을 매매 사이클(매도로 끝나는 구간)로 나눠 색인하는 코드 (사이클 색인)
+#
+# 무한매수법은 "마지막 매도 이후 매수한 수량"으로 1회 매수 수량(unit_qty)을 정합니다.
+# 매번 체결내역 전체를 처음부터 훑어 매도를 찾으면 기록이 쌓일수록 느려지므로,
+# 이 파일은 종목마다 체결(주문 단위)을 시각 순으로 모아 두고
+# 매도 체결의 위치/시각(사이클 경계)과 사이클별 매수 수량 분포를 함께 관리합니다.
+#
+# - 사이클 k: k번째 매도 다음 체결부터 (k+1)번째 매도까지 (0부터, 마지막은 진행 중인 사이클)
+# - "날짜 d가 속한 사이클", "사이클 k의 체결/매수 수량 분포"는 경계 목록의 이진 탐색으로 찾습니다
+# - 새 체결은 끝에 붙이기만 하면 되고, 같은 주문번호가 더 체결되면 그 자리의 수량만 고칩니다
+#
+# 체결이 들어올 때마다 한 줄씩 CYCLE_INDEX_PATH 파일(JSONL)에 덧붙이고,
+# 프로그램을 시작해 처음 조회할 때 파일을 시각 순으로 다시 읽어 경계를 만듭니다.
+import json
+import os
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from config import CYCLE_INDEX_PATH
+
+# 종목 -> CycleIndex
+_indexes = {}
+_loaded_path = None
+
+# 여러 스레드(체결 확인, 전략)가 동시에 색인을 고치지 않도록 보호하는 잠금
+_lock = threading.RLock()
+
+
+def time_key(text):
+    """
+    시각 문자열을 YYYYMMDDHHMMSS 정수로 바꿉니다.
+
+    Examples:
+        >>> time_key("2024-01-05T10:30:00")
+        20240105103000
+        >>> time_key("20240105" + "093000")
+        20240105093000
+    """
+    digits = "".join(character for character in str(text) if character.isdigit())
+    return int(digits[:14].ljust(14, "0"))
+
+
+class CycleIndex:
+    """
+    한 종목의 체결(주문 단위)과 사이클 경계(매도)의 색인
+
+    체결은 시각 오름차순 열(times, sides, quantities, odnos)로 두고,
+    매도 체결의 위치(boundaries)와 시각(boundary_times)을 오름차순으로 따로 둡니다.
+    histograms[k]는 사이클 k의 매수 수량 -> 주문 수입니다.
+    """
+
+    def __init__(self):
+        self.times = []
+        self.sides = []       # 매수 1, 매도 -1
+        self.quantities = []
+        self.odnos = []
+        self.positions = {}   # 주문번호 -> 위치
+        self.boundaries = []
+        self.boundary_times = []
+        self.histograms = [Counter()]
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def current_cycle(self):
+        """진행 중인 사이클 번호 (지금까지의 매도 체결 수)"""
+        return len(self.boundaries)
+
+    def _cycle_of_position(self, position):
+        return bisect_left(self.boundaries, position)
+
+    def _rebuild(self):
+        """체결 위치가 바뀌었을 때 경계와 분포를 처음부터 다시 만듭니다."""
+        self.positions = {odno: position for position, odno in enumerate(self.odnos)}
+        self.boundaries = [position for position, side in enumerate(self.sides) if side < 0]
+        self.boundary_times = [self.times[position] for position in self.boundaries]
+        self.histograms = [Counter() for _ in range(len(self.boundaries) + 1)]
+        for position, (side, quantity) in enumerate(zip(self.sides, self.quantities)):
+            if side > 0:
+                self.histograms[self._cycle_of_position(position)][quantity] += 1
+
+    def add(self, time_value, side, quantity, odno):
+        """
+        체결을 색인에 넣습니다.
+
+        같은 주문번호가 이미 있으면 체결 수량(누적)만 고칩니다. (시각과 방향은 처음 값 유지)
+
+        Parameters:
+            time_value (int): 시각 (YYYYMMDDHHMMSS)
+            side (int): 매수 1, 매도 -1
+            quantity (int): 주문의 누적 체결 수량
+            odno (str): 주문번호
+
+        Returns:
+            bool: 색인이 바뀌었는지
+        """
+        position = self.positions.get(odno)
+        if position is not None:
+            previous = self.quantities[position]
+            if previous == quantity:
+                return False
+            self.quantities[position] = quantity
+            if self.sides[position] > 0:
+                histogram = self.histograms[self._cycle_of_position(position)]
+                histogram[previous] -= 1
+                if histogram[previous] <= 0:
+                    del histogram[previous]
+                histogram[quantity] += 1
+            return True
+
+        if not self.times or time_value >= self.times[-1]:
+            # 대부분의 체결은 시각 순으로 들어오므로 끝에 붙이기만 합니다
+            position = len(self.times)
+            self.times.append(time_value)
+            self.sides.append(side)
+            self.quantities.append(quantity)
+            self.odnos.append(odno)
+            self.positions[odno] = position
+            if side < 0:
+                self.boundaries.append(position)
+                self.boundary_times.append(time_value)
+                self.histograms.append(Counter())
+            else:
+                self.histograms[-1][quantity] += 1
+            return True
+
+        # 예전 체결이 늦게 들어온 경우 (드묾): 제자리에 넣고 다시 만듭니다
+        rows = list(zip(self.times, self.sides, self.quantities, self.odnos))
+        insort(rows, (time_value, side, quantity, odno), key=lambda row: row[0])
+        self.times, self.sides, self.quantities, self.odnos = (list(column) for column in zip(*rows))
+        self._rebuild()
+        return True
+
+    def cycle_at(self, time_value):
+        """
+        시각이 속한 사이클 번호를 돌려줍니다. (그 시각의 매도는 그 매도로 끝나는 사이클에 속함)
+        """
+        return bisect_left(self.boundary_times, time_value)
+
+    def cycle_range(self, cycle=None):
+        """사이클의 체결 위치 구간 [start, end)을 돌려줍니다. (None이면 진행 중인 사이클)"""
+        if cycle is None:
+            cycle = self.current_cycle
+        if cycle < 0 or cycle > self.current_cycle:
+            return 0, 0
+        start = self.boundaries[cycle - 1] + 1 if cycle > 0 else 0
+        end = self.boundaries[cycle] + 1 if cycle < self.current_cycle else len(self.times)
+        return start, end
+
+    def cycle_fills(self, cycle=None):
+        """
+        사이클의 체결 목록을 돌려줍니다. (None이면 진행 중인 사이클)
+
+        Returns:
+            list: [{"time", "side" ("BUY"/"SELL"), "quantity", "odno"}, ...] 시각 순
+        """
+        start, end = self.cycle_range(cycle)
+        return [
+            {
+                "time": self.times[position],
+                "side": "BUY" if self.sides[position] > 0 else "SELL",
+                "quantity": self.quantities[position],
+                "odno": self.odnos[position]
+            }
+            for position in range(start, end)
+        ]
+
+    def histogram(self, cycle=None):
+        """
+        사이클의 매수 수량 분포(수량 -> 주문 수)를 돌려줍니다. (None이면 진행 중인 사이클)
+        """
+        if cycle is None:
+            cycle = self.current_cycle
+        if cycle < 0 or cycle > self.current_cycle:
+            return {}
+        return dict(self.histograms[cycle])
+
+    def unit_quantity(self):
+        """
+        진행 중인 사이클(마지막 매도 이후)에서 가장 많이 쓴 매수 수량을 돌려줍니다. (매수가 없으면 None)
+        """
+        histogram = self.histograms[self.current_cycle]
+        if not histogram:
+            return None
+        return histogram.most_common(1)[0][0]
+
+
+def _append_record(record):
+    folder = os.path.dirname(_loaded_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(_loaded_path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_cycle_index(path=CYCLE_INDEX_PATH):
+    """
+    파일에 저장된 체결을 읽어 종목별 색인을 만듭니다.
+
+    시각 순으로 정렬해서 넣으므로 한 번 훑으며 경계가 만들어집니다.
+    깨진 줄은 건너뜁니다.
+
+    Returns:
+        int: 읽은 체결 수
+    """
+    global _loaded_path
+
+    with _lock:
+        _indexes.clear()
+        _loaded_path = path
+
+        if not os.path.exists(path):
+            return 0
+
+        records = []
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+
+        # 같은 주문번호의 수량 고침은 나중 기록이 이기도록, 시각이 같으면 파일 순서를 유지합니다
+        for record in sorted(records, key=lambda record: record["time"]):
+            index = _indexes.setdefault(record["symbol"], CycleIndex())
+            index.add(record["time"], record["side"], record["quantity"], record["odno"])
+
+        return len(records)
+
+
+def get_cycle_index(symbol):
+    """
+    종목의 사이클 색인을 돌려줍니다. (처음 부르면 파일을 읽습니다)
+    """
+    with _lock:
+        if _loaded_path is None:
+            load_cycle_index()
+        return _indexes.setdefault(symbol.upper(), CycleIndex())
+
+
+def record_fill(symbol, time_text, side, quantity, odno):
+    """
+    체결(주문의 누적 체결 수량)을 색인에 넣고, 바뀌었으면 파일에 한 줄 덧붙입니다.
+
+    Parameters:
+        symbol (str): 종목 코드
+        time_text (str | int): 체결(주문) 시각 (ISO 형식 문자열, "YYYYMMDDHHMMSS" 등)
+        side (str): "BUY" 또는 "SELL"
+        quantity (int): 주문의 누적 체결 수량
+        odno (str): 주문번호
+
+    Returns:
+        bool: 색인이 바뀌었는지
+    """
+    record = {
+        "symbol": symbol.upper(),
+        "time": time_key(time_text),
+        "side": 1 if side == "BUY" else -1,
+        "quantity": int(quantity),
+        "odno": odno
+    }
+    with _lock:
+        index = get_cycle_index(symbol)
+        if not index.add(record["time"], record["side"], record["quantity"], record["odno"]):
+            return False
+        # 수량만 고친 경우에도 처음 시각으로 기록해야 다시 읽을 때 같은 자리에 들어갑니다
+        record["time"] = index.times[index.positions[odno]]
+        _append_record(record)
+        return True
+
+
+def sync_order_history(symbol, order_history):
+    """
+    체결내역 조회(get_overseas_order_history) 결과 중 색인에 없거나 수량이 바뀐 주문만 넣습니다.
+
+    Returns:
+        int: 새로 넣거나 고친 주문 수
+    """
+    changed = 0
+    for order in order_history:
+        quantity = int(order.get("ft_ccld_qty", "0") or 0)
+        if quantity <= 0 or not order.get("odno"):
+            continue
+        side_name = order.get("sll_buy_dvsn_cd_name", "")
+        side = "SELL" if "매도" in side_name or "SELL" in side_name.upper() else "BUY"
+        changed += record_fill(symbol, order["ord_dt"] + order["ord_tmd"], side, quantity, order["odno"])
+    return changed
@@ -0,0 +1,183 @@
+# 분봉으로 주문 체결을 흉내 내는 코드 (체결 시뮬레이터)
+#
+# 일봉만으로는 익절 LIMIT 매도가 LOC 매수보다 먼저 체결되었는지,
+# LOC 주문이 종가에 얼마나 가깝게 걸렸는지 알 수 없습니다.
+# 이 파일은 저장해 둔 1분봉(minute_bars.py)을 하루씩 다시 돌려 보며
+# 무상태_무한매수법이 내는 주문 유형(LIMIT, LOC, MOC, LOO, MOO)의 체결 여부/가격/시각을 계산합니다.
+#
+# 체결 규칙:
+# - LIMIT 매수: 주문 후 저가가 지정가 이하인 첫 분봉에서 체결 (그 분봉 시가가 이미 낮으면 시가에 체결)
+# - LIMIT 매도: 주문 후 고가가 지정가 이상인 첫 분봉에서 체결 (그 분봉 시가가 이미 높으면 시가에 체결)
+# - LOC / MOC: 마지막 분봉 종가(장 마감 가격)로 판단, LOC 매수는 종가 ≤ 지정가, 매도는 종가 ≥ 지정가일 때 체결
+# - LOO / MOO: 첫 분봉 시가(장 시작 가격)로 판단, 장 시작 뒤에 낸 주문은 체결되지 않음
+#
+# LIMIT 주문은 분봉마다 확인하지 않고, 하루치 저가의 누적 최솟값 / 고가의 누적 최댓값을
+# 한 번 만들어 두고 이진 탐색으로 첫 체결 분봉을 찾습니다. (주문이 많아도 하루에 한 번만 훑음)
+from bisect import bisect_left
+from itertools import accumulate
+from operator import neg
+from config import BARS_DIR
+from money import to_units, from_units
+from minute_bars import bar_path, list_bar_dates, read_bar_columns
+from trader import ORDER_TYPE_CODES
+
+
+def _first_bar_index(columns, start):
+    """주문을 낸 시각 이후 첫 분봉의 위치를 돌려줍니다. (HHMMSS, None이면 장 시작부터)"""
+    if start is None:
+        return 0
+    return bisect_left(columns["time"], start)
+
+
+class _DayScan:
+    """
+    하루치 분봉에서 LIMIT 주문의 첫 체결 분봉을 빠르게 찾기 위한 누적 최솟값/최댓값 표
+
+    주문을 낸 시각(first_index)마다 한 번만 만들고, 같은 시각에 낸 주문은 모두 같은 표를 씁니다.
+    """
+
+    def __init__(self, columns, first_index):
+        self.first_index = first_index
+        # 누적 최솟값은 점점 작아지므로, 부호를 바꿔 오름차순으로 만들어 이진 탐색합니다
+        self.falling_low = list(map(neg, accumulate(columns["low"][first_index:], min)))
+        self.rising_high = list(accumulate(columns["high"][first_index:], max))
+
+    def first_touch(self, side, price_units, strict=False):
+        """지정가에 처음 닿은(strict이면 뚫은) 분봉의 위치를 돌려줍니다. (없으면 None)"""
+        if side == "BUY":
+            # 저가 ≤ 지정가 (strict: 저가 < 지정가) ⇔ -저가 ≥ -지정가 (strict: >)
+            index = bisect_left(self.falling_low, -price_units + (1 if strict else 0))
+            found = index < len(self.falling_low)
+        else:
+            index = bisect_left(self.rising_high, price_units + (1 if strict else 0))
+            found = index < len(self.rising_high)
+        return self.first_index + index if found else None
+
+
+def _result(order, filled, fill_units=None, fill_time=None, margin=None, reason=""):
+    """주문에 체결 결과를 덧붙인 딕셔너리를 만듭니다."""
+    return dict(
+        order,
+        filled=filled,
+        fill_price=from_units(fill_units) if filled else None,
+        fill_time=fill_time if filled else None,
+        margin=margin,
+        reason=reason
+    )
+
+
+def simulate_day(columns, orders, submit_time=None, strict=False):
+    """
+    하루치 분봉으로 주문 목록의 체결을 흉내 냅니다.
+
+    Parameters:
+        columns (dict): minute_bars.read_bar_columns()의 결과 (하루치)
+        orders (list): 전략이 만든 주문 목록 (side, quantity, price, order_type, comment)
+        submit_time (int): 주문을 낸 현지 시각 (HHMMSS, None이면 장 시작 전)
+        strict (bool): True이면 LIMIT 주문은 지정가를 뚫어야(닿기만 해서는 안 됨) 체결
+
+    Returns:
+        list: 주문별 결과 (체결 시각 순, 체결되지 않은 주문은 뒤에 입력 순서대로)
+              각 주문에 다음 필드를 더합니다:
+              - filled: 체결 여부
+              - fill_price: 체결 가격 (체결되지 않으면 None)
+              - fill_time: 체결 시각 HHMMSS (체결되지 않으면 None)
+              - margin: LOC/LOO 주문의 여유 (지정가와 기준가의 차이 / 기준가,
+                        0 이상이면 체결, 음수면 그만큼 모자라서 미체결)
+              - reason: 체결되지 않은 이유
+
+    Raises:
+        Exception: 지원하지 않는 주문 유형인 경우
+    """
+    times = columns["time"]
+    if not times:
+        return [_result(order, False, reason="분봉 없음") for order in orders]
+
+    first_index = _first_bar_index(columns, submit_time)
+    open_units = columns["open"][0]
+    close_units = columns["close"][-1]
+    open_time = times[0]
+    close_time = times[-1]
+    scan = None
+
+    results = []
+    for order in orders:
+        order_type = order["order_type"]
+        side = order["side"]
+        if order_type not in ORDER_TYPE_CODES:
+            raise Exception(f"지원하지 않는 주문 유형입니다: {order_type}")
+
+        price_units = to_units(order["price"] or 0)
+        is_buy = side == "BUY"
+
+        if order_type == "LIMIT":
+            if first_index >= len(times):
+                results.append(_result(order, False, reason="장 마감 후 주문"))
+                continue
+            if scan is None:
+                scan = _DayScan(columns, first_index)
+            index = scan.first_touch(side, price_units, strict)
+            if index is None:
+                results.append(_result(order, False, reason="지정가 미도달"))
+                continue
+            bar_open = columns["open"][index]
+            # 분봉이 시작할 때 이미 지정가보다 유리하면 그 시가에 체결됩니다
+            fill_units = min(bar_open, price_units) if is_buy else max(bar_open, price_units)
+            results.append(_result(order, True, fill_units, times[index]))
+
+        elif order_type in ("LOC", "MOC"):
+            if order_type == "MOC":
+                results.append(_result(order, True, close_units, close_time))
+                continue
+            margin = ((price_units - close_units) if is_buy else (close_units - price_units)) / close_units
+            if margin >= 0:
+                results.append(_result(order, True, close_units, close_time, margin))
+            else:
+                results.append(_result(order, False, margin=margin, reason="종가가 지정가 밖"))
+
+        else:
+            # LOO / MOO: 장 시작 동시호가에 참여해야 하므로 장 시작 전에 낸 주문만 체결됩니다
+            if first_index > 0:
+                results.append(_result(order, False, reason="장 시작 후 주문"))
+                continue
+            if order_type == "MOO":
+                results.append(_result(order, True, open_units, open_time))
+                continue
+            margin = ((price_units - open_units) if is_buy else (open_units - price_units)) / open_units
+            if margin >= 0:
+                results.append(_result(order, True, open_units, open_time, margin))
+            else:
+                results.append(_result(order, False, margin=margin, reason="시가가 지정가 밖"))
+
+    # 체결 시각 순으로 정렬합니다 (같은 시각이면 입력 순서, 미체결은 맨 뒤)
+    return sorted(results, key=lambda result: result["fill_time"] if result["filled"] else 1_000_000)
+
+
+def replay(symbol, exchange_code, plan_func, dates=None, submit_time=None, strict=False, bars_dir=BARS_DIR):
+    """
+    저장된 분봉을 하루씩 돌려 보며 주문 체결을 흉내 냅니다.
+
+    하루가 끝날 때마다 결과를 돌려주므로(generator), 호출한 쪽은 체결 결과로
+    보유 수량/평단가를 고친 뒤 다음 날 주문을 만들 수 있습니다.
+
+    Parameters:
+        symbol (str): 종목 코드
+        exchange_code (str): 시세 조회용 거래소 코드
+        plan_func (callable): plan_func(일자, 분봉 열) -> 그날 낼 주문 목록
+        dates (list): 돌려 볼 일자 목록 (None이면 저장된 모든 일자)
+        submit_time (int): 매일 주문을 내는 현지 시각 (HHMMSS, None이면 장 시작 전)
+        strict (bool): simulate_day() 참고
+        bars_dir (str): 분봉 저장 폴더
+
+    Yields:
+        tuple: (일자, simulate_day()의 결과)
+    """
+    if dates is None:
+        dates = list_bar_dates(symbol, exchange_code, bars_dir)
+
+    for trade_date in dates:
+        columns = read_bar_columns(bar_path(symbol, exchange_code, trade_date, bars_dir))
+        if not columns["time"]:
+            continue
+        orders = plan_func(trade_date, columns)
+        yield trade_date, simulate_day(columns, orders, submit_time, strict)
@@ -0,0 +1,181 @@
+# 주문 후 체결 여부를 지켜보는 코드
+#
+# 주문을 넣은 뒤 체결되었는지 확인하려면 API를 다시 불러야 합니다.
+# 주문마다 따로 물어보면 호출 수가 너무 많아지므로,
+# 오늘 주문 전체를 한 번에 조회해서 주문번호로 찾아봅니다.
+# 변화가 없으면 조회 간격을 점점 늘리고(backoff), 체결이 생기면 다시 짧게 줄입니다.
+import time
+from datetime import datetime
+from ledger import append_fill
+from cycle_index import record_fill
+from notifier import notify as send_notification
+from trader import get_overseas_today_orders
+
+# 조회 간격 (초)
+MIN_POLL_INTERVAL = 1.0   # 가장 짧은 간격
+MAX_POLL_INTERVAL = 15.0  # 가장 긴 간격
+BACKOFF_FACTOR = 2.0      # 변화가 없을 때 간격을 늘리는 배수
+
+# 매도매수구분코드를 전략의 매수/매도 표기로 바꾸는 표
+SIDE_NAME_MAP = {
+    "01": "SELL",
+    "02": "BUY"
+}
+
+
+def _index_by_odno(today_orders):
+    """
+    주문 목록을 주문번호로 바로 찾을 수 있도록 딕셔너리로 바꿉니다.
+    """
+    orders_by_odno = {}
+    for order in today_orders:
+        orders_by_odno[order["odno"]] = order
+    return orders_by_odno
+
+
+def _build_fill_event(tracked_order, status, previous_qty, previous_amount):
+    """
+    새로 체결된 부분만큼의 체결 기록을 만듭니다.
+
+    체결단가(ft_ccld_unpr3)는 주문 전체의 평균이므로,
+    이번에 늘어난 체결금액을 늘어난 수량으로 나누어 이번 체결의 단가를 구합니다.
+    """
+    filled_qty = int(status.get("ft_ccld_qty", "0"))
+    filled_amount = float(status.get("ft_ccld_amt3", "0"))
+
+    new_qty = filled_qty - previous_qty
+    new_amount = filled_amount - previous_amount
+
+    if new_qty > 0 and new_amount > 0:
+        price = new_amount / new_qty
+    else:
+        price = float(status.get("ft_ccld_unpr3", "0"))
+
+    return {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "symbol": tracked_order["symbol"],
+        "odno": tracked_order["odno"],
+        "side": SIDE_NAME_MAP.get(status.get("sll_buy_dvsn_cd", ""), tracked_order.get("side", "")),
+        "quantity": new_qty,
+        "price": round(price, 6),
+        "total_filled": filled_qty,
+        "order_quantity": int(status.get("ft_ord_qty", "0")),
+        "comment": tracked_order.get("comment", "")
+    }
+
+
+def _send_fill_message(fill_event, notify):
+    """
+    체결 알림 메시지를 보냅니다.
+    """
+    message = f"""💰 체결 확인
+
+{fill_event['comment']}
+{fill_event['side']} {fill_event['quantity']}주 @ ${fill_event['price']}
+누적 체결: {fill_event['total_filled']}/{fill_event['order_quantity']}주
+주문번호: {fill_event['odno']}"""
+    notify(message)
+
+
+def track_fills(tracked_orders, timeout_seconds, fetch_orders=get_overseas_today_orders, notify=send_notification):
+    """
+    주문들이 체결되는지 일정 시간 동안 지켜보고, 체결될 때마다 기록과 알림을 남깁니다.
+
+    한 번 조회할 때 오늘 주문 전체를 가져오므로,
+    지켜보는 주문이 몇 개든 조회 1회(연속조회 포함)로 모두 확인합니다.
+    모든 주문이 끝나거나(전량 체결/취소/거부) 시간이 다 되면 멈춥니다.
+
+    Parameters:
+        tracked_orders (list): 지켜볼 주문 목록
+              [{
+                  "odno": 주문번호,
+                  "symbol": 종목 코드,
+                  "side": "BUY" 또는 "SELL",
+                  "quantity": 주문 수량,
+                  "comment": 주문 설명
+              }]
+        timeout_seconds (float): 최대로 지켜볼 시간 (초)
+        fetch_orders (function): 오늘 주문 목록을 조회하는 함수
+        notify (function): 알림 메시지를 보내는 함수
+
+    Returns:
+        list: 지켜보는 동안 발생한 체결 기록 목록
+    """
+    # 주문번호별로 지금까지 확인한 체결 수량/금액을 기억합니다
+    filled_qty_by_odno = {}
+    filled_amount_by_odno = {}
+    pending_odnos = set()
+
+    for tracked_order in tracked_orders:
+        if tracked_order.get("odno"):
+            filled_qty_by_odno[tracked_order["odno"]] = 0
+            filled_amount_by_odno[tracked_order["odno"]] = 0.0
+            pending_odnos.add(tracked_order["odno"])
+
+    tracked_by_odno = _index_by_odno([order for order in tracked_orders if order.get("odno")])
+
+    fill_events = []
+    poll_interval = MIN_POLL_INTERVAL
+    deadline = time.monotonic() + timeout_seconds
+
+    while pending_odnos and time.monotonic() < deadline:
+        try:
+            status_by_odno = _index_by_odno(fetch_orders())
+        except Exception as e:
+            print(f"⚠️ 체결 조회 실패, 잠시 후 다시 시도합니다: {str(e)}")
+            status_by_odno = {}
+
+        changed = False
+
+        for odno in list(pending_odnos):
+            status = status_by_odno.get(odno)
+
+            # 아직 조회 결과에 나타나지 않은 주문은 다음 조회를 기다립니다
+            if status is None:
+                continue
+
+            filled_qty = int(status.get("ft_ccld_qty", "0"))
+
+            if filled_qty > filled_qty_by_odno[odno]:
+                fill_event = _build_fill_event(
+                    tracked_by_odno[odno],
+                    status,
+                    filled_qty_by_odno[odno],
+                    filled_amount_by_odno[odno]
+                )
+                filled_qty_by_odno[odno] = filled_qty
+                filled_amount_by_odno[odno] = float(status.get("ft_ccld_amt3", "0"))
+
+                append_fill(fill_event)
+                # 사이클 색인은 체결내역 동기화(sync_order_history)와 같은 KIS 주문일시로 넣어야 같은 자리에 들어갑니다
+                order_time = status.get("ord_dt", "") + status.get("ord_tmd", "")
+                record_fill(fill_event["symbol"], order_time or fill_event["time"], fill_event["side"], filled_qty, odno)
+                _send_fill_message(fill_event, notify)
+                fill_events.append(fill_event)
+                changed = True
+
+                print(f"💰 체결: {fill_event['comment']} {fill_event['quantity']}주 @ ${fill_event['price']}")
+
+            # 남은 수량이 없으면 (전량 체결, 취소, 거부) 더 이상 지켜보지 않습니다
+            if int(status.get("nccs_qty", "0")) == 0:
+                pending_odnos.discard(odno)
+                changed = True
+
+        if not pending_odnos:
+            break
+
+        # 변화가 있으면 간격을 줄이고, 없으면 간격을 늘립니다
+        if changed:
+            poll_interval = MIN_POLL_INTERVAL
+        else:
+            poll_interval = min(poll_interval * BACKOFF_FACTOR, MAX_POLL_INTERVAL)
+
+        remaining_seconds = deadline - time.monotonic()
+        if remaining_seconds <= 0:
+            break
+        time.sleep(min(poll_interval, remaining_seconds))
+
+    if pending_odnos:
+        print(f"⏳ 아직 끝나지 않은 주문 {len(pending_odnos)}개: {', '.join(sorted(pending_odnos))}")
+
+    return fill_events
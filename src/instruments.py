@@ -0,0 +1,237 @@
+# 종목 기본 정보(거래소, 통화, 호가 단위, 매매 단위, 이름)를 관리하는 코드 (종목 마스터)
+#
+# 거래소 코드 변환표가 여러 파일에 따로 있으면 서로 달라지기 쉽고,
+# 종목 정보를 매번 API로 조회하면 호출 한도를 낭비하게 됩니다.
+# 그래서 거래소 정보는 이 파일의 EXCHANGES 한 곳에만 두고,
+# 종목 정보는 처음 한 번만 API로 조회한 뒤 파일(INSTRUMENT_CACHE_PATH)에 저장해 두고 다시 씁니다.
+# 프로그램 시작 시 load_instruments()로 파일을 한 번 읽어 두면,
+# 이후 get_instrument()는 API 호출 없이 딕셔너리에서 바로 찾습니다.
+import json
+import os
+import time
+from collections import namedtuple
+from config import INSTRUMENT_CACHE_PATH, INSTRUMENT_CACHE_DAYS
+
+# 거래소 정보
+# - 키: 시세 조회용 거래소 코드 (EXCD)
+# - order_code: 주문/잔고 API용 거래소 코드 (OVRS_EXCG_CD)
+# - currency: 거래 통화
+# - product_type: 상품기본정보 조회용 상품유형코드 (PRDT_TYPE_CD)
+# - tick_ladder: 호가 단위표 이름 (TICK_LADDERS의 키)
+# - lot_size: 기본 매매 단위 (상품 정보에 없을 때 사용)
+EXCHANGES = {
+    "NAS": {"order_code": "NASD", "currency": "USD", "product_type": "512", "tick_ladder": "US", "lot_size": 1, "name": "나스닥"},
+    "NYS": {"order_code": "NYSE", "currency": "USD", "product_type": "513", "tick_ladder": "US", "lot_size": 1, "name": "뉴욕"},
+    "AMS": {"order_code": "AMEX", "currency": "USD", "product_type": "529", "tick_ladder": "US", "lot_size": 1, "name": "아멕스"},
+    "HKS": {"order_code": "SEHK", "currency": "HKD", "product_type": "501", "tick_ladder": "HK", "lot_size": 100, "name": "홍콩"},
+    "TSE": {"order_code": "TKSE", "currency": "JPY", "product_type": "515", "tick_ladder": "JP", "lot_size": 100, "name": "도쿄"},
+    "SHS": {"order_code": "SHAA", "currency": "CNY", "product_type": "551", "tick_ladder": "CN", "lot_size": 100, "name": "상해"},
+    "SZS": {"order_code": "SZAA", "currency": "CNY", "product_type": "552", "tick_ladder": "CN", "lot_size": 100, "name": "심천"},
+    "HNX": {"order_code": "HASE", "currency": "VND", "product_type": "507", "tick_ladder": "VN_HNX", "lot_size": 100, "name": "하노이"},
+    "HSX": {"order_code": "VNSE", "currency": "VND", "product_type": "508", "tick_ladder": "VN_HSX", "lot_size": 100, "name": "호치민"},
+}
+
+# 호가 단위표: [(이 가격 이상부터, 호가 단위), ...] 가격 오름차순
+# (가격에 맞는 호가 단위 찾기와 가격 맞추기는 tick.py가 합니다)
+TICK_LADDERS = {
+    # 미국: $1 미만 $0.0001, $1 이상 $0.01
+    "US": [(0, 0.0001), (1, 0.01)],
+    # 홍콩 거래소 호가 단위표 (Spread Table)
+    "HK": [(0, 0.001), (0.25, 0.005), (0.5, 0.01), (10, 0.02), (20, 0.05), (100, 0.1),
+           (200, 0.2), (500, 0.5), (1000, 1), (2000, 2), (5000, 5)],
+    # 도쿄 거래소 (TOPIX100 외 일반 종목)
+    "JP": [(0, 1), (3000, 5), (5000, 10), (30000, 50), (50000, 100), (300000, 500),
+           (500000, 1000), (3000000, 5000), (5000000, 10000), (30000000, 50000), (50000000, 100000)],
+    # 상해/심천 A주
+    "CN": [(0, 0.01)],
+    # 베트남 호치민 / 하노이
+    "VN_HSX": [(0, 10), (10000, 50), (50000, 100)],
+    "VN_HNX": [(0, 100)],
+}
+
+# 주문/잔고 API용 거래소 코드 -> 시세 조회용 거래소 코드 (예: "NASD" -> "NAS")
+_QUOTE_CODES = {exchange["order_code"]: code for code, exchange in EXCHANGES.items()}
+
+# 종목 정보
+Instrument = namedtuple("Instrument", [
+    "symbol",          # 종목 코드 (예: "TQQQ")
+    "exchange",        # 시세 조회용 거래소 코드 (예: "NAS")
+    "order_exchange",  # 주문용 거래소 코드 (예: "NASD")
+    "currency",        # 거래 통화 (예: "USD")
+    "name",            # 종목 이름
+    "lot_size",        # 매매 단위 (주)
+    "tick_ladder",     # 호가 단위표 이름 (TICK_LADDERS의 키)
+    "fetched_at"       # 조회 시각 (time.time(), 기본값으로 만든 정보는 0)
+])
+
+# 종목 코드 -> Instrument (load_instruments()로 파일에서 채웁니다)
+_instruments = {}
+_loaded_path = None
+
+
+def get_exchange(exchange_code):
+    """
+    거래소 정보를 돌려줍니다.
+
+    Parameters:
+        exchange_code (str): 시세 조회용 거래소 코드 (예: "NAS")
+
+    Returns:
+        dict: EXCHANGES의 값
+
+    Raises:
+        Exception: 지원하지 않는 거래소 코드인 경우
+    """
+    exchange = EXCHANGES.get(exchange_code)
+    if exchange is None:
+        raise Exception(f"지원하지 않는 거래소 코드입니다: {exchange_code}")
+    return exchange
+
+
+def quote_exchange_code(order_code):
+    """
+    주문/잔고 API용 거래소 코드를 시세 조회용 거래소 코드로 바꿉니다.
+    (이미 시세 조회용 코드이면 그대로 돌려줍니다)
+
+    Examples:
+        >>> quote_exchange_code("NASD")
+        'NAS'
+        >>> quote_exchange_code("NAS")
+        'NAS'
+    """
+    code = _QUOTE_CODES.get(order_code, order_code)
+    get_exchange(code)
+    return code
+
+
+def default_instrument(symbol, exchange_code):
+    """
+    API 조회 없이 거래소 기본값으로 종목 정보를 만듭니다. (이름은 종목 코드)
+    """
+    exchange = get_exchange(exchange_code)
+    return Instrument(
+        symbol=symbol,
+        exchange=exchange_code,
+        order_exchange=exchange["order_code"],
+        currency=exchange["currency"],
+        name=symbol,
+        lot_size=exchange["lot_size"],
+        tick_ladder=exchange["tick_ladder"],
+        fetched_at=0
+    )
+
+
+def load_instruments(path=INSTRUMENT_CACHE_PATH):
+    """
+    파일에 저장된 종목 정보를 읽어 둡니다. 프로그램 시작 시 한 번 부르세요.
+
+    파일이 없거나 깨져 있으면 빈 상태로 시작합니다. (필요할 때 API로 조회합니다)
+
+    Returns:
+        int: 읽은 종목 수
+    """
+    global _loaded_path
+
+    _instruments.clear()
+    _loaded_path = path
+
+    if not os.path.exists(path):
+        return 0
+
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            records = json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ 종목 정보 파일을 읽지 못했습니다. 다시 조회합니다: {e}")
+        return 0
+
+    for record in records:
+        try:
+            instrument = Instrument(**record)
+        except TypeError:
+            # 예전 형식의 기록은 버리고 다시 조회합니다
+            continue
+        _instruments[instrument.symbol] = instrument
+
+    return len(_instruments)
+
+
+def save_instruments(path=None):
+    """
+    읽어 둔 종목 정보를 파일에 저장합니다. (기본값으로 만든 정보는 저장하지 않음)
+    """
+    path = path or _loaded_path or INSTRUMENT_CACHE_PATH
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    records = [instrument._asdict() for instrument in _instruments.values() if instrument.fetched_at]
+
+    # 저장 도중 죽어도 파일이 깨지지 않도록 임시 파일에 쓴 뒤 바꿔치기합니다
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(records, file, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def _fetch_instrument(symbol, exchange_code):
+    """상품기본정보와 현재가상세를 조회하여 종목 정보를 만듭니다."""
+    # trader가 이 파일(EXCHANGES)을 불러오므로, 순환 import를 피하려고 여기서 불러옵니다
+    from trader import get_overseas_product_info, get_overseas_stock_price
+
+    exchange = get_exchange(exchange_code)
+    product_info = get_overseas_product_info(symbol, exchange_code)
+    price_detail = get_overseas_stock_price(symbol, exchange_code)
+
+    lot_size = int(float(price_detail.get("vnit") or 0)) or exchange["lot_size"]
+
+    return Instrument(
+        symbol=symbol,
+        exchange=exchange_code,
+        order_exchange=product_info.get("ovrs_excg_cd") or exchange["order_code"],
+        currency=product_info.get("tr_crcy_cd") or price_detail.get("curr") or exchange["currency"],
+        name=product_info.get("prdt_eng_name") or product_info.get("prdt_name") or symbol,
+        lot_size=lot_size,
+        tick_ladder=exchange["tick_ladder"],
+        fetched_at=time.time()
+    )
+
+
+def get_instrument(symbol, exchange_code="NAS", max_age_days=INSTRUMENT_CACHE_DAYS):
+    """
+    종목 정보를 돌려줍니다.
+
+    읽어 둔 정보가 있고 max_age_days일보다 오래되지 않았으면 API를 부르지 않습니다.
+    없거나 오래되었으면 API로 조회하여 파일에 저장하고,
+    조회에 실패하면 거래소 기본값으로 만든 정보를 돌려줍니다.
+
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 시세 조회용 거래소 코드 (예: "NAS")
+        max_age_days (float): 종목 정보를 다시 조회하는 주기 (일)
+
+    Returns:
+        Instrument: 종목 정보
+    """
+    instrument = _instruments.get(symbol)
+    if instrument is not None and instrument.exchange == exchange_code:
+        if not instrument.fetched_at or time.time() - instrument.fetched_at < max_age_days * 86400:
+            return instrument
+
+    try:
+        instrument = _fetch_instrument(symbol, exchange_code)
+    except Exception as e:
+        print(f"⚠️ 종목 정보 조회 실패, 거래소 기본값을 사용합니다 ({symbol}): {str(e)}")
+        # 이번 실행 동안은 같은 종목을 다시 조회하지 않습니다 (파일에는 저장하지 않음)
+        instrument = default_instrument(symbol, exchange_code)
+        _instruments[symbol] = instrument
+        return instrument
+
+    _instruments[symbol] = instrument
+    try:
+        save_instruments()
+    except OSError as e:
+        print(f"⚠️ 종목 정보 저장 실패: {e}")
+
+    return instrument
@@ -0,0 +1,402 @@
+# 장 마감 전 마지막 구간에서 주문 계획을 몇 초마다 다시 세우는 코드
+#
+# 무상태_무한매수법은 장 마감 몇 시간 전에 한 번 실행되므로,
+# 초기 진입 주문 가격이 그때의 현재가로 고정되어 버립니다.
+# 이 파일은 장 마감 INTRADAY_WINDOW_MINUTES분 전부터 INTRADAY_INTERVAL_SECONDS초마다
+# 실시간 가격표(또는 현재가 조회)로 계획을 다시 세우고,
+# 계획 입력 키(plan_inputs_key)가 바뀌어 주문이 달라졌을 때만 정정/신규/취소 주문을 보냅니다.
+# LOC 주문 접수가 마감되기 전(장 마감 INTRADAY_CUTOFF_MINUTES분 전)에 멈춥니다.
+import time
+from datetime import datetime, timedelta, time as clock_time
+from zoneinfo import ZoneInfo
+from config import (
+    INTRADAY_INTERVAL_SECONDS,
+    INTRADAY_WINDOW_MINUTES,
+    INTRADAY_CUTOFF_MINUTES,
+    JOURNAL_PATH,
+    ENTRY_PRICE_MODE
+)
+from strategy import 무상태_무한매수법, plan_orders_memoized, get_open_and_last, get_entry_price
+from trader import place_overseas_order, revise_or_cancel_overseas_order, get_overseas_today_orders, get_overseas_open_orders
+from order_journal import (
+    ACK,
+    CANCELLED,
+    make_order_key,
+    replay_journal,
+    write_event,
+    find_matching_kis_order,
+    submit_with_journal
+)
+from notifier import notify
+from instruments import get_exchange
+from money import to_units
+from tracing import span
+
+# 미국 정규장 마감 시각 (뉴욕 시간)
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_CLOSE = clock_time(16, 0)
+
+
+def minutes_to_close(now):
+    """
+    미국 정규장 마감까지 남은 시간(분)을 계산합니다.
+
+    조기 마감일(추수감사절 다음 날 등)은 고려하지 않습니다.
+
+    Parameters:
+        now (datetime): 현재 시각 (시간대 정보가 있어야 합니다)
+
+    Returns:
+        float: 장 마감까지 남은 분 (마감이 지났으면 0 이하)
+    """
+    market_now = now.astimezone(MARKET_TIMEZONE)
+    market_close = datetime.combine(market_now.date(), MARKET_CLOSE, tzinfo=MARKET_TIMEZONE)
+    return (market_close - market_now).total_seconds() / 60
+
+
+def session_date(now):
+    """
+    주문이 들어갈 미국 정규장의 날짜(뉴욕 기준)를 구합니다.
+
+    주문 기록(저널) 키의 거래일로 씁니다. 한국시간 오전 실행은 뉴욕으로 전날 밤이고
+    장 마감 뒤에 낸 주문은 다음 정규장에 들어가므로, 마감이 지났으면 다음 평일이 됩니다.
+    그래서 한국시간 오전 실행과 그날 밤 장 마감 전 재평가가 같은 거래일을 씁니다.
+    미국 공휴일은 고려하지 않습니다.
+
+    Parameters:
+        now (datetime): 현재 시각 (시간대 정보가 있어야 합니다)
+
+    Returns:
+        str: 거래일 (예: "20240101")
+    """
+    market_now = now.astimezone(MARKET_TIMEZONE)
+    day = market_now.date()
+
+    if market_now.time() >= MARKET_CLOSE:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:  # 토요일, 일요일
+        day += timedelta(days=1)
+
+    return day.strftime("%Y%m%d")
+
+
+def diff_orders(planned_orders, live_orders):
+    """
+    새 주문 계획과 지금 걸려 있는 주문을 비교해 보낼 요청을 만듭니다.
+
+    주문 설명(comment)이 같은 주문끼리 비교합니다.
+    (make_order_key도 주문 설명으로 주문을 구분합니다)
+
+    Parameters:
+        planned_orders (list): 전략이 만든 주문 목록
+        live_orders (dict): 주문 설명 -> {"order": 주문, "odno": 주문번호, "key": 주문 키}
+
+    Returns:
+        list: 요청 목록 [(종류, 주문 또는 None, 걸려 있는 주문 또는 None)]
+              종류는 "PLACE"(새 주문), "REVISE"(가격/수량 정정), "CANCEL"(취소)
+    """
+    actions = []
+    planned_comments = set()
+
+    for order in planned_orders:
+        planned_comments.add(order["comment"])
+        live = live_orders.get(order["comment"])
+
+        if live is None:
+            actions.append(("PLACE", order, None))
+            continue
+
+        old_order = live["order"]
+        if old_order.get("order_type") != order["order_type"] or old_order.get("side") != order["side"]:
+            # 주문 유형이 바뀌면 정정할 수 없으므로 취소 후 새로 넣습니다
+            actions.append(("CANCEL", None, live))
+            actions.append(("PLACE", order, None))
+        elif not order["price"]:
+            # 시장가 주문은 정정할 가격이 없습니다
+            continue
+        elif to_units(old_order.get("price") or 0) != to_units(order["price"]) or old_order.get("quantity") != order["quantity"]:
+            actions.append(("REVISE", order, live))
+
+    for comment, live in live_orders.items():
+        if comment not in planned_comments:
+            actions.append(("CANCEL", None, live))
+
+    return actions
+
+
+def load_live_orders(trade_date, symbol, journal_path=JOURNAL_PATH):
+    """
+    주문 저널에서 오늘 이 종목의 접수된 주문을 읽어 옵니다.
+
+    trading_bot이 먼저 넣어 둔 주문이나, 다시 실행하기 전에 넣은 주문을
+    새로 넣지 않고 정정할 수 있도록 하기 위함입니다.
+
+    Returns:
+        dict: 주문 설명 -> {"order": 주문, "odno": 주문번호, "key": 주문 키}
+    """
+    key_prefix = f"{trade_date}:{symbol}:"
+    live_orders = {}
+
+    for order_key, entry in replay_journal(journal_path).items():
+        if not order_key.startswith(key_prefix) or entry["state"] != ACK or not entry["order"]:
+            continue
+        live_orders[entry["order"]["comment"]] = {
+            "order": entry["order"],
+            "odno": entry["odno"],
+            "key": order_key
+        }
+
+    return live_orders
+
+
+def _place(order, symbol, exchange_code, order_exchange_code, trade_mode, order_key, live_orders, journal_path):
+    """새 주문 1건을 보내고, 접수되면 live_orders에 추가합니다."""
+
+    def submit_order(retries=0):
+        return place_overseas_order(
+            symbol=symbol,
+            exchange_code=order_exchange_code,
+            order_type=order["order_type"],
+            quantity=order["quantity"],
+            price=order["price"] or 0,
+            trade_mode=trade_mode,
+            retries=retries
+        )
+
+    def find_existing_odno():
+        today_orders = get_overseas_today_orders(exchange_code, symbol)
+        claimed_odnos = {live["odno"] for live in live_orders.values()}
+        return find_matching_kis_order(order, symbol, today_orders, claimed_odnos)
+
+    if trade_mode == "LIVE":
+        result = submit_with_journal(order_key, order, submit_order, find_existing_odno, journal_path=journal_path)
+    else:
+        result = submit_order()
+
+    live_orders[order["comment"]] = {
+        "order": order,
+        "odno": result["odno"] if result else "",
+        "key": order_key
+    }
+
+
+def _revise_or_cancel(action, order, live, symbol, order_exchange_code, trade_mode, live_orders, journal_path,
+                      remaining_qty=None):
+    """
+    걸려 있는 주문 1건을 정정하거나 취소하고, live_orders를 고칩니다.
+
+    remaining_qty는 미체결 주문 조회의 미체결수량(nccs_qty)입니다. 일부 체결된 주문을
+    계획 수량 전체로 정정하면 더 사거나 거부되므로, 정정은 남은 수량으로 보냅니다.
+    (cancel_replace.build_replace_requests와 같습니다, None이면 주문 수량)
+    """
+    old_order = live["order"]
+
+    if remaining_qty is None:
+        remaining_qty = order["quantity"] if order else old_order["quantity"]
+
+    result = revise_or_cancel_overseas_order(
+        symbol=symbol,
+        exchange_code=order_exchange_code,
+        original_odno=live["odno"],
+        action=action,
+        quantity=remaining_qty,
+        price=order["price"] if order else 0,
+        trade_mode=trade_mode
+    )
+
+    if action == "CANCEL":
+        live_orders.pop(old_order["comment"], None)
+        if trade_mode == "LIVE":
+            write_event(live["key"], CANCELLED, {"odno": live["odno"]}, journal_path)
+        return
+
+    new_odno = result["odno"] if result else ""
+    live_orders[order["comment"]] = {"order": order, "odno": new_odno, "key": live["key"]}
+
+    if trade_mode == "LIVE":
+        # 정정하면 주문번호가 바뀌므로, 다시 실행해도 새 주문번호를 찾을 수 있게 남깁니다
+        write_event(live["key"], ACK, {"odno": new_odno, "order": order, "revised_from": live["odno"]}, journal_path)
+
+
+def apply_actions(actions, symbol, exchange_code, order_exchange_code, trade_date, trade_mode, live_orders, journal_path=JOURNAL_PATH):
+    """
+    diff_orders()의 요청을 차례로 보냅니다.
+
+    매도 주문은 trading_bot과 마찬가지로 아직 새로 넣지 않습니다.
+    요청 하나가 실패해도 나머지 요청은 계속 보냅니다.
+    LIVE 모드에서 정정할 주문이 있으면 미체결 주문을 1회 조회하여 남은 수량으로 정정하고,
+    남은 수량이 없는 주문(이미 체결/취소됨)은 정정하지 않고 실패로 돌려 잔고를 다시 조회하게 합니다.
+
+    Returns:
+        dict: 종류별 성공 횟수와 실패 목록
+              {"PLACE": 0, "REVISE": 0, "CANCEL": 0, "failed": [(종류, 주문 설명, 에러)]}
+    """
+    counts = {"PLACE": 0, "REVISE": 0, "CANCEL": 0, "failed": []}
+    remaining_by_odno = None
+
+    for action, order, live in actions:
+        comment = order["comment"] if order else live["order"]["comment"]
+
+        if action == "PLACE" and order["side"] == "SELL":
+            continue
+
+        try:
+            with span(f"intraday.{action.lower()}", comment=comment):
+                if action == "PLACE":
+                    order_key = make_order_key(trade_date, symbol, order)
+                    _place(order, symbol, exchange_code, order_exchange_code, trade_mode, order_key, live_orders, journal_path)
+                else:
+                    remaining_qty = None
+                    if action == "REVISE" and trade_mode == "LIVE":
+                        if remaining_by_odno is None:
+                            remaining_by_odno = {row["odno"]: int(row.get("nccs_qty", "0"))
+                                                 for row in get_overseas_open_orders(exchange_code)}
+                        remaining_qty = remaining_by_odno.get(live["odno"], 0)
+                        if remaining_qty <= 0:
+                            raise Exception(f"미체결 수량이 없습니다 (주문번호 {live['odno']}, 체결 또는 취소됨)")
+                    _revise_or_cancel(action, order, live, symbol, order_exchange_code, trade_mode, live_orders, journal_path,
+                                      remaining_qty)
+        except Exception as e:
+            print(f"✗ {comment} {action} 실패: {str(e)}")
+            counts["failed"].append((action, comment, str(e)))
+            if live is not None:
+                # 이미 체결되었거나 취소된 주문일 수 있으므로, 다음에 잔고를 다시 조회하여 맞춥니다
+                live_orders.pop(live["order"]["comment"], None)
+            continue
+
+        counts[action] += 1
+        price_text = f"${order['price']}" if order and order["price"] else ""
+        print(f"✓ {comment} {action} {price_text}".rstrip())
+
+    return counts
+
+
+def run_intraday_loop(symbol, exchange_code, order_exchange_code, splits, take_profit_rate, big_buy_range,
+                      trade_mode="DRY", price_book=None, entry_price_mode=ENTRY_PRICE_MODE,
+                      interval_seconds=INTRADAY_INTERVAL_SECONDS,
+                      window_minutes=INTRADAY_WINDOW_MINUTES,
+                      cutoff_minutes=INTRADAY_CUTOFF_MINUTES,
+                      now_func=None, sleep_func=time.sleep, journal_path=JOURNAL_PATH):
+    """
+    장 마감 전 마지막 구간에서 주문 계획을 반복해서 다시 세우고 주문을 맞춥니다.
+
+    잔고/단위 수량은 처음에 한 번 조회하고, 그다음부터는 시가/현재가만 새로 읽습니다.
+    (실시간 가격표에 최신 값이 있으면 API도 부르지 않습니다)
+    계획 입력 키가 지난번과 같으면 주문이 바뀌지 않으므로 아무것도 보내지 않습니다.
+    정정/취소가 실패하면(이미 체결된 경우 등) 다음 차례에 잔고를 다시 조회합니다.
+
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 조회용 거래소 코드 (예: "NAS")
+        order_exchange_code (str): 주문용 거래소 코드 (예: "NASD")
+        splits, take_profit_rate, big_buy_range: 전략 파라미터 (무상태_무한매수법과 같음)
+        trade_mode (str): 거래 모드 ("DRY" 또는 "LIVE")
+        price_book (PriceBook): 실시간 가격표 (realtime.PriceBook, 없으면 현재가 조회 API 사용)
+        entry_price_mode (str): 초기 진입 주문 가격 기준 ("last", "bid", "ask", "mid")
+        interval_seconds (float): 계획을 다시 세우는 간격 (초)
+        window_minutes (float): 장 마감 몇 분 전부터 시작할지
+        cutoff_minutes (float): 장 마감 몇 분 전에 멈출지
+        now_func (function): 현재 시각을 돌려주는 함수 (테스트용, 기본은 뉴욕 현재 시각)
+        sleep_func (function): 기다리는 함수 (테스트용)
+        journal_path (str): 주문 저널 파일 경로
+
+    Returns:
+        dict: 실행 요약
+              {
+                  "iterations": 계획을 확인한 횟수,
+                  "replanned": 입력 키가 바뀌어 주문을 맞춘 횟수,
+                  "unchanged": 입력 키가 같아 건너뛴 횟수,
+                  "placed": 새 주문 수, "revised": 정정 수, "cancelled": 취소 수,
+                  "failed": 실패 목록,
+                  "live_orders": 마지막으로 걸려 있는 주문
+              }
+    """
+    now_func = now_func or (lambda: datetime.now(MARKET_TIMEZONE))
+    trade_date = session_date(now_func())
+
+    summary = {
+        "iterations": 0,
+        "replanned": 0,
+        "unchanged": 0,
+        "placed": 0,
+        "revised": 0,
+        "cancelled": 0,
+        "failed": [],
+        "live_orders": {}
+    }
+
+    # 구간이 시작될 때까지 기다립니다
+    minutes_left = minutes_to_close(now_func())
+    if minutes_left <= cutoff_minutes:
+        print(f"⊘ 장 마감 {cutoff_minutes}분 전이 지나 재평가를 하지 않습니다. (남은 시간 {minutes_left:.1f}분)")
+        return summary
+    if minutes_left > window_minutes:
+        wait_seconds = (minutes_left - window_minutes) * 60
+        print(f"장 마감 {window_minutes}분 전까지 {wait_seconds:.0f}초 기다립니다...")
+        sleep_func(wait_seconds)
+
+    live_orders = load_live_orders(trade_date, symbol, journal_path) if trade_mode == "LIVE" else {}
+    summary["live_orders"] = live_orders
+
+    state = None
+    last_key = None
+
+    while minutes_to_close(now_func()) > cutoff_minutes:
+        summary["iterations"] += 1
+
+        with span("intraday.iteration", symbol=symbol):
+            if state is None:
+                # 처음이거나 주문이 체결/실패했을 수 있으면 잔고부터 다시 조회합니다
+                state = 무상태_무한매수법(symbol, exchange_code, splits, take_profit_rate, big_buy_range,
+                                  price_book=price_book, entry_price_mode=entry_price_mode)
+                open_price, last_price, entry_price = state["open_price"], state["last_price"], state["entry_price"]
+            else:
+                open_price, last_price = get_open_and_last(symbol, exchange_code, price_book)
+                entry_price = None
+                if state["position_qty"] == 0:
+                    entry_price = get_entry_price(symbol, exchange_code, entry_price_mode, last_price, price_book)
+
+            plan_key, plan = plan_orders_memoized(
+                position_qty=state["position_qty"],
+                avg_price=state["avg_price"],
+                open_price=open_price,
+                last_price=last_price,
+                unit_qty=state["unit_qty"],
+                splits=splits,
+                take_profit_rate=take_profit_rate,
+                big_buy_range=big_buy_range,
+                entry_price=entry_price,
+                tick_ladder=get_exchange(exchange_code)["tick_ladder"]
+            )
+
+            if plan_key == last_key:
+                summary["unchanged"] += 1
+            else:
+                summary["replanned"] += 1
+                actions = diff_orders(plan["orders"], live_orders)
+                counts = apply_actions(actions, symbol, exchange_code, order_exchange_code, trade_date, trade_mode, live_orders, journal_path)
+
+                summary["placed"] += counts["PLACE"]
+                summary["revised"] += counts["REVISE"]
+                summary["cancelled"] += counts["CANCEL"]
+                summary["failed"].extend(counts["failed"])
+
+                if counts["REVISE"] or counts["PLACE"]:
+                    notify(
+                        f"🔁 주문 재평가 ({symbol} ${last_price})\n"
+                        f"정정 {counts['REVISE']}건, 신규 {counts['PLACE']}건, 취소 {counts['CANCEL']}건",
+                        event_type="order",
+                        data={"symbol": symbol, "last_price": last_price}
+                    )
+
+                if counts["failed"]:
+                    # 다음 차례에 잔고를 다시 조회하고 처음부터 다시 맞춥니다
+                    state = None
+                    last_key = None
+                else:
+                    last_key = plan_key
+
+        sleep_func(interval_seconds)
+
+    print(f"✓ 재평가 종료: {summary['iterations']}회 확인, 주문 변경 {summary['replanned']}회")
+    return summary
@@ -0,0 +1,69 @@
+# 체결 기록(장부)을 파일에 저장하고 읽어오는 코드
+#
+# 체결이 일어날 때마다 한 줄짜리 JSON으로 파일 끝에 덧붙입니다 (JSONL 형식).
+# 나중에 손익 분석이나 매매 사이클 확인에 이 기록을 사용합니다.
+import json
+import os
+import threading
+from config import LEDGER_PATH
+
+# 여러 스레드가 동시에 파일에 쓰지 않도록 보호하는 잠금
+_lock = threading.Lock()
+
+
+def append_fill(fill_event, ledger_path=LEDGER_PATH):
+    """
+    체결 기록 1건을 장부 파일 끝에 추가합니다.
+
+    Parameters:
+        fill_event (dict): 체결 정보
+            - time: 체결 확인 시각 (ISO 형식 문자열)
+            - symbol: 종목 코드
+            - odno: 주문번호
+            - side: "BUY" 또는 "SELL"
+            - quantity: 이번에 체결된 수량
+            - price: 이번 체결의 평균 단가
+            - 기타 필드는 자유롭게 추가 가능
+        ledger_path (str): 장부 파일 경로
+    """
+    folder = os.path.dirname(ledger_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    line = json.dumps(fill_event, ensure_ascii=False)
+
+    with _lock:
+        with open(ledger_path, "a", encoding="utf-8") as file:
+            file.write(line + "\n")
+
+
+def read_fills(symbol=None, ledger_path=LEDGER_PATH):
+    """
+    장부 파일에서 체결 기록을 읽어옵니다.
+
+    Parameters:
+        symbol (str): 종목 코드 (None이면 전체 종목)
+        ledger_path (str): 장부 파일 경로
+
+    Returns:
+        list: 체결 기록 목록 (기록된 순서대로)
+    """
+    if not os.path.exists(ledger_path):
+        return []
+
+    fills = []
+
+    with open(ledger_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+
+            fill_event = json.loads(line)
+
+            if symbol and fill_event.get("symbol", "").upper() != symbol.upper():
+                continue
+
+            fills.append(fill_event)
+
+    return fills
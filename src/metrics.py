@@ -0,0 +1,260 @@
+# API 호출 시간과 횟수를 기록하는 코드
+#
+# 한국투자증권 API를 부를 때마다 걸린 시간, HTTP 상태, 응답코드(rt_cd/msg_cd),
+# 응답 크기, 재시도 횟수를 거래 ID(tr_id)별로 모읍니다.
+# 실행이 끝나면 JSON과 Prometheus 형식 파일로 저장하여
+# 어떤 API가 시간을 가장 많이 쓰는지 확인할 수 있습니다.
+#
+# 걸린 시간은 모든 값을 저장하지 않고, 미리 나눠 둔 구간(bucket)의 개수만 세므로
+# 호출이 아무리 많아도 메모리와 계산 비용이 거의 늘지 않습니다.
+import json
+import os
+import threading
+from bisect import bisect_left
+
+# 걸린 시간 구간의 경계값 (초): 1ms부터 1.2배씩 늘려 약 2분까지
+LATENCY_BUCKETS = []
+_bound = 0.001
+while _bound < 120.0:
+    LATENCY_BUCKETS.append(round(_bound, 6))
+    _bound *= 1.2
+
+# 거래 ID별 통계
+_stats_by_tr_id = {}
+
+# 여러 스레드가 동시에 통계를 수정하지 않도록 보호하는 잠금
+_lock = threading.Lock()
+
+
+def _new_stats():
+    """
+    거래 ID 하나의 빈 통계를 만듭니다.
+    """
+    return {
+        "calls": 0,
+        "errors": 0,
+        "latency_sum": 0.0,
+        "latency_max": 0.0,
+        # 마지막 칸은 가장 큰 경계값보다 오래 걸린 호출 수입니다
+        "bucket_counts": [0] * (len(LATENCY_BUCKETS) + 1),
+        "http_status": {},
+        "rt_cd": {},
+        "msg_cd": {},
+        "bytes": 0,
+        "retries": 0
+    }
+
+
+def record_api_call(tr_id, latency_seconds, http_status, rt_cd="", msg_cd="", response_bytes=0, retries=0):
+    """
+    API 호출 1건의 결과를 기록합니다.
+
+    Parameters:
+        tr_id (str): 거래 ID (예: "HHDFS76200200")
+        latency_seconds (float): 걸린 시간 (초)
+        http_status (int): HTTP 상태 코드 (응답을 못 받았으면 0)
+        rt_cd (str): 응답의 성공/실패 코드 ("0"이면 성공)
+        msg_cd (str): 응답의 메시지 코드 (예: "EGW00201")
+        response_bytes (int): 응답 크기 (바이트)
+        retries (int): 이 호출 전에 재시도한 횟수
+    """
+    bucket_index = bisect_left(LATENCY_BUCKETS, latency_seconds)
+    is_error = http_status == 0 or http_status >= 400 or (rt_cd not in ("", "0"))
+
+    with _lock:
+        stats = _stats_by_tr_id.get(tr_id)
+        if stats is None:
+            stats = _new_stats()
+            _stats_by_tr_id[tr_id] = stats
+
+        stats["calls"] += 1
+        stats["latency_sum"] += latency_seconds
+        stats["latency_max"] = max(stats["latency_max"], latency_seconds)
+        stats["bucket_counts"][bucket_index] += 1
+        stats["bytes"] += response_bytes
+        stats["retries"] += retries
+
+        if is_error:
+            stats["errors"] += 1
+
+        status_key = str(http_status)
+        stats["http_status"][status_key] = stats["http_status"].get(status_key, 0) + 1
+
+        if rt_cd:
+            stats["rt_cd"][rt_cd] = stats["rt_cd"].get(rt_cd, 0) + 1
+        if msg_cd:
+            stats["msg_cd"][msg_cd] = stats["msg_cd"].get(msg_cd, 0) + 1
+
+
+def _percentile(bucket_counts, total, percent):
+    """
+    구간별 개수로부터 백분위수(예: p95)를 추정합니다.
+
+    해당 순위가 들어 있는 구간 안에서 선형으로 보간합니다.
+    """
+    if total == 0:
+        return 0.0
+
+    target_rank = total * percent / 100.0
+    cumulative = 0
+
+    for index, count in enumerate(bucket_counts):
+        if count == 0:
+            continue
+
+        if cumulative + count >= target_rank:
+            lower = LATENCY_BUCKETS[index - 1] if index > 0 else 0.0
+            upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1]
+            fraction = (target_rank - cumulative) / count
+            return lower + (upper - lower) * fraction
+
+        cumulative += count
+
+    return LATENCY_BUCKETS[-1]
+
+
+def get_summary():
+    """
+    거래 ID별 통계 요약을 돌려줍니다.
+
+    Returns:
+        dict: 거래 ID별 요약
+              {
+                  "tr_id": {
+                      "calls": 호출 수,
+                      "errors": 실패 수,
+                      "latency_avg": 평균 시간 (초),
+                      "latency_p50": 중앙값 (초),
+                      "latency_p95": 95% 값 (초),
+                      "latency_p99": 99% 값 (초),
+                      "latency_max": 최대 시간 (초),
+                      "latency_total": 합계 시간 (초),
+                      "http_status": HTTP 상태별 횟수,
+                      "rt_cd": rt_cd별 횟수,
+                      "msg_cd": msg_cd별 횟수,
+                      "bytes": 응답 크기 합계,
+                      "retries": 재시도 횟수 합계
+                  }
+              }
+    """
+    summary = {}
+
+    with _lock:
+        for tr_id, stats in _stats_by_tr_id.items():
+            calls = stats["calls"]
+            summary[tr_id] = {
+                "calls": calls,
+                "errors": stats["errors"],
+                "latency_avg": stats["latency_sum"] / calls if calls else 0.0,
+                "latency_p50": min(_percentile(stats["bucket_counts"], calls, 50), stats["latency_max"]),
+                "latency_p95": min(_percentile(stats["bucket_counts"], calls, 95), stats["latency_max"]),
+                "latency_p99": min(_percentile(stats["bucket_counts"], calls, 99), stats["latency_max"]),
+                "latency_max": stats["latency_max"],
+                "latency_total": stats["latency_sum"],
+                "http_status": dict(stats["http_status"]),
+                "rt_cd": dict(stats["rt_cd"]),
+                "msg_cd": dict(stats["msg_cd"]),
+                "bytes": stats["bytes"],
+                "retries": stats["retries"]
+            }
+
+    return summary
+
+
+def format_prometheus():
+    """
+    통계를 Prometheus 텍스트 형식으로 만듭니다.
+
+    Returns:
+        str: Prometheus 텍스트 형식의 통계
+    """
+    lines = [
+        "# HELP kis_request_duration_seconds KIS API 호출 시간",
+        "# TYPE kis_request_duration_seconds histogram"
+    ]
+
+    with _lock:
+        snapshot = {tr_id: {**stats, "bucket_counts": list(stats["bucket_counts"])} for tr_id, stats in _stats_by_tr_id.items()}
+
+    for tr_id, stats in sorted(snapshot.items()):
+        cumulative = 0
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            cumulative += stats["bucket_counts"][index]
+            lines.append(f'kis_request_duration_seconds_bucket{{tr_id="{tr_id}",le="{bound}"}} {cumulative}')
+        lines.append(f'kis_request_duration_seconds_bucket{{tr_id="{tr_id}",le="+Inf"}} {stats["calls"]}')
+        lines.append(f'kis_request_duration_seconds_sum{{tr_id="{tr_id}"}} {stats["latency_sum"]:.6f}')
+        lines.append(f'kis_request_duration_seconds_count{{tr_id="{tr_id}"}} {stats["calls"]}')
+
+    lines.append("# HELP kis_requests_total HTTP 상태별 KIS API 호출 수")
+    lines.append("# TYPE kis_requests_total counter")
+    for tr_id, stats in sorted(snapshot.items()):
+        for status, count in sorted(stats["http_status"].items()):
+            lines.append(f'kis_requests_total{{tr_id="{tr_id}",http_status="{status}"}} {count}')
+
+    lines.append("# HELP kis_responses_total 응답코드(msg_cd)별 KIS API 응답 수")
+    lines.append("# TYPE kis_responses_total counter")
+    for tr_id, stats in sorted(snapshot.items()):
+        for msg_cd, count in sorted(stats["msg_cd"].items()):
+            lines.append(f'kis_responses_total{{tr_id="{tr_id}",msg_cd="{msg_cd}"}} {count}')
+
+    lines.append("# HELP kis_response_bytes_total KIS API 응답 크기 합계")
+    lines.append("# TYPE kis_response_bytes_total counter")
+    for tr_id, stats in sorted(snapshot.items()):
+        lines.append(f'kis_response_bytes_total{{tr_id="{tr_id}"}} {stats["bytes"]}')
+
+    lines.append("# HELP kis_retries_total KIS API 재시도 횟수 합계")
+    lines.append("# TYPE kis_retries_total counter")
+    for tr_id, stats in sorted(snapshot.items()):
+        lines.append(f'kis_retries_total{{tr_id="{tr_id}"}} {stats["retries"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+def export_metrics(folder):
+    """
+    통계를 JSON(metrics.json)과 Prometheus 형식(metrics.prom) 파일로 저장합니다.
+
+    Parameters:
+        folder (str): 저장할 폴더
+
+    Returns:
+        dict: get_summary()의 결과
+    """
+    os.makedirs(folder, exist_ok=True)
+
+    summary = get_summary()
+
+    with open(os.path.join(folder, "metrics.json"), "w", encoding="utf-8") as file:
+        json.dump(summary, file, ensure_ascii=False, indent=2)
+
+    with open(os.path.join(folder, "metrics.prom"), "w", encoding="utf-8") as file:
+        file.write(format_prometheus())
+
+    return summary
+
+
+def print_summary():
+    """
+    거래 ID별 호출 수와 시간을 걸린 시간 합계가 큰 순서로 출력합니다.
+    """
+    summary = get_summary()
+
+    if not summary:
+        return
+
+    print(f"\n[API 호출 통계]")
+    ordered = sorted(summary.items(), key=lambda item: item[1]["latency_total"], reverse=True)
+    for tr_id, stats in ordered:
+        print(
+            f"  {tr_id}: {stats['calls']}회 (실패 {stats['errors']}회), "
+            f"합계 {stats['latency_total']:.2f}초, "
+            f"p50 {stats['latency_p50'] * 1000:.0f}ms / p95 {stats['latency_p95'] * 1000:.0f}ms / p99 {stats['latency_p99'] * 1000:.0f}ms"
+        )
+
+
+def reset_metrics():
+    """
+    지금까지 모은 통계를 모두 지웁니다. (벤치마크나 테스트에서 사용)
+    """
+    with _lock:
+        _stats_by_tr_id.clear()
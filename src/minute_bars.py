@@ -0,0 +1,190 @@
+# 분봉을 받아서 종목/일자별 바이너리 파일에 이어 쓰는 코드
+#
+# 장 마감 지정가(LOC) 시뮬레이션에는 분봉이 필요하지만, 몇 달치 분봉을 JSON이나
+# 딕셔너리 목록으로 모아 두면 파일도 메모리도 금방 커집니다.
+# 이 파일은 분봉 하나를 고정 길이(44바이트) 레코드로 만들어 일자별 파일 끝에 이어 쓰기만 합니다.
+#
+# 파일 위치: BARS_DIR/거래소/종목/YYYYMMDD.bin (일자는 거래소 현지 일자)
+# 레코드 형식 (리틀 엔디언, 시각 오름차순):
+#   시각(HHMMSS, uint32) / 시가 / 고가 / 저가 / 종가 (마이크로 단위, int64) / 체결량 (int64)
+#
+# 받을 때는 이미 저장된 마지막 시각보다 새로운 분봉만 쓰고, 저장된 분봉에 닿으면
+# 더 오래된 페이지는 조회하지 않으므로 매일 실행해도 새 분봉만 받습니다.
+import os
+import struct
+from array import array
+from config import BARS_DIR
+from money import to_units
+from trader import iter_overseas_minute_bars
+
+# 분봉 레코드: 시각, 시가, 고가, 저가, 종가, 체결량
+RECORD = struct.Struct("<Iqqqqq")
+RECORD_SIZE = RECORD.size
+
+# 읽을 때 한 번에 읽는 레코드 수 (파일 전체를 한꺼번에 읽지 않습니다)
+_READ_CHUNK_RECORDS = 4096
+
+# read_bar_columns()가 돌려주는 열 이름 (레코드 순서와 같음)
+COLUMNS = ("time", "open", "high", "low", "close", "volume")
+
+
+def bar_path(symbol, exchange_code, trade_date, bars_dir=BARS_DIR):
+    """
+    분봉 파일 경로를 돌려줍니다.
+
+    Examples:
+        >>> bar_path("TQQQ", "NAS", "20240105", "logs/bars")
+        'logs/bars/NAS/TQQQ/20240105.bin'
+    """
+    return os.path.join(bars_dir, exchange_code, symbol, f"{trade_date}.bin")
+
+
+def list_bar_dates(symbol, exchange_code, bars_dir=BARS_DIR):
+    """
+    분봉 파일이 있는 일자(YYYYMMDD) 목록을 오름차순으로 돌려줍니다.
+    """
+    folder = os.path.join(bars_dir, exchange_code, symbol)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(name[:-4] for name in os.listdir(folder) if name.endswith(".bin"))
+
+
+def _whole_size(path):
+    """파일에서 완전한 레코드가 차지하는 크기를 돌려줍니다. (파일이 없으면 0)"""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0
+    return size - size % RECORD_SIZE
+
+
+def last_stored_time(path):
+    """
+    파일에 저장된 마지막 분봉의 시각(HHMMSS 정수)을 돌려줍니다. (없으면 -1)
+    """
+    size = _whole_size(path)
+    if size == 0:
+        return -1
+
+    with open(path, "rb") as file:
+        file.seek(size - RECORD_SIZE)
+        return RECORD.unpack(file.read(RECORD_SIZE))[0]
+
+
+def _append_records(path, records):
+    """
+    레코드(바이트) 목록을 파일 끝에 씁니다.
+
+    예전에 쓰다가 끊겨서 끝에 반쪽 레코드가 남아 있으면 먼저 잘라 냅니다.
+    """
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    size = _whole_size(path)
+    if os.path.exists(path) and os.path.getsize(path) != size:
+        os.truncate(path, size)
+
+    with open(path, "ab") as file:
+        file.write(b"".join(records))
+
+
+def download_minute_bars(symbol, exchange_code="NAS", bars_dir=BARS_DIR, include_previous=True, skip_latest=True):
+    """
+    1분봉을 받아서 일자별 파일에 이어 씁니다.
+
+    API는 최신 분봉부터 돌려주므로, 페이지를 받는 대로 레코드(바이트)로 바꾸고
+    일자별로 모았다가 시각 오름차순으로 한 번에 씁니다.
+    이미 저장된 분봉에 닿으면 더 이상 페이지를 조회하지 않습니다.
+
+    Parameters:
+        symbol (str): 종목 코드
+        exchange_code (str): 시세 조회용 거래소 코드
+        bars_dir (str): 분봉 저장 폴더
+        include_previous (bool): 전일 분봉도 받을지 여부
+        skip_latest (bool): 가장 최근 분봉은 아직 만들어지는 중일 수 있으므로 저장하지 않음
+            (다음에 받을 때 저장됩니다)
+
+    Returns:
+        dict: 일자(YYYYMMDD) -> 새로 저장한 분봉 수
+    """
+    pending = {}      # 일자 -> 새 레코드 목록 (최신순)
+    stored_time = {}  # 일자 -> 파일에 저장된 마지막 시각
+    oldest_time = {}  # 일자 -> 이번에 받은 가장 오래된 시각 (같은 분봉이 두 번 오면 건너뜀)
+    reached_stored = False
+    skipped = not skip_latest
+
+    for bars in iter_overseas_minute_bars(symbol, exchange_code, minutes=1, include_previous=include_previous):
+        for bar in bars:
+            if not skipped:
+                skipped = True
+                continue
+
+            trade_date = bar["xymd"]
+            bar_time = int(bar["xhms"])
+
+            if trade_date not in stored_time:
+                stored_time[trade_date] = last_stored_time(bar_path(symbol, exchange_code, trade_date, bars_dir))
+
+            if bar_time <= stored_time[trade_date]:
+                reached_stored = True
+                break
+            if bar_time >= oldest_time.get(trade_date, 240000):
+                continue
+            oldest_time[trade_date] = bar_time
+
+            pending.setdefault(trade_date, []).append(RECORD.pack(
+                bar_time,
+                to_units(bar["open"]),
+                to_units(bar["high"]),
+                to_units(bar["low"]),
+                to_units(bar["last"]),
+                int(bar.get("evol") or 0)
+            ))
+
+        # 저장된 분봉에 닿았으면 더 오래된 페이지는 받을 필요가 없습니다
+        if reached_stored:
+            break
+
+    written = {}
+    for trade_date, records in sorted(pending.items()):
+        records.reverse()
+        _append_records(bar_path(symbol, exchange_code, trade_date, bars_dir), records)
+        written[trade_date] = len(records)
+
+    return written
+
+
+def iter_bars(path):
+    """
+    분봉 파일을 조금씩 읽으며 분봉을 하나씩 돌려줍니다.
+
+    Yields:
+        tuple: (시각 HHMMSS, 시가, 고가, 저가, 종가, 체결량) 가격은 마이크로 단위 정수
+    """
+    size = _whole_size(path)
+    if size == 0:
+        return
+
+    chunk_size = RECORD_SIZE * _READ_CHUNK_RECORDS
+    with open(path, "rb") as file:
+        remaining = size
+        while remaining > 0:
+            chunk = file.read(min(chunk_size, remaining))
+            remaining -= len(chunk)
+            yield from RECORD.iter_unpack(chunk)
+
+
+def read_bar_columns(path):
+    """
+    분봉 파일을 열(column)별 정수 배열로 읽습니다. (시뮬레이션용)
+
+    Returns:
+        dict: 열 이름(COLUMNS) -> array('q') (가격은 마이크로 단위)
+    """
+    records = list(iter_bars(path))
+    if not records:
+        return {name: array("q") for name in COLUMNS}
+
+    # 레코드 목록을 열 단위로 뒤집어서 열마다 배열 하나로 만듭니다
+    return {name: array("q", values) for name, values in zip(COLUMNS, zip(*records))}
@@ -0,0 +1,118 @@
+# 가격과 금액을 정수(마이크로 단위)로 다루는 코드 (고정소수점)
+#
+# API는 가격과 금액을 문자열("56.37")로 주고받는데,
+# 이를 float로 바꿔 계산하고 str(price)로 다시 문자열을 만들면
+# 변환이 반복되고 "0.30000000000000004" 같은 float 오차가 주문 요청에 섞일 수 있습니다.
+# 이 파일은 가격/금액을 백만분의 1 단위 정수(마이크로 단위, 예: $56.37 → 56370000)로
+# API 경계에서 한 번만 바꾸고, 전략 계산은 정수로만 하며,
+# 주문 요청에는 정수에서 바로 만든 문자열을 넣도록 도와줍니다.
+# 시뮬레이션에서는 같은 단위의 정수 배열(array('q'))을 사용합니다.
+from array import array
+from decimal import Decimal, ROUND_HALF_EVEN
+
+# 가격 1 = 1,000,000 마이크로 단위
+PRICE_SCALE = 1_000_000
+
+
+def to_units(price):
+    """
+    가격/금액을 마이크로 단위 정수로 바꿉니다.
+
+    문자열(API 응답)과 Decimal은 적힌 그대로 정확히 바꾸고,
+    float는 소수점 7째 자리에서 반올림합니다. (float에 남은 이진 오차를 없앰)
+    int는 통화 단위 그대로의 값(예: 3000엔)으로 봅니다.
+
+    Examples:
+        >>> to_units("56.37")
+        56370000
+        >>> to_units(56.37)
+        56370000
+        >>> to_units(3000)
+        3000000000
+    """
+    if isinstance(price, int):
+        return price * PRICE_SCALE
+    if isinstance(price, float):
+        return round(price * PRICE_SCALE)
+    return int((Decimal(str(price).strip() or "0") * PRICE_SCALE).to_integral_value(ROUND_HALF_EVEN))
+
+
+def from_units(units):
+    """
+    마이크로 단위 정수를 float 가격으로 바꿉니다. (56370000 → 56.37)
+    """
+    return units / PRICE_SCALE
+
+
+def to_units_array(prices):
+    """
+    가격 목록을 마이크로 단위 정수 배열(array('q'))로 바꿉니다. (시뮬레이션용)
+    """
+    return array("q", [to_units(price) for price in prices])
+
+
+def format_units(units, decimals=None):
+    """
+    마이크로 단위 정수를 API 요청에 넣을 문자열로 바꿉니다. float를 거치지 않습니다.
+
+    Parameters:
+        units (int): 마이크로 단위 가격
+        decimals (int): 소수점 자릿수 (None이면 필요한 만큼만, 최소 0자리)
+
+    Examples:
+        >>> format_units(56370000)
+        '56.37'
+        >>> format_units(56370000, 4)
+        '56.3700'
+    """
+    sign = "-" if units < 0 else ""
+    whole, fraction = divmod(abs(units), PRICE_SCALE)
+    fraction_text = f"{fraction:06d}"
+
+    if decimals is None:
+        fraction_text = fraction_text.rstrip("0")
+    else:
+        fraction_text = fraction_text[:decimals].ljust(decimals, "0")
+
+    if fraction_text:
+        return f"{sign}{whole}.{fraction_text}"
+    return f"{sign}{whole}"
+
+
+def format_price(price, decimals=None):
+    """
+    가격(float, 문자열, Decimal, int)을 주문 요청의 단가(OVRS_ORD_UNPR) 문자열로 바꿉니다.
+
+    Examples:
+        >>> format_price(0.1 + 0.2)
+        '0.3'
+        >>> format_price(3000.0)
+        '3000'
+    """
+    return format_units(to_units(price), decimals)
+
+
+def apply_rate(units, rate):
+    """
+    가격에 (1 + rate)를 곱한 값을 마이크로 단위로 버림하여 돌려줍니다.
+
+    비율도 마이크로 단위 정수로 바꿔 곱하므로 float 오차가 없습니다.
+
+    Examples:
+        >>> apply_rate(50000000, 0.10)
+        55000000
+    """
+    return units * (PRICE_SCALE + to_units(rate)) // PRICE_SCALE
+
+
+def share_count(cash_units, price_units, parts=1):
+    """
+    금액을 parts로 나눈 돈으로 살 수 있는 주식 수를 돌려줍니다. (버림)
+
+    Examples:
+        >>> share_count(to_units("10000"), to_units("51.0"), 80)
+        2
+    """
+    if price_units <= 0:
+        return 0
+    return cash_units // (price_units * parts)
@@ -1 +1,400 @@
 # 텔레그램 등 알림을 보내는 역할
+#
+# 알림을 보낼 곳(백엔드)을 여러 개 사용할 수 있습니다.
+# - telegram: 텔레그램 메시지
+# - file: 로컬 파일에 한 줄씩 기록 (JSONL)
+# - webhook: 지정한 주소로 JSON 전송 (다른 알림 서비스와 연결할 때 사용)
+#
+# notify()는 알림을 먼저 파일(재시도 대기열)에 적고 바로 돌아오며, 백그라운드에서 모아서 보냅니다.
+# 보낸 알림만 파일에서 지우므로, 네트워크가 끊기거나 보내는 도중 프로그램이 끝나도
+# 알림이 사라지지 않고 다음에 다시 보내집니다. (드물게 같은 알림이 두 번 갈 수는 있습니다)
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+import requests
+import telegram
+from tracing import span
+from config import NOTIFY_BACKENDS, NOTIFY_FILE_PATH, NOTIFY_WEBHOOK_URL, NOTIFY_RETRY_PATH
+
+# 이 시간 안에 들어온 알림은 한 번에 묶어서 보냅니다 (초)
+BATCH_SECONDS = 1.0
+
+# 재시도 횟수가 이만큼 쌓인 알림은 포기합니다 (재시도 파일이 끝없이 커지는 것을 막기 위함)
+MAX_RETRY_ATTEMPTS = 100
+
+# 보낼 알림 대기열과 이를 처리하는 백그라운드 스레드
+_event_queue = queue.Queue()
+_worker_thread = None
+_worker_lock = threading.Lock()
+
+# 재시도 파일을 동시에 읽고 쓰지 않도록 보호하는 잠금 (파일을 읽고 쓰는 동안만 잡습니다)
+_retry_lock = threading.Lock()
+
+# 텔레그램으로 마지막으로 보낸 시각 (전송 간격을 지키기 위함)
+_last_telegram_sent_at = 0.0
+
+
+def _telegram_groups(events):
+    """
+    알림을 텔레그램 메시지 하나에 들어가는 만큼씩 묶습니다.
+
+    알림 하나가 여러 메시지에 나뉘어 들어가지 않으므로,
+    중간 메시지가 실패해도 앞에서 이미 보낸 알림은 다시 보내지 않습니다.
+    (알림 하나가 길이 제한보다 길 때만 그 알림이 여러 메시지로 나뉩니다)
+    """
+    groups = []
+    current = []
+
+    for event in events:
+        messages = [queued["message"] for queued in current] + [event["message"]]
+        if current and len(telegram.build_digest(messages)) > telegram.MAX_MESSAGE_LENGTH:
+            groups.append(current)
+            current = []
+        current.append(event)
+
+    if current:
+        groups.append(current)
+
+    return groups
+
+
+def _send_to_telegram(events):
+    """
+    알림 여러 개를 텔레그램 메시지로 묶어서 보냅니다.
+
+    Returns:
+        list: 보내지 못한 알림 목록 (모두 보냈으면 빈 목록)
+    """
+    global _last_telegram_sent_at
+
+    groups = _telegram_groups(events)
+
+    for index, group in enumerate(groups):
+        for part in telegram.split_message(telegram.build_digest([event["message"] for event in group])):
+            wait_seconds = telegram.MIN_SEND_INTERVAL - (time.monotonic() - _last_telegram_sent_at)
+            if wait_seconds > 0:
+                time.sleep(wait_seconds)
+
+            success = telegram.send_telegram(part)
+            _last_telegram_sent_at = time.monotonic()
+
+            if not success:
+                # 이 묶음부터 뒤는 모두 다시 보냅니다 (앞의 묶음은 이미 전송됨)
+                return [event for remaining in groups[index:] for event in remaining]
+
+    return []
+
+
+def _send_to_file(events):
+    """
+    알림 여러 개를 로컬 파일 끝에 한 번에 기록합니다.
+
+    Returns:
+        list: 기록하지 못한 알림 목록 (성공하면 빈 목록)
+    """
+    try:
+        folder = os.path.dirname(NOTIFY_FILE_PATH)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+        lines = [json.dumps(event, ensure_ascii=False) + "\n" for event in events]
+
+        with open(NOTIFY_FILE_PATH, "a", encoding="utf-8") as file:
+            file.writelines(lines)
+
+        return []
+    except OSError as e:
+        print(f"❌ 알림 파일 기록 실패: {e}")
+        return events
+
+
+def _send_to_webhook(events):
+    """
+    알림 여러 개를 JSON 배열 하나로 묶어 webhook 주소로 보냅니다.
+
+    Returns:
+        list: 보내지 못한 알림 목록 (성공하면 빈 목록)
+    """
+    try:
+        response = requests.post(NOTIFY_WEBHOOK_URL, json={"events": events}, timeout=5)
+        if 200 <= response.status_code < 300:
+            return []
+        print(f"❌ webhook 알림 전송 실패: {response.status_code}")
+        return events
+    except requests.exceptions.RequestException as e:
+        print(f"❌ webhook 알림 전송 중 오류 발생: {e}")
+        return events
+
+
+# 백엔드 이름별 전송 함수
+BACKEND_SENDERS = {
+    "telegram": _send_to_telegram,
+    "file": _send_to_file,
+    "webhook": _send_to_webhook
+}
+
+
+def get_enabled_backends():
+    """
+    설정(NOTIFY_BACKENDS)에 적힌 백엔드 중 실제로 사용할 수 있는 것만 돌려줍니다.
+
+    텔레그램 토큰이나 webhook 주소가 없으면 그 백엔드는 건너뜁니다.
+    (설정이 없는데 계속 실패로 쌓이는 것을 막기 위함)
+
+    Returns:
+        list: 사용할 백엔드 이름 목록
+    """
+    backends = []
+
+    for name in NOTIFY_BACKENDS.split(","):
+        name = name.strip()
+
+        if name not in BACKEND_SENDERS:
+            continue
+        if name == "telegram" and not (os.getenv("TELEGRAM_BOT_TOKEN") and os.getenv("TELEGRAM_CHAT_ID")):
+            continue
+        if name == "webhook" and not NOTIFY_WEBHOOK_URL:
+            continue
+
+        backends.append(name)
+
+    return backends
+
+
+def _load_retry_entries():
+    """
+    재시도 파일에 저장된 알림을 읽어옵니다.
+    """
+    if not os.path.exists(NOTIFY_RETRY_PATH):
+        return []
+
+    entries = []
+    with open(NOTIFY_RETRY_PATH, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+
+    return entries
+
+
+def _save_retry_entries(entries):
+    """
+    재시도 파일을 새 내용으로 바꿉니다.
+
+    임시 파일에 먼저 쓰고 교체하므로, 쓰는 도중 죽어도 기존 내용이 깨지지 않습니다.
+    """
+    folder = os.path.dirname(NOTIFY_RETRY_PATH)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    temp_path = NOTIFY_RETRY_PATH + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        for entry in entries:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+    os.replace(temp_path, NOTIFY_RETRY_PATH)
+
+
+def _append_retry_entries(entries):
+    """
+    재시도 파일 끝에 알림을 덧붙입니다. (_retry_lock을 잡은 상태에서 부릅니다)
+    """
+    folder = os.path.dirname(NOTIFY_RETRY_PATH)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    with open(NOTIFY_RETRY_PATH, "a", encoding="utf-8") as file:
+        for entry in entries:
+            file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        file.flush()
+
+
+def _deliver(events_by_backend):
+    """
+    백엔드별로 알림을 한 번에 묶어서 보냅니다.
+
+    Parameters:
+        events_by_backend (dict): 백엔드 이름별 알림 목록
+
+    Returns:
+        dict: 보내지 못한 백엔드 이름별 알림 목록
+    """
+    failed_by_backend = {}
+
+    for backend, events in events_by_backend.items():
+        if not events:
+            continue
+
+        try:
+            with span(f"notify.{backend}", category="notify", events=len(events)):
+                undelivered = BACKEND_SENDERS[backend](events)
+        except Exception as e:
+            print(f"❌ {backend} 알림 전송 중 오류 발생: {e}")
+            undelivered = events
+
+        if undelivered:
+            failed_by_backend[backend] = undelivered
+
+    return failed_by_backend
+
+
+def _deliver_pending():
+    """
+    재시도 파일에 남아 있는 알림(새 알림 포함)을 보내고, 보낸 알림만 파일에서 지웁니다.
+
+    파일을 읽고 쓰는 동안만 잠금을 잡고, 네트워크로 보내는 동안에는 잡지 않습니다.
+    (보내는 동안 notify()가 새 알림을 파일에 덧붙일 수 있어야 하기 때문)
+    """
+    with _retry_lock:
+        entries = _load_retry_entries()
+
+    if not entries:
+        return
+
+    # 파일에 적힌 순서(예전 알림 먼저)대로 백엔드별로 나눕니다
+    events_by_backend = {}
+    for entry in entries:
+        events_by_backend.setdefault(entry["backend"], []).append(entry["event"])
+
+    failed_by_backend = _deliver(events_by_backend)
+
+    attempted_keys = {(entry["backend"], entry["event"]["id"]) for entry in entries}
+    failed_keys = {(backend, event["id"]) for backend, events in failed_by_backend.items() for event in events}
+
+    with _retry_lock:
+        remaining_entries = []
+        for entry in _load_retry_entries():
+            key = (entry["backend"], entry["event"]["id"])
+            if key not in attempted_keys:
+                # 보내는 동안 새로 들어온 알림은 다음 차례에 보냅니다
+                remaining_entries.append(entry)
+                continue
+            if key not in failed_keys:
+                continue
+
+            attempts = entry.get("attempts", 0) + 1
+            if attempts >= MAX_RETRY_ATTEMPTS:
+                print(f"⚠️ {entry['backend']} 알림을 {attempts}회 보내지 못해 포기합니다: {entry['event']['message'][:30]}")
+                continue
+            remaining_entries.append(dict(entry, attempts=attempts))
+
+        _save_retry_entries(remaining_entries)
+
+
+def _collect_batch():
+    """
+    대기열에서 알림을 꺼내고, 잠시 안에 뒤따라온 알림도 함께 꺼냅니다.
+    """
+    events = [_event_queue.get()]
+
+    collect_until = time.monotonic() + BATCH_SECONDS
+    while True:
+        remaining_seconds = collect_until - time.monotonic()
+        if remaining_seconds <= 0:
+            break
+        try:
+            events.append(_event_queue.get(timeout=remaining_seconds))
+        except queue.Empty:
+            break
+
+    return events
+
+
+def _notify_worker():
+    """
+    백그라운드에서 대기열의 알림을 모아 백엔드별로 보냅니다.
+    """
+    while True:
+        events = _collect_batch()
+
+        try:
+            # 새 알림은 notify()가 이미 재시도 파일에 적어 두었으므로 파일에서 꺼내 보냅니다
+            _deliver_pending()
+        except Exception as e:
+            print(f"❌ 알림 처리 중 오류 발생: {e}")
+        finally:
+            for _ in events:
+                _event_queue.task_done()
+
+
+def notify(message, event_type="info", data=None):
+    """
+    알림을 재시도 파일에 적고 대기열에 넣은 뒤 바로 돌아옵니다.
+
+    실제 전송은 백그라운드에서 하며, 짧은 시간 안에 들어온 알림은
+    백엔드별로 한 번에 묶어서 보냅니다. 보내기 전에 프로그램이 끝나도
+    파일에 남아 있으므로 다음 실행에서 보내집니다.
+
+    Parameters:
+        message (str): 사람이 읽을 알림 내용
+        event_type (str): 알림 종류 (예: "start", "order", "fill", "error")
+        data (dict): 알림과 함께 남길 추가 정보 (file/webhook 백엔드에 그대로 전달)
+    """
+    global _worker_thread
+
+    event = {
+        "id": uuid.uuid4().hex,
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "type": event_type,
+        "message": message,
+        "data": data or {}
+    }
+
+    # 보내기 전에 먼저 파일에 적어 둡니다 (백그라운드 스레드가 보내기 전에 프로그램이 끝나도 남도록)
+    with _retry_lock:
+        _append_retry_entries([
+            {"backend": backend, "attempts": 0, "event": event}
+            for backend in get_enabled_backends()
+        ])
+
+    with _worker_lock:
+        if _worker_thread is None:
+            _worker_thread = threading.Thread(target=_notify_worker, daemon=True)
+            _worker_thread.start()
+            # 프로그램이 끝날 때 남은 알림을 보내도록 등록합니다
+            atexit.register(flush_notifications)
+
+    _event_queue.put(event)
+
+
+def flush_notifications(deadline_seconds=10.0):
+    """
+    대기열에 남은 알림이 모두 처리될 때까지 기다립니다.
+
+    최대 deadline_seconds 초까지만 기다립니다.
+    그때까지 보내지 못한 알림은 이미 재시도 파일에 있으므로 다음 실행에서 보냅니다.
+
+    Parameters:
+        deadline_seconds (float): 최대로 기다릴 시간 (초)
+
+    Returns:
+        bool: 모두 처리되었으면 True
+    """
+    if _worker_thread is None:
+        return True
+
+    # queue.join()에는 시간 제한이 없으므로, 별도 스레드에서 기다립니다
+    waiter = threading.Thread(target=_event_queue.join, daemon=True)
+    waiter.start()
+    waiter.join(timeout=deadline_seconds)
+
+    if not waiter.is_alive():
+        return True
+
+    with _retry_lock:
+        pending_count = len(_load_retry_entries())
+
+    print(f"⚠️ 알림 전송 대기 시간 초과: 재시도 파일의 {pending_count}건은 다음 실행에서 다시 보냅니다.")
+    return False
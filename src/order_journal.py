@@ -0,0 +1,323 @@
+# 주문 과정을 파일에 먼저 기록하는 코드 (주문 저널)
+#
+# 주문을 보내는 도중 프로그램이 죽거나 응답이 늦으면,
+# 그 주문이 증권사에 접수되었는지 알 수 없어 다시 주문하기가 위험합니다.
+# 그래서 주문하기 "전"에 의도(INTENT)를, 보내기 직전에 전송(SUBMITTED)을,
+# 응답을 받은 뒤 접수(ACK)를 파일에 한 줄씩 남기고 바로 디스크에 저장(fsync)합니다.
+# 다시 실행할 때 이 기록과 증권사의 주문내역을 맞춰 보면
+# 이미 접수된 주문은 건너뛰고, 접수되지 않은 주문만 안전하게 다시 보낼 수 있습니다.
+import json
+import os
+import time
+from datetime import datetime
+from config import JOURNAL_PATH, ORDER_ACK_GRACE_SECONDS, ORDER_ACK_POLL_SECONDS
+from money import to_units
+from trader import OrderRejectedError
+
+# 기록 종류
+INTENT = "INTENT"        # 이런 주문을 내려고 함
+SUBMITTED = "SUBMITTED"  # 주문 요청을 보내기 직전
+ACK = "ACK"              # 증권사가 접수함 (주문번호 받음)
+TIMEOUT = "TIMEOUT"      # 응답이 없어 접수 여부를 알 수 없음
+NOT_FOUND = "NOT_FOUND"  # 증권사 주문내역에 없음 (다시 보내도 안전함)
+FAILED = "FAILED"        # 증권사가 거부함 (다시 보내지 않음)
+NOT_SENT = "NOT_SENT"    # 요청을 보내기 전에 실패함 (토큰 획득 실패 등, 다시 보내도 안전함)
+CANCELLED = "CANCELLED"  # 접수된 주문을 취소함
+
+# 접수되었는지 증권사에 확인해야 하는 상태
+UNKNOWN_STATES = (SUBMITTED, TIMEOUT)
+
+# 전략 주문의 매수/매도 구분을 주문내역 조회 API의 매도매수구분코드로 바꾸는 표
+SIDE_CODE_MAP = {
+    "SELL": "01",  # 매도
+    "BUY": "02"    # 매수
+}
+
+
+def make_order_key(trade_date, symbol, order):
+    """
+    같은 날 같은 주문이면 항상 같은 값이 나오는 주문 키를 만듭니다.
+
+    프로그램을 다시 실행해도 같은 주문은 같은 키를 가지므로,
+    저널에서 이 주문이 이미 접수되었는지 찾을 수 있습니다.
+
+    Parameters:
+        trade_date (str): 거래일 (예: "20240101")
+        symbol (str): 종목 코드 (예: "TQQQ")
+        order (dict): 전략이 만든 주문
+
+    Returns:
+        str: 주문 키 (예: "20240101:TQQQ:BUY:LOC:평단 매수")
+    """
+    return f"{trade_date}:{symbol}:{order['side']}:{order['order_type']}:{order['comment']}"
+
+
+def _ends_with_newline(journal_path):
+    """
+    저널 파일이 비어 있거나 줄바꿈으로 끝나면 True를 반환합니다.
+    """
+    if not os.path.exists(journal_path) or os.path.getsize(journal_path) == 0:
+        return True
+
+    with open(journal_path, "rb") as file:
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+def write_event(order_key, event_type, data=None, journal_path=JOURNAL_PATH):
+    """
+    저널 파일 끝에 기록 1줄을 추가하고, 디스크에 저장될 때까지 기다립니다.
+
+    fsync를 하면 프로그램이 바로 죽어도 이 줄은 파일에 남아 있습니다.
+
+    Parameters:
+        order_key (str): 주문 키
+        event_type (str): 기록 종류 (INTENT, SUBMITTED, ACK 등)
+        data (dict): 함께 남길 정보 (주문 내용, 주문번호, 에러 등)
+        journal_path (str): 저널 파일 경로
+    """
+    folder = os.path.dirname(journal_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    record = {
+        "time": datetime.now().isoformat(timespec="milliseconds"),
+        "key": order_key,
+        "event": event_type,
+        "data": data or {}
+    }
+
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+
+    # 지난 실행이 줄을 쓰다가 죽었다면, 잘린 줄과 붙지 않도록 줄을 바꿔 줍니다
+    if not _ends_with_newline(journal_path):
+        line = "\n" + line
+
+    with open(journal_path, "a", encoding="utf-8") as file:
+        file.write(line)
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def replay_journal(journal_path=JOURNAL_PATH):
+    """
+    저널 파일을 처음부터 읽어 주문 키별 마지막 상태를 복원합니다.
+
+    프로그램이 기록 도중 죽어서 마지막 줄이 깨져 있으면 그 줄은 무시합니다.
+
+    Parameters:
+        journal_path (str): 저널 파일 경로
+
+    Returns:
+        dict: 주문 키별 상태
+              {
+                  "주문 키": {
+                      "state": 마지막 기록 종류,
+                      "order": INTENT에 기록된 주문 내용,
+                      "odno": 접수된 주문번호 (ACK일 때),
+                      "attempts": 전송 시도 횟수
+                  }
+              }
+    """
+    entries = {}
+
+    if not os.path.exists(journal_path):
+        return entries
+
+    with open(journal_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 기록 도중 죽어서 잘린 줄입니다
+                continue
+
+            entry = entries.setdefault(record["key"], {
+                "state": None,
+                "order": {},
+                "odno": "",
+                "attempts": 0
+            })
+
+            entry["state"] = record["event"]
+            data = record.get("data", {})
+
+            if record["event"] == INTENT:
+                entry["order"] = data.get("order", {})
+            elif record["event"] == SUBMITTED:
+                entry["attempts"] += 1
+            elif record["event"] == ACK:
+                entry["odno"] = data.get("odno", "")
+                # 정정된 주문은 새 주문 내용을 함께 남깁니다
+                if "order" in data:
+                    entry["order"] = data["order"]
+
+    return entries
+
+
+def find_matching_kis_order(order, symbol, today_orders, claimed_odnos):
+    """
+    증권사 오늘 주문내역에서 저널의 주문과 같은 주문을 찾습니다.
+
+    종목, 매수/매도, 수량, 가격이 모두 같고
+    아직 다른 주문 키가 차지하지 않은 주문번호를 돌려줍니다.
+
+    Parameters:
+        order (dict): 전략이 만든 주문
+        symbol (str): 종목 코드
+        today_orders (list): get_overseas_today_orders()의 결과
+        claimed_odnos (set): 이미 다른 주문 키에 연결된 주문번호
+
+    Returns:
+        str: 찾은 주문번호 (없으면 빈 문자열)
+    """
+    side_code = SIDE_CODE_MAP.get(order["side"])
+    order_units = to_units(order["price"] or 0)
+
+    for kis_order in today_orders:
+        if kis_order["odno"] in claimed_odnos:
+            continue
+        if kis_order.get("pdno", "").upper() != symbol.upper():
+            continue
+        if kis_order.get("sll_buy_dvsn_cd") != side_code:
+            continue
+        if int(kis_order.get("ft_ord_qty", "0")) != order["quantity"]:
+            continue
+        if to_units(kis_order.get("ft_ord_unpr3", "0")) != order_units:
+            continue
+        return kis_order["odno"]
+
+    return ""
+
+
+def reconcile_journal(entries, symbol, today_orders, journal_path=JOURNAL_PATH):
+    """
+    접수 여부를 모르는 주문을 증권사 주문내역과 맞춰 보고 상태를 확정합니다.
+
+    - 증권사에 같은 주문이 있으면 ACK로 기록합니다 (다시 보내면 안 됨)
+    - 없으면 NOT_FOUND로 기록합니다 (다시 보내도 안전함)
+
+    Parameters:
+        entries (dict): replay_journal()의 결과 (이 함수가 상태를 갱신합니다)
+        symbol (str): 종목 코드
+        today_orders (list): get_overseas_today_orders()의 결과
+        journal_path (str): 저널 파일 경로
+
+    Returns:
+        dict: 갱신된 entries
+    """
+    claimed_odnos = set()
+    for entry in entries.values():
+        if entry["odno"]:
+            claimed_odnos.add(entry["odno"])
+
+    for order_key, entry in entries.items():
+        if entry["state"] not in UNKNOWN_STATES:
+            continue
+
+        odno = find_matching_kis_order(entry["order"], symbol, today_orders, claimed_odnos)
+
+        if odno:
+            claimed_odnos.add(odno)
+            entry["state"] = ACK
+            entry["odno"] = odno
+            write_event(order_key, ACK, {"odno": odno, "recovered": True}, journal_path)
+            print(f"✓ 저널 복구: {order_key} → 이미 접수됨 (주문번호 {odno})")
+        else:
+            entry["state"] = NOT_FOUND
+            write_event(order_key, NOT_FOUND, {}, journal_path)
+            print(f"✓ 저널 복구: {order_key} → 접수되지 않음 (다시 주문 가능)")
+
+    return entries
+
+
+def _wait_for_odno(find_existing_odno, grace_seconds, poll_seconds, sleep):
+    """
+    시간 초과된 주문이 주문내역에 나타나는지 grace_seconds 동안 확인합니다.
+
+    시간 초과된 요청도 증권사에서 조금 늦게 처리되거나, 주문내역에 늦게 보일 수 있으므로
+    한 번 확인해서 없다고 바로 다시 보내지 않습니다.
+
+    Returns:
+        str: 찾은 주문번호 (끝까지 없으면 빈 문자열)
+
+    Raises:
+        Exception: 주문내역 조회에 실패한 경우
+    """
+    deadline = time.monotonic() + grace_seconds
+    while True:
+        try:
+            odno = find_existing_odno()
+        except Exception as lookup_error:
+            # 확인조차 못 하면 두 번 주문될 수 있으므로 더 이상 보내지 않습니다
+            raise Exception(f"주문 접수 여부 확인 실패: {str(lookup_error)}")
+
+        if odno or time.monotonic() >= deadline:
+            return odno
+        sleep(poll_seconds)
+
+
+def submit_with_journal(order_key, order, submit_order, find_existing_odno, max_attempts=3, journal_path=JOURNAL_PATH,
+                        grace_seconds=ORDER_ACK_GRACE_SECONDS, poll_seconds=ORDER_ACK_POLL_SECONDS, sleep=time.sleep):
+    """
+    주문을 저널에 기록하면서 보내고, 응답 시간 초과 시 안전하게 다시 보냅니다.
+
+    응답을 받지 못하면(TimeoutError, 연결 끊김 포함) grace_seconds 동안 poll_seconds 간격으로
+    증권사 주문내역을 확인하고, 접수되어 있으면 그 주문번호를 사용하고, 끝까지 없을 때만 다시 보냅니다.
+    (시간 초과된 요청이 늦게 처리되어도 같은 주문이 두 번 들어가지 않도록 기다립니다)
+    증권사가 거부한 주문(OrderRejectedError)은 FAILED로, 보내기 전에 실패한 주문은 NOT_SENT로 남깁니다.
+
+    Parameters:
+        order_key (str): make_order_key()로 만든 주문 키
+        order (dict): 전략이 만든 주문
+        submit_order (function): 주문을 실제로 보내는 함수 (앞서 다시 보낸 횟수를 받아
+                                 place_overseas_order 결과를 반환)
+        find_existing_odno (function): 증권사 주문내역에서 이 주문의 주문번호를 찾는 함수
+                                       (없으면 빈 문자열 반환)
+        max_attempts (int): 최대 전송 시도 횟수
+        journal_path (str): 저널 파일 경로
+        grace_seconds (float): 시간 초과 뒤 주문내역을 확인하는 시간 (초)
+        poll_seconds (float): 주문내역 확인 간격 (초)
+        sleep (function): 기다리는 함수 (테스트에서 바꿔 끼웁니다)
+
+    Returns:
+        dict: 주문 결과 {"odno": 주문번호, "ord_tmd": 주문시각, ...}
+
+    Raises:
+        OrderRejectedError: 증권사가 주문을 거부한 경우
+        Exception: 보내기 전에 실패했거나, 모든 시도가 시간 초과된 경우
+    """
+    write_event(order_key, INTENT, {"order": order}, journal_path)
+
+    for attempt in range(1, max_attempts + 1):
+        write_event(order_key, SUBMITTED, {"attempt": attempt}, journal_path)
+
+        try:
+            result = submit_order(attempt - 1)
+        except TimeoutError as e:
+            write_event(order_key, TIMEOUT, {"attempt": attempt, "error": str(e)}, journal_path)
+            print(f"⏳ 주문 응답을 받지 못해, 최대 {grace_seconds:g}초 동안 접수 여부를 확인합니다... ({attempt}/{max_attempts})")
+
+            odno = _wait_for_odno(find_existing_odno, grace_seconds, poll_seconds, sleep)
+
+            if odno:
+                write_event(order_key, ACK, {"odno": odno, "recovered": True}, journal_path)
+                return {"odno": odno, "org_no": "", "ord_tmd": ""}
+
+            write_event(order_key, NOT_FOUND, {"attempt": attempt}, journal_path)
+            continue
+        except OrderRejectedError as e:
+            write_event(order_key, FAILED, {"attempt": attempt, "error": str(e)}, journal_path)
+            raise
+        except Exception as e:
+            write_event(order_key, NOT_SENT, {"attempt": attempt, "error": str(e)}, journal_path)
+            raise
+
+        write_event(order_key, ACK, {"odno": result["odno"], "ord_tmd": result["ord_tmd"]}, journal_path)
+        return result
+
+    raise Exception(f"주문 실패: {max_attempts}회 모두 응답 시간 초과")
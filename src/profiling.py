@@ -0,0 +1,204 @@
+# 함수 실행 시간과 메모리 사용을 분석하는 코드 (프로파일링)
+#
+# @profiled("이름")을 붙인 함수는 PROFILE_ENABLED=1 일 때
+# cProfile(함수별 실행 시간)과 tracemalloc(코드 줄별 메모리 할당)으로 측정됩니다.
+# 같은 함수를 여러 번 실행하면(여러 종목, 백테스트 등) 결과를 모두 합쳐서
+# 프로그램이 끝날 때 LOG_DIR에 보고서를 한 번 저장합니다.
+#   - profile_<이름>.txt: 오래 걸린 함수 순위 (누적 시간 / 자체 시간)
+#   - profile_<이름>.prof: snakeviz 등으로 열어볼 수 있는 원본 데이터
+#   - alloc_<이름>.txt: 메모리를 많이 할당한 코드 줄 순위와 최대 사용량
+#
+# PROFILE_ENABLED가 꺼져 있으면 함수를 그대로 돌려주므로 추가 비용이 없습니다.
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import threading
+import tracemalloc
+from datetime import datetime
+from functools import wraps
+from config import PROFILE_ENABLED, PROFILE_TOP_N, LOG_DIR
+
+# 이름별 측정 결과 {이름: {"profile", "calls", "snapshot", "peak_bytes"}}
+_results = {}
+
+# 여러 스레드가 동시에 측정을 시작하지 않도록 보호하는 잠금
+# (cProfile은 한 번에 하나만 켤 수 있습니다)
+_lock = threading.Lock()
+_active_name = None
+
+_report_registered = False
+
+
+def _run_profiled(name, func, args, kwargs):
+    """
+    함수를 측정하면서 실행하고, 결과를 이름별로 합칩니다.
+    """
+    global _active_name, _report_registered
+
+    with _lock:
+        # 이미 다른 측정이 진행 중이면(예: main 안에서 전략 실행)
+        # 바깥 측정 결과에 함께 포함되므로 그냥 실행합니다
+        if _active_name is not None:
+            nested = True
+        else:
+            nested = False
+            _active_name = name
+
+            result_entry = _results.get(name)
+            if result_entry is None:
+                result_entry = {"profile": cProfile.Profile(), "calls": 0, "snapshot": None, "peak_bytes": 0, "reported_calls": 0}
+                _results[name] = result_entry
+
+            if not _report_registered:
+                atexit.register(write_reports)
+                _report_registered = True
+
+    if nested:
+        return func(*args, **kwargs)
+
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+
+    profile = result_entry["profile"]
+    try:
+        profile.enable()
+    except ValueError:
+        # 다른 프로파일러가 이미 켜져 있으면 측정하지 않고 실행만 합니다
+        profile = None
+
+    try:
+        return func(*args, **kwargs)
+    finally:
+        if profile is not None:
+            profile.disable()
+
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>")
+        ))
+        if started_tracemalloc:
+            tracemalloc.stop()
+
+        with _lock:
+            result_entry["calls"] += 1
+            result_entry["peak_bytes"] = max(result_entry["peak_bytes"], peak_bytes)
+            result_entry["snapshot"] = snapshot
+            _active_name = None
+
+
+def profiled(name):
+    """
+    PROFILE_ENABLED=1 일 때 함수를 cProfile/tracemalloc으로 측정하는 데코레이터입니다.
+
+    Parameters:
+        name (str): 보고서 파일 이름에 쓸 이름 (예: "main", "strategy")
+
+    Examples:
+        @profiled("strategy")
+        def 무상태_무한매수법(...):
+            ...
+    """
+    def decorator(func):
+        if not PROFILE_ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return _run_profiled(name, func, args, kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _format_hotspots(profile, calls):
+    """
+    오래 걸린 함수 순위를 누적 시간 순, 자체 시간 순으로 만듭니다.
+    """
+    output = io.StringIO()
+    output.write(f"실행 횟수: {calls}회\n")
+
+    for sort_key, title in (("cumulative", "누적 시간 순"), ("tottime", "자체 시간 순")):
+        output.write(f"\n===== {title} (상위 {PROFILE_TOP_N}개) =====\n")
+        stats = pstats.Stats(profile, stream=output)
+        stats.strip_dirs().sort_stats(sort_key).print_stats(PROFILE_TOP_N)
+
+    return output.getvalue()
+
+
+def _format_allocations(snapshot, peak_bytes):
+    """
+    메모리를 많이 할당한 코드 줄 순위를 만듭니다.
+    """
+    lines = [f"최대 메모리 사용량: {peak_bytes / 1024:.1f} KiB", ""]
+
+    if snapshot is None:
+        return "\n".join(lines) + "\n"
+
+    top_stats = snapshot.statistics("lineno")
+    total_bytes = sum(stat.size for stat in top_stats)
+    lines.append(f"===== 실행이 끝날 때 남아 있는 할당 (합계 {total_bytes / 1024:.1f} KiB, 상위 {PROFILE_TOP_N}개) =====")
+
+    for index, stat in enumerate(top_stats[:PROFILE_TOP_N], 1):
+        frame = stat.traceback[0]
+        lines.append(f"{index:3d}. {frame.filename}:{frame.lineno}  {stat.size / 1024:.1f} KiB ({stat.count}개)")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_reports(folder=None):
+    """
+    지금까지 측정한 결과를 보고서 파일로 저장합니다.
+
+    프로그램이 끝날 때 자동으로 호출되며, 직접 호출할 수도 있습니다.
+    마지막으로 저장한 뒤 새로 측정한 결과가 없으면 다시 저장하지 않습니다.
+
+    Parameters:
+        folder (str): 저장할 폴더 (None이면 LOG_DIR)
+
+    Returns:
+        list: 저장한 파일 경로 목록
+    """
+    folder = folder or LOG_DIR
+
+    with _lock:
+        entries = {name: dict(entry) for name, entry in _results.items() if entry["calls"] > entry["reported_calls"]}
+        for entry in _results.values():
+            entry["reported_calls"] = entry["calls"]
+
+    if not entries:
+        return []
+
+    os.makedirs(folder, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    paths = []
+
+    for name, entry in entries.items():
+        hotspot_path = os.path.join(folder, f"profile_{name}_{timestamp}.txt")
+        with open(hotspot_path, "w", encoding="utf-8") as file:
+            file.write(_format_hotspots(entry["profile"], entry["calls"]))
+
+        raw_path = os.path.join(folder, f"profile_{name}_{timestamp}.prof")
+        entry["profile"].dump_stats(raw_path)
+
+        alloc_path = os.path.join(folder, f"alloc_{name}_{timestamp}.txt")
+        with open(alloc_path, "w", encoding="utf-8") as file:
+            file.write(_format_allocations(entry["snapshot"], entry["peak_bytes"]))
+
+        paths.extend([hotspot_path, raw_path, alloc_path])
+
+    print(f"\n📊 성능 분석 보고서 저장: {folder} ({', '.join(sorted(entries))})")
+    return paths
+
+
+def reset_profiles():
+    """
+    지금까지 측정한 결과를 모두 지웁니다. (벤치마크나 테스트에서 사용)
+    """
+    with _lock:
+        _results.clear()
@@ -0,0 +1,49 @@
+# 한국투자증권 API 호출 속도를 제한하는 파일
+#
+# 한국투자증권 실전 계좌는 1초에 약 20건까지만 API를 호출할 수 있습니다.
+# 이 한도를 넘으면 EGW00201(초당 거래건수 초과) 오류가 발생하므로,
+# 여러 주문을 동시에 보낼 때도 한도를 넘지 않도록 여기서 순서를 조절합니다.
+import threading
+import time
+from collections import deque
+from config import API_CALLS_PER_SECOND
+
+# 최근 1초 동안 API를 호출한 시각 목록
+_recent_call_times = deque()
+
+# 여러 스레드가 동시에 호출 시각 목록을 수정하지 않도록 보호하는 잠금
+_lock = threading.Lock()
+
+
+def wait_for_api_slot():
+    """
+    API를 호출해도 되는 시점까지 기다립니다.
+
+    최근 1초 동안의 호출 횟수가 API_CALLS_PER_SECOND에 도달했다면,
+    가장 오래된 호출이 1초 범위를 벗어날 때까지 잠시 기다립니다.
+    여러 스레드에서 동시에 불러도 안전합니다.
+
+    Returns:
+        float: 실제로 기다린 시간 (초)
+    """
+    waited_seconds = 0.0
+
+    while True:
+        with _lock:
+            now = time.monotonic()
+
+            # 1초보다 오래된 호출 기록은 지웁니다
+            while _recent_call_times and now - _recent_call_times[0] >= 1.0:
+                _recent_call_times.popleft()
+
+            # 여유가 있으면 지금 호출 시각을 기록하고 바로 진행합니다
+            if len(_recent_call_times) < API_CALLS_PER_SECOND:
+                _recent_call_times.append(now)
+                return waited_seconds
+
+            # 여유가 없으면 가장 오래된 호출이 1초 범위를 벗어날 때까지 기다립니다
+            sleep_seconds = 1.0 - (now - _recent_call_times[0])
+
+        # 잠금을 풀고 기다려야 다른 스레드가 멈추지 않습니다
+        time.sleep(sleep_seconds)
+        waited_seconds += sleep_seconds
@@ -0,0 +1,422 @@
+# 한국투자증권 실시간 시세(WebSocket)를 받는 코드
+#
+# REST API로 시세를 매번 조회하지 않고, WebSocket으로 체결가/호가를 계속 받아
+# 종목별 최신 가격표(PriceBook)에 저장합니다.
+# 전략은 가격표에서 값을 읽기만 하므로 네트워크 호출 없이 바로 최신 가격을 얻습니다.
+#
+# 지원하는 실시간 데이터:
+# - HDFSCNT0: 해외주식 실시간지연체결가 (현재가, 시가, 고가, 저가, 매수/매도호가, 거래량)
+# - HDFSASP0: 해외주식 실시간호가 (1호가 매수/매도 가격과 잔량)
+#
+# 연결이 끊기면 자동으로 다시 접속하고, 등록했던 종목을 다시 등록합니다.
+# WebSocket 연결(접속, ping/pong, 메시지 조립)은 websocket-client 라이브러리가 처리합니다.
+import json
+import threading
+import time
+from collections import namedtuple
+from websocket import ABNF, WebSocketException, WebSocketTimeoutException, create_connection
+from authentication import get_approval_key
+from config import KIS_WS_DOMAIN
+
+# 실시간 데이터 거래 ID
+TRADE_TR_ID = "HDFSCNT0"  # 해외주식 실시간지연체결가
+QUOTE_TR_ID = "HDFSASP0"  # 해외주식 실시간호가 (미국)
+
+# 실시간 데이터의 항목 순서 ('^'로 구분된 값의 위치)
+TRADE_FIELDS = (
+    "RSYM", "SYMB", "ZDIV", "TYMD", "XYMD", "XHMS", "KYMD", "KHMS",
+    "OPEN", "HIGH", "LOW", "LAST", "SIGN", "DIFF", "RATE",
+    "PBID", "PASK", "VBID", "VASK", "EVOL", "TVOL", "TAMT",
+    "BIVL", "ASVL", "STRN", "MTYP"
+)
+QUOTE_FIELDS = (
+    "RSYM", "SYMB", "ZDIV", "XYMD", "XHMS", "KYMD", "KHMS",
+    "BVOL", "AVOL", "BDVL", "ADVL",
+    "PBID1", "PASK1", "VBID1", "VASK1", "DBID1", "DASK1"
+)
+
+# 다시 접속할 때 기다리는 시간 (초): 1, 2, 4, ... 최대 30초
+RECONNECT_MIN_SECONDS = 1.0
+RECONNECT_MAX_SECONDS = 30.0
+
+# 연결이 끊겼는지 확인하기 위해 메시지를 기다리는 최대 시간 (초)
+RECEIVE_TIMEOUT_SECONDS = 0.5
+
+# 가격 정보의 묶음: 체결가 묶음과 호가 묶음은 따로 들어오므로, 받은 시각도 따로 기억합니다
+# (호가만 계속 들어와도 체결가가 최신인 것처럼 보이지 않도록)
+FIELD_GROUPS = {
+    "trade": ("last", "open", "high", "low", "volume"),
+    "quote": ("bid", "ask", "bid_size", "ask_size")
+}
+
+
+# 종목 하나의 최신 가격 정보 (값을 바꾸지 않고 항상 새로 만들어 교체합니다)
+Tick = namedtuple("Tick", [
+    "symbol",         # 종목 코드
+    "last",           # 현재가
+    "open",           # 시가
+    "high",           # 고가
+    "low",            # 저가
+    "bid",            # 매수 1호가
+    "ask",            # 매도 1호가
+    "bid_size",       # 매수 1호가 잔량
+    "ask_size",       # 매도 1호가 잔량
+    "volume",         # 누적 거래량
+    "exchange_time",  # 현지 체결/호가 시각 (HHMMSS)
+    "received_at",    # 마지막으로 받은 시각 (time.monotonic)
+    "trade_at",       # 체결가 묶음(현재가, 시가 등)을 받은 시각 (time.monotonic)
+    "quote_at"        # 호가 묶음(매수/매도호가, 잔량)을 받은 시각 (time.monotonic)
+])
+
+_EMPTY_TICK = Tick(None, None, None, None, None, None, None, None, None, None, "", 0.0, 0.0, 0.0)
+
+
+class PriceBook:
+    """
+    종목별 최신 가격표
+
+    쓰는 쪽(WebSocket 수신 스레드)은 새 Tick을 만들어 dict에 통째로 교체하고,
+    읽는 쪽(전략)은 dict에서 Tick 하나를 꺼내기만 합니다.
+    dict 항목 하나를 바꾸는 동작은 한 번에 끝나므로(원자적) 잠금 없이도
+    읽는 쪽은 항상 완성된 Tick만 보게 됩니다.
+    """
+
+    def __init__(self):
+        self._ticks = {}
+
+    def update(self, symbol, **fields):
+        """
+        종목의 가격 정보 일부를 바꿉니다. (쓰는 스레드는 하나만 사용하세요)
+
+        Parameters:
+            symbol (str): 종목 코드
+            **fields: 바꿀 항목 (예: last=51.2, bid=51.19)
+        """
+        now = time.monotonic()
+        received = {"received_at": now}
+        for group, names in FIELD_GROUPS.items():
+            if any(name in fields for name in names):
+                received[f"{group}_at"] = now
+
+        previous = self._ticks.get(symbol, _EMPTY_TICK)
+        self._ticks[symbol] = previous._replace(symbol=symbol, **received, **fields)
+
+    def get(self, symbol, max_age_seconds=None, group=None):
+        """
+        종목의 최신 가격 정보를 돌려줍니다. 네트워크 호출은 하지 않습니다.
+
+        Parameters:
+            symbol (str): 종목 코드
+            max_age_seconds (float): 이 시간보다 오래된 정보면 None을 돌려줍니다
+            group (str): 오래되었는지 볼 묶음 ("trade": 체결가, "quote": 호가, None: 아무 값이나)
+
+        Returns:
+            Tick: 최신 가격 정보 (없거나 오래되었으면 None)
+        """
+        tick = self._ticks.get(symbol)
+        if tick is None:
+            return None
+
+        received_at = getattr(tick, f"{group}_at") if group else tick.received_at
+        if max_age_seconds is not None and time.monotonic() - received_at > max_age_seconds:
+            return None
+        return tick
+
+    def symbols(self):
+        """가격 정보가 있는 종목 목록"""
+        return list(self._ticks)
+
+
+def _to_float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_realtime_message(message):
+    """
+    실시간 데이터 메시지를 항목 이름별 dict 목록으로 바꿉니다.
+
+    실시간 데이터 형식: "암호화여부|거래ID|데이터건수|값^값^값..."
+    데이터건수가 2 이상이면 한 건의 항목 수만큼 이어서 붙어 옵니다.
+
+    Parameters:
+        message (str): WebSocket으로 받은 문자열
+
+    Returns:
+        tuple: (거래 ID, [항목 dict, ...]) — 실시간 데이터가 아니면 (None, [])
+    """
+    if not message or message[0] not in ("0", "1"):
+        return None, []
+
+    parts = message.split("|", 3)
+    if len(parts) < 4:
+        return None, []
+
+    _, tr_id, count_text, data = parts
+    if tr_id == TRADE_TR_ID:
+        field_names = TRADE_FIELDS
+    elif tr_id == QUOTE_TR_ID:
+        field_names = QUOTE_FIELDS
+    else:
+        return tr_id, []
+
+    values = data.split("^")
+    field_count = len(field_names)
+    records = []
+
+    for index in range(int(count_text or "1")):
+        record_values = values[index * field_count:(index + 1) * field_count]
+        if len(record_values) < field_count:
+            break
+        records.append(dict(zip(field_names, record_values)))
+
+    return tr_id, records
+
+
+def make_tr_key(symbol, exchange_code="NAS"):
+    """
+    실시간 등록용 종목 키를 만듭니다. (D: 지연시세 + 거래소 코드 + 종목 코드, 예: "DNASTQQQ")
+    """
+    return f"D{exchange_code}{symbol}"
+
+
+class RealtimePriceClient:
+    """
+    한국투자증권 실시간 시세 클라이언트
+
+    백그라운드 스레드에서 WebSocket으로 체결가/호가를 받아 price_book에 저장합니다.
+
+    Examples:
+        client = RealtimePriceClient()
+        client.subscribe("TQQQ", "NAS")
+        client.start()
+        ...
+        tick = client.price_book.get("TQQQ", max_age_seconds=5)
+        ...
+        client.stop()
+    """
+
+    def __init__(self, url=None, price_book=None, approval_key_getter=get_approval_key):
+        """
+        Parameters:
+            url (str): WebSocket 주소 (None이면 KIS_WS_DOMAIN)
+            price_book (PriceBook): 가격을 저장할 가격표 (None이면 새로 만듦)
+            approval_key_getter (callable): 실시간 접속키를 돌려주는 함수
+        """
+        self.url = url or KIS_WS_DOMAIN
+        self.price_book = price_book or PriceBook()
+        self.connect_count = 0
+        self.last_error = None
+
+        self._approval_key_getter = approval_key_getter
+        self._subscriptions = {}  # (tr_id, tr_key) -> 종목 코드
+        self._subscriptions_lock = threading.Lock()
+        self._websocket = None
+        self._connected = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    # ========================================
+    # 종목 등록 / 해제
+    # ========================================
+
+    def _send_subscription(self, websocket, tr_id, tr_key, register):
+        message = {
+            "header": {
+                "approval_key": self._approval_key_getter(),
+                "custtype": "P",                      # 고객 타입 (P: 개인)
+                "tr_type": "1" if register else "2",  # 1: 등록, 2: 해제
+                "content-type": "utf-8"
+            },
+            "body": {
+                "input": {
+                    "tr_id": tr_id,
+                    "tr_key": tr_key
+                }
+            }
+        }
+        websocket.send(json.dumps(message))
+
+    def subscribe(self, symbol, exchange_code="NAS", trades=True, quotes=True):
+        """
+        종목의 실시간 체결가/호가를 받도록 등록합니다.
+
+        연결되기 전에 불러도 되며, 연결되면(다시 연결될 때도) 자동으로 등록됩니다.
+        """
+        tr_key = make_tr_key(symbol, exchange_code)
+        tr_ids = [tr_id for tr_id, wanted in ((TRADE_TR_ID, trades), (QUOTE_TR_ID, quotes)) if wanted]
+
+        with self._subscriptions_lock:
+            for tr_id in tr_ids:
+                self._subscriptions[(tr_id, tr_key)] = symbol
+
+        websocket = self._websocket
+        if websocket is not None and self._connected.is_set():
+            for tr_id in tr_ids:
+                try:
+                    self._send_subscription(websocket, tr_id, tr_key, register=True)
+                except (OSError, WebSocketException):
+                    pass  # 연결이 끊겼으면 다시 연결될 때 등록됩니다
+
+    def unsubscribe(self, symbol, exchange_code="NAS"):
+        """
+        종목의 실시간 체결가/호가 등록을 해제합니다.
+        """
+        tr_key = make_tr_key(symbol, exchange_code)
+
+        with self._subscriptions_lock:
+            removed = [key for key in self._subscriptions if key[1] == tr_key]
+            for key in removed:
+                del self._subscriptions[key]
+
+        websocket = self._websocket
+        if websocket is not None and self._connected.is_set():
+            for tr_id, _ in removed:
+                try:
+                    self._send_subscription(websocket, tr_id, tr_key, register=False)
+                except (OSError, WebSocketException):
+                    pass
+
+    # ========================================
+    # 메시지 처리
+    # ========================================
+
+    def _handle_message(self, websocket, message):
+        # 실시간 데이터는 "0|" 또는 "1|"로 시작하고, 나머지는 JSON 제어 메시지입니다
+        if message[:1] in ("0", "1"):
+            tr_id, records = parse_realtime_message(message)
+            for record in records:
+                self._apply_record(tr_id, record)
+            return
+
+        try:
+            control = json.loads(message)
+        except ValueError:
+            return
+
+        header = control.get("header", {})
+
+        # 서버의 연결 확인(PINGPONG)에는 받은 메시지를 그대로 돌려보내야 합니다
+        if header.get("tr_id") == "PINGPONG":
+            websocket.send(message)
+            return
+
+        body = control.get("body", {})
+        if body.get("rt_cd") not in (None, "0"):
+            self.last_error = f"[{body.get('msg_cd', '')}] {body.get('msg1', '')}"
+            print(f"⚠️ 실시간 등록 실패 ({header.get('tr_key', '')}): {self.last_error}")
+
+    def _apply_record(self, tr_id, record):
+        symbol = record.get("SYMB", "")
+        if not symbol:
+            return
+
+        if tr_id == TRADE_TR_ID:
+            self.price_book.update(
+                symbol,
+                last=_to_float(record.get("LAST")),
+                open=_to_float(record.get("OPEN")),
+                high=_to_float(record.get("HIGH")),
+                low=_to_float(record.get("LOW")),
+                bid=_to_float(record.get("PBID")),
+                ask=_to_float(record.get("PASK")),
+                volume=_to_float(record.get("TVOL")),
+                exchange_time=record.get("XHMS", "")
+            )
+        else:
+            self.price_book.update(
+                symbol,
+                bid=_to_float(record.get("PBID1")),
+                ask=_to_float(record.get("PASK1")),
+                bid_size=_to_float(record.get("VBID1")),
+                ask_size=_to_float(record.get("VASK1")),
+                exchange_time=record.get("XHMS", "")
+            )
+
+    # ========================================
+    # 연결 관리
+    # ========================================
+
+    def _receive(self, websocket):
+        """
+        메시지 하나를 받습니다. (ping에는 라이브러리가 pong으로 답합니다)
+
+        Returns:
+            str: 받은 메시지 (RECEIVE_TIMEOUT_SECONDS 동안 받은 것이 없으면 None)
+        """
+        try:
+            opcode, data = websocket.recv_data()
+        except WebSocketTimeoutException:
+            return None
+
+        if opcode == ABNF.OPCODE_CLOSE:
+            raise ConnectionError("서버가 WebSocket 연결을 닫았습니다.")
+        return data.decode("utf-8")
+
+    def _run(self):
+        reconnect_delay = RECONNECT_MIN_SECONDS
+
+        while not self._stop_event.is_set():
+            websocket = None
+            try:
+                websocket = create_connection(self.url, timeout=10)
+                websocket.settimeout(RECEIVE_TIMEOUT_SECONDS)
+                self._websocket = websocket
+                self.connect_count += 1
+
+                with self._subscriptions_lock:
+                    subscriptions = list(self._subscriptions)
+                for tr_id, tr_key in subscriptions:
+                    self._send_subscription(websocket, tr_id, tr_key, register=True)
+
+                self._connected.set()
+                reconnect_delay = RECONNECT_MIN_SECONDS
+
+                while not self._stop_event.is_set():
+                    message = self._receive(websocket)
+                    if message is not None:
+                        self._handle_message(websocket, message)
+
+            except Exception as e:
+                self.last_error = str(e)
+                if not self._stop_event.is_set():
+                    print(f"⚠️ 실시간 시세 연결 끊김: {e} ({reconnect_delay:.0f}초 후 다시 연결)")
+            finally:
+                self._connected.clear()
+                self._websocket = None
+                if websocket is not None:
+                    try:
+                        websocket.close(timeout=1)
+                    except (OSError, WebSocketException):
+                        pass
+
+            if self._stop_event.wait(reconnect_delay):
+                break
+            reconnect_delay = min(reconnect_delay * 2, RECONNECT_MAX_SECONDS)
+
+    def start(self):
+        """백그라운드 스레드에서 실시간 시세 수신을 시작합니다."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="kis-realtime", daemon=True)
+        self._thread.start()
+
+    def wait_until_connected(self, timeout=10.0):
+        """
+        연결될 때까지 기다립니다.
+
+        Returns:
+            bool: 시간 안에 연결되었으면 True
+        """
+        return self._connected.wait(timeout)
+
+    def stop(self):
+        """실시간 시세 수신을 멈추고 연결을 닫습니다. (수신 스레드가 연결을 닫고 끝납니다)"""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
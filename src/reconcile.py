@@ -0,0 +1,178 @@
+# 실행 한 번의 주문 계획, 접수(주문번호), 실제 체결을 맞춰 보는 코드 (주문 대사)
+#
+# 실행이 끝나면 "보낸 주문"과 "실패한 주문"만 출력되므로,
+# 계획한 주문이 실제로 얼마나 체결되었는지는 따로 체결내역을 조회해서 확인해야 했습니다.
+# 이 파일은 세 가지를 해시 색인(딕셔너리)으로 한 번에 맞춥니다.
+#
+# - 계획: 전략이 만든 주문 목록 (주문 설명으로 찾음)
+# - 접수: 주문을 보내고 받은 주문번호 (주문 설명 -> 주문번호)
+# - 체결: 주문체결내역(inquire-ccnl) 조회 결과 (주문번호 -> 체결 상태)
+#
+# 결과는 실행마다 한 줄짜리 JSON으로 RECONCILE_PATH 파일에 덧붙여 두고,
+# 하루를 돌아볼 때 read_reports()로 다시 읽습니다.
+import json
+import os
+import threading
+from datetime import datetime
+from config import RECONCILE_PATH
+
+# 주문 하나의 대사 결과
+NOT_SENT = "NOT_SENT"        # 보내지 않음 (위험 점검 제외, 매도 미지원, 실패 등)
+NOT_FOUND = "NOT_FOUND"      # 접수되었지만 체결내역에서 찾을 수 없음
+UNFILLED = "UNFILLED"        # 체결 없음
+PARTIAL = "PARTIAL"          # 일부 체결
+FILLED = "FILLED"            # 전량 체결
+OVERFILLED = "OVERFILLED"    # 계획보다 많이 체결
+
+STATUSES = (NOT_SENT, NOT_FOUND, UNFILLED, PARTIAL, FILLED, OVERFILLED)
+
+# 확인이 필요한 결과 (알림 대상)
+ATTENTION_STATUSES = (NOT_FOUND, PARTIAL, OVERFILLED)
+
+# 여러 스레드가 동시에 파일에 쓰지 않도록 보호하는 잠금
+_lock = threading.Lock()
+
+
+def _fill_status(quantity, filled_qty):
+    """계획 수량과 체결 수량으로 대사 결과를 정합니다."""
+    if filled_qty <= 0:
+        return UNFILLED
+    if filled_qty < quantity:
+        return PARTIAL
+    if filled_qty == quantity:
+        return FILLED
+    return OVERFILLED
+
+
+def reconcile_orders(planned_orders, acks, today_orders, not_sent=None):
+    """
+    주문 계획, 접수, 체결을 주문 설명과 주문번호로 맞춰 주문별 결과를 만듭니다.
+
+    Parameters:
+        planned_orders (list): 전략이 만든 주문 목록 (side, quantity, price, order_type, comment)
+        acks (list): 접수된 주문 목록 [{"comment", "odno", ...}] (trading_bot의 executed_orders)
+        today_orders (list): 주문체결내역 조회 결과 (get_overseas_today_orders)
+        not_sent (list): 보내지 않은 주문 [{"comment", "reason" 또는 "error"}]
+
+    Returns:
+        dict:
+            - orders: 계획 순서대로 주문별 결과
+                  [{"comment", "side", "order_type", "price", "quantity", "odno",
+                    "filled_qty", "unfilled_qty", "avg_price", "status", "state", "reason"}]
+            - counts: 결과별 주문 수 {"FILLED": 2, ...}
+    """
+    acks_by_comment = {ack["comment"]: ack for ack in acks}
+    status_by_odno = {row["odno"]: row for row in today_orders}
+    reasons = {item["comment"]: item.get("reason") or item.get("error", "") for item in not_sent or []}
+
+    rows = []
+    counts = dict.fromkeys(STATUSES, 0)
+
+    for order in planned_orders:
+        row = {
+            "comment": order["comment"],
+            "side": order["side"],
+            "order_type": order["order_type"],
+            "price": order["price"],
+            "quantity": order["quantity"],
+            "odno": "",
+            "filled_qty": 0,
+            "unfilled_qty": order["quantity"],
+            "avg_price": None,
+            "status": NOT_SENT,
+            "state": "",
+            "reason": reasons.get(order["comment"], "")
+        }
+
+        ack = acks_by_comment.get(order["comment"])
+        if ack:
+            row["odno"] = ack["odno"]
+            status = status_by_odno.get(ack["odno"])
+            if status is None:
+                row["status"] = NOT_FOUND
+            else:
+                filled_qty = int(status.get("ft_ccld_qty") or 0)
+                row["filled_qty"] = filled_qty
+                row["unfilled_qty"] = max(order["quantity"] - filled_qty, 0)
+                row["avg_price"] = float(status.get("ft_ccld_unpr3") or 0) if filled_qty else None
+                row["status"] = _fill_status(order["quantity"], filled_qty)
+                row["state"] = status.get("prcs_stat_name", "")
+                row["reason"] = status.get("rjct_rson_name", "")
+
+        counts[row["status"]] += 1
+        rows.append(row)
+
+    return {"orders": rows, "counts": counts}
+
+
+def needs_attention(report):
+    """
+    확인이 필요한 주문(찾을 수 없음, 일부 체결, 초과 체결)만 돌려줍니다.
+    """
+    return [row for row in report["orders"] if row["status"] in ATTENTION_STATUSES]
+
+
+def save_report(report, symbol, trade_mode, trade_date="", reconcile_path=RECONCILE_PATH):
+    """
+    대사 결과에 실행 시각/종목/모드/거래일을 붙여 파일 끝에 한 줄로 추가합니다.
+
+    한 번의 실행에서 이번 거래일과 지난 거래일의 대사 결과를 따로 저장하므로
+    거래일(trade_date, 예: "20240101")로 두 기록을 구분합니다.
+
+    Returns:
+        dict: 저장한 기록
+    """
+    record = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "symbol": symbol,
+        "trade_mode": trade_mode,
+        "trade_date": trade_date,
+        "counts": report["counts"],
+        "orders": report["orders"]
+    }
+
+    folder = os.path.dirname(reconcile_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    with _lock:
+        with open(reconcile_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return record
+
+
+def read_reports(trade_date=None, symbol=None, reconcile_path=RECONCILE_PATH):
+    """
+    저장된 대사 결과를 읽습니다.
+
+    Parameters:
+        trade_date (str): 실행 날짜 "YYYY-MM-DD" (None이면 전체)
+        symbol (str): 종목 코드 (None이면 전체 종목)
+        reconcile_path (str): 대사 보고서 파일 경로
+
+    Returns:
+        list: 대사 기록 목록 (저장된 순서대로)
+    """
+    if not os.path.exists(reconcile_path):
+        return []
+
+    reports = []
+
+    with open(reconcile_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 쓰는 도중 끊긴 줄은 건너뜁니다
+                continue
+            if trade_date and not record["time"].startswith(trade_date):
+                continue
+            if symbol and record["symbol"] != symbol:
+                continue
+            reports.append(record)
+
+    return reports
@@ -0,0 +1,163 @@
+# 주문을 보내기 전에 주문 목록 전체를 점검하는 코드 (주문 전 위험 점검)
+#
+# 잘못된 주문도 일단 보내면 한국투자증권이 거부할 때까지 API 왕복 한 번과 실패 알림 한 건이 들고,
+# 거부되지 않는 실수(현재가와 동떨어진 가격, 같은 주문 두 번)는 그대로 체결될 수도 있습니다.
+# 이 파일은 전략이 이미 조회해 둔 값(현재가, 보유 수량, 주문 가능 금액, 최대 포지션)만으로
+# API를 부르지 않고 메모리 안에서 주문 목록을 차례로 점검하여, 문제가 있는 주문을 미리 뺍니다.
+#
+# 점검 항목 (주문 목록 순서대로, 통과한 매수 주문은 한도를 차지함):
+# 1. 주문 형식: 주문 유형, 수량(매매 단위의 배수), 지정가(호가 단위)
+# 2. 중복: 같은 설명/방향/유형/가격/수량의 주문이 이미 목록에 있음
+# 3. 가격 범위: 현재가보다 RISK_PRICE_BAND 넘게 비싸게 사는 지정가 / 싸게 파는 지정가
+#    (현재가보다 싸게 사거나 비싸게 파는 주문은 나쁜 가격에 체결될 수 없으므로 보지 않습니다.
+#     LOC는 종가가 지정가보다 유리할 때만 종가에 체결되므로 범위를 보지 않습니다.
+#     그래서 손실 구간의 평단 매수(LOC)와 익절 매도(현재가보다 높은 LIMIT)는 그대로 나갑니다)
+# 4. 매도 수량: 매도 주문 합계가 보유 수량보다 많음
+# 5. 매수 한도: 최대 포지션(max_position), 주문 가능 금액, 종목/계좌 보유 금액 한도
+from config import RISK_PRICE_BAND, RISK_MAX_SYMBOL_EXPOSURE, RISK_MAX_ACCOUNT_EXPOSURE
+from money import to_units, from_units, apply_rate
+from tick import tick_units
+from trader import ORDER_TYPE_CODES
+
+# 지정가가 있어야 하는 주문 유형 (MOC/MOO는 시장가)
+PRICED_ORDER_TYPES = ("LIMIT", "LOC", "LOO")
+
+# 가격 범위를 보는 주문 유형 (지정가로 바로 체결될 수 있는 주문)
+BANDED_ORDER_TYPES = ("LIMIT", "LOO")
+
+
+def _limit_units(limit):
+    """달러 한도를 마이크로 단위로 바꿉니다. (0 이하이면 None = 제한 없음)"""
+    return to_units(limit) if limit and limit > 0 else None
+
+
+def _format_reason(order, lot_size, tick_ladder):
+    """주문 하나의 형식 문제를 돌려줍니다. (문제가 없으면 None)"""
+    if order.get("order_type") not in ORDER_TYPE_CODES:
+        return f"지원하지 않는 주문 유형 ({order.get('order_type')})"
+    if order.get("side") not in ("BUY", "SELL"):
+        return f"매수/매도 구분 오류 ({order.get('side')})"
+
+    quantity = order.get("quantity")
+    if not isinstance(quantity, int) or quantity <= 0:
+        return f"주문 수량 오류 ({quantity})"
+    if quantity % lot_size:
+        return f"매매 단위({lot_size}주)의 배수가 아님 ({quantity}주)"
+
+    if order["order_type"] in PRICED_ORDER_TYPES:
+        price_units = to_units(order.get("price") or 0)
+        if price_units <= 0:
+            return "지정가 없음"
+        if price_units % tick_units(price_units, tick_ladder):
+            return f"호가 단위에 맞지 않는 가격 (${order['price']})"
+    return None
+
+
+def check_orders(orders, snapshot, lot_size=1, tick_ladder="US", account_exposure=None,
+                 price_band=RISK_PRICE_BAND, max_symbol_exposure=RISK_MAX_SYMBOL_EXPOSURE,
+                 max_account_exposure=RISK_MAX_ACCOUNT_EXPOSURE):
+    """
+    주문 목록 전체를 API 호출 없이 점검하여 보낼 주문과 뺄 주문으로 나눕니다.
+
+    Parameters:
+        orders (list): 전략이 만든 주문 목록 (side, quantity, price, order_type, comment)
+        snapshot (dict): 전략 결과 (무상태_무한매수법의 반환값)
+            - last_price: 현재가
+            - position_qty: 보유 수량
+            - orderable_cash: 주문 가능 금액
+            - max_position: 최대 포지션 (없으면 확인하지 않음)
+        lot_size (int): 매매 단위
+        tick_ladder (str): 호가 단위표 이름
+        account_exposure (float): 계좌 전체 보유 금액 (None이면 이 종목 보유 금액)
+        price_band (float): 현재가 대비 허용 가격 범위 (예: 0.30 = 현재가보다 30% 넘게 비싸게 사거나 싸게 팔지 않음)
+        max_symbol_exposure (float): 종목 보유 금액 + 매수 주문 금액 한도 (0이면 제한 없음)
+        max_account_exposure (float): 계좌 보유 금액 + 매수 주문 금액 한도 (0이면 제한 없음)
+
+    Returns:
+        dict:
+            - accepted: 보낼 주문 목록 (원래 순서)
+            - rejected: [{"comment", "reason", "order"}, ...]
+    """
+    last_units = to_units(snapshot["last_price"])
+    position_qty = int(snapshot.get("position_qty") or 0)
+    max_position = snapshot.get("max_position")
+    band_parts = to_units(price_band)
+
+    # 시장가 매수는 가격 범위 끝(현재가 + 범위)에 체결된다고 보고 금액을 잡습니다
+    market_buy_units = apply_rate(last_units, price_band)
+
+    symbol_exposure = position_qty * last_units
+    if account_exposure is None:
+        account_exposure_units = symbol_exposure
+    else:
+        account_exposure_units = to_units(account_exposure)
+
+    remaining_cash = to_units(snapshot.get("orderable_cash") or 0)
+    symbol_limit = _limit_units(max_symbol_exposure)
+    account_limit = _limit_units(max_account_exposure)
+
+    bought_qty = 0
+    sold_qty = 0
+    seen = set()
+    accepted = []
+    rejected = []
+
+    def reject(order, reason):
+        rejected.append({"comment": order.get("comment", ""), "reason": reason, "order": order})
+
+    for order in orders:
+        reason = _format_reason(order, lot_size, tick_ladder)
+        if reason:
+            reject(order, reason)
+            continue
+
+        side = order["side"]
+        quantity = order["quantity"]
+        priced = order["order_type"] in PRICED_ORDER_TYPES
+        price_units = to_units(order["price"]) if priced else 0
+
+        key = (order.get("comment", ""), side, order["order_type"], price_units, quantity)
+        if key in seen:
+            reject(order, "같은 주문이 이미 목록에 있음")
+            continue
+
+        if order["order_type"] in BANDED_ORDER_TYPES and last_units > 0:
+            # 불리한 쪽으로 벗어난 정도 (매수는 현재가보다 비싼 만큼, 매도는 싼 만큼)
+            adverse_units = price_units - last_units if side == "BUY" else last_units - price_units
+            if adverse_units * 1_000_000 > last_units * band_parts:
+                direction = "비싼 매수" if side == "BUY" else "싼 매도"
+                reject(order, f"현재가 ${from_units(last_units)}보다 {price_band:.0%} 넘게 {direction} (${order['price']})")
+                continue
+
+        if side == "SELL":
+            if sold_qty + quantity > position_qty:
+                reject(order, f"보유 수량 초과 (보유 {position_qty}주, 매도 주문 {sold_qty + quantity}주)")
+                continue
+            sold_qty += quantity
+            seen.add(key)
+            accepted.append(order)
+            continue
+
+        notional = quantity * (price_units if priced else market_buy_units)
+
+        if max_position is not None and position_qty + bought_qty + quantity > max_position:
+            reject(order, f"최대 포지션 초과 (보유 {position_qty}주 + 매수 {bought_qty + quantity}주 > {max_position}주)")
+            continue
+        if notional > remaining_cash:
+            reject(order, f"주문 가능 금액 부족 (필요 ${from_units(notional):.2f}, 남은 금액 ${from_units(remaining_cash):.2f})")
+            continue
+        if symbol_limit is not None and symbol_exposure + notional > symbol_limit:
+            reject(order, f"종목 한도 초과 (${from_units(symbol_exposure + notional):.2f} > ${from_units(symbol_limit):.2f})")
+            continue
+        if account_limit is not None and account_exposure_units + notional > account_limit:
+            reject(order, f"계좌 한도 초과 (${from_units(account_exposure_units + notional):.2f} > ${from_units(account_limit):.2f})")
+            continue
+
+        bought_qty += quantity
+        remaining_cash -= notional
+        symbol_exposure += notional
+        account_exposure_units += notional
+        seen.add(key)
+        accepted.append(order)
+
+    return {"accepted": accepted, "rejected": rejected}
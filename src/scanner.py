@@ -0,0 +1,232 @@
+# 여러 종목을 한꺼번에 조회하여 무한매수법을 돌릴 후보를 고르는 코드 (종목 스캐너)
+#
+# 종목 하나(SYMBOL)만 보는 대신, 레버리지 ETF 같은 종목 목록(유니버스)을 훑어서
+# 오늘 거래할 만한 종목을 순위대로 돌려줍니다.
+# 종목마다 현재체결가(주문 가능 여부)와 현재가상세(시가/고가/저가/거래량)를 조회해야 하므로,
+# 여러 스레드로 동시에 조회하되 초당 호출 한도(rate_limiter)는 지킵니다.
+# 지표는 종목별로 따로 계산하지 않고, 열(column)별 정수 배열(array('q'))로 모아서 한 번에 계산합니다.
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from config import API_CALLS_PER_SECOND, SCAN_UNIVERSE, SCAN_TOP_N, SCAN_WORKERS
+from trader import get_overseas_stock_price, get_overseas_stock_quotation
+from money import to_units, from_units
+from tracing import span
+
+# 기본 유니버스: 미국 상장 레버리지/인버스 ETF (종목 코드, 시세 조회용 거래소 코드)
+# NYSE Arca 상장 ETF는 한국투자증권에서 AMS(아멕스)로 조회합니다
+LEVERAGED_ETFS = [
+    ("TQQQ", "NAS"), ("SQQQ", "NAS"), ("QLD", "AMS"), ("SOXL", "AMS"), ("SOXS", "AMS"),
+    ("UPRO", "AMS"), ("SPXL", "AMS"), ("SPXU", "AMS"), ("SSO", "AMS"), ("TECL", "AMS"),
+    ("TNA", "AMS"), ("TZA", "AMS"), ("LABU", "AMS"), ("LABD", "AMS"), ("FAS", "AMS"),
+    ("FAZ", "AMS"), ("UDOW", "AMS"), ("SDOW", "AMS"), ("TMF", "AMS"), ("TMV", "AMS"),
+    ("YINN", "AMS"), ("YANG", "AMS"), ("NUGT", "AMS"), ("DUST", "AMS"), ("GUSH", "AMS"),
+    ("DPST", "AMS"), ("NAIL", "AMS"), ("CURE", "AMS"), ("DRN", "AMS"), ("WEBL", "AMS"),
+    ("UCO", "AMS"), ("BOIL", "AMS"), ("USD", "AMS"), ("ROM", "AMS"), ("UYG", "AMS")
+]
+
+
+def parse_universe(text):
+    """
+    "종목:거래소" 목록 문자열을 (종목 코드, 거래소 코드) 목록으로 바꿉니다.
+
+    거래소를 생략하면 NAS로 봅니다.
+
+    Examples:
+        >>> parse_universe("TQQQ:NAS, SOXL:AMS, AAPL")
+        [('TQQQ', 'NAS'), ('SOXL', 'AMS'), ('AAPL', 'NAS')]
+    """
+    universe = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        symbol, _, exchange_code = item.partition(":")
+        universe.append((symbol.strip().upper(), exchange_code.strip().upper() or "NAS"))
+    return universe
+
+
+def _fetch_one(symbol, exchange_code):
+    """
+    종목 하나의 현재체결가와 현재가상세를 조회합니다.
+
+    예외가 나도 다른 종목 조회에 영향을 주지 않도록 결과에 에러를 담아 반환합니다.
+    """
+    try:
+        quotation = get_overseas_stock_quotation(symbol, exchange_code)
+        price_detail = get_overseas_stock_price(symbol, exchange_code)
+    except Exception as e:
+        return {"symbol": symbol, "exchange": exchange_code, "error": str(e)}
+
+    # 없는 종목은 성공 응답에 빈 가격이 옵니다
+    if not price_detail.get("last") or to_units(price_detail["last"]) <= 0:
+        return {"symbol": symbol, "exchange": exchange_code, "error": "시세 없음"}
+
+    return {
+        "symbol": symbol,
+        "exchange": exchange_code,
+        "tradable": quotation.get("ordy", "N") == "Y",
+        "last": price_detail.get("last", "0"),
+        "open": price_detail.get("open") or price_detail.get("last", "0"),
+        "high": price_detail.get("high") or price_detail.get("last", "0"),
+        "low": price_detail.get("low") or price_detail.get("last", "0"),
+        "base": price_detail.get("base") or price_detail.get("open") or price_detail.get("last", "0"),
+        "volume": int(float(price_detail.get("tvol") or 0)),
+        "turnover": price_detail.get("tamt") or "0",
+        "error": ""
+    }
+
+
+def fetch_universe(universe, max_workers=None):
+    """
+    여러 종목의 시세를 동시에 조회합니다.
+
+    Parameters:
+        universe (list): (종목 코드, 거래소 코드) 목록
+        max_workers (int): 동시에 조회할 스레드 수 (None이면 SCAN_WORKERS 또는 API_CALLS_PER_SECOND)
+
+    Returns:
+        list: 종목별 조회 결과 (입력 순서와 같음, 실패한 종목은 "error"에 사유)
+    """
+    if not universe:
+        return []
+
+    worker_count = min(len(universe), max_workers or SCAN_WORKERS or API_CALLS_PER_SECOND)
+
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        return list(executor.map(lambda item: _fetch_one(item[0], item[1]), universe))
+
+
+def compute_metrics(rows):
+    """
+    조회 결과로 종목별 선별 지표를 계산합니다.
+
+    가격은 마이크로 단위 정수 배열로 모아서 열 단위로 한 번에 계산합니다.
+
+    Parameters:
+        rows (list): fetch_universe()에서 성공한 결과 목록
+
+    Returns:
+        list: 종목별 지표 (입력 순서와 같음)
+              [{
+                  "symbol", "exchange", "tradable", "last", "volume", "turnover",
+                  "gap_from_open": 시가 대비 현재가 변화율 (예: -0.02 = 2% 하락),
+                  "change": 전일 종가 대비 변화율,
+                  "day_range": 시가 대비 당일 변동폭 ((고가 - 저가) / 시가)
+              }]
+    """
+    last = array("q", [to_units(row["last"]) for row in rows])
+    open_ = array("q", [to_units(row["open"]) for row in rows])
+    high = array("q", [to_units(row["high"]) for row in rows])
+    low = array("q", [to_units(row["low"]) for row in rows])
+    base = array("q", [to_units(row["base"]) for row in rows])
+    turnover = array("q", [to_units(row["turnover"]) for row in rows])
+
+    gap_from_open = [(l - o) / o if o else 0.0 for l, o in zip(last, open_)]
+    change = [(l - b) / b if b else 0.0 for l, b in zip(last, base)]
+    day_range = [(h - lo) / o if o else 0.0 for h, lo, o in zip(high, low, open_)]
+
+    return [
+        {
+            "symbol": row["symbol"],
+            "exchange": row["exchange"],
+            "tradable": row["tradable"],
+            "last": from_units(last[index]),
+            "volume": row["volume"],
+            # 거래대금이 없으면 거래량 × 현재가로 계산합니다
+            "turnover": from_units(turnover[index]) or row["volume"] * from_units(last[index]),
+            "gap_from_open": gap_from_open[index],
+            "change": change[index],
+            "day_range": day_range[index]
+        }
+        for index, row in enumerate(rows)
+    ]
+
+
+def _percentile_ranks(values):
+    """값이 클수록 1에 가까운 순위 비율(0~1)을 돌려줍니다. (값이 같으면 같은 순위)"""
+    if len(values) <= 1:
+        return [1.0] * len(values)
+
+    order = sorted(range(len(values)), key=lambda index: values[index])
+    ranks = [0.0] * len(values)
+    position = 0
+    while position < len(order):
+        # 같은 값끼리는 처음 위치의 순위를 함께 씁니다
+        end = position
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[position]]:
+            end += 1
+        for index in order[position:end + 1]:
+            ranks[index] = position / (len(values) - 1)
+        position = end + 1
+    return ranks
+
+
+def rank_candidates(metrics, top_n=SCAN_TOP_N):
+    """
+    선별 지표로 종목 순위를 매깁니다.
+
+    주문할 수 없는 종목은 빼고, 다음 세 순위 비율의 평균을 점수로 씁니다.
+    - 거래대금이 클수록 (체결이 잘 되는 종목)
+    - 당일 변동폭이 클수록 (분할 매수/익절 기회가 많은 종목)
+    - 시가 대비 많이 내렸을수록 (평단을 낮추기 좋은 종목)
+
+    Returns:
+        list: 점수가 높은 순서로 top_n개 (각 지표에 "score", "rank" 추가)
+    """
+    candidates = [row for row in metrics if row["tradable"]]
+
+    turnover_ranks = _percentile_ranks([row["turnover"] for row in candidates])
+    range_ranks = _percentile_ranks([row["day_range"] for row in candidates])
+    dip_ranks = _percentile_ranks([-row["gap_from_open"] for row in candidates])
+
+    scored = []
+    for row, turnover_rank, range_rank, dip_rank in zip(candidates, turnover_ranks, range_ranks, dip_ranks):
+        scored.append(dict(row, score=(turnover_rank + range_rank + dip_rank) / 3))
+
+    # 점수가 같으면 거래대금이 큰 종목을 앞에 둡니다
+    scored.sort(key=lambda row: (-row["score"], -row["turnover"], row["symbol"]))
+
+    ranked = scored[:top_n]
+    for rank, row in enumerate(ranked, start=1):
+        row["rank"] = rank
+    return ranked
+
+
+def scan_universe(universe=None, top_n=SCAN_TOP_N, max_workers=None):
+    """
+    유니버스의 모든 종목을 조회하고 순위를 매깁니다.
+
+    Parameters:
+        universe (list): (종목 코드, 거래소 코드) 목록
+            None이면 SCAN_UNIVERSE 설정, 그것도 비어 있으면 LEVERAGED_ETFS
+        top_n (int): 순위표에 남길 종목 수
+        max_workers (int): 동시에 조회할 스레드 수
+
+    Returns:
+        dict: 스캔 결과
+            - ranked: rank_candidates()의 결과
+            - failed: [(종목 코드, 거래소 코드, 실패 사유), ...]
+            - scanned: 조회한 종목 수
+            - elapsed: 걸린 시간 (초)
+    """
+    if universe is None:
+        universe = parse_universe(SCAN_UNIVERSE) or LEVERAGED_ETFS
+
+    started_at = time.monotonic()
+
+    with span("scan.fetch", symbols=len(universe)):
+        rows = fetch_universe(universe, max_workers)
+
+    fetched = [row for row in rows if not row["error"]]
+    failed = [(row["symbol"], row["exchange"], row["error"]) for row in rows if row["error"]]
+
+    with span("scan.rank", symbols=len(fetched)):
+        ranked = rank_candidates(compute_metrics(fetched), top_n)
+
+    return {
+        "ranked": ranked,
+        "failed": failed,
+        "scanned": len(universe),
+        "elapsed": time.monotonic() - started_at
+    }
@@ -0,0 +1,224 @@
+# 실제 전략과 함께 다른 파라미터의 전략을 "그림자"로 돌려 보는 코드 (그림자 전략)
+#
+# 분할 수/익절률/큰수 상승률을 바꾸면 어떤 주문이 나갔을지 보려고
+# 무상태_무한매수법을 파라미터마다 다시 부르면, 그때마다 시세/잔고/체결내역 API를 다시 부르게 됩니다.
+# 이 파일은 실제 전략이 조회한 스냅샷(strategy.fetch_market_snapshot) 하나로
+# 여러 파라미터의 계획을 메모리 안에서만 세우므로, 그림자를 몇 개 더해도 API 호출은 늘지 않습니다.
+#
+# - 계획은 실행마다 SHADOW_PATH 파일(JSONL)에 스냅샷과 함께 한 줄로 남깁니다
+# - 장이 끝나고 분봉(minute_bars.py)을 받아 두면, simulate_shadows()로 계획별 체결/비용/손익을 흉내 냅니다
+import json
+import os
+import threading
+from datetime import datetime
+from config import SHADOW_PARAMS, SHADOW_PATH, SLIPPAGE_RATE
+from costs import fill_costs
+from fill_simulator import simulate_day
+from money import to_units, from_units
+from strategy import SNAPSHOT_FIELDS, plan_from_snapshot
+
+# 실제 전략 계획의 이름 (그림자와 함께 기록해 비교 기준으로 씁니다)
+LIVE_NAME = "live"
+
+# 여러 스레드가 동시에 파일에 쓰지 않도록 보호하는 잠금
+_lock = threading.Lock()
+
+
+def parse_shadow_params(text=SHADOW_PARAMS):
+    """
+    그림자 파라미터 문자열을 읽습니다.
+
+    Examples:
+        >>> parse_shadow_params("20/0.05/0.10")
+        [{'name': '20/0.05/0.10', 'splits': 20, 'take_profit_rate': 0.05, 'big_buy_range': 0.1}]
+
+    Returns:
+        list: [{"name", "splits", "take_profit_rate", "big_buy_range"}, ...] (비어 있으면 [])
+
+    Raises:
+        Exception: 형식이 틀린 경우
+    """
+    param_sets = []
+    for item in text.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split("/")
+        try:
+            splits, take_profit_rate, big_buy_range = int(parts[0]), float(parts[1]), float(parts[2])
+        except (IndexError, ValueError):
+            raise Exception(f"그림자 파라미터 형식이 틀렸습니다 (분할수/익절률/큰수상승률): {item}")
+        if len(parts) != 3 or splits <= 0:
+            raise Exception(f"그림자 파라미터 형식이 틀렸습니다 (분할수/익절률/큰수상승률): {item}")
+        param_sets.append({
+            "name": item,
+            "splits": splits,
+            "take_profit_rate": take_profit_rate,
+            "big_buy_range": big_buy_range
+        })
+    return param_sets
+
+
+def _plan_summary(orders):
+    """주문 목록의 매수/매도 수량과 매수 금액(시장가 제외)을 더합니다."""
+    buy_qty = sum(order["quantity"] for order in orders if order["side"] == "BUY")
+    sell_qty = sum(order["quantity"] for order in orders if order["side"] == "SELL")
+    buy_units = sum(order["quantity"] * to_units(order["price"] or 0) for order in orders if order["side"] == "BUY")
+    return {"buy_qty": buy_qty, "sell_qty": sell_qty, "buy_amount": from_units(buy_units)}
+
+
+def plan_shadows(snapshot, param_sets):
+    """
+    스냅샷 하나로 파라미터마다 주문 계획을 세웁니다. (API를 부르지 않습니다)
+
+    잔고 부족처럼 계획을 세울 수 없는 파라미터는 error에 이유를 남기고 넘어갑니다.
+
+    Parameters:
+        snapshot (dict): fetch_market_snapshot()의 결과 (또는 무상태_무한매수법의 결과)
+        param_sets (list): parse_shadow_params()의 결과
+
+    Returns:
+        list: 파라미터별 계획
+              [{"name", "splits", "take_profit_rate", "big_buy_range",
+                "unit_qty", "max_position", "orders", "buy_qty", "sell_qty", "buy_amount", "error"}]
+    """
+    shadows = []
+    for params in param_sets:
+        shadow = dict(params, unit_qty=0, max_position=0, orders=[], error="")
+        try:
+            plan = plan_from_snapshot(snapshot, params["splits"], params["take_profit_rate"], params["big_buy_range"])
+        except Exception as e:
+            shadow["error"] = str(e)
+        else:
+            shadow.update(unit_qty=plan["unit_qty"], max_position=plan["max_position"], orders=plan["orders"])
+        shadow.update(_plan_summary(shadow["orders"]))
+        shadows.append(shadow)
+    return shadows
+
+
+def live_shadow(strategy_result, splits, take_profit_rate, big_buy_range):
+    """
+    실제 전략 결과를 그림자 계획과 같은 형식으로 바꿉니다. (비교 기준)
+    """
+    shadow = {
+        "name": LIVE_NAME,
+        "splits": splits,
+        "take_profit_rate": take_profit_rate,
+        "big_buy_range": big_buy_range,
+        "unit_qty": strategy_result["unit_qty"],
+        "max_position": strategy_result["max_position"],
+        "orders": strategy_result["orders"],
+        "error": ""
+    }
+    shadow.update(_plan_summary(shadow["orders"]))
+    return shadow
+
+
+def save_shadows(snapshot, shadows, shadow_path=SHADOW_PATH):
+    """
+    스냅샷과 계획 목록을 파일 끝에 한 줄로 추가합니다.
+
+    Returns:
+        dict: 저장한 기록
+    """
+    record = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "snapshot": {field: snapshot[field] for field in SNAPSHOT_FIELDS},
+        "shadows": shadows
+    }
+
+    folder = os.path.dirname(shadow_path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    with _lock:
+        with open(shadow_path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    return record
+
+
+def read_shadows(trade_date=None, symbol=None, shadow_path=SHADOW_PATH):
+    """
+    저장된 그림자 기록을 읽습니다.
+
+    Parameters:
+        trade_date (str): 실행 날짜 "YYYY-MM-DD" (None이면 전체)
+        symbol (str): 종목 코드 (None이면 전체 종목)
+        shadow_path (str): 그림자 기록 파일 경로
+
+    Returns:
+        list: 기록 목록 (저장된 순서대로)
+    """
+    if not os.path.exists(shadow_path):
+        return []
+
+    records = []
+
+    with open(shadow_path, "r", encoding="utf-8") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # 쓰는 도중 끊긴 줄은 건너뜁니다
+                continue
+            if trade_date and not record["time"].startswith(trade_date):
+                continue
+            if symbol and record["snapshot"]["symbol"] != symbol:
+                continue
+            records.append(record)
+
+    return records
+
+
+def simulate_shadows(record, columns, submit_time=None, slippage_rate=SLIPPAGE_RATE):
+    """
+    기록 하나의 계획들을 그날 분봉으로 흉내 내어 체결과 결과를 계산합니다.
+
+    장 마감 종가로 남은 주식을 평가한 값과, 주문 전(주문 가능 금액 + 보유 주식)을 비교한
+    trade_pnl로 계획끼리 비교합니다. (보유 주식의 가격 변화는 모든 계획에 같으므로 빠집니다)
+
+    Parameters:
+        record (dict): save_shadows() / read_shadows()의 기록
+        columns (dict): 그날 분봉 열 (minute_bars.read_bar_columns)
+        submit_time (int): 주문을 낸 현지 시각 (HHMMSS, None이면 장 시작 전)
+        slippage_rate (float): 시뮬레이션 체결가에 더할 슬리피지
+
+    Returns:
+        list: 계획별 결과
+              [{"name", "filled", "bought", "sold", "position_qty", "cash", "total_cost", "trade_pnl", "error"}]
+    """
+    snapshot = record["snapshot"]
+    if not columns["time"]:
+        return []
+    close_units = columns["close"][-1]
+    position_qty = snapshot["position_qty"]
+    cash_units = to_units(snapshot["orderable_cash"])
+
+    outcomes = []
+    for shadow in record["shadows"]:
+        fills = simulate_day(columns, shadow["orders"], submit_time) if shadow["orders"] else []
+        costs = fill_costs(fills, snapshot["exchange"], price_field="fill_price", slippage_rate=slippage_rate)
+
+        bought = sum(fill["quantity"] for fill in fills if fill["filled"] and fill["side"] == "BUY")
+        sold = sum(fill["quantity"] for fill in fills if fill["filled"] and fill["side"] == "SELL")
+        position_after = position_qty + bought - sold
+        cash_after = cash_units + sum(costs["cash"])
+        trade_pnl = (cash_after + position_after * close_units) - (cash_units + position_qty * close_units)
+
+        outcomes.append({
+            "name": shadow["name"],
+            "filled": sum(1 for fill in fills if fill["filled"]),
+            "bought": bought,
+            "sold": sold,
+            "position_qty": position_after,
+            "cash": from_units(cash_after),
+            "total_cost": from_units(sum(costs["total_cost"])),
+            "trade_pnl": from_units(trade_pnl),
+            "error": shadow["error"]
+        })
+
+    return outcomes
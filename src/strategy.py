@@ -1,27 +1,37 @@
 # 매수/매도 여부를 판단하는 전략 로직
-import math
-from collections import Counter
+import copy
 from trader import (
     get_overseas_stock_price,
     get_overseas_stock_quotation,
     get_overseas_balance,
     get_overseas_purchase_amount,
-    get_overseas_order_history
+    get_overseas_order_history,
+    get_cached_asking_price
 )
+from config import REALTIME_MAX_AGE_SECONDS, ENTRY_PRICE_MODE
+from cycle_index import get_cycle_index, sync_order_history
+from instruments import get_exchange
+from money import to_units, from_units, apply_rate, share_count
+from tick import round_price, round_units, FLOOR
+from tracing import span
+from profiling import profiled
 
 
-def adjust_price_to_tick(price):
+def adjust_price_to_tick(price, tick_ladder="US"):
     """
-    미국 주식 거래소의 호가 단위 규칙에 맞춰 가격을 조정합니다.
+    거래소의 호가 단위 규칙에 맞춰 가격을 조정합니다.
     
-    호가 단위 규칙:
+    미국 호가 단위 규칙 (tick_ladder="US"):
     - 가격이 $1.00 미만: 소수점 4자리까지 ($0.0001 단위)
     - 가격이 $1.00 이상: 소수점 2자리까지 ($0.01 단위)
+    다른 거래소의 규칙은 instruments.TICK_LADDERS를 참고하세요.
     
     모든 가격은 버림(floor) 처리합니다.
+    float 오차로 한 호가 내려가지 않도록 정수(마이크로 단위)로 계산합니다. (tick.py)
     
     Parameters:
         price (float): 조정할 가격
+        tick_ladder (str): 호가 단위표 이름 ("US", "HK", "JP", "CN" 등)
     
     Returns:
         float: 호가 단위에 맞게 조정된 가격
@@ -33,167 +43,64 @@ def adjust_price_to_tick(price):
         56.37
         >>> adjust_price_to_tick(56.378)
         56.37
+        >>> adjust_price_to_tick(1.14)
+        1.14
     """
-    price = float(price)
-    
-    if price < 1.0:
-        # $1.00 미만: 소수점 4자리까지
-        return math.floor(price * 10000) / 10000
-    else:
-        # $1.00 이상: 소수점 2자리까지
-        return math.floor(price * 100) / 100
+    return round_price(price, tick_ladder, FLOOR)
 
 
-def 무상태_무한매수법(symbol, exchange_code, splits, take_profit_rate, big_buy_range):
+def plan_orders(position_qty, avg_price, open_price, last_price, unit_qty, splits, take_profit_rate, big_buy_range, entry_price=None,
+                tick_ladder="US"):
     """
-    무상태 무한매수법 전략을 실행합니다.
+    조회한 시장/보유 정보로 무상태 무한매수법의 주문 목록을 계산합니다.
     
-    이 전략은 주문을 실제로 실행하지 않고, DryRun 모드로 예상되는 주문 목록을 반환합니다.
-    
-    전략 규칙:
-    1. 포지션이 없을 때: 초기 진입 (2 * unit_qty) @ 현재가 (MOC)
-    2. 포지션이 있을 때:
-       - 익절 주문: 전체 수량 매도 @ 익절가 (LIMIT)
-       - 추가 매수 (분할 제한 확인 후):
-         * 평단 매수: unit_qty @ 평단가 (LOC)
-         * 큰수 매수: unit_qty @ 큰수기준가 (LOC)
+    API를 호출하지 않고 계산만 하므로, 같은 입력이면 항상 같은 결과가 나옵니다.
     
     Parameters:
-        symbol (str): 종목 코드 (예: "TQQQ")
-        exchange_code (str): 거래소 코드 (예: "NAS")
-        splits (int): 분할 수 (기본 40)
+        position_qty (int): 보유 수량
+        avg_price (float): 평단가 (포지션이 없으면 0)
+        open_price (float): 시가
+        last_price (float): 현재가
+        unit_qty (int): 단위 주문 수량
+        splits (int): 분할 수
         take_profit_rate (float): 익절 상승률 (예: 0.10 = 10%)
         big_buy_range (float): 큰수 상승률 (예: 0.10 = 10%)
+        entry_price (float): 초기 진입 주문 기준가 (None이면 현재가, get_entry_price() 참고)
+        tick_ladder (str): 호가 단위표 이름 (거래소별, instruments.TICK_LADDERS)
     
     Returns:
-        dict: DryRun 결과
-            - symbol: 종목 코드
-            - exchange: 거래소
-            - tradable: 거래 가능 여부
-            - open_price: 시가
-            - last_price: 현재가
-            - position_qty: 보유 수량
-            - avg_price: 평단가
-            - orderable_cash: 주문 가능 금액
-            - unit_qty: 단위 주문 수량
+        dict: 계산 결과
             - max_position: 최대 포지션
-            - take_profit_price: 익절가
+            - take_profit_price: 익절가 (포지션이 없으면 None)
             - big_buy_price: 큰수 기준가
             - orders: 예상 주문 목록
-                [{
-                    "side": "BUY" or "SELL",
-                    "quantity": 주문 수량,
-                    "price": 주문 단가 (LIMIT/LOC인 경우),
-                    "order_type": "LIMIT", "LOC", "MOC",
-                    "comment": 주문 설명
-                }]
-    
-    Raises:
-        Exception: 잔고 부족 또는 API 호출 실패 시
     """
     
-    # ========================================
-    # 1. 시장 정보 조회
-    # ========================================
-    
-    # 거래 가능 여부 확인
-    quotation = get_overseas_stock_quotation(symbol, exchange_code)
-    tradable = quotation.get("ordy", "N") == "Y"
-    
-    # 시가 / 현재가 조회
-    price_detail = get_overseas_stock_price(symbol, exchange_code)
-    open_price = float(price_detail.get("open", "0"))
-    last_price = float(price_detail.get("last", "0"))
-    
-    # ========================================
-    # 2. 보유 정보 조회
-    # ========================================
-    
-    balance = get_overseas_balance(symbol, exchange_code)
-    
-    if balance:
-        position_qty = int(balance.get("quantity", "0"))
-        avg_price = float(balance.get("avg_price", "0"))
-    else:
-        position_qty = 0
-        avg_price = 0.0
-    
-    # ========================================
-    # 3. 주문가능금액 조회
-    # ========================================
-    
-    psamount = get_overseas_purchase_amount(symbol, exchange_code)
-    orderable_cash = float(psamount.get("ord_psbl_frcr_amt", "0"))
+    # 공통 계산 (가격은 마이크로 단위 정수로 계산합니다, money.py)
     
-    # ========================================
-    # 4. unit_qty 결정
-    # ========================================
-    
-    unit_qty = 0
-    
-    if position_qty > 0:
-        # 최근 체결내역 조회
-        order_history = get_overseas_order_history(symbol, exchange_code, days=30)
-        
-        # 매도 이후 매수 내역 중 최빈값 찾기
-        sell_found = False
-        buy_quantities = []
-        
-        for order in order_history:
-            side = order.get("sll_buy_dvsn_cd_name", "")
-            qty = int(order.get("ft_ccld_qty", "0"))
-            
-            if "매도" in side or "SELL" in side.upper():
-                sell_found = True
-            elif sell_found and ("매수" in side or "BUY" in side.upper()):
-                buy_quantities.append(qty)
-        
-        if buy_quantities:
-            # 최빈값을 unit_qty로 설정
-            counter = Counter(buy_quantities)
-            unit_qty = counter.most_common(1)[0][0]
-        else:
-            # 매도 이후 매수가 없다면, 기본 계산식 사용
-            base_cash = orderable_cash / (splits * 2)
-            unit_qty = math.floor(base_cash / last_price)
-    else:
-        # 포지션 없음: 기본 계산식 사용
-        base_cash = orderable_cash / (splits * 2)
-        unit_qty = math.floor(base_cash / last_price)
-    
-    # unit_qty가 0이면 잔고 부족 에러
-    if unit_qty == 0:
-        raise Exception(
-            f"잔고 부족: 주문 가능 금액이 부족합니다. "
-            f"현재 잔고: ${orderable_cash:.2f}"
-        )
-    
-    # ========================================
-    # 5. 공통 계산
-    # ========================================
+    open_units = to_units(open_price)
+    avg_units = to_units(avg_price)
     
     max_position = unit_qty * splits
-    big_buy_price = adjust_price_to_tick(open_price * (1 + big_buy_range))
+    big_buy_price = from_units(round_units(apply_rate(open_units, big_buy_range), tick_ladder, FLOOR))
     
     take_profit_price = None
-    if avg_price > 0:
-        take_profit_price = adjust_price_to_tick(avg_price * (1 + take_profit_rate))
+    if avg_units > 0:
+        take_profit_price = from_units(round_units(apply_rate(avg_units, take_profit_rate), tick_ladder, FLOOR))
     
-    # ========================================
-    # 6. 예상 주문 생성
-    # ========================================
+    # 예상 주문 생성
     
     orders = []
     
     if position_qty == 0:
         # 포지션 없음: 초기 진입 (현재가 LIMIT 주문)
         initial_qty = 2 * unit_qty
-        initial_price = adjust_price_to_tick(last_price)
+        initial_price = adjust_price_to_tick(entry_price or last_price, tick_ladder)
         
         orders.append({
             "side": "BUY",
             "quantity": initial_qty,
-            "price": initial_price,  # 현재가로 LIMIT 주문
+            "price": initial_price,  # 현재가(또는 호가)로 LIMIT 주문
             "order_type": "LIMIT",
             "comment": "초기 진입"
         })
@@ -211,7 +118,7 @@ def 무상태_무한매수법(symbol, exchange_code, splits, take_profit_rate, b
         # 추가 매수 (분할 제한 체크)
         if position_qty < max_position:
             # 평단 매수
-            avg_price_adjusted = adjust_price_to_tick(avg_price)
+            avg_price_adjusted = from_units(round_units(avg_units, tick_ladder, FLOOR))
             orders.append({
                 "side": "BUY",
                 "quantity": unit_qty,
@@ -229,22 +136,351 @@ def 무상태_무한매수법(symbol, exchange_code, splits, take_profit_rate, b
                 "comment": "큰수 매수"
             })
     
+    return {
+        "max_position": max_position,
+        "take_profit_price": take_profit_price,
+        "big_buy_price": big_buy_price,
+        "orders": orders
+    }
+
+
+def plan_inputs_key(position_qty, avg_price, open_price, last_price, unit_qty, splits, take_profit_rate, big_buy_range, entry_price=None,
+                    tick_ladder="US"):
+    """
+    주문 목록에 실제로 영향을 주는 값만 남긴 계획 입력 키를 만듭니다.
+    
+    현재가(또는 entry_price)는 포지션이 없을 때(초기 진입)만 주문 가격에 쓰이고,
+    그때도 호가 단위로 버림한 값만 의미가 있습니다.
+    그래서 현재가가 조금씩 움직여도 주문이 바뀌지 않으면 키도 바뀌지 않습니다.
+    
+    Returns:
+        tuple: 계획 입력 키 (같은 키면 항상 같은 주문 목록)
+    """
+    initial_price = adjust_price_to_tick(entry_price or last_price, tick_ladder) if position_qty == 0 else None
+    return (position_qty, avg_price, open_price, initial_price, unit_qty, splits, take_profit_rate, big_buy_range, tick_ladder)
+
+
+# 계획 입력 키 -> plan_orders() 결과 (plan_orders_memoized에서 사용)
+_plan_cache = {}
+_PLAN_CACHE_SIZE = 256
+
+
+def plan_orders_memoized(position_qty, avg_price, open_price, last_price, unit_qty, splits, take_profit_rate, big_buy_range, entry_price=None,
+                         tick_ladder="US"):
+    """
+    plan_orders()와 같지만, 계획 입력 키가 같으면 다시 계산하지 않습니다.
+    
+    장 마감 전 몇 초마다 계획을 다시 세울 때, 입력 키를 비교하면
+    주문이 바뀌었는지 바로 알 수 있습니다.
+    캐시된 결과를 호출한 쪽에서 고쳐도 캐시가 바뀌지 않도록 복사본을 돌려줍니다.
+    
+    Returns:
+        tuple: (계획 입력 키, plan_orders() 결과)
+    """
+    key = plan_inputs_key(position_qty, avg_price, open_price, last_price, unit_qty, splits, take_profit_rate, big_buy_range, entry_price,
+                          tick_ladder)
+    
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = plan_orders(
+            position_qty=position_qty,
+            avg_price=avg_price,
+            open_price=open_price,
+            last_price=last_price,
+            unit_qty=unit_qty,
+            splits=splits,
+            take_profit_rate=take_profit_rate,
+            big_buy_range=big_buy_range,
+            entry_price=entry_price,
+            tick_ladder=tick_ladder
+        )
+        # 하루에 쓰는 키는 몇 개 되지 않으므로, 가득 차면 그냥 비웁니다
+        if len(_plan_cache) >= _PLAN_CACHE_SIZE:
+            _plan_cache.clear()
+        _plan_cache[key] = plan
+    
+    return key, copy.deepcopy(plan)
+
+
+def get_open_and_last(symbol, exchange_code, price_book=None):
+    """
+    시가와 현재가를 조회합니다.
+    
+    실시간 가격표에 최근 REALTIME_MAX_AGE_SECONDS초 안에 받은 값이 있으면
+    API를 부르지 않고 가격표의 값을 사용합니다.
+    
+    Returns:
+        tuple: (시가, 현재가)
+    """
+    tick = price_book.get(symbol, max_age_seconds=REALTIME_MAX_AGE_SECONDS, group="trade") if price_book else None
+    if tick and tick.open and tick.last:
+        return tick.open, tick.last
+    
+    with span("fetch.price_detail", symbol=symbol):
+        price_detail = get_overseas_stock_price(symbol, exchange_code)
+    return float(price_detail.get("open", "0")), float(price_detail.get("last", "0"))
+
+
+def get_entry_price(symbol, exchange_code, mode, last_price, price_book=None):
+    """
+    초기 진입(LIMIT) 주문의 기준가를 정합니다.
+    
+    - last: 현재가 (API를 부르지 않습니다)
+    - bid / ask / mid: 매수호가 / 매도호가 / 둘의 가운데
+      실시간 가격표에 최신 호가가 있으면 그 값을, 없으면 호가 조회(캐시) 결과를 사용합니다.
+      호가가 비어 있으면 현재가를 사용합니다.
+    
+    Parameters:
+        symbol (str): 종목 코드
+        exchange_code (str): 거래소 코드
+        mode (str): "last", "bid", "ask", "mid" 중 하나
+        last_price (float): 현재가
+        price_book (PriceBook): 실시간 가격표 (realtime.PriceBook)
+    
+    Returns:
+        float: 초기 진입 기준가
+    """
+    if mode == "last":
+        return last_price
+    if mode not in ("bid", "ask", "mid"):
+        raise Exception(f"지원하지 않는 초기 진입 가격 기준입니다: {mode}")
+    
+    tick = price_book.get(symbol, max_age_seconds=REALTIME_MAX_AGE_SECONDS, group="quote") if price_book else None
+    if tick and tick.bid and tick.ask:
+        quote = {"bid": tick.bid, "ask": tick.ask, "mid": (tick.bid + tick.ask) / 2}
+    else:
+        with span("fetch.asking_price", symbol=symbol):
+            quote = get_cached_asking_price(symbol, exchange_code)
+    
+    return quote[mode] or last_price
+
+
+# 스냅샷(fetch_market_snapshot)의 필드: 전략 파라미터와 관계없이 조회로만 정해지는 값
+SNAPSHOT_FIELDS = (
+    "symbol", "exchange", "tradable", "open_price", "last_price", "entry_price",
+    "position_qty", "avg_price", "orderable_cash", "cycle_unit_qty"
+)
+
+
+def fetch_market_snapshot(symbol, exchange_code, price_book=None, entry_price_mode=ENTRY_PRICE_MODE):
+    """
+    전략에 필요한 시세/잔고/주문가능금액/체결내역을 한 번에 조회합니다.
+    
+    분할 수, 익절률, 큰수 상승률과 관계없는 값만 모으므로,
+    같은 스냅샷으로 파라미터가 다른 계획을 API 호출 없이 여러 번 세울 수 있습니다. (plan_from_snapshot)
+    
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 거래소 코드 (예: "NAS")
+        price_book (PriceBook): 실시간 가격표 (realtime.PriceBook)
+        entry_price_mode (str): 초기 진입 주문 가격 기준 ("last", "bid", "ask", "mid")
+    
+    Returns:
+        dict: 스냅샷 (SNAPSHOT_FIELDS)
+            - cycle_unit_qty: 마지막 매도 이후 가장 많이 쓴 매수 수량 (포지션이 없거나 매수가 없으면 None)
+            - entry_price: 초기 진입 기준가 (포지션이 있으면 None)
+    
+    Raises:
+        Exception: API 호출 실패 시
+    """
+    
     # ========================================
-    # 7. 결과 반환
+    # 1. 시장 정보 조회
+    # ========================================
+    
+    # 거래 가능 여부 확인
+    with span("fetch.quotation", symbol=symbol):
+        quotation = get_overseas_stock_quotation(symbol, exchange_code)
+    tradable = quotation.get("ordy", "N") == "Y"
+    
+    # 시가 / 현재가 조회 (실시간 가격표에 최신 값이 있으면 API를 부르지 않습니다)
+    open_price, last_price = get_open_and_last(symbol, exchange_code, price_book)
+    
+    # ========================================
+    # 2. 보유 정보 조회
+    # ========================================
+    
+    with span("fetch.balance", symbol=symbol):
+        balance = get_overseas_balance(symbol, exchange_code)
+    
+    # 가격/금액 문자열은 여기서 한 번만 마이크로 단위 정수로 바꿉니다 (money.py)
+    if balance:
+        position_qty = int(balance.get("quantity", "0"))
+        avg_units = to_units(balance.get("avg_price", "0"))
+    else:
+        position_qty = 0
+        avg_units = 0
+    
+    # ========================================
+    # 3. 주문가능금액 조회
     # ========================================
     
+    with span("fetch.purchase_amount", symbol=symbol):
+        psamount = get_overseas_purchase_amount(symbol, exchange_code)
+    cash_units = to_units(psamount.get("ord_psbl_frcr_amt", "0"))
+    
+    # ========================================
+    # 4. 마지막 매도 이후 매수 수량 (포지션이 있을 때만)
+    # ========================================
+    
+    cycle_unit_qty = None
+    entry_price = None
+    
+    if position_qty > 0:
+        # 최근 체결내역 조회
+        with span("fetch.order_history", symbol=symbol):
+            order_history = get_overseas_order_history(symbol, exchange_code, days=30)
+        
+        # 새 체결만 사이클 색인에 넣고, 마지막 매도 이후 매수 수량의 최빈값을 씁니다
+        # (색인은 매도 시각으로 사이클을 나눠 두므로 체결 기록을 처음부터 훑지 않습니다)
+        sync_order_history(symbol, order_history)
+        cycle_unit_qty = get_cycle_index(symbol).unit_quantity()
+    else:
+        # 포지션이 없을 때만 초기 진입 기준가(호가)가 필요합니다
+        entry_price = get_entry_price(symbol, exchange_code, entry_price_mode, last_price, price_book)
+    
     return {
         "symbol": symbol,
         "exchange": exchange_code,
         "tradable": tradable,
         "open_price": open_price,
         "last_price": last_price,
+        "entry_price": entry_price,
         "position_qty": position_qty,
-        "avg_price": avg_price,
-        "orderable_cash": orderable_cash,
-        "unit_qty": unit_qty,
-        "max_position": max_position,
-        "take_profit_price": take_profit_price,
-        "big_buy_price": big_buy_price,
-        "orders": orders
+        "avg_price": from_units(avg_units),
+        "orderable_cash": from_units(cash_units),
+        "cycle_unit_qty": cycle_unit_qty
     }
+
+
+def plan_from_snapshot(snapshot, splits, take_profit_rate, big_buy_range):
+    """
+    조회해 둔 스냅샷으로 주문 계획을 세웁니다. (API를 부르지 않습니다)
+    
+    Parameters:
+        snapshot (dict): fetch_market_snapshot()의 결과 (또는 그 필드를 가진 전략 결과)
+        splits (int): 분할 수
+        take_profit_rate (float): 익절 상승률
+        big_buy_range (float): 큰수 상승률
+    
+    Returns:
+        dict: 무상태_무한매수법()과 같은 형식
+    
+    Raises:
+        Exception: 잔고 부족 (1회 매수 수량이 0주)
+    """
+    
+    # ========================================
+    # 5. unit_qty 결정
+    # ========================================
+    
+    cash_units = to_units(snapshot["orderable_cash"])
+    
+    if snapshot["cycle_unit_qty"]:
+        unit_qty = snapshot["cycle_unit_qty"]
+    else:
+        # 포지션이 없거나 매도 이후 매수가 없다면, 기본 계산식 사용
+        # (주문 가능 금액 / (분할 수 * 2) / 현재가, 버림)
+        unit_qty = share_count(cash_units, to_units(snapshot["last_price"]), splits * 2)
+    
+    # unit_qty가 0이면 잔고 부족 에러
+    if unit_qty == 0:
+        raise Exception(
+            f"잔고 부족: 주문 가능 금액이 부족합니다. "
+            f"현재 잔고: ${snapshot['orderable_cash']:.2f}"
+        )
+    
+    # ========================================
+    # 6. 공통 계산 및 예상 주문 생성
+    # ========================================
+    
+    with span("planning", symbol=snapshot["symbol"]):
+        plan_key, plan = plan_orders_memoized(
+            position_qty=snapshot["position_qty"],
+            avg_price=snapshot["avg_price"],
+            open_price=snapshot["open_price"],
+            last_price=snapshot["last_price"],
+            unit_qty=unit_qty,
+            splits=splits,
+            take_profit_rate=take_profit_rate,
+            big_buy_range=big_buy_range,
+            entry_price=snapshot["entry_price"],
+            tick_ladder=get_exchange(snapshot["exchange"])["tick_ladder"]
+        )
+    
+    # ========================================
+    # 7. 결과 반환
+    # ========================================
+    
+    result = {field: snapshot[field] for field in SNAPSHOT_FIELDS}
+    result.update({
+        "unit_qty": unit_qty,
+        "max_position": plan["max_position"],
+        "take_profit_price": plan["take_profit_price"],
+        "big_buy_price": plan["big_buy_price"],
+        "plan_key": plan_key,
+        "orders": plan["orders"]
+    })
+    return result
+
+
+@profiled("strategy")
+def 무상태_무한매수법(symbol, exchange_code, splits, take_profit_rate, big_buy_range, price_book=None,
+                 entry_price_mode=ENTRY_PRICE_MODE):
+    """
+    무상태 무한매수법 전략을 실행합니다.
+    
+    이 전략은 주문을 실제로 실행하지 않고, DryRun 모드로 예상되는 주문 목록을 반환합니다.
+    조회(fetch_market_snapshot)와 계획(plan_from_snapshot)을 차례로 부릅니다.
+    
+    전략 규칙:
+    1. 포지션이 없을 때: 초기 진입 (2 * unit_qty) @ 현재가 또는 호가 (entry_price_mode)
+    2. 포지션이 있을 때:
+       - 익절 주문: 전체 수량 매도 @ 익절가 (LIMIT)
+       - 추가 매수 (분할 제한 확인 후):
+         * 평단 매수: unit_qty @ 평단가 (LOC)
+         * 큰수 매수: unit_qty @ 큰수기준가 (LOC)
+    
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 거래소 코드 (예: "NAS")
+        splits (int): 분할 수 (기본 40)
+        take_profit_rate (float): 익절 상승률 (예: 0.10 = 10%)
+        big_buy_range (float): 큰수 상승률 (예: 0.10 = 10%)
+        price_book (PriceBook): 실시간 가격표 (realtime.PriceBook)
+            최근 REALTIME_MAX_AGE_SECONDS초 안에 받은 시가/현재가가 있으면
+            현재가 조회 API를 부르지 않고 가격표의 값을 사용합니다
+        entry_price_mode (str): 초기 진입 주문 가격 기준 ("last", "bid", "ask", "mid")
+    
+    Returns:
+        dict: DryRun 결과
+            - symbol: 종목 코드
+            - exchange: 거래소
+            - tradable: 거래 가능 여부
+            - open_price: 시가
+            - last_price: 현재가
+            - entry_price: 초기 진입 기준가 (포지션이 있으면 None)
+            - position_qty: 보유 수량
+            - avg_price: 평단가
+            - orderable_cash: 주문 가능 금액
+            - unit_qty: 단위 주문 수량
+            - max_position: 최대 포지션
+            - take_profit_price: 익절가
+            - big_buy_price: 큰수 기준가
+            - cycle_unit_qty: 마지막 매도 이후 가장 많이 쓴 매수 수량 (없으면 None)
+            - plan_key: 계획 입력 키 (plan_inputs_key)
+            - orders: 예상 주문 목록
+                [{
+                    "side": "BUY" or "SELL",
+                    "quantity": 주문 수량,
+                    "price": 주문 단가 (LIMIT/LOC인 경우),
+                    "order_type": "LIMIT", "LOC", "MOC",
+                    "comment": 주문 설명
+                }]
+    
+    Raises:
+        Exception: 잔고 부족 또는 API 호출 실패 시
+    """
+    
+    snapshot = fetch_market_snapshot(symbol, exchange_code, price_book, entry_price_mode)
+    return plan_from_snapshot(snapshot, splits, take_profit_rate, big_buy_range)
@@ -3,6 +3,11 @@
 
 이 파일은 텔레그램 봇을 통해 사용자에게 
 알림 메시지를 보내는 역할을 합니다.
+
+send_telegram()은 전송이 끝날 때까지 기다립니다.
+주문 도중에는 notifier.notify()를 사용해야
+텔레그램 서버가 느려도 다음 주문이 늦어지지 않습니다.
+(notifier가 알림을 모아서 이 모듈의 함수로 보냅니다)
 """
 
 import os
@@ -12,6 +17,12 @@ from dotenv import load_dotenv
 # .env 파일에서 환경변수 읽기
 load_dotenv()
 
+# 텔레그램 메시지 1개의 최대 길이
+MAX_MESSAGE_LENGTH = 4096
+
+# 같은 채팅방에는 1초에 1개 정도만 보내는 것이 안전합니다
+MIN_SEND_INTERVAL = 1.0
+
 
 def send_telegram(message: str) -> bool:
     """
@@ -60,3 +71,47 @@ def send_telegram(message: str) -> bool:
     except Exception as e:
         print(f"❌ 텔레그램 메시지 전송 중 오류 발생: {e}")
         return False
+
+
+def build_digest(messages):
+    """
+    여러 메시지를 하나의 요약 메시지로 묶습니다.
+    
+    Parameters:
+        messages (list): 메시지 목록
+    
+    Returns:
+        str: 묶인 메시지 (1개면 그대로 반환)
+    """
+    if len(messages) == 1:
+        return messages[0]
+    
+    separator = "\n\n──────────\n\n"
+    return f"📬 알림 {len(messages)}건\n\n" + separator.join(messages)
+
+
+def split_message(message):
+    """
+    텔레그램 길이 제한(4096자)을 넘는 메시지를 여러 개로 나눕니다.
+    
+    가능하면 줄바꿈 위치에서 나누어 읽기 편하게 합니다.
+    
+    Parameters:
+        message (str): 나눌 메시지
+    
+    Returns:
+        list: 길이 제한 안쪽의 메시지 목록
+    """
+    parts = []
+    
+    while len(message) > MAX_MESSAGE_LENGTH:
+        cut_position = message.rfind("\n", 0, MAX_MESSAGE_LENGTH)
+        if cut_position <= 0:
+            cut_position = MAX_MESSAGE_LENGTH
+        parts.append(message[:cut_position])
+        message = message[cut_position:].lstrip("\n")
+    
+    if message:
+        parts.append(message)
+    
+    return parts
@@ -0,0 +1,136 @@
+# 가격을 거래소 호가 단위에 맞추는 코드 (정수 고정소수점)
+#
+# float로 math.floor(price * 100) / 100 을 계산하면 이진 소수 오차 때문에
+# 1.14 → 1.13 처럼 한 호가 내려가는 가격이 생깁니다.
+# 이 파일은 가격을 백만분의 1 단위 정수(마이크로 단위, 예: $56.37 → 56370000, money.py)로 바꿔
+# 정수 나눗셈만으로 호가 단위를 맞추므로 오차가 없습니다.
+# 가격 목록(list, array 등)을 한 번에 처리하는 함수도 있어서
+# 백테스트처럼 수백만 개의 가격도 한 번의 호출로 맞출 수 있습니다.
+from array import array
+from bisect import bisect_right
+from instruments import TICK_LADDERS
+from money import PRICE_SCALE, to_units, to_units_array
+
+# 반올림 방식
+FLOOR = "floor"      # 버림 (매수 주문 가격 등)
+CEIL = "ceil"        # 올림
+NEAREST = "nearest"  # 가장 가까운 호가 (정확히 가운데면 올림)
+
+
+def _build_ladder_units(ladder):
+    """호가 단위표를 (구간 시작 가격 목록, 호가 단위 목록) 마이크로 단위 정수로 바꿉니다."""
+    bounds = [to_units(str(lower)) for lower, tick in ladder]
+    ticks = [to_units(str(tick)) for lower, tick in ladder]
+    return bounds, ticks
+
+
+# 호가 단위표 이름 -> (구간 시작 가격 목록, 호가 단위 목록) (마이크로 단위)
+LADDER_UNITS = {name: _build_ladder_units(ladder) for name, ladder in TICK_LADDERS.items()}
+
+
+def tick_units(units, tick_ladder="US"):
+    """
+    마이크로 단위 가격에 맞는 호가 단위(마이크로 단위)를 돌려줍니다.
+    """
+    bounds, ticks = LADDER_UNITS[tick_ladder]
+    return ticks[max(bisect_right(bounds, units) - 1, 0)]
+
+
+def round_units(units, tick_ladder="US", mode=FLOOR):
+    """
+    마이크로 단위 가격 하나를 호가 단위에 맞춥니다.
+
+    Parameters:
+        units (int): 마이크로 단위 가격
+        tick_ladder (str): 호가 단위표 이름 ("US", "HK", "JP", "CN" 등)
+        mode (str): FLOOR(버림), CEIL(올림), NEAREST(가장 가까운 호가)
+
+    Returns:
+        int: 호가 단위에 맞춘 마이크로 단위 가격
+    """
+    tick = tick_units(units, tick_ladder)
+    remainder = units % tick
+
+    if remainder == 0:
+        return units
+    if mode == FLOOR:
+        return units - remainder
+    if mode == CEIL:
+        # 올린 가격이 다음 구간으로 넘어가도 그 가격은 다음 구간의 호가 단위에도 맞습니다
+        return units - remainder + tick
+    if mode == NEAREST:
+        if remainder * 2 >= tick:
+            return units - remainder + tick
+        return units - remainder
+    raise Exception(f"지원하지 않는 반올림 방식입니다: {mode}")
+
+
+def round_units_array(units_list, tick_ladder="US", mode=FLOOR):
+    """
+    마이크로 단위 가격 목록을 한 번에 호가 단위에 맞춥니다.
+
+    호가 단위가 하나뿐인 표(CN 등)는 구간을 찾지 않고,
+    여러 개인 표는 구간 경계를 이진 탐색으로 찾습니다.
+
+    Parameters:
+        units_list (iterable): 마이크로 단위 가격 목록 (list, array('q') 등)
+        tick_ladder (str): 호가 단위표 이름
+        mode (str): FLOOR, CEIL, NEAREST
+
+    Returns:
+        array: 호가 단위에 맞춘 가격 목록 (array('q'), 마이크로 단위)
+    """
+    if mode not in (FLOOR, CEIL, NEAREST):
+        raise Exception(f"지원하지 않는 반올림 방식입니다: {mode}")
+
+    bounds, ticks = LADDER_UNITS[tick_ladder]
+
+    if len(ticks) == 1:
+        tick = ticks[0]
+        if mode == FLOOR:
+            return array("q", [units - units % tick for units in units_list])
+        if mode == CEIL:
+            return array("q", [units + (-units) % tick for units in units_list])
+        half = tick // 2
+        return array("q", [(units + half) - (units + half) % tick for units in units_list])
+
+    # 반복문 안에서 전역 이름을 찾지 않도록 지역 변수로 가져옵니다
+    search = bisect_right
+    rounded = array("q")
+    append = rounded.append
+
+    for units in units_list:
+        index = search(bounds, units) - 1
+        tick = ticks[index if index >= 0 else 0]
+        remainder = units % tick
+        if remainder and (mode == CEIL or (mode == NEAREST and remainder * 2 >= tick)):
+            append(units - remainder + tick)
+        else:
+            append(units - remainder)
+
+    return rounded
+
+
+def round_prices(prices, tick_ladder="US", mode=FLOOR):
+    """
+    가격 목록(float 또는 문자열)을 호가 단위에 맞춘 float 목록으로 돌려줍니다.
+
+    Examples:
+        >>> round_prices([56.378, 1.14, 0.98769])
+        [56.37, 1.14, 0.9876]
+    """
+    units_list = to_units_array(prices)
+    return [units / PRICE_SCALE for units in round_units_array(units_list, tick_ladder, mode)]
+
+
+def round_price(price, tick_ladder="US", mode=FLOOR):
+    """
+    가격 하나를 호가 단위에 맞춘 float로 돌려줍니다.
+
+    Examples:
+        >>> round_price(56.375)
+        56.37
+        >>> round_price(15.33, "HK")
+        15.32
+    """
+    return round_units(to_units(price), tick_ladder, mode) / PRICE_SCALE
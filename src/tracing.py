@@ -0,0 +1,122 @@
+# 실행 단계별 걸린 시간을 기록하는 코드 (트레이스)
+#
+# 프로그램의 각 단계(설정 읽기, 토큰 발급, 시세 조회, 주문, 알림 전송 등)를
+# span("이름")으로 감싸면 시작 시각과 걸린 시간이 기록됩니다.
+# 실행이 끝나고 export_trace()로 저장한 파일을
+# 크롬의 chrome://tracing 이나 https://ui.perfetto.dev 에서 열면
+# 어느 단계에서 시간이 얼마나 걸렸는지, 동시에 실행된 작업이 무엇인지 그림으로 볼 수 있습니다.
+#
+# TRACE_ENABLED=0 으로 설정하면 기록하지 않습니다.
+# 오래 도는 실행(intraday 등)에서 메모리가 계속 늘지 않도록 최근 TRACE_MAX_EVENTS개 구간만 남깁니다.
+# (설정 파일을 읽는 단계도 기록하기 위해 config 대신 환경변수를 직접 읽습니다)
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_ENABLED = (os.getenv("TRACE_ENABLED") or "1") == "1"
+TRACE_MAX_EVENTS = int(os.getenv("TRACE_MAX_EVENTS") or "20000")
+
+# 기록된 span 목록 (Chrome trace 이벤트 형식, 가득 차면 가장 오래된 구간부터 버립니다)
+_events = deque(maxlen=TRACE_MAX_EVENTS)
+
+# 스레드 번호별 스레드 이름 (그림에서 줄 이름으로 표시됩니다)
+_thread_names = {}
+
+# 여러 스레드가 동시에 기록하지 않도록 보호하는 잠금
+_lock = threading.Lock()
+
+# 모든 시각은 이 시점을 0으로 하는 마이크로초 단위로 기록합니다
+_started_at_ns = time.perf_counter_ns()
+
+
+@contextmanager
+def span(name, category="run", **args):
+    """
+    with 블록이 실행되는 동안을 하나의 구간(span)으로 기록합니다.
+
+    span 안에서 다시 span을 열면, 그림에서 안쪽 구간으로 겹쳐 표시됩니다.
+
+    Parameters:
+        name (str): 구간 이름 (예: "strategy", "order")
+        category (str): 구간 분류 (예: "run", "kis", "notify")
+        **args: 구간과 함께 표시할 정보 (예: symbol="TQQQ")
+
+    Examples:
+        with span("strategy", symbol="TQQQ"):
+            result = 무상태_무한매수법(...)
+    """
+    if not TRACE_ENABLED:
+        yield
+        return
+
+    start_ns = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        end_ns = time.perf_counter_ns()
+        thread = threading.current_thread()
+
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",  # 시작 시각과 길이가 있는 완료된 구간
+            "ts": (start_ns - _started_at_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args
+        }
+
+        with _lock:
+            _events.append(event)
+            _thread_names[thread.ident] = thread.name
+
+
+def export_trace(path):
+    """
+    기록된 구간을 Chrome/Perfetto에서 열 수 있는 JSON 파일로 저장합니다.
+
+    Parameters:
+        path (str): 저장할 파일 경로 (예: "logs/trace.json")
+
+    Returns:
+        int: 저장한 구간 수
+    """
+    if not TRACE_ENABLED:
+        return 0
+
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+
+    with _lock:
+        events = list(_events)
+        thread_names = dict(_thread_names)
+
+    # 스레드 이름 정보(metadata)를 앞에 붙입니다
+    metadata_events = []
+    for thread_id, thread_name in thread_names.items():
+        metadata_events.append({
+            "name": "thread_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "tid": thread_id,
+            "args": {"name": thread_name}
+        })
+
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"traceEvents": metadata_events + events, "displayTimeUnit": "ms"}, file, ensure_ascii=False)
+
+    return len(events)
+
+
+def reset_trace():
+    """
+    지금까지 기록한 구간을 모두 지웁니다. (벤치마크나 테스트에서 사용)
+    """
+    with _lock:
+        _events.clear()
+        _thread_names.clear()
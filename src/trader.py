@@ -1,7 +1,104 @@
 # 실제 주문을 실행하는 코드
+import re
+import time
 import requests
 from authentication import get_access_token
-from config import KIS_APP_KEY, KIS_APP_SECRET, KIS_DOMAIN
+from config import KIS_APP_KEY, KIS_APP_SECRET, KIS_DOMAIN, ORDER_BOOK_CACHE_SECONDS
+from instruments import get_exchange
+from metrics import record_api_call
+from money import format_price
+from rate_limiter import wait_for_api_slot
+from tracing import span
+
+# 응답에서 성공/실패 코드와 메시지 코드를 찾는 정규식 (호출 기록용)
+_RT_CD_PATTERN = re.compile(r'"rt_cd"\s*:\s*"([^"]*)"')
+_MSG_CD_PATTERN = re.compile(r'"msg_cd"\s*:\s*"([^"]*)"')
+
+# 주문 유형 -> 주문구분 코드 (ORD_DVSN)
+ORDER_TYPE_CODES = {
+    "LIMIT": "00",  # 지정가
+    "LOC": "34",    # 장마감지정가
+    "LOO": "32",    # 장개시지정가
+    "MOO": "31",    # 장개시시장가
+    "MOC": "33"     # 장마감시장가
+}
+
+# 호가 조회 결과 캐시: (종목 코드, 거래소 코드) -> (조회 시각, 호가 정보)
+_asking_price_cache = {}
+
+
+class OrderRejectedError(Exception):
+    """
+    증권사가 주문 요청에 응답하면서 거부한 경우 (rt_cd가 "0"이 아님)
+
+    접수되지 않은 것이 확실하므로, 응답을 받지 못한 경우(TimeoutError)와 구분합니다.
+    """
+
+
+def _send_kis_request(method, url, headers, params=None, body=None, timeout=None, retries=0):
+    """
+    한국투자증권 API에 HTTP 요청을 보냅니다.
+    
+    모든 API 호출이 이 함수를 거치도록 하여,
+    초당 호출 한도(rate limit)를 한 곳에서 지키고
+    호출 시간과 결과를 거래 ID(tr_id)별로 기록(metrics)할 수 있게 합니다.
+    
+    Parameters:
+        method (str): "GET" 또는 "POST"
+        url (str): 호출할 API 주소
+        headers (dict): 요청 헤더
+        params (dict): GET 요청의 Query Parameter
+        body (dict): POST 요청의 바디 (JSON)
+        timeout (float): 응답을 기다릴 최대 시간 (초, None이면 무제한)
+        retries (int): 같은 요청을 앞서 보냈다가 다시 보내는 횟수 (호출 기록용)
+    
+    Returns:
+        requests.Response: API 응답 객체
+    """
+    # 초당 호출 한도를 넘지 않도록 차례를 기다립니다
+    wait_for_api_slot()
+    
+    tr_id = headers.get("tr_id", "")
+    started_at = time.perf_counter()
+    
+    try:
+        with span(f"kis:{tr_id}", category="kis"):
+            if method == "POST":
+                response = requests.post(
+                    url,
+                    headers=headers,
+                    json=body,
+                    timeout=timeout,
+                    verify=False  # 자체 서명 인증서 때문에 SSL 검증 비활성화
+                )
+            else:
+                response = requests.get(
+                    url,
+                    headers=headers,
+                    params=params,
+                    timeout=timeout,
+                    verify=False  # 자체 서명 인증서 때문에 SSL 검증 비활성화
+                )
+    except requests.exceptions.RequestException as e:
+        # 응답을 받지 못한 호출도 기록합니다 (HTTP 상태 0, 메시지 코드는 예외 이름)
+        record_api_call(tr_id, time.perf_counter() - started_at, 0, msg_cd=type(e).__name__, retries=retries)
+        raise
+    
+    # 응답 JSON을 한 번 더 해석하지 않도록, 응답 코드만 정규식으로 찾습니다
+    rt_cd_match = _RT_CD_PATTERN.search(response.text)
+    msg_cd_match = _MSG_CD_PATTERN.search(response.text)
+    
+    record_api_call(
+        tr_id,
+        time.perf_counter() - started_at,
+        response.status_code,
+        rt_cd=rt_cd_match.group(1) if rt_cd_match else "",
+        msg_cd=msg_cd_match.group(1) if msg_cd_match else "",
+        response_bytes=len(response.content),
+        retries=retries
+    )
+    
+    return response
 
 
 def get_overseas_stock_price(symbol, exchange_code="NAS"):
@@ -73,12 +170,7 @@ def get_overseas_stock_price(symbol, exchange_code="NAS"):
     
     # Step 5: API 호출
     try:
-        response = requests.get(
-            url, 
-            headers=headers, 
-            params=params, 
-            verify=False  # 자체 서명 인증서 때문에 SSL 검증 비활성화
-        )
+        response = _send_kis_request("GET", url, headers, params=params)
         response.raise_for_status()  # HTTP 에러 발생 시 예외 던지기
         
         # Step 6: 응답 데이터 추출
@@ -162,12 +254,7 @@ def get_overseas_stock_quotation(symbol, exchange_code="NAS"):
     
     # Step 5: API 호출
     try:
-        response = requests.get(
-            url, 
-            headers=headers, 
-            params=params, 
-            verify=False
-        )
+        response = _send_kis_request("GET", url, headers, params=params)
         response.raise_for_status()
         
         # Step 6: 응답 데이터 추출
@@ -185,6 +272,134 @@ def get_overseas_stock_quotation(symbol, exchange_code="NAS"):
         raise Exception(f"현재체결가 조회 실패: {str(e)}")
 
 
+def _parse_asking_price(symbol, output1, output2):
+    """
+    호가 조회 응답을 매수/매도 호가 목록으로 정리합니다.
+    
+    가격이 비어 있거나 0인 호가 단계는 건너뜁니다.
+    (미국 종목은 무료 시세로 1호가만 내려오는 경우가 많습니다)
+    """
+    bids = []
+    asks = []
+    
+    for level in range(1, 11):
+        bid_price = float(output2.get(f"pbid{level}") or 0)
+        ask_price = float(output2.get(f"pask{level}") or 0)
+        if bid_price > 0:
+            bids.append((bid_price, int(float(output2.get(f"vbid{level}") or 0))))
+        if ask_price > 0:
+            asks.append((ask_price, int(float(output2.get(f"vask{level}") or 0))))
+    
+    bid = bids[0][0] if bids else None
+    ask = asks[0][0] if asks else None
+    
+    return {
+        "symbol": symbol,
+        "last": float(output1.get("last") or 0),
+        "bids": bids,
+        "asks": asks,
+        "bid": bid,
+        "ask": ask,
+        "mid": (bid + ask) / 2 if bid and ask else None,
+        "spread": ask - bid if bid and ask else None
+    }
+
+
+def get_overseas_asking_price(symbol, exchange_code="NAS"):
+    """
+    한국투자증권 API를 사용하여 해외주식의 호가(매수/매도 대기 주문)를 조회합니다.
+    
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ", "AAPL", "TSLA")
+        exchange_code (str): 거래소 코드 (NAS, NYS, AMS, HKS, TSE, SHS, SZS 등)
+    
+    Returns:
+        dict: 호가 정보
+              {
+                  "symbol": 종목 코드,
+                  "last": 현재가,
+                  "bids": [(매수호가, 잔량), ...] (가격이 높은 순),
+                  "asks": [(매도호가, 잔량), ...] (가격이 낮은 순),
+                  "bid": 최우선 매수호가 (없으면 None),
+                  "ask": 최우선 매도호가 (없으면 None),
+                  "mid": 매수/매도호가의 가운데 (둘 중 하나라도 없으면 None),
+                  "spread": 매도호가 - 매수호가 (둘 중 하나라도 없으면 None)
+              }
+    
+    Raises:
+        Exception: API 호출 실패 시
+    """
+    
+    # Step 1: 접근 토큰 획득
+    try:
+        token_data = get_access_token()
+        access_token = token_data["access_token"]
+    except Exception as e:
+        raise Exception(f"토큰 획득 실패: {str(e)}")
+    
+    # Step 2: API 호출 URL 구성
+    url = f"{KIS_DOMAIN}/uapi/overseas-price/v1/quotations/inquire-asking-price"
+    
+    # Step 3: 요청 헤더 설정
+    headers = {
+        "content-type": "application/json; charset=utf-8",
+        "authorization": f"Bearer {access_token}",
+        "appkey": KIS_APP_KEY,
+        "appsecret": KIS_APP_SECRET,
+        "tr_id": "HHDFS76200100"  # 해외주식 현재가 호가 조회 API의 거래 ID
+    }
+    
+    # Step 4: Query Parameter 설정
+    params = {
+        "AUTH": "",  # 사용자 권한 정보 (개인 고객은 빈 값)
+        "EXCD": exchange_code,  # 거래소 코드
+        "SYMB": symbol  # 종목 코드
+    }
+    
+    # Step 5: API 호출
+    try:
+        response = _send_kis_request("GET", url, headers, params=params)
+        response.raise_for_status()
+        
+        # Step 6: 응답 데이터 추출
+        response_data = response.json()
+        
+        if response_data.get("rt_cd") != "0":
+            msg = response_data.get("msg1", "알 수 없는 에러")
+            raise Exception(f"API 호출 실패: {msg}")
+        
+        return _parse_asking_price(symbol, response_data.get("output1") or {}, response_data.get("output2") or {})
+    
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"호가 조회 실패: {str(e)}")
+
+
+def get_cached_asking_price(symbol, exchange_code="NAS", max_age_seconds=ORDER_BOOK_CACHE_SECONDS):
+    """
+    호가를 조회하되, max_age_seconds초 안에 조회한 결과가 있으면 그대로 돌려줍니다.
+    
+    한 번 실행하는 동안 전략과 주문 가격 계산이 같은 호가를 여러 번 써도
+    API는 한 번만 호출됩니다.
+    
+    Parameters:
+        symbol (str): 종목 코드
+        exchange_code (str): 거래소 코드
+        max_age_seconds (float): 캐시를 사용할 최대 시간 (초, 0이면 항상 새로 조회)
+    
+    Returns:
+        dict: get_overseas_asking_price()와 같은 호가 정보
+    """
+    cache_key = (symbol, exchange_code)
+    cached = _asking_price_cache.get(cache_key)
+    
+    if cached is not None and time.monotonic() - cached[0] < max_age_seconds:
+        return cached[1]
+    
+    snapshot = get_overseas_asking_price(symbol, exchange_code)
+    _asking_price_cache[cache_key] = (time.monotonic(), snapshot)
+    return snapshot
+
+
 def _convert_exchange_code(exchange_code):
     """
     API 호출에 사용되는 거래소 코드를 변환합니다.
@@ -195,22 +410,170 @@ def _convert_exchange_code(exchange_code):
     Returns:
         tuple: (API 요청용 거래소 코드, 통화 코드)
     """
-    exchange_map = {
-        "NAS": ("NASD", "USD"),      # 나스닥
-        "NYS": ("NYSE", "USD"),      # 뉴욕
-        "AMS": ("AMEX", "USD"),      # 아멕스
-        "HKS": ("SEHK", "HKD"),      # 홍콩
-        "TSE": ("TKSE", "JPY"),      # 도쿄
-        "SHS": ("SHAA", "CNY"),      # 상해
-        "SZS": ("SZAA", "CNY"),      # 심천
-        "HSX": ("HASE", "VND"),      # 베트남 하노이
-        "HNX": ("VNSE", "VND"),      # 베트남 호치민
+    exchange = get_exchange(exchange_code)
+    return exchange["order_code"], exchange["currency"]
+
+
+def get_overseas_product_info(symbol, exchange_code="NAS"):
+    """
+    한국투자증권 API를 사용하여 해외주식의 상품기본정보를 조회합니다.
+    
+    종목 이름, 거래소, 통화처럼 자주 바뀌지 않는 정보이므로
+    직접 부르기보다 instruments.get_instrument()로 캐시된 값을 사용하세요.
+    
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 시세 조회용 거래소 코드 (예: "NAS")
+    
+    Returns:
+        dict: 상품기본정보
+              주요 필드:
+              - prdt_name: 상품명
+              - prdt_eng_name: 영문 상품명
+              - ovrs_excg_cd: 해외거래소코드 (예: "NASD")
+              - tr_crcy_cd: 거래통화코드 (예: "USD")
+              - natn_cd: 국가코드
+    
+    Raises:
+        Exception: API 호출 실패 시
+    """
+    
+    # Step 1: 접근 토큰 획득
+    try:
+        token_data = get_access_token()
+        access_token = token_data["access_token"]
+    except Exception as e:
+        raise Exception(f"토큰 획득 실패: {str(e)}")
+    
+    # Step 2: API 호출 URL 구성
+    url = f"{KIS_DOMAIN}/uapi/overseas-price/v1/quotations/search-info"
+    
+    # Step 3: 요청 헤더 설정
+    headers = {
+        "content-type": "application/json; charset=utf-8",
+        "authorization": f"Bearer {access_token}",
+        "appkey": KIS_APP_KEY,
+        "appsecret": KIS_APP_SECRET,
+        "tr_id": "CTPF1702R",  # 해외주식 상품기본정보 조회 API의 거래 ID
+        "custtype": "P"        # 고객 타입 (P: 개인)
     }
     
-    if exchange_code in exchange_map:
-        return exchange_map[exchange_code]
-    else:
-        raise Exception(f"지원하지 않는 거래소 코드입니다: {exchange_code}")
+    # Step 4: Query Parameter 설정
+    params = {
+        "PRDT_TYPE_CD": get_exchange(exchange_code)["product_type"],  # 상품유형코드 (예: 512 = 미국 나스닥)
+        "PDNO": symbol  # 종목 코드
+    }
+    
+    # Step 5: API 호출
+    try:
+        response = _send_kis_request("GET", url, headers, params=params)
+        response.raise_for_status()
+        
+        # Step 6: 응답 데이터 추출
+        response_data = response.json()
+        
+        if response_data.get("rt_cd") != "0":
+            msg = response_data.get("msg1", "알 수 없는 에러")
+            raise Exception(f"API 호출 실패: {msg}")
+        
+        return response_data.get("output", {})
+    
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"상품기본정보 조회 실패: {str(e)}")
+
+
+def iter_overseas_minute_bars(symbol, exchange_code="NAS", minutes=1, include_previous=True, max_pages=50):
+    """
+    한국투자증권 API를 사용하여 해외주식 분봉을 페이지 단위로 조회합니다.
+    
+    한 번에 최대 120개씩, 최신 분봉부터 과거 방향으로 연속조회(NEXT / KEYB)를 따라가며
+    페이지를 하나씩 돌려줍니다(generator). 모든 분봉을 목록에 모으지 않으므로
+    받은 페이지를 바로 파일에 쓰고 버릴 수 있습니다. (minute_bars.download_minute_bars() 참고)
+    더 받지 않아도 되면 반복을 멈추면 그 뒤 페이지는 조회하지 않습니다.
+    
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 시세 조회용 거래소 코드 (예: "NAS")
+        minutes (int): 분봉 간격 (1, 5, 10 등)
+        include_previous (bool): 전일 분봉 포함 여부
+        max_pages (int): 무한 반복을 막기 위한 최대 페이지 수
+    
+    Yields:
+        list: 분봉 배열 (최신순)
+              각 항목의 필드:
+              - xymd: 현지 일자 (YYYYMMDD)
+              - xhms: 현지 시각 (HHMMSS)
+              - open / high / low / last: 시가 / 고가 / 저가 / 종가
+              - evol: 체결량
+              - eamt: 체결대금
+    
+    Raises:
+        Exception: API 호출 실패 시
+    """
+    
+    # Step 1: 접근 토큰 획득
+    try:
+        token_data = get_access_token()
+        access_token = token_data["access_token"]
+    except Exception as e:
+        raise Exception(f"토큰 획득 실패: {str(e)}")
+    
+    # Step 2: API 호출 URL 구성
+    url = f"{KIS_DOMAIN}/uapi/overseas-price/v1/quotations/inquire-time-itemchartprice"
+    
+    # Step 3: 요청 헤더 설정
+    headers = {
+        "content-type": "application/json; charset=utf-8",
+        "authorization": f"Bearer {access_token}",
+        "appkey": KIS_APP_KEY,
+        "appsecret": KIS_APP_SECRET,
+        "tr_id": "HHDFS76950200",  # 해외주식 분봉조회 API의 거래 ID
+        "custtype": "P"            # 고객 타입 (P: 개인)
+    }
+    
+    # Step 4: 연속조회를 반복하며 페이지를 돌려줍니다
+    next_flag = ""  # 첫 조회는 공란, 다음 페이지부터는 "1"
+    key = ""        # 다음 페이지 기준 (앞 페이지 마지막 분봉의 일자 + 시각)
+    
+    try:
+        for page in range(max_pages):
+            params = {
+                "AUTH": "",                               # 사용자 권한 정보 (개인 고객은 빈 값)
+                "EXCD": exchange_code,                    # 거래소 코드
+                "SYMB": symbol,                           # 종목 코드
+                "NMIN": str(minutes),                     # 분봉 간격
+                "PINC": "1" if include_previous else "0",  # 전일 포함 여부
+                "NEXT": next_flag,                        # 다음 여부
+                "NREC": "120",                            # 요청 개수 (최대 120)
+                "FILL": "",                               # 미체결 채움 구분 (공란)
+                "KEYB": key                               # 다음 조회 키
+            }
+            
+            response = _send_kis_request("GET", url, headers, params=params)
+            response.raise_for_status()
+            
+            response_data = response.json()
+            
+            # API 응답이 정상인지 확인
+            if response_data.get("rt_cd") != "0":
+                msg = response_data.get("msg1", "알 수 없는 에러")
+                raise Exception(f"API 호출 실패: {msg}")
+            
+            bars = response_data.get("output2") or []
+            if not bars:
+                break
+            
+            yield bars
+            
+            # output1의 more가 Y이면 다음 페이지가 있습니다
+            if (response_data.get("output1") or {}).get("more") != "Y":
+                break
+            
+            next_flag = "1"
+            key = bars[-1].get("xymd", "") + bars[-1].get("xhms", "")
+    
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"분봉 조회 실패: {str(e)}")
 
 
 def get_overseas_balance(symbol, exchange_code="NAS"):
@@ -284,12 +647,7 @@ def get_overseas_balance(symbol, exchange_code="NAS"):
     
     # Step 6: API 호출
     try:
-        response = requests.get(
-            url, 
-            headers=headers, 
-            params=params, 
-            verify=False
-        )
+        response = _send_kis_request("GET", url, headers, params=params)
         response.raise_for_status()
         
         # Step 7: 응답 데이터 추출
@@ -415,12 +773,7 @@ def get_overseas_purchase_amount(symbol, exchange_code="NAS"):
     
     # Step 7: API 호출
     try:
-        response = requests.get(
-            url, 
-            headers=headers, 
-            params=params, 
-            verify=False
-        )
+        response = _send_kis_request("GET", url, headers, params=params)
         response.raise_for_status()
         
         # Step 8: 응답 데이터 추출
@@ -550,12 +903,7 @@ def get_overseas_order_history(symbol, exchange_code="NAS", days=30):
     
     # Step 7: API 호출
     try:
-        response = requests.get(
-            url, 
-            headers=headers, 
-            params=params, 
-            verify=False
-        )
+        response = _send_kis_request("GET", url, headers, params=params)
         response.raise_for_status()
         
         # Step 8: 응답 데이터 추출
@@ -600,7 +948,137 @@ def get_overseas_order_history(symbol, exchange_code="NAS", days=30):
         raise Exception(f"주문체결내역 조회 실패: {str(e)}")
 
 
-def place_overseas_order(symbol, exchange_code, order_type, quantity, price, trade_mode="DRY"):
+def get_overseas_fill_history(symbol="%", exchange_code="%", start_date=None, end_date=None, max_pages=100):
+    """
+    한국투자증권 API를 사용하여 기간 동안의 해외주식 체결내역을 모두 조회합니다. (연속조회)
+
+    get_overseas_order_history()는 첫 페이지(최대 20건)만 조회하지만,
+    이 함수는 연속조회를 따라 기간 안의 체결된 주문을 모두 모아 오래된 순서로 돌려줍니다.
+    손익/매매 사이클 분석(analytics.py)에 사용합니다.
+
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ"), "%"이면 전체 종목
+        exchange_code (str): 거래소 코드 (예: "NAS"), "%"이면 전체 거래소
+        start_date (str): 조회 시작일 (YYYYMMDD, None이면 1년 전)
+        end_date (str): 조회 종료일 (YYYYMMDD, None이면 오늘)
+        max_pages (int): 최대 연속조회 횟수
+
+    Returns:
+        list: 체결된 주문 배열 (오래된 순)
+              각 항목의 필드:
+              - ord_dt / ord_tmd: 주문일자 / 주문시각
+              - odno: 주문번호
+              - pdno: 상품번호 (종목 코드)
+              - sll_buy_dvsn_cd: 매도매수구분코드 (01: 매도, 02: 매수)
+              - ft_ccld_qty: 체결수량
+              - ft_ccld_unpr3: 체결단가
+              - ft_ccld_amt3: 체결금액
+              - ovrs_excg_cd: 거래소코드
+              - tr_crcy_cd: 거래통화코드
+
+    Raises:
+        Exception: API 호출 실패 또는 필수 정보 미설정 시 예외 발생
+    """
+
+    from config import KIS_ACCOUNT_NO, ACNT_PRDT_CD
+    from datetime import datetime, timedelta
+
+    # Step 1: 접근 토큰 획득
+    try:
+        token_data = get_access_token()
+        access_token = token_data["access_token"]
+    except Exception as e:
+        raise Exception(f"토큰 획득 실패: {str(e)}")
+
+    # Step 2: 조회 기간
+    today = datetime.now()
+    ord_end_dt = end_date or today.strftime("%Y%m%d")
+    ord_strt_dt = start_date or (today - timedelta(days=365)).strftime("%Y%m%d")
+
+    # Step 3: 거래소 코드 변환 ("%"는 전체 거래소)
+    if exchange_code == "%":
+        api_exchange_code = "%"
+    else:
+        try:
+            api_exchange_code, currency_code = _convert_exchange_code(exchange_code)
+        except Exception as e:
+            raise Exception(f"거래소 코드 변환 실패: {str(e)}")
+
+    url = f"{KIS_DOMAIN}/uapi/overseas-stock/v1/trading/inquire-ccnl"
+
+    # Step 4: 연속조회를 반복하며 체결된 주문을 모읍니다
+    fills = []
+    ctx_area_fk200 = ""
+    ctx_area_nk200 = ""
+    tr_cont = ""  # 첫 조회는 공란, 다음 페이지부터는 "N"
+
+    try:
+        for page in range(max_pages):
+            headers = {
+                "content-type": "application/json; charset=utf-8",
+                "authorization": f"Bearer {access_token}",
+                "appkey": KIS_APP_KEY,
+                "appsecret": KIS_APP_SECRET,
+                "tr_id": "TTTS3035R",  # 해외주식 주문체결내역 조회 API의 거래 ID (실전)
+                "tr_cont": tr_cont
+            }
+
+            params = {
+                "CANO": KIS_ACCOUNT_NO,             # 종합계좌번호 (8자리)
+                "ACNT_PRDT_CD": ACNT_PRDT_CD,      # 계좌상품코드 (01)
+                "PDNO": symbol.upper(),             # 상품번호 ("%"이면 전종목)
+                "ORD_STRT_DT": ord_strt_dt,         # 주문시작일자
+                "ORD_END_DT": ord_end_dt,           # 주문종료일자
+                "SLL_BUY_DVSN": "00",               # 매도매수구분 (00: 전체)
+                "CCLD_NCCS_DVSN": "01",             # 체결미체결구분 (01: 체결만)
+                "OVRS_EXCG_CD": api_exchange_code,  # 해외거래소코드 ("%"이면 전체)
+                "SORT_SQN": "DS",                   # 정렬순서 (DS: 정순, 오래된 것이 먼저)
+                "ORD_DT": "",                       # 주문일자 (Null)
+                "ORD_GNO_BRNO": "",                 # 주문채번지점번호 (Null)
+                "ODNO": "",                         # 주문번호 (Null)
+                "CTX_AREA_NK200": ctx_area_nk200,   # 연속조회키200
+                "CTX_AREA_FK200": ctx_area_fk200    # 연속조회검색조건200
+            }
+
+            response = _send_kis_request("GET", url, headers, params=params)
+            response.raise_for_status()
+
+            response_data = response.json()
+
+            # API 응답이 정상인지 확인
+            if response_data.get("rt_cd") != "0":
+                msg = response_data.get("msg1", "알 수 없는 에러")
+                raise Exception(f"API 호출 실패: {msg}")
+
+            for item in response_data.get("output", []):
+                fills.append({
+                    "ord_dt": item.get("ord_dt", ""),                # 주문일자
+                    "ord_tmd": item.get("ord_tmd", ""),              # 주문시각
+                    "odno": item.get("odno", ""),                    # 주문번호
+                    "pdno": item.get("pdno", ""),                    # 상품번호 (종목 코드)
+                    "sll_buy_dvsn_cd": item.get("sll_buy_dvsn_cd", ""),  # 매도매수구분코드
+                    "ft_ccld_qty": item.get("ft_ccld_qty", "0"),     # 체결수량
+                    "ft_ccld_unpr3": item.get("ft_ccld_unpr3", "0"), # 체결단가
+                    "ft_ccld_amt3": item.get("ft_ccld_amt3", "0"),   # 체결금액
+                    "ovrs_excg_cd": item.get("ovrs_excg_cd", ""),    # 거래소코드
+                    "tr_crcy_cd": item.get("tr_crcy_cd", "")         # 거래통화코드
+                })
+
+            # 응답 헤더의 tr_cont가 F 또는 M이면 다음 페이지가 있습니다
+            if response.headers.get("tr_cont", "") not in ("F", "M"):
+                break
+
+            tr_cont = "N"
+            ctx_area_fk200 = response_data.get("ctx_area_fk200", "")
+            ctx_area_nk200 = response_data.get("ctx_area_nk200", "")
+
+        return fills
+
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"체결내역 조회 실패: {str(e)}")
+
+
+def place_overseas_order(symbol, exchange_code, order_type, quantity, price, trade_mode="DRY", retries=0):
     """
     해외주식 주문을 실행합니다.
     
@@ -623,8 +1101,9 @@ def place_overseas_order(symbol, exchange_code, order_type, quantity, price, tra
             - MOO: 장개시시장가 (31)
             - MOC: 장마감시장가 (33)
         quantity (int): 주문 수량
-        price (float): 주문 가격 (1주당 가격)
+        price (float | str): 주문 가격 (1주당 가격, 요청에는 money.format_price()로 넣습니다)
         trade_mode (str): 거래 모드 ("DRY" 또는 "LIVE")
+        retries (int): 같은 주문을 앞서 보냈다가 다시 보내는 횟수 (저널 재전송, 호출 기록용)
     
     Returns:
         dict: LIVE 모드일 때 주문번호(odno)를 포함한 딕셔너리
@@ -636,24 +1115,18 @@ def place_overseas_order(symbol, exchange_code, order_type, quantity, price, tra
               DRY 모드일 때는 None
     
     Raises:
-        Exception: API 호출 실패 또는 필수 정보 미설정 시 예외 발생
-                   실패 시 응답코드(msg_cd)와 응답메시지(msg1)를 포함하여 에러 발생
+        TimeoutError: 요청을 보낸 뒤 정상 응답을 받지 못한 경우
+                      (시간 초과, 연결 끊김, 응답이 깨진 경우 등 주문이 접수되었는지 알 수 없으므로
+                       주문내역으로 확인해야 합니다)
+        OrderRejectedError: 증권사가 주문을 거부한 경우 (응답코드(msg_cd)와 응답메시지(msg1) 포함)
+        Exception: 요청을 보내기 전에 실패한 경우 (지원하지 않는 주문 유형, 토큰 획득 실패 등)
     """
-    from config import KIS_ACCOUNT_NO, ACNT_PRDT_CD
+    from config import KIS_ACCOUNT_NO, ACNT_PRDT_CD, ORDER_TIMEOUT_SECONDS
     
-    # 주문 구분 코드 매핑
-    order_type_map = {
-        "LIMIT": "00",  # 지정가
-        "LOC": "34",    # 장마감지정가
-        "LOO": "32",    # 장개시지정가
-        "MOO": "31",    # 장개시시장가
-        "MOC": "33"     # 장마감시장가
-    }
-    
-    if order_type not in order_type_map:
+    if order_type not in ORDER_TYPE_CODES:
         raise Exception(f"지원하지 않는 주문 유형입니다: {order_type}")
     
-    ord_dvsn = order_type_map[order_type]
+    ord_dvsn = ORDER_TYPE_CODES[order_type]
     
     # DRY 모드일 때는 주문 정보만 출력
     if trade_mode == "DRY":
@@ -662,7 +1135,7 @@ def place_overseas_order(symbol, exchange_code, order_type, quantity, price, tra
         print(f"거래소: {exchange_code}")
         print(f"주문 유형: {order_type} ({ord_dvsn})")
         print(f"주문 수량: {quantity}주")
-        print(f"주문 가격: ${price}")
+        print(f"주문 가격: ${format_price(price)}")
         print(f"계좌 번호: {KIS_ACCOUNT_NO}")
         print("실제 주문은 실행되지 않았습니다.")
         print("=========================================\n")
@@ -698,19 +1171,14 @@ def place_overseas_order(symbol, exchange_code, order_type, quantity, price, tra
         "OVRS_EXCG_CD": exchange_code,    # 해외거래소코드
         "PDNO": symbol,                   # 상품번호 (종목코드)
         "ORD_QTY": str(quantity),         # 주문수량
-        "OVRS_ORD_UNPR": str(price),      # 해외주문단가 (1주당 가격)
+        "OVRS_ORD_UNPR": format_price(price),  # 해외주문단가 (1주당 가격, float 오차 없는 문자열)
         "ORD_SVR_DVSN_CD": "0",           # 주문서버구분코드 (기본값 "0")
         "ORD_DVSN": ord_dvsn              # 주문구분
     }
     
     # Step 6: API 호출
     try:
-        response = requests.post(
-            url,
-            headers=headers,
-            json=body,
-            verify=False
-        )
+        response = _send_kis_request("POST", url, headers, body=body, timeout=ORDER_TIMEOUT_SECONDS, retries=retries)
         response.raise_for_status()
         
         # Step 7: 응답 데이터 추출
@@ -720,7 +1188,7 @@ def place_overseas_order(symbol, exchange_code, order_type, quantity, price, tra
         if response_data.get("rt_cd") != "0":
             msg_cd = response_data.get("msg_cd", "")
             msg1 = response_data.get("msg1", "알 수 없는 에러")
-            raise Exception(f"주문 실패 (응답코드: {msg_cd}): {msg1}")
+            raise OrderRejectedError(f"주문 실패 (응답코드: {msg_cd}): {msg1}")
         
         # 주문 성공 정보 반환
         output = response_data.get("output", {})
@@ -730,7 +1198,7 @@ def place_overseas_order(symbol, exchange_code, order_type, quantity, price, tra
         print(f"주문번호: {output.get('ODNO', '')}")
         print(f"주문시각: {output.get('ORD_TMD', '')}")
         print(f"주문수량: {quantity}주")
-        print(f"주문가격: ${price}")
+        print(f"주문가격: ${format_price(price)}")
         print("==========================================\n")
         
         return {
@@ -739,5 +1207,401 @@ def place_overseas_order(symbol, exchange_code, order_type, quantity, price, tra
             "ord_tmd": output.get("ORD_TMD", "")                 # 주문시각
         }
     
+    except requests.exceptions.Timeout as e:
+        # 응답이 늦은 경우: 주문이 접수되었을 수도, 아닐 수도 있습니다
+        raise TimeoutError(f"주문 응답 시간 초과: {str(e)}")
+    
+    except requests.exceptions.RequestException as e:
+        # 연결 끊김, 응답이 깨진 경우 등도 요청이 이미 증권사에 닿았을 수 있으므로 시간 초과와 같이 다룹니다
+        raise TimeoutError(f"주문 응답 확인 실패: {str(e)}")
+
+
+def get_overseas_open_orders(exchange_code="NAS"):
+    """
+    한국투자증권 API를 사용하여 해외주식의 미체결 주문 목록을 조회합니다.
+    
+    아직 체결되지 않고 남아 있는 주문을 모두 가져옵니다.
+    결과가 많으면 연속조회(다음 페이지)를 자동으로 이어서 조회합니다.
+    
+    Parameters:
+        exchange_code (str): 거래소 코드
+            - NAS: 나스닥
+            - NYS: 뉴욕
+            - AMS: 아멕스
+            - HKS: 홍콩
+            - TSE: 도쿄
+            - SHS: 상해
+            - SZS: 심천
+            - HSX: 호치민
+            - HNX: 하노이
+    
+    Returns:
+        list: 미체결 주문 배열
+              각 항목의 필드:
+              - odno: 주문번호
+              - pdno: 상품번호 (종목 코드)
+              - sll_buy_dvsn_cd: 매도매수구분코드 (01: 매도, 02: 매수)
+              - ft_ord_qty: 주문수량
+              - nccs_qty: 미체결수량 (핵심 정보)
+              - ft_ord_unpr3: 주문단가
+              - ovrs_excg_cd: 거래소코드 (주문용, 예: NASD)
+              - 기타 필드 참고
+        
+        []: 미체결 주문이 없을 경우 빈 배열
+    
+    Raises:
+        Exception: API 호출 실패 또는 필수 정보 미설정 시 예외 발생
+    """
+    
+    from config import KIS_ACCOUNT_NO, ACNT_PRDT_CD
+    
+    # Step 1: 접근 토큰 획득
+    try:
+        token_data = get_access_token()
+        access_token = token_data["access_token"]
+    except Exception as e:
+        raise Exception(f"토큰 획득 실패: {str(e)}")
+    
+    # Step 2: 거래소 코드 변환
+    try:
+        api_exchange_code, currency_code = _convert_exchange_code(exchange_code)
+    except Exception as e:
+        raise Exception(f"거래소 코드 변환 실패: {str(e)}")
+    
+    # Step 3: API 호출 URL 구성
+    url = f"{KIS_DOMAIN}/uapi/overseas-stock/v1/trading/inquire-nccs"
+    
+    # Step 4: 연속조회를 반복하며 미체결 주문을 모읍니다
+    open_orders = []
+    ctx_area_fk200 = ""
+    ctx_area_nk200 = ""
+    tr_cont = ""  # 첫 조회는 공란, 다음 페이지부터는 "N"
+    max_pages = 10  # 무한 반복을 막기 위한 최대 페이지 수
+    
+    try:
+        for page in range(max_pages):
+            headers = {
+                "content-type": "application/json; charset=utf-8",
+                "authorization": f"Bearer {access_token}",
+                "appkey": KIS_APP_KEY,
+                "appsecret": KIS_APP_SECRET,
+                "tr_id": "TTTS3018R",  # 해외주식 미체결내역 조회 API의 거래 ID (실전)
+                "tr_cont": tr_cont
+            }
+            
+            params = {
+                "CANO": KIS_ACCOUNT_NO,             # 종합계좌번호 (8자리)
+                "ACNT_PRDT_CD": ACNT_PRDT_CD,      # 계좌상품코드 (01)
+                "OVRS_EXCG_CD": api_exchange_code,  # 해외거래소코드
+                "SORT_SQN": "DS",                   # 정렬순서
+                "CTX_AREA_FK200": ctx_area_fk200,   # 연속조회검색조건200
+                "CTX_AREA_NK200": ctx_area_nk200    # 연속조회키200
+            }
+            
+            response = _send_kis_request("GET", url, headers, params=params)
+            response.raise_for_status()
+            
+            response_data = response.json()
+            
+            # API 응답이 정상인지 확인
+            if response_data.get("rt_cd") != "0":
+                msg = response_data.get("msg1", "알 수 없는 에러")
+                raise Exception(f"API 호출 실패: {msg}")
+            
+            for item in response_data.get("output", []):
+                open_orders.append({
+                    "ord_dt": item.get("ord_dt", ""),                # 주문일자
+                    "ord_tmd": item.get("ord_tmd", ""),              # 주문시각
+                    "odno": item.get("odno", ""),                    # 주문번호
+                    "orgn_odno": item.get("orgn_odno", ""),          # 원주문번호
+                    "pdno": item.get("pdno", ""),                    # 상품번호 (종목 코드)
+                    "prdt_name": item.get("prdt_name", ""),          # 상품명
+                    "sll_buy_dvsn_cd": item.get("sll_buy_dvsn_cd", ""),  # 매도매수구분코드
+                    "ft_ord_qty": item.get("ft_ord_qty", "0"),       # 주문수량
+                    "ft_ccld_qty": item.get("ft_ccld_qty", "0"),     # 체결수량
+                    "nccs_qty": item.get("nccs_qty", "0"),           # 미체결수량
+                    "ft_ord_unpr3": item.get("ft_ord_unpr3", "0"),   # 주문단가
+                    "ovrs_excg_cd": item.get("ovrs_excg_cd", "")     # 거래소코드
+                })
+            
+            # 응답 헤더의 tr_cont가 F 또는 M이면 다음 페이지가 있습니다
+            if response.headers.get("tr_cont", "") not in ("F", "M"):
+                break
+            
+            tr_cont = "N"
+            ctx_area_fk200 = response_data.get("ctx_area_fk200", "")
+            ctx_area_nk200 = response_data.get("ctx_area_nk200", "")
+        
+        return open_orders
+    
     except requests.exceptions.RequestException as e:
-        raise Exception(f"주문 실행 실패: {str(e)}")
+        raise Exception(f"미체결내역 조회 실패: {str(e)}")
+
+
+def revise_or_cancel_overseas_order(symbol, exchange_code, original_odno, action, quantity, price=0, trade_mode="DRY"):
+    """
+    이미 접수된 해외주식 주문을 정정(가격 변경)하거나 취소합니다.
+    
+    평단가나 큰수 기준가가 바뀌었을 때, 예전 가격으로 걸려 있는 주문을
+    새 가격으로 바꾸거나 없애기 위해 사용합니다.
+    - DRY 모드: 정정/취소 정보만 출력하고 실제로는 요청하지 않습니다
+    - LIVE 모드: 실제로 정정/취소를 요청하고 새 주문번호를 반환합니다
+    
+    Parameters:
+        symbol (str): 종목 코드 (예: "TQQQ")
+        exchange_code (str): 주문용 거래소 코드 (예: "NASD", "NYSE", "AMEX")
+        original_odno (str): 정정/취소할 원래 주문번호
+        action (str): "REVISE" (정정) 또는 "CANCEL" (취소)
+        quantity (int): 정정/취소할 수량 (보통 미체결 수량 전체)
+        price (float): 정정할 새 가격 (취소일 때는 0)
+        trade_mode (str): 거래 모드 ("DRY" 또는 "LIVE")
+    
+    Returns:
+        dict: LIVE 모드일 때 정정/취소 주문번호를 포함한 딕셔너리
+              {
+                  "odno": "정정/취소 주문번호",
+                  "org_no": "한국거래소전송주문조직번호",
+                  "ord_tmd": "주문시각"
+              }
+              DRY 모드일 때는 None
+    
+    Raises:
+        Exception: API 호출 실패 또는 필수 정보 미설정 시 예외 발생
+    """
+    from config import KIS_ACCOUNT_NO, ACNT_PRDT_CD
+    
+    # 정정취소구분코드 매핑
+    action_map = {
+        "REVISE": "01",  # 정정
+        "CANCEL": "02"   # 취소
+    }
+    
+    if action not in action_map:
+        raise Exception(f"지원하지 않는 정정/취소 구분입니다: {action}")
+    
+    # 취소는 가격이 필요 없으므로 0으로 보냅니다
+    if action == "CANCEL":
+        price = 0
+    
+    # DRY 모드일 때는 정정/취소 정보만 출력
+    if trade_mode == "DRY":
+        print("\n========== [DRY 모드] 정정/취소 정보 ==========")
+        print(f"종목 코드: {symbol}")
+        print(f"원주문번호: {original_odno}")
+        print(f"구분: {action}")
+        print(f"수량: {quantity}주")
+        if action == "REVISE":
+            print(f"새 가격: ${format_price(price)}")
+        print("실제 정정/취소는 실행되지 않았습니다.")
+        print("==============================================\n")
+        return None
+    
+    # Step 1: 접근 토큰 획득
+    try:
+        token_data = get_access_token()
+        access_token = token_data["access_token"]
+    except Exception as e:
+        raise Exception(f"토큰 획득 실패: {str(e)}")
+    
+    # Step 2: API 호출 URL 구성
+    url = f"{KIS_DOMAIN}/uapi/overseas-stock/v1/trading/order-rvsecncl"
+    
+    # Step 3: 요청 헤더 설정
+    headers = {
+        "content-type": "application/json; charset=utf-8",
+        "authorization": f"Bearer {access_token}",
+        "appkey": KIS_APP_KEY,
+        "appsecret": KIS_APP_SECRET,
+        "tr_id": "TTTT1004U"  # 해외주식 정정취소주문 API의 거래 ID (실전, 미국)
+    }
+    
+    # Step 4: 요청 바디 설정
+    body = {
+        "CANO": KIS_ACCOUNT_NO,                    # 종합계좌번호 (8자리)
+        "ACNT_PRDT_CD": ACNT_PRDT_CD,              # 계좌상품코드 (01)
+        "OVRS_EXCG_CD": exchange_code,             # 해외거래소코드
+        "PDNO": symbol,                            # 상품번호 (종목코드)
+        "ORGN_ODNO": original_odno,                # 원주문번호
+        "RVSE_CNCL_DVSN_CD": action_map[action],   # 정정취소구분코드
+        "ORD_QTY": str(quantity),                  # 주문수량
+        "OVRS_ORD_UNPR": format_price(price),      # 해외주문단가 (취소 시 0)
+        "ORD_SVR_DVSN_CD": "0"                     # 주문서버구분코드 (기본값 "0")
+    }
+    
+    # Step 5: API 호출
+    try:
+        response = _send_kis_request("POST", url, headers, body=body)
+        response.raise_for_status()
+        
+        # Step 6: 응답 데이터 추출
+        response_data = response.json()
+        
+        # API 응답이 정상인지 확인
+        if response_data.get("rt_cd") != "0":
+            msg_cd = response_data.get("msg_cd", "")
+            msg1 = response_data.get("msg1", "알 수 없는 에러")
+            raise Exception(f"정정/취소 실패 (응답코드: {msg_cd}): {msg1}")
+        
+        output = response_data.get("output", {})
+        
+        return {
+            "odno": output.get("ODNO", ""),                       # 정정/취소 주문번호
+            "org_no": output.get("KRX_FWDG_ORD_ORGNO", ""),      # 한국거래소전송주문조직번호
+            "ord_tmd": output.get("ORD_TMD", "")                 # 주문시각
+        }
+    
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"정정/취소 실행 실패: {str(e)}")
+
+
+def today_orders_start_date(now=None):
+    """
+    get_overseas_today_orders()가 기본으로 조회하는 첫 주문일자(한국 날짜 어제)를 돌려줍니다.
+    
+    미국 장은 한국 날짜로 이틀에 걸쳐 열리므로 어제부터 오늘까지 조회합니다.
+    이보다 앞선 주문(월요일 실행에서 본 금요일 주문 등)은 start_date를 넘겨야 보입니다.
+    
+    Returns:
+        str: "YYYYMMDD"
+    """
+    from datetime import datetime, timedelta
+    
+    return ((now or datetime.now()) - timedelta(days=1)).strftime("%Y%m%d")
+
+
+def get_overseas_today_orders(exchange_code="%", symbol="%", start_date=None):
+    """
+    한국투자증권 API를 사용하여 오늘 낸 해외주식 주문의 체결 상태를 한 번에 조회합니다.
+    
+    체결/미체결 주문을 모두 가져오므로, 여러 주문의 체결 여부를
+    주문마다 따로 묻지 않고 한 번의 조회(필요하면 연속조회)로 확인할 수 있습니다.
+    
+    Parameters:
+        exchange_code (str): 거래소 코드 (예: "NAS"), "%"이면 전체 거래소
+        symbol (str): 종목 코드 (예: "TQQQ"), "%"이면 전체 종목
+        start_date (str): 첫 주문일자 "YYYYMMDD" (None이면 today_orders_start_date(), 어제)
+    
+    Returns:
+        list: 주문 배열
+              각 항목의 필드:
+              - odno: 주문번호
+              - pdno: 상품번호 (종목 코드)
+              - sll_buy_dvsn_cd: 매도매수구분코드 (01: 매도, 02: 매수)
+              - ft_ord_qty: 주문수량
+              - ft_ccld_qty: 체결수량
+              - ft_ccld_unpr3: 체결단가
+              - ft_ccld_amt3: 체결금액
+              - nccs_qty: 미체결수량
+              - prcs_stat_name: 처리상태
+              - rjct_rson_name: 거부사유
+        
+        []: 오늘 주문이 없을 경우 빈 배열
+    
+    Raises:
+        Exception: API 호출 실패 또는 필수 정보 미설정 시 예외 발생
+    """
+    
+    from config import KIS_ACCOUNT_NO, ACNT_PRDT_CD
+    from datetime import datetime
+    
+    # Step 1: 접근 토큰 획득
+    try:
+        token_data = get_access_token()
+        access_token = token_data["access_token"]
+    except Exception as e:
+        raise Exception(f"토큰 획득 실패: {str(e)}")
+    
+    # Step 2: 날짜 계산
+    # 미국 장은 한국 날짜로 이틀에 걸쳐 열리므로 (따로 정하지 않으면) 어제부터 오늘까지 조회합니다
+    today = datetime.now()
+    ord_end_dt = today.strftime("%Y%m%d")
+    ord_strt_dt = start_date or today_orders_start_date(today)
+    
+    # Step 3: 거래소 코드 변환 ("%"는 전체 거래소)
+    if exchange_code == "%":
+        api_exchange_code = "%"
+    else:
+        try:
+            api_exchange_code, currency_code = _convert_exchange_code(exchange_code)
+        except Exception as e:
+            raise Exception(f"거래소 코드 변환 실패: {str(e)}")
+    
+    # Step 4: API 호출 URL 구성
+    url = f"{KIS_DOMAIN}/uapi/overseas-stock/v1/trading/inquire-ccnl"
+    
+    # Step 5: 연속조회를 반복하며 주문을 모읍니다
+    today_orders = []
+    ctx_area_fk200 = ""
+    ctx_area_nk200 = ""
+    tr_cont = ""  # 첫 조회는 공란, 다음 페이지부터는 "N"
+    max_pages = 10  # 무한 반복을 막기 위한 최대 페이지 수
+    
+    try:
+        for page in range(max_pages):
+            headers = {
+                "content-type": "application/json; charset=utf-8",
+                "authorization": f"Bearer {access_token}",
+                "appkey": KIS_APP_KEY,
+                "appsecret": KIS_APP_SECRET,
+                "tr_id": "TTTS3035R",  # 해외주식 주문체결내역 조회 API의 거래 ID (실전)
+                "tr_cont": tr_cont
+            }
+            
+            params = {
+                "CANO": KIS_ACCOUNT_NO,             # 종합계좌번호 (8자리)
+                "ACNT_PRDT_CD": ACNT_PRDT_CD,      # 계좌상품코드 (01)
+                "PDNO": symbol.upper(),             # 상품번호 ("%"이면 전종목)
+                "ORD_STRT_DT": ord_strt_dt,         # 주문시작일자
+                "ORD_END_DT": ord_end_dt,           # 주문종료일자
+                "SLL_BUY_DVSN": "00",               # 매도매수구분 (00: 전체)
+                "CCLD_NCCS_DVSN": "00",             # 체결미체결구분 (00: 전체)
+                "OVRS_EXCG_CD": api_exchange_code,  # 해외거래소코드 ("%"이면 전체)
+                "SORT_SQN": "DS",                   # 정렬순서
+                "ORD_DT": "",                       # 주문일자 (Null)
+                "ORD_GNO_BRNO": "",                 # 주문채번지점번호 (Null)
+                "ODNO": "",                         # 주문번호 (Null)
+                "CTX_AREA_NK200": ctx_area_nk200,   # 연속조회키200
+                "CTX_AREA_FK200": ctx_area_fk200    # 연속조회검색조건200
+            }
+            
+            response = _send_kis_request("GET", url, headers, params=params)
+            response.raise_for_status()
+            
+            response_data = response.json()
+            
+            # API 응답이 정상인지 확인
+            if response_data.get("rt_cd") != "0":
+                msg = response_data.get("msg1", "알 수 없는 에러")
+                raise Exception(f"API 호출 실패: {msg}")
+            
+            for item in response_data.get("output", []):
+                today_orders.append({
+                    "ord_dt": item.get("ord_dt", ""),                # 주문일자
+                    "ord_tmd": item.get("ord_tmd", ""),              # 주문시각
+                    "odno": item.get("odno", ""),                    # 주문번호
+                    "orgn_odno": item.get("orgn_odno", ""),          # 원주문번호
+                    "pdno": item.get("pdno", ""),                    # 상품번호 (종목 코드)
+                    "sll_buy_dvsn_cd": item.get("sll_buy_dvsn_cd", ""),  # 매도매수구분코드
+                    "ft_ord_qty": item.get("ft_ord_qty", "0"),       # 주문수량
+                    "ft_ord_unpr3": item.get("ft_ord_unpr3", "0"),   # 주문단가
+                    "ft_ccld_qty": item.get("ft_ccld_qty", "0"),     # 체결수량
+                    "ft_ccld_unpr3": item.get("ft_ccld_unpr3", "0"), # 체결단가
+                    "ft_ccld_amt3": item.get("ft_ccld_amt3", "0"),   # 체결금액
+                    "nccs_qty": item.get("nccs_qty", "0"),           # 미체결수량
+                    "prcs_stat_name": item.get("prcs_stat_name", ""),  # 처리상태
+                    "rjct_rson_name": item.get("rjct_rson_name", ""),  # 거부사유
+                    "ovrs_excg_cd": item.get("ovrs_excg_cd", "")     # 거래소코드
+                })
+            
+            # 응답 헤더의 tr_cont가 F 또는 M이면 다음 페이지가 있습니다
+            if response.headers.get("tr_cont", "") not in ("F", "M"):
+                break
+            
+            tr_cont = "N"
+            ctx_area_fk200 = response_data.get("ctx_area_fk200", "")
+            ctx_area_nk200 = response_data.get("ctx_area_nk200", "")
+        
+        return today_orders
+    
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"주문체결내역 조회 실패: {str(e)}")
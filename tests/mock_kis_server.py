@@ -0,0 +1,909 @@
+"""
+한국투자증권 API를 흉내 내는 테스트용 가짜 서버
+
+실제 서버에 접속하지 않고도 trader / strategy / trading_bot을 실행해 볼 수 있도록
+봇이 사용하는 API를 같은 주소와 같은 응답 형식으로 제공합니다.
+
+지원하는 API:
+- /oauth2/tokenP                                    토큰 발급 (1분당 1회 제한 EGW00133 흉내 가능)
+- /oauth2/Approval                                  실시간(WebSocket) 접속키 발급
+- /uapi/overseas-price/v1/quotations/price          현재체결가 (HHDFS00000300)
+- /uapi/overseas-price/v1/quotations/price-detail   현재가상세 (HHDFS76200200)
+- /uapi/overseas-price/v1/quotations/inquire-asking-price  호가 (HHDFS76200100)
+- /uapi/overseas-price/v1/quotations/search-info    상품기본정보 (CTPF1702R)
+- /uapi/overseas-price/v1/quotations/inquire-time-itemchartprice  분봉 (HHDFS76950200, 연속조회 지원)
+- /uapi/overseas-stock/v1/trading/inquire-balance   잔고 (TTTS3012R)
+- /uapi/overseas-stock/v1/trading/inquire-psamount  매수가능금액 (TTTS3007R)
+- /uapi/overseas-stock/v1/trading/inquire-ccnl      주문체결내역 (TTTS3035R, 연속조회 지원)
+- /uapi/overseas-stock/v1/trading/inquire-nccs      미체결내역 (TTTS3018R, 연속조회 지원)
+- /uapi/overseas-stock/v1/trading/order             주문 (TTTT1002U 매수, TTTT1006U 매도)
+- /uapi/overseas-stock/v1/trading/order-rvsecncl    정정/취소 (TTTT1004U)
+
+설정할 수 있는 것:
+- latency: 응답마다 기다리는 시간 (초), latency_by_path로 API별로 다르게 줄 수 있음
+- calls_per_second: 초당 호출 한도 (넘으면 EGW00201 응답)
+- token_interval_seconds: 토큰 재발급 제한 시간 (이 시간 안에 다시 요청하면 EGW00133 응답)
+- page_size: 연속조회 한 페이지의 건수
+- script: 시세를 단계별로 바꾸는 시나리오 (advance_market()을 부를 때마다 다음 단계 적용)
+
+주문 체결 규칙 (단순화):
+- LIMIT 매수/매도: 주문 시 현재가로 바로 체결 가능하면 현재가에 체결, 아니면 미체결
+- LOC / MOC: close_market()을 부를 때 종가(현재가) 기준으로 체결
+- 그 외 주문 유형(LOO, MOO)은 접수만 하고 체결하지 않음
+
+직접 실행하면 서버를 켜 두고 주소를 출력합니다:
+    python tests/mock_kis_server.py
+    KIS_DOMAIN=http://127.0.0.1:<포트> KIS_APP_KEY=mock KIS_APP_SECRET=mock python tests/test_dryrun.py
+"""
+
+import json
+import math
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# 조회용 거래소 코드 -> 주문용 거래소 코드
+ORDER_EXCHANGE_CODES = {
+    "NAS": "NASD",
+    "NYS": "NYSE",
+    "AMS": "AMEX",
+    "HKS": "SEHK",
+    "TSE": "TKSE",
+    "SHS": "SHAA",
+    "SZS": "SZAA"
+}
+
+# 상품기본정보 조회의 상품유형코드 -> 조회용 거래소 코드
+PRODUCT_TYPE_EXCHANGES = {
+    "512": "NAS",
+    "513": "NYS",
+    "529": "AMS",
+    "501": "HKS",
+    "515": "TSE",
+    "551": "SHS",
+    "552": "SZS"
+}
+
+# 주문구분 코드 -> 주문 유형
+ORDER_TYPES = {
+    "00": "LIMIT",
+    "31": "MOO",
+    "32": "LOO",
+    "33": "MOC",
+    "34": "LOC"
+}
+
+# 경로별 거래 ID (토큰 발급은 tr_id가 없어 "tokenP"로 셉니다)
+PATH_TR_IDS = {
+    "/oauth2/tokenP": "tokenP",
+    "/oauth2/Approval": "Approval",
+    "/uapi/overseas-price/v1/quotations/price": "HHDFS00000300",
+    "/uapi/overseas-price/v1/quotations/price-detail": "HHDFS76200200",
+    "/uapi/overseas-price/v1/quotations/inquire-asking-price": "HHDFS76200100",
+    "/uapi/overseas-price/v1/quotations/search-info": "CTPF1702R",
+    "/uapi/overseas-price/v1/quotations/inquire-time-itemchartprice": "HHDFS76950200",
+    "/uapi/overseas-stock/v1/trading/inquire-balance": "TTTS3012R",
+    "/uapi/overseas-stock/v1/trading/inquire-psamount": "TTTS3007R",
+    "/uapi/overseas-stock/v1/trading/inquire-ccnl": "TTTS3035R",
+    "/uapi/overseas-stock/v1/trading/inquire-nccs": "TTTS3018R",
+    "/uapi/overseas-stock/v1/trading/order": "TTTT1002U",
+    "/uapi/overseas-stock/v1/trading/order-rvsecncl": "TTTT1004U"
+}
+
+
+def _price_text(value):
+    """가격을 KIS 응답처럼 문자열로 만듭니다."""
+    return f"{value:.4f}"
+
+
+class MockKisServer:
+    """
+    한국투자증권 API 가짜 서버
+
+    Examples:
+        server = MockKisServer(cash=10000)
+        server.set_market("TQQQ", open_price=50.0, last_price=51.0)
+        server.start()
+        os.environ["KIS_DOMAIN"] = server.url
+        ...
+        server.stop()
+    """
+
+    def __init__(self, cash=10000.0, latency=0.0, latency_by_path=None, calls_per_second=None,
+                 token_interval_seconds=0.0, page_size=20, script=None, advance_every=0):
+        """
+        Parameters:
+            cash (float): 주문 가능 외화 금액
+            latency (float): 모든 응답에 더할 지연 시간 (초)
+            latency_by_path (dict): API 경로 끝부분별 지연 시간 (예: {"order": 0.2})
+            calls_per_second (int): 초당 호출 한도 (None이면 제한 없음)
+            token_interval_seconds (float): 토큰 재발급 제한 시간 (0이면 제한 없음)
+            page_size (int): 연속조회 한 페이지의 건수
+            script (list): 시세 시나리오 [{종목: {"last": 가격, ...}}, ...]
+            advance_every (int): 현재가상세 조회가 이 횟수만큼 오면 자동으로 다음 단계로 (0이면 자동 진행 안 함)
+        """
+        self.cash = float(cash)
+        self.latency = latency
+        self.latency_by_path = latency_by_path or {}
+        self.calls_per_second = calls_per_second
+        self.token_interval_seconds = token_interval_seconds
+        self.page_size = page_size
+        self.script = list(script or [])
+        self.advance_every = advance_every
+
+        self.market = {}    # 종목별 시세
+        self.holdings = {}  # 종목별 보유 {"quantity", "avg_price", "exchange"}
+        self.orders = []    # 주문 목록 (주문체결내역 형식)
+
+        # 호출 기록
+        self.call_counts = {}
+        self.rate_limited_count = 0
+
+        self._lock = threading.Lock()
+        self._call_times = deque()
+        self._token = None
+        self._token_issued_at = None
+        self.approval_key = None
+        self._next_odno = 1
+        self._script_index = 0
+        self._price_detail_calls = 0
+        self._http_server = None
+        self._thread = None
+
+    # ========================================
+    # 시장 상태 설정
+    # ========================================
+
+    def set_market(self, symbol, open_price, last_price, exchange="NAS", name=None, tradable=True,
+                   base_price=None, volume=1000000):
+        """
+        종목의 시세를 설정합니다.
+        """
+        with self._lock:
+            self.market[symbol] = {
+                "exchange": exchange,
+                "name": name or symbol,
+                "open": float(open_price),
+                "last": float(last_price),
+                "high": max(float(open_price), float(last_price)),
+                "low": min(float(open_price), float(last_price)),
+                "base": float(base_price if base_price is not None else open_price),
+                "tvol": int(volume),
+                "ordy": "Y" if tradable else "N",
+                "book": None,
+                "bars": []
+            }
+
+    def set_order_book(self, symbol, bids, asks):
+        """
+        종목의 호가를 설정합니다. (설정하지 않으면 현재가 ±0.01에 100주씩)
+
+        Parameters:
+            bids (list): [(매수호가, 잔량), ...] 가격이 높은 순
+            asks (list): [(매도호가, 잔량), ...] 가격이 낮은 순
+        """
+        with self._lock:
+            self.market[symbol]["book"] = {"bids": list(bids), "asks": list(asks)}
+
+    def set_minute_bars(self, symbol, bars):
+        """
+        종목의 분봉을 설정합니다.
+
+        Parameters:
+            bars (list): [(현지 일자 "YYYYMMDD", 현지 시각 "HHMMSS", 시가, 고가, 저가, 종가, 체결량), ...] 시각 오름차순
+        """
+        with self._lock:
+            self.market[symbol]["bars"] = list(bars)
+
+    def set_holding(self, symbol, quantity, avg_price):
+        """
+        종목의 보유 수량과 평단가를 설정합니다.
+        """
+        with self._lock:
+            exchange = self.market.get(symbol, {}).get("exchange", "NAS")
+            self.holdings[symbol] = {
+                "quantity": int(quantity),
+                "avg_price": float(avg_price),
+                "exchange": ORDER_EXCHANGE_CODES.get(exchange, exchange)
+            }
+
+    def add_filled_order(self, symbol, side, quantity, price, ord_dt=None, ord_tmd="093000"):
+        """
+        과거 체결 내역을 추가합니다. (체결내역 조회 결과를 미리 만들어 둘 때 사용)
+
+        보유 수량은 바꾸지 않으므로, 필요하면 set_holding()도 함께 호출하세요.
+        """
+        with self._lock:
+            order = self._new_order(symbol, side, "00", quantity, price, ord_dt=ord_dt, ord_tmd=ord_tmd)
+            order["ft_ccld_qty"] = int(quantity)
+            order["ft_ccld_amt3"] = quantity * price
+            order["ft_ccld_unpr3"] = float(price)
+            order["nccs_qty"] = 0
+            return order["odno"]
+
+    def advance_market(self):
+        """
+        시나리오의 다음 단계를 적용합니다.
+
+        Returns:
+            bool: 적용할 단계가 있었으면 True
+        """
+        with self._lock:
+            return self._advance_market_locked()
+
+    def _advance_market_locked(self):
+        if self._script_index >= len(self.script):
+            return False
+
+        step = self.script[self._script_index]
+        self._script_index += 1
+
+        for symbol, fields in step.items():
+            quote = self.market.get(symbol)
+            if quote is None:
+                continue
+            for key, value in fields.items():
+                quote[key] = value
+            quote["high"] = max(quote["high"], quote["last"])
+            quote["low"] = min(quote["low"], quote["last"])
+            self._fill_marketable_limits(symbol)
+
+        return True
+
+    def close_market(self):
+        """
+        장 마감을 흉내 냅니다. 현재가를 종가로 보고 LOC/MOC 주문을 체결합니다.
+
+        Returns:
+            int: 체결된 주문 수
+        """
+        filled_count = 0
+
+        with self._lock:
+            for order in self.orders:
+                if order["nccs_qty"] == 0 or order["order_type"] not in ("LOC", "MOC"):
+                    continue
+
+                close_price = self.market[order["pdno"]]["last"]
+                limit_price = order["ft_ord_unpr3"]
+                is_buy = order["sll_buy_dvsn_cd"] == "02"
+
+                if order["order_type"] == "LOC":
+                    if is_buy and close_price > limit_price:
+                        continue
+                    if not is_buy and close_price < limit_price:
+                        continue
+
+                self._fill(order, close_price)
+                filled_count += 1
+
+        return filled_count
+
+    # ========================================
+    # 주문 처리
+    # ========================================
+
+    def _new_order(self, symbol, side, ord_dvsn, quantity, price, ord_dt=None, ord_tmd=None, orgn_odno=""):
+        now = datetime.now()
+        exchange = self.market.get(symbol, {}).get("exchange", "NAS")
+
+        order = {
+            "ord_dt": ord_dt or now.strftime("%Y%m%d"),
+            "ord_tmd": ord_tmd or now.strftime("%H%M%S"),
+            "odno": f"{self._next_odno:010d}",
+            "orgn_odno": orgn_odno,
+            "pdno": symbol,
+            "prdt_name": self.market.get(symbol, {}).get("name", symbol),
+            "sll_buy_dvsn_cd": "02" if side == "BUY" else "01",
+            "sll_buy_dvsn_cd_name": "매수" if side == "BUY" else "매도",
+            "order_type": ORDER_TYPES.get(ord_dvsn, ord_dvsn),
+            "ft_ord_qty": int(quantity),
+            "ft_ord_unpr3": float(price),
+            "ft_ccld_qty": 0,
+            "ft_ccld_unpr3": 0.0,
+            "ft_ccld_amt3": 0.0,
+            "nccs_qty": int(quantity),
+            "prcs_stat_name": "완료",
+            "rjct_rson_name": "",
+            "ovrs_excg_cd": ORDER_EXCHANGE_CODES.get(exchange, exchange),
+            "tr_crcy_cd": "USD"
+        }
+        self._next_odno += 1
+        self.orders.append(order)
+        return order
+
+    def _fill(self, order, fill_price):
+        """미체결 수량 전체를 fill_price에 체결하고 잔고/예수금을 바꿉니다."""
+        quantity = order["nccs_qty"]
+        symbol = order["pdno"]
+
+        order["ft_ccld_qty"] += quantity
+        order["ft_ccld_amt3"] += quantity * fill_price
+        order["ft_ccld_unpr3"] = order["ft_ccld_amt3"] / order["ft_ccld_qty"]
+        order["nccs_qty"] = 0
+
+        holding = self.holdings.get(symbol)
+        if order["sll_buy_dvsn_cd"] == "02":
+            self.cash -= quantity * fill_price
+            if holding is None:
+                holding = {"quantity": 0, "avg_price": 0.0, "exchange": order["ovrs_excg_cd"]}
+                self.holdings[symbol] = holding
+            total_cost = holding["quantity"] * holding["avg_price"] + quantity * fill_price
+            holding["quantity"] += quantity
+            holding["avg_price"] = total_cost / holding["quantity"]
+        else:
+            self.cash += quantity * fill_price
+            holding["quantity"] -= quantity
+            if holding["quantity"] == 0:
+                del self.holdings[symbol]
+
+    def _fill_marketable_limits(self, symbol):
+        """현재가로 바로 체결 가능한 LIMIT 주문을 체결합니다."""
+        last_price = self.market[symbol]["last"]
+
+        for order in self.orders:
+            if order["pdno"] != symbol or order["nccs_qty"] == 0 or order["order_type"] != "LIMIT":
+                continue
+            is_buy = order["sll_buy_dvsn_cd"] == "02"
+            if (is_buy and order["ft_ord_unpr3"] >= last_price) or (not is_buy and order["ft_ord_unpr3"] <= last_price):
+                self._fill(order, last_price)
+
+    def _reserved_cash(self):
+        """미체결 매수 주문에 묶인 금액"""
+        reserved = 0.0
+        for order in self.orders:
+            if order["sll_buy_dvsn_cd"] == "02" and order["nccs_qty"] > 0:
+                price = order["ft_ord_unpr3"] or self.market[order["pdno"]]["last"]
+                reserved += order["nccs_qty"] * price
+        return reserved
+
+    def _sellable_quantity(self, symbol):
+        """보유 수량 중 미체결 매도 주문에 묶이지 않은 수량"""
+        holding_qty = self.holdings.get(symbol, {}).get("quantity", 0)
+        open_sell_qty = sum(
+            order["nccs_qty"] for order in self.orders
+            if order["pdno"] == symbol and order["sll_buy_dvsn_cd"] == "01"
+        )
+        return holding_qty - open_sell_qty
+
+    # ========================================
+    # API 응답 만들기
+    # ========================================
+
+    def handle(self, method, path, headers, params, body):
+        """
+        요청 하나를 처리하고 (HTTP 상태, 응답 헤더, 응답 바디)를 돌려줍니다.
+        """
+        tr_id = PATH_TR_IDS.get(path)
+        if tr_id is None:
+            return 404, {}, {"rt_cd": "1", "msg_cd": "EGW00404", "msg1": "없는 API입니다."}
+
+        delay = self.latency + self.latency_by_path.get(path.rsplit("/", 1)[-1], 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+        with self._lock:
+            self.call_counts[tr_id] = self.call_counts.get(tr_id, 0) + 1
+
+            if tr_id == "tokenP":
+                return self._issue_token(body)
+            if tr_id == "Approval":
+                return self._issue_approval_key(body)
+
+            if self._is_rate_limited():
+                self.rate_limited_count += 1
+                return 500, {}, {"rt_cd": "1", "msg_cd": "EGW00201", "msg1": "초당 거래건수를 초과하였습니다."}
+
+            if headers.get("authorization") != f"Bearer {self._token}":
+                return 500, {}, {"rt_cd": "1", "msg_cd": "EGW00123", "msg1": "기간이 만료된 token 입니다."}
+
+            if tr_id == "HHDFS00000300":
+                return self._quotation(params)
+            if tr_id == "HHDFS76200200":
+                return self._price_detail(params)
+            if tr_id == "HHDFS76200100":
+                return self._asking_price(params)
+            if tr_id == "CTPF1702R":
+                return self._product_info(params)
+            if tr_id == "HHDFS76950200":
+                return self._minute_bars(params)
+            if tr_id == "TTTS3012R":
+                return self._balance(params)
+            if tr_id == "TTTS3007R":
+                return self._purchase_amount(params)
+            if tr_id == "TTTS3035R":
+                return self._order_history(headers, params)
+            if tr_id == "TTTS3018R":
+                return self._open_orders(headers, params)
+            if tr_id == "TTTT1002U":
+                # 같은 주소로 매수(TTTT1002U)와 매도(TTTT1006U)를 받습니다
+                side = "SELL" if headers.get("tr_id") == "TTTT1006U" else "BUY"
+                return self._place_order(side, body)
+            return self._revise_or_cancel(body)
+
+    def _is_rate_limited(self):
+        if not self.calls_per_second:
+            return False
+
+        now = time.monotonic()
+        while self._call_times and now - self._call_times[0] >= 1.0:
+            self._call_times.popleft()
+
+        if len(self._call_times) >= self.calls_per_second:
+            return True
+
+        self._call_times.append(now)
+        return False
+
+    def _issue_token(self, body):
+        now = time.monotonic()
+
+        if not body.get("appkey") or not body.get("appsecret"):
+            return 403, {}, {"error_code": "EGW00103", "error_description": "유효하지 않은 AppKey입니다."}
+
+        if self._token_issued_at is not None and now - self._token_issued_at < self.token_interval_seconds:
+            return 403, {}, {"error_code": "EGW00133", "error_description": "접근토큰 발급 잠시 후 다시 시도하세요(1분당 1회)"}
+
+        self._token = f"mock-token-{int(time.time() * 1000)}"
+        self._token_issued_at = now
+        return 200, {}, {
+            "access_token": self._token,
+            "token_type": "Bearer",
+            "expires_in": 86400,
+            "access_token_token_expired": "2099-12-31 23:59:59"
+        }
+
+    def _issue_approval_key(self, body):
+        if not body.get("appkey") or not body.get("secretkey"):
+            return 403, {}, {"error_code": "EGW00103", "error_description": "유효하지 않은 AppKey입니다."}
+
+        self.approval_key = f"mock-approval-{int(time.time() * 1000)}"
+        return 200, {}, {"approval_key": self.approval_key}
+
+    def _find_quote(self, params):
+        symbol = params.get("SYMB", "")
+        quote = self.market.get(symbol)
+        if quote is None or quote["exchange"] != params.get("EXCD", ""):
+            return symbol, None
+        return symbol, quote
+
+    def _quotation(self, params):
+        symbol, quote = self._find_quote(params)
+        if quote is None:
+            return 200, {}, {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output": {"rsym": "", "last": "", "ordy": ""}}
+
+        diff = quote["last"] - quote["base"]
+        return 200, {}, {
+            "rt_cd": "0",
+            "msg_cd": "MCA00000",
+            "msg1": "정상처리 되었습니다.",
+            "output": {
+                "rsym": f"D{quote['exchange']}{symbol}",
+                "last": _price_text(quote["last"]),
+                "base": _price_text(quote["base"]),
+                "diff": _price_text(abs(diff)),
+                "rate": f"{diff / quote['base'] * 100:.2f}" if quote["base"] else "0.00",
+                "sign": "2" if diff > 0 else ("5" if diff < 0 else "3"),
+                "tvol": str(quote["tvol"]),
+                "tamt": str(int(quote["tvol"] * quote["last"])),
+                "ordy": quote["ordy"]
+            }
+        }
+
+    def _price_detail(self, params):
+        symbol, quote = self._find_quote(params)
+
+        # 조회 횟수에 따라 시나리오를 자동으로 진행합니다
+        self._price_detail_calls += 1
+        if self.advance_every and self._price_detail_calls % self.advance_every == 0:
+            self._advance_market_locked()
+
+        if quote is None:
+            return 200, {}, {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output": {"rsym": "", "last": "", "open": ""}}
+
+        return 200, {}, {
+            "rt_cd": "0",
+            "msg_cd": "MCA00000",
+            "msg1": "정상처리 되었습니다.",
+            "output": {
+                "rsym": f"D{quote['exchange']}{symbol}",
+                "last": _price_text(quote["last"]),
+                "open": _price_text(quote["open"]),
+                "high": _price_text(quote["high"]),
+                "low": _price_text(quote["low"]),
+                "base": _price_text(quote["base"]),
+                "tvol": str(quote["tvol"]),
+                "tamt": str(int(quote["tvol"] * quote["last"])),
+                "curr": "USD",
+                "vnit": "1",
+                "e_hogau": "0.0100" if quote["last"] >= 1 else "0.0001",
+                "e_ordyn": "매매 가능" if quote["ordy"] == "Y" else "매매 불가"
+            }
+        }
+
+    def _product_info(self, params):
+        symbol = params.get("PDNO", "")
+        quote = self.market.get(symbol)
+        if quote is None or PRODUCT_TYPE_EXCHANGES.get(params.get("PRDT_TYPE_CD")) != quote["exchange"]:
+            return 200, {}, {"rt_cd": "1", "msg_cd": "KIOK0560", "msg1": "조회할 내용이 없습니다."}
+
+        return 200, {}, {
+            "rt_cd": "0",
+            "msg_cd": "KIOK0000",
+            "msg1": "정상처리 되었습니다.",
+            "output": {
+                "std_pdno": symbol,
+                "prdt_name": quote["name"],
+                "prdt_eng_name": quote["name"],
+                "natn_cd": "840",
+                "ovrs_excg_cd": ORDER_EXCHANGE_CODES.get(quote["exchange"], quote["exchange"]),
+                "tr_crcy_cd": "USD"
+            }
+        }
+
+    def _asking_price(self, params):
+        symbol, quote = self._find_quote(params)
+        if quote is None:
+            return 200, {}, {"rt_cd": "0", "msg_cd": "MCA00000", "msg1": "정상처리 되었습니다.", "output1": {"rsym": "", "last": ""}, "output2": {}}
+
+        book = quote["book"] or {
+            "bids": [(round(quote["last"] - 0.01, 4), 100)],
+            "asks": [(round(quote["last"] + 0.01, 4), 100)]
+        }
+
+        output2 = {}
+        for level in range(1, 11):
+            bid = book["bids"][level - 1] if level <= len(book["bids"]) else (0, 0)
+            ask = book["asks"][level - 1] if level <= len(book["asks"]) else (0, 0)
+            output2[f"pbid{level}"] = _price_text(bid[0])
+            output2[f"vbid{level}"] = str(bid[1])
+            output2[f"pask{level}"] = _price_text(ask[0])
+            output2[f"vask{level}"] = str(ask[1])
+
+        return 200, {}, {
+            "rt_cd": "0",
+            "msg_cd": "MCA00000",
+            "msg1": "정상처리 되었습니다.",
+            "output1": {
+                "rsym": f"D{quote['exchange']}{symbol}",
+                "curr": "USD",
+                "open": _price_text(quote["open"]),
+                "high": _price_text(quote["high"]),
+                "low": _price_text(quote["low"]),
+                "last": _price_text(quote["last"]),
+                "base": _price_text(quote["base"])
+            },
+            "output2": output2
+        }
+
+    def _minute_bars(self, params):
+        symbol, quote = self._find_quote(params)
+        bars = quote["bars"] if quote else []
+
+        # 최신 분봉부터, 다음 조회면 KEYB(앞 페이지 마지막 분봉의 일자 + 시각)보다 오래된 분봉부터 돌려줍니다
+        newest_first = bars[::-1]
+        if params.get("NEXT") == "1" and params.get("KEYB"):
+            newest_first = [bar for bar in newest_first if bar[0] + bar[1] < params["KEYB"]]
+
+        page_size = min(int(params.get("NREC") or "120"), 120)
+        page = newest_first[:page_size]
+        more = len(newest_first) > page_size
+
+        return 200, {}, {
+            "rt_cd": "0",
+            "msg_cd": "MCA00000",
+            "msg1": "정상처리 되었습니다.",
+            "output1": {
+                "rsym": f"D{quote['exchange']}{symbol}" if quote else "",
+                "next": "1" if more else "",
+                "more": "Y" if more else "N",
+                "nrec": str(len(page))
+            },
+            "output2": [
+                {
+                    "xymd": trade_date,
+                    "xhms": bar_time,
+                    "open": _price_text(open_price),
+                    "high": _price_text(high_price),
+                    "low": _price_text(low_price),
+                    "last": _price_text(close_price),
+                    "evol": str(volume),
+                    "eamt": str(int(volume * close_price))
+                }
+                for trade_date, bar_time, open_price, high_price, low_price, close_price, volume in page
+            ]
+        }
+
+    def _balance(self, params):
+        exchange = params.get("OVRS_EXCG_CD", "")
+        items = []
+
+        for symbol, holding in self.holdings.items():
+            if exchange and holding["exchange"] != exchange:
+                continue
+            last_price = self.market.get(symbol, {}).get("last", holding["avg_price"])
+            eval_amount = holding["quantity"] * last_price
+            cost = holding["quantity"] * holding["avg_price"]
+            items.append({
+                "ovrs_pdno": symbol,
+                "ovrs_item_name": self.market.get(symbol, {}).get("name", symbol),
+                "ovrs_cblc_qty": str(holding["quantity"]),
+                "ord_psbl_qty": str(self._sellable_quantity(symbol)),
+                "pchs_avg_pric": _price_text(holding["avg_price"]),
+                "now_pric2": _price_text(last_price),
+                "ovrs_stck_evlu_amt": f"{eval_amount:.2f}",
+                "evlu_pfls_rt": f"{(eval_amount - cost) / cost * 100:.2f}" if cost else "0.00",
+                "tr_crcy_cd": "USD",
+                "ovrs_excg_cd": holding["exchange"]
+            })
+
+        return 200, {"tr_cont": "D"}, {
+            "rt_cd": "0",
+            "msg_cd": "KIOK0510",
+            "msg1": "조회가 완료되었습니다",
+            "ctx_area_fk200": "",
+            "ctx_area_nk200": "",
+            "output1": items,
+            "output2": {"frcr_pchs_amt1": f"{sum(h['quantity'] * h['avg_price'] for h in self.holdings.values()):.2f}"}
+        }
+
+    def _purchase_amount(self, params):
+        price = float(params.get("OVRS_ORD_UNPR") or "0")
+        orderable_cash = max(self.cash - self._reserved_cash(), 0.0)
+        max_qty = math.floor(orderable_cash / price) if price > 0 else 0
+
+        return 200, {}, {
+            "rt_cd": "0",
+            "msg_cd": "KIOK0510",
+            "msg1": "조회가 완료되었습니다",
+            "output": {
+                "tr_crcy_cd": "USD",
+                "ord_psbl_frcr_amt": f"{orderable_cash:.2f}",
+                "sll_ruse_psbl_amt": "0.00",
+                "ovrs_ord_psbl_amt": f"{orderable_cash:.2f}",
+                "max_ord_psbl_qty": str(max_qty),
+                "echm_af_ord_psbl_amt": "0.00",
+                "echm_af_ord_psbl_qty": "0",
+                "ord_psbl_qty": str(max_qty),
+                "exrt": "1350.0000",
+                "frcr_ord_psbl_amt1": f"{orderable_cash:.2f}",
+                "ovrs_max_ord_psbl_qty": str(max_qty)
+            }
+        }
+
+    def _page(self, rows, headers, params):
+        """
+        연속조회: 요청의 CTX_AREA_NK200에 담긴 위치부터 page_size건을 잘라 돌려줍니다.
+        """
+        start = 0
+        if headers.get("tr_cont") == "N" and params.get("CTX_AREA_NK200", "").strip():
+            start = int(params["CTX_AREA_NK200"].strip())
+
+        page_rows = rows[start:start + self.page_size]
+        next_start = start + self.page_size
+        has_more = next_start < len(rows)
+
+        return page_rows, ("M" if has_more else "D"), (str(next_start) if has_more else "")
+
+    def _format_order(self, order):
+        row = dict(order)
+        del row["order_type"]
+        for key in ("ft_ord_qty", "ft_ccld_qty", "nccs_qty"):
+            row[key] = str(row[key])
+        for key in ("ft_ord_unpr3", "ft_ccld_unpr3"):
+            row[key] = _price_text(row[key])
+        row["ft_ccld_amt3"] = f"{row['ft_ccld_amt3']:.2f}"
+        return row
+
+    def _order_history(self, headers, params):
+        symbol = params.get("PDNO", "%")
+        exchange = params.get("OVRS_EXCG_CD", "%")
+        start_date = params.get("ORD_STRT_DT", "")
+        end_date = params.get("ORD_END_DT", "")
+        ccld_nccs = params.get("CCLD_NCCS_DVSN", "00")
+
+        rows = []
+        for order in self.orders:
+            if symbol not in ("", "%") and order["pdno"] != symbol:
+                continue
+            if exchange not in ("", "%") and order["ovrs_excg_cd"] != exchange:
+                continue
+            if (start_date and order["ord_dt"] < start_date) or (end_date and order["ord_dt"] > end_date):
+                continue
+            if ccld_nccs == "01" and order["ft_ccld_qty"] == 0:
+                continue
+            if ccld_nccs == "02" and order["nccs_qty"] == 0:
+                continue
+            rows.append(order)
+
+        # 정렬순서 (AS: 최신이 먼저, DS: 오래된 것이 먼저)
+        rows.sort(
+            key=lambda order: (order["ord_dt"], order["ord_tmd"], order["odno"]),
+            reverse=params.get("SORT_SQN", "AS") != "DS"
+        )
+
+        page_rows, tr_cont, next_key = self._page(rows, headers, params)
+        return 200, {"tr_cont": tr_cont}, {
+            "rt_cd": "0",
+            "msg_cd": "KIOK0510",
+            "msg1": "조회가 완료되었습니다",
+            "ctx_area_fk200": next_key,
+            "ctx_area_nk200": next_key,
+            "output": [self._format_order(order) for order in page_rows]
+        }
+
+    def _open_orders(self, headers, params):
+        exchange = params.get("OVRS_EXCG_CD", "")
+
+        rows = [
+            order for order in self.orders
+            if order["nccs_qty"] > 0 and (not exchange or order["ovrs_excg_cd"] == exchange)
+        ]
+        rows.sort(key=lambda order: order["odno"], reverse=True)
+
+        page_rows, tr_cont, next_key = self._page(rows, headers, params)
+        return 200, {"tr_cont": tr_cont}, {
+            "rt_cd": "0",
+            "msg_cd": "KIOK0510",
+            "msg1": "조회가 완료되었습니다",
+            "ctx_area_fk200": next_key,
+            "ctx_area_nk200": next_key,
+            "output": [self._format_order(order) for order in page_rows]
+        }
+
+    def _order_response(self, order):
+        return 200, {}, {
+            "rt_cd": "0",
+            "msg_cd": "APBK0013",
+            "msg1": "주문 전송 완료 되었습니다.",
+            "output": {
+                "KRX_FWDG_ORD_ORGNO": "91252",
+                "ODNO": order["odno"],
+                "ORD_TMD": order["ord_tmd"]
+            }
+        }
+
+    def _place_order(self, side, body):
+        symbol = body.get("PDNO", "")
+        ord_dvsn = body.get("ORD_DVSN", "")
+        quantity = int(body.get("ORD_QTY") or "0")
+        price = float(body.get("OVRS_ORD_UNPR") or "0")
+
+        quote = self.market.get(symbol)
+        if quote is None or ORDER_EXCHANGE_CODES.get(quote["exchange"]) != body.get("OVRS_EXCG_CD"):
+            return 200, {}, {"rt_cd": "1", "msg_cd": "APBK0656", "msg1": "해당종목정보가 없습니다."}
+        if ord_dvsn not in ORDER_TYPES or quantity <= 0:
+            return 200, {}, {"rt_cd": "1", "msg_cd": "APBK0919", "msg1": "주문구분 또는 수량이 올바르지 않습니다."}
+
+        if side == "BUY":
+            needed = quantity * (price or quote["last"])
+            if needed > self.cash - self._reserved_cash() + 1e-9:
+                return 200, {}, {"rt_cd": "1", "msg_cd": "APBK0952", "msg1": "주문가능금액을 초과 했습니다"}
+        elif quantity > self._sellable_quantity(symbol):
+            return 200, {}, {"rt_cd": "1", "msg_cd": "APBK0400", "msg1": "주문 가능한 수량을 초과하였습니다."}
+
+        order = self._new_order(symbol, side, ord_dvsn, quantity, price)
+        if order["order_type"] == "LIMIT":
+            self._fill_marketable_limits(symbol)
+
+        return self._order_response(order)
+
+    def _revise_or_cancel(self, body):
+        original_odno = body.get("ORGN_ODNO", "")
+        original = next((order for order in self.orders if order["odno"] == original_odno), None)
+
+        if original is None or original["nccs_qty"] == 0:
+            return 200, {}, {"rt_cd": "1", "msg_cd": "APBK0915", "msg1": "정정/취소할 수 있는 주문이 없습니다."}
+
+        remaining_qty = original["nccs_qty"]
+        original["nccs_qty"] = 0
+
+        if body.get("RVSE_CNCL_DVSN_CD") == "02":
+            # 취소: 취소 주문 1건을 남깁니다
+            side = "BUY" if original["sll_buy_dvsn_cd"] == "02" else "SELL"
+            cancel_order = self._new_order(original["pdno"], side, "00", remaining_qty, 0, orgn_odno=original_odno)
+            cancel_order["order_type"] = "CANCEL"
+            cancel_order["nccs_qty"] = 0
+            cancel_order["prcs_stat_name"] = "취소"
+            return self._order_response(cancel_order)
+
+        # 정정: 같은 유형의 새 가격 주문을 만듭니다
+        side = "BUY" if original["sll_buy_dvsn_cd"] == "02" else "SELL"
+        ord_dvsn = next((code for code, name in ORDER_TYPES.items() if name == original["order_type"]), "00")
+        new_order = self._new_order(
+            original["pdno"], side, ord_dvsn,
+            int(body.get("ORD_QTY") or remaining_qty),
+            float(body.get("OVRS_ORD_UNPR") or "0"),
+            orgn_odno=original_odno
+        )
+        if new_order["order_type"] == "LIMIT":
+            self._fill_marketable_limits(original["pdno"])
+
+        return self._order_response(new_order)
+
+    # ========================================
+    # 서버 켜기 / 끄기
+    # ========================================
+
+    @property
+    def url(self):
+        """클라이언트의 KIS_DOMAIN으로 쓸 주소"""
+        host, port = self._http_server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host="127.0.0.1", port=0):
+        """
+        백그라운드 스레드에서 서버를 켭니다. (port=0이면 비어 있는 포트를 사용)
+
+        Returns:
+            str: 서버 주소 (예: "http://127.0.0.1:54321")
+        """
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _respond(self, method):
+                parsed = urlparse(self.path)
+                params = {key: values[0] for key, values in parse_qs(parsed.query, keep_blank_values=True).items()}
+                length = int(self.headers.get("Content-Length") or "0")
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                headers = {key.lower(): value for key, value in self.headers.items()}
+
+                status, response_headers, response_body = mock.handle(method, parsed.path, headers, params, body)
+
+                payload = json.dumps(response_body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in response_headers.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def do_GET(self):
+                self._respond("GET")
+
+            def do_POST(self):
+                self._respond("POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._http_server = ThreadingHTTPServer((host, port), Handler)
+        self._http_server.daemon_threads = True
+        self._thread = threading.Thread(target=self._http_server.serve_forever, name="mock-kis-server", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        """서버를 끕니다."""
+        if self._http_server is not None:
+            self._http_server.shutdown()
+            self._http_server.server_close()
+            self._http_server = None
+
+
+if __name__ == "__main__":
+    # 직접 실행: TQQQ 시세와 보유 잔고가 있는 가짜 서버를 켜 둡니다
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8999
+    server = MockKisServer(cash=10000, calls_per_second=20, token_interval_seconds=60)
+    server.set_market("TQQQ", open_price=50.0, last_price=51.23)
+    server.set_holding("TQQQ", quantity=8, avg_price=49.5)
+    server.add_filled_order("TQQQ", "BUY", 4, 49.0, ord_dt=datetime.now().strftime("%Y%m%d"), ord_tmd="050000")
+    server.add_filled_order("TQQQ", "BUY", 4, 50.0, ord_dt=datetime.now().strftime("%Y%m%d"), ord_tmd="060000")
+    url = server.start(port=port)
+
+    print(f"가짜 한국투자증권 서버 실행 중: {url}")
+    print(f"다른 터미널에서: KIS_DOMAIN={url} KIS_APP_KEY=mock KIS_APP_SECRET=mock python tests/test_dryrun.py")
+    print("종료하려면 Ctrl+C")
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,276 @@
+"""
+한국투자증권 실시간 시세(WebSocket)를 흉내 내는 테스트용 가짜 서버
+
+실제 서버처럼
+- 종목 등록/해제 메시지(tr_type 1/2)에 JSON으로 결과를 답하고
+- 등록된 종목에만 실시간 데이터("0|HDFSCNT0|001|값^값...")를 보내고
+- 연결 확인 메시지(PINGPONG)를 보냅니다.
+테스트에서는 push_trade() / push_quote()로 시세를 보내고,
+drop_connections()로 연결을 끊어 자동 재접속을 확인할 수 있습니다.
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import socketserver
+import struct
+import threading
+
+_WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+# 실시간 체결가(HDFSCNT0) 항목 수와 호가(HDFSASP0) 항목 수
+TRADE_FIELD_COUNT = 26
+QUOTE_FIELD_COUNT = 17
+
+
+def _read_exact(connection, size):
+    data = b""
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("연결이 끊어졌습니다.")
+        data += chunk
+    return data
+
+
+def _send_frame(connection, opcode, payload):
+    """서버가 보내는 프레임 (마스킹하지 않음)"""
+    header = bytes([0x80 | opcode])
+    length = len(payload)
+    if length < 126:
+        header += bytes([length])
+    elif length < 65536:
+        header += bytes([126]) + struct.pack("!H", length)
+    else:
+        header += bytes([127]) + struct.pack("!Q", length)
+    connection.sendall(header + payload)
+
+
+def _recv_frame(connection):
+    """클라이언트가 보낸 프레임 하나를 읽습니다. (opcode, payload)"""
+    first, second = _read_exact(connection, 2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", _read_exact(connection, 2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", _read_exact(connection, 8))[0]
+    mask = _read_exact(connection, 4) if second & 0x80 else b"\0\0\0\0"
+    payload = _read_exact(connection, length)
+    return opcode, bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+
+
+class MockKisWebSocket:
+    """
+    한국투자증권 실시간 시세 가짜 서버
+
+    Examples:
+        ws_server = MockKisWebSocket(approval_key="mock-approval")
+        url = ws_server.start()
+        ...
+        ws_server.push_trade("TQQQ", last=51.2, open_price=50.0)
+        ws_server.stop()
+    """
+
+    def __init__(self, approval_key=None):
+        """
+        Parameters:
+            approval_key (str): 받아들일 접속키 (None이면 아무 키나 허용)
+        """
+        self.approval_key = approval_key
+        self.connection_count = 0
+        self.received_messages = []
+
+        self._lock = threading.Lock()
+        self._clients = {}  # 연결 -> 등록된 (tr_id, tr_key) 집합
+        self._server = None
+
+    # ========================================
+    # 연결 처리
+    # ========================================
+
+    def _handle_connection(self, connection):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = connection.recv(4096)
+            if not chunk:
+                return
+            request += chunk
+
+        key = ""
+        for line in request.decode("latin-1").split("\r\n"):
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "sec-websocket-key":
+                key = value.strip()
+
+        accept = base64.b64encode(hashlib.sha1((key + _WEBSOCKET_GUID).encode("ascii")).digest()).decode("ascii")
+        connection.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {accept}\r\n"
+            "\r\n"
+        ).encode("ascii"))
+
+        with self._lock:
+            self._clients[connection] = set()
+            self.connection_count += 1
+
+        try:
+            while True:
+                opcode, payload = _recv_frame(connection)
+                if opcode == 0x8:  # close
+                    break
+                if opcode == 0x9:  # ping
+                    with self._lock:
+                        _send_frame(connection, 0xA, payload)
+                    continue
+                if opcode == 0x1:
+                    self._handle_text(connection, payload.decode("utf-8"))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            with self._lock:
+                self._clients.pop(connection, None)
+
+    def _handle_text(self, connection, text):
+        message = json.loads(text)
+        header = message.get("header", {})
+
+        with self._lock:
+            self.received_messages.append(message)
+
+            # 클라이언트가 돌려보낸 PINGPONG
+            if header.get("tr_id") == "PINGPONG":
+                return
+
+            tr_input = message.get("body", {}).get("input", {})
+            tr_id = tr_input.get("tr_id", "")
+            tr_key = tr_input.get("tr_key", "")
+
+            if self.approval_key is not None and header.get("approval_key") != self.approval_key:
+                body = {"rt_cd": "1", "msg_cd": "OPSP0011", "msg1": "invalid approval : NOT FOUND"}
+            elif header.get("tr_type") == "1":
+                self._clients[connection].add((tr_id, tr_key))
+                body = {"rt_cd": "0", "msg_cd": "OPSP0000", "msg1": "SUBSCRIBE SUCCESS", "output": {"iv": "0", "key": "0"}}
+            else:
+                self._clients[connection].discard((tr_id, tr_key))
+                body = {"rt_cd": "0", "msg_cd": "OPSP0001", "msg1": "UNSUBSCRIBE SUCCESS"}
+
+            response = {"header": {"tr_id": tr_id, "tr_key": tr_key, "encrypt": "N"}, "body": body}
+            _send_frame(connection, 0x1, json.dumps(response).encode("utf-8"))
+
+    # ========================================
+    # 시세 보내기
+    # ========================================
+
+    def subscriber_count(self, tr_id, tr_key):
+        """해당 실시간 데이터에 등록된 연결 수"""
+        with self._lock:
+            return sum(1 for subscriptions in self._clients.values() if (tr_id, tr_key) in subscriptions)
+
+    def _broadcast(self, tr_id, tr_key, values):
+        payload = f"0|{tr_id}|001|{'^'.join(values)}".encode("utf-8")
+        sent_count = 0
+        with self._lock:
+            for connection, subscriptions in list(self._clients.items()):
+                if (tr_id, tr_key) in subscriptions:
+                    try:
+                        _send_frame(connection, 0x1, payload)
+                        sent_count += 1
+                    except OSError:
+                        pass
+        return sent_count
+
+    def push_trade(self, symbol, last, open_price=None, high=None, low=None, bid=None, ask=None,
+                   volume=1000, exchange="NAS", exchange_time="093000"):
+        """
+        실시간 체결가(HDFSCNT0)를 보냅니다.
+
+        Returns:
+            int: 보낸 연결 수
+        """
+        values = [""] * TRADE_FIELD_COUNT
+        values[0] = f"D{exchange}{symbol}"                              # RSYM
+        values[1] = symbol                                              # SYMB
+        values[2] = "4"                                                 # ZDIV
+        values[5] = exchange_time                                       # XHMS
+        values[8] = f"{open_price if open_price is not None else last:.4f}"  # OPEN
+        values[9] = f"{high if high is not None else last:.4f}"         # HIGH
+        values[10] = f"{low if low is not None else last:.4f}"          # LOW
+        values[11] = f"{last:.4f}"                                      # LAST
+        values[15] = f"{bid if bid is not None else last:.4f}"          # PBID
+        values[16] = f"{ask if ask is not None else last:.4f}"          # PASK
+        values[20] = str(volume)                                        # TVOL
+        return self._broadcast("HDFSCNT0", f"D{exchange}{symbol}", values)
+
+    def push_quote(self, symbol, bid, ask, bid_size=100, ask_size=100, exchange="NAS", exchange_time="093000"):
+        """
+        실시간 호가(HDFSASP0)를 보냅니다.
+
+        Returns:
+            int: 보낸 연결 수
+        """
+        values = [""] * QUOTE_FIELD_COUNT
+        values[0] = f"D{exchange}{symbol}"  # RSYM
+        values[1] = symbol                  # SYMB
+        values[4] = exchange_time           # XHMS
+        values[11] = f"{bid:.4f}"           # PBID1
+        values[12] = f"{ask:.4f}"           # PASK1
+        values[13] = str(bid_size)          # VBID1
+        values[14] = str(ask_size)          # VASK1
+        return self._broadcast("HDFSASP0", f"D{exchange}{symbol}", values)
+
+    def send_pingpong(self):
+        """모든 연결에 연결 확인(PINGPONG) 메시지를 보냅니다."""
+        payload = json.dumps({"header": {"tr_id": "PINGPONG", "datetime": "20240101093000"}}).encode("utf-8")
+        with self._lock:
+            for connection in list(self._clients):
+                try:
+                    _send_frame(connection, 0x1, payload)
+                except OSError:
+                    pass
+
+    def drop_connections(self):
+        """모든 연결을 강제로 끊습니다. (재접속 테스트용)"""
+        with self._lock:
+            connections = list(self._clients)
+        for connection in connections:
+            try:
+                connection.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    # ========================================
+    # 서버 켜기 / 끄기
+    # ========================================
+
+    def start(self, host="127.0.0.1", port=0):
+        """
+        백그라운드 스레드에서 서버를 켭니다.
+
+        Returns:
+            str: 접속 주소 (예: "ws://127.0.0.1:54321")
+        """
+        mock = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                mock._handle_connection(self.request)
+
+        self._server = socketserver.ThreadingTCPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._server.allow_reuse_address = True
+        threading.Thread(target=self._server.serve_forever, name="mock-kis-websocket", daemon=True).start()
+
+        bound_host, bound_port = self._server.server_address[:2]
+        return f"ws://{bound_host}:{bound_port}"
+
+    def stop(self):
+        """서버를 끄고 모든 연결을 끊습니다."""
+        self.drop_connections()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
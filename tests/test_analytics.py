@@ -0,0 +1,200 @@
+"""
+손익/매매 사이클 분석(analytics) 테스트
+
+1. 끝난 사이클의 실현 손익(비용 차감), 보유 기간, 분할 수, 원화 손익
+2. 진행 중인 사이클의 이동평균 평단, 일부 매도 실현 손익, 평가 손익
+3. 조회 기간 이전에 산 주식을 판 사이클은 손익을 계산하지 않는지
+4. 체결내역 API(연속조회)로 받은 결과가 장부로 계산한 결과와 같은지
+5. 50종목 × 3년치 체결을 분석하는 시간
+을 확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+server = MockKisServer(cash=100000)
+server.set_market("TQQQ", open_price=50.0, last_price=51.0)
+
+temp_folder = tempfile.mkdtemp()
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+os.environ["LOG_DIR"] = temp_folder
+# 손으로 계산하기 쉽도록 수수료 0.1%만 둡니다
+os.environ["COMMISSION_RATE"] = "0.001"
+os.environ["SEC_FEE_RATE"] = "0"
+os.environ["FINRA_TAF_PER_SHARE"] = "0"
+os.environ["FX_SPREAD_RATE"] = "0.01"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from analytics import columns_from_ledger, columns_from_history, analyze_cycles, summarize_cycles
+from trader import get_overseas_fill_history
+
+FILL_HISTORY_TR_ID = "TTTS3035R"
+
+
+def fill(symbol, side, quantity, price, time_text, exchange="NAS"):
+    return {"time": time_text, "symbol": symbol, "side": side, "quantity": quantity, "price": price, "exchange": exchange}
+
+
+def test_analytics():
+    """사이클 손익 → 진행 중 사이클 → 기간 밖 → API 체결내역 → 성능을 확인합니다."""
+
+    print("=" * 60)
+    print("손익/매매 사이클 분석 테스트")
+    print("=" * 60)
+
+    fills = [
+        fill("TQQQ", "BUY", 10, 50.0, "2024-01-02T05:30:00"),
+        fill("TQQQ", "BUY", 10, 45.0, "2024-01-03T05:30:00"),
+        fill("TQQQ", "SELL", 20, 52.0, "2024-01-04T23:40:00"),
+        fill("TQQQ", "BUY", 5, 60.0, "2024-01-08T05:30:00"),
+        fill("TQQQ", "BUY", 5, 58.0, "2024-01-08T05:31:00"),
+        fill("TQQQ", "SELL", 4, 63.0, "2024-01-09T23:40:00"),
+        # SOXL: 조회 기간 이전에 산 5주를 먼저 팔고, 새 사이클을 한 번 돌림
+        fill("SOXL", "SELL", 5, 30.0, "2024-01-02T05:30:00", "AMS"),
+        fill("SOXL", "BUY", 5, 28.0, "2024-01-03T05:30:00", "AMS"),
+        fill("SOXL", "SELL", 5, 31.0, "2024-01-05T05:30:00", "AMS"),
+    ]
+    cycles = analyze_cycles(
+        columns_from_ledger(fills),
+        last_prices={"TQQQ": 62.0},
+        exrt="1300",
+        as_of=datetime(2024, 1, 10, 5, 30)
+    )
+    by_key = {(cycle["symbol"], cycle["cycle"]): cycle for cycle in cycles}
+    for cycle in cycles:
+        print(f"  {cycle['symbol']} #{cycle['cycle']}: 완료={cycle['closed']} 기간안={cycle['complete']} "
+              f"보유 {cycle['holding_days']}일, 분할 {cycle['splits_used']}, 매수 {cycle['invested']}, "
+              f"실현 {cycle['realized_pnl']}, 원화 {cycle['realized_krw']}, 남은 {cycle['position']}주")
+
+    # Step 1: 끝난 사이클
+    print("\n[Step 1] 끝난 사이클")
+    first = by_key[("TQQQ", 1)]
+    # 매수 -500.50, -450.45 / 매도 +1038.96 (수수료 0.1%)
+    if (first["closed"], first["splits_used"], first["buys"], first["sells"]) != (True, 2, 2, 1):
+        print("❌ 이틀에 나눠 사고 한 번에 판 사이클이어야 합니다.")
+        return False
+    if abs(first["realized_pnl"] - 88.01) > 1e-9 or abs(first["realized_return"] - 88.01 / 950) > 1e-9:
+        print("❌ 실현 손익은 수수료를 뺀 88.01이어야 합니다.")
+        return False
+    if abs(first["holding_days"] - 2.75) > 0.01:
+        print("❌ 보유 기간은 첫 매수부터 마지막 매도까지여야 합니다.")
+        return False
+    # 원화: 매수는 1313원, 매도는 1287원에 환전
+    expected_krw = round(-950.95 * 1313 + 1038.96 * 1287)
+    if first["realized_krw"] != expected_krw:
+        print(f"❌ 원화 실현 손익은 {expected_krw}원이어야 합니다.")
+        return False
+
+    # Step 2: 진행 중인 사이클
+    print("\n[Step 2] 진행 중인 사이클")
+    second = by_key[("TQQQ", 2)]
+    # 매입 원가 300.30 + 290.29 = 590.59 (10주), 4주 매도: 원가 236.236, 받은 돈 251.748
+    if (second["closed"], second["position"], second["splits_used"], second["end"]) != (False, 6, 1, None):
+        print("❌ 6주가 남은 진행 중 사이클이어야 합니다.")
+        return False
+    if abs(second["realized_pnl"] - 15.512) > 1e-6 or abs(second["avg_price"] - 59.059) > 1e-6:
+        print("❌ 이동평균법으로 일부 매도 손익과 평단을 계산해야 합니다.")
+        return False
+    if abs(second["unrealized_pnl"] - (62.0 * 6 - 354.354)) > 1e-6:
+        print("❌ 현재가로 남은 주식을 평가해야 합니다.")
+        return False
+
+    # Step 3: 기간 밖
+    print("\n[Step 3] 조회 기간 이전에 산 주식")
+    soxl_first, soxl_second = by_key[("SOXL", 1)], by_key[("SOXL", 2)]
+    if soxl_first["complete"] or soxl_first["realized_pnl"] is not None:
+        print("❌ 기간 밖 사이클은 손익을 계산하지 않아야 합니다.")
+        return False
+    if not soxl_second["complete"] or abs(soxl_second["realized_pnl"] - 14.705) > 1e-9:
+        print("❌ 그 뒤 사이클은 정상적으로 계산해야 합니다.")
+        return False
+
+    summary = summarize_cycles(cycles)
+    print(f"요약: {summary}")
+    if summary["symbols"]["TQQQ"]["closed"] != 1 or summary["symbols"]["TQQQ"]["position"] != 6:
+        print("❌ 종목별 요약이 맞지 않습니다.")
+        return False
+    if list(summary["yearly_krw"]) != ["2024"]:
+        print("❌ 연도별 원화 손익이 있어야 합니다.")
+        return False
+
+    # Step 4: API 체결내역 (연속조회)
+    print("\n[Step 4] 체결내역 API로 분석")
+    ledger_fills = []
+    day = datetime(2024, 3, 1)
+    for cycle_number in range(15):
+        for side, quantity, price in (("BUY", 3, 40.0 + cycle_number), ("BUY", 3, 39.0 + cycle_number), ("SELL", 6, 43.0 + cycle_number)):
+            day += timedelta(days=1)
+            server.add_filled_order("TQQQ", side, quantity, price, ord_dt=day.strftime("%Y%m%d"), ord_tmd="223000")
+            ledger_fills.append(fill("TQQQ", side, quantity, price, day.strftime("%Y%m%d") + "223000"))
+
+    calls_before = server.call_counts.get(FILL_HISTORY_TR_ID, 0)
+    rows = get_overseas_fill_history("TQQQ", "NAS", start_date="20240301", end_date="20240501")
+    calls = server.call_counts.get(FILL_HISTORY_TR_ID, 0) - calls_before
+    print(f"체결내역 {len(rows)}건, 조회 {calls}회")
+    if len(rows) != 45 or calls != 3:
+        print("❌ 45건을 연속조회 3페이지로 모두 받아야 합니다.")
+        return False
+
+    from_api = analyze_cycles(columns_from_history(rows), exrt="1300")
+    from_ledger = analyze_cycles(columns_from_ledger(ledger_fills), exrt="1300")
+    if from_api != from_ledger or len(from_api) != 15 or not all(cycle["closed"] for cycle in from_api):
+        print("❌ API 체결내역과 장부로 계산한 사이클이 같아야 합니다.")
+        return False
+
+    # Step 5: 50종목 × 3년
+    print("\n[Step 5] 50종목 × 3년치 체결")
+    generator = random.Random(46)
+    big_fills = []
+    start_day = datetime(2022, 1, 3)
+    for symbol_number in range(50):
+        symbol = f"S{symbol_number:02d}"
+        held = 0
+        price = 50.0
+        for day_number in range(756):
+            day_text = (start_day + timedelta(days=day_number)).strftime("%Y%m%d")
+            price = max(5.0, round(price * (1 + generator.gauss(0, 0.03)), 2))
+            big_fills.append(fill(symbol, "BUY", 2, price, day_text + "225900"))
+            big_fills.append(fill(symbol, "BUY", 2, round(price * 0.99, 2), day_text + "225901"))
+            held += 4
+            if generator.random() < 0.1:
+                big_fills.append(fill(symbol, "SELL", held, round(price * 1.1, 2), day_text + "230000"))
+                held = 0
+
+    started_at = time.perf_counter()
+    columns = columns_from_ledger(big_fills)
+    loaded_at = time.perf_counter()
+    big_cycles = analyze_cycles(columns, exrt="1300")
+    summary = summarize_cycles(big_cycles)
+    finished_at = time.perf_counter()
+    print(f"체결 {len(big_fills):,}건 → 사이클 {len(big_cycles):,}개, "
+          f"열 만들기 {loaded_at - started_at:.2f}초, 분석 {finished_at - loaded_at:.2f}초")
+
+    if len(summary["symbols"]) != 50 or sum(row["closed"] for row in summary["symbols"].values()) + 50 < len(big_cycles):
+        print("❌ 모든 종목의 사이클을 계산해야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_analytics()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,89 @@
+"""
+미체결 주문 정정/취소 엔진 테스트
+
+가짜 미체결 주문 목록과 새 주문 계획을 비교하여
+- 저널에 있는 봇의 주문만 매수/매도, 주문 유형, 주문 설명으로 짝지어지는지
+- 가격이 바뀐 주문만 남은 수량으로 정정되고, 계획에 없는 주문은 취소되는지
+확인합니다.
+DRY 모드로 실행하므로 실제 API는 호출하지 않습니다.
+"""
+
+import sys
+from pathlib import Path
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cancel_replace import match_open_orders, build_replace_requests, cancel_replace_orders
+
+
+def test_cancel_replace():
+    """
+    정정 요청 생성과 동시 제출(DRY 모드)을 테스트합니다.
+    """
+
+    print("=" * 60)
+    print("미체결 주문 정정/취소 엔진 테스트")
+    print("=" * 60)
+
+    # 새 주문 계획 (평단가가 바뀜, 큰수 기준가는 그대로, 초기 진입은 빠짐)
+    planned_orders = [
+        {"side": "BUY", "quantity": 3, "price": 49.80, "order_type": "LOC", "comment": "평단 매수"},
+        {"side": "BUY", "quantity": 3, "price": 55.00, "order_type": "LOC", "comment": "큰수 매수"},
+        {"side": "SELL", "quantity": 6, "price": 60.00, "order_type": "LIMIT", "comment": "익절"},
+    ]
+
+    # 주문 저널에 남아 있는 봇의 주문 (주문번호별 원래 주문)
+    known_orders = {
+        "0001": {"side": "BUY", "quantity": 3, "price": 50.12, "order_type": "LOC", "comment": "평단 매수"},
+        "0002": {"side": "BUY", "quantity": 3, "price": 55.00, "order_type": "LOC", "comment": "큰수 매수"},
+        "0004": {"side": "BUY", "quantity": 2, "price": 51.00, "order_type": "LIMIT", "comment": "초기 진입"},
+        "0005": {"side": "SELL", "quantity": 6, "price": 61.00, "order_type": "LIMIT", "comment": "익절"},
+        "0007": {"side": "BUY", "quantity": 3, "price": 50.12, "order_type": "LIMIT", "comment": "평단 매수"},
+    }
+
+    # 이미 걸려 있는 주문 (예전 평단가 기준)
+    open_orders = [
+        {"odno": "0001", "pdno": "TQQQ", "sll_buy_dvsn_cd": "02", "nccs_qty": "3", "ft_ord_unpr3": "50.12"},
+        {"odno": "0002", "pdno": "TQQQ", "sll_buy_dvsn_cd": "02", "nccs_qty": "3", "ft_ord_unpr3": "55.00"},
+        {"odno": "0003", "pdno": "SOXL", "sll_buy_dvsn_cd": "02", "nccs_qty": "3", "ft_ord_unpr3": "20.00"},
+        {"odno": "0004", "pdno": "TQQQ", "sll_buy_dvsn_cd": "02", "nccs_qty": "2", "ft_ord_unpr3": "51.00"},
+        {"odno": "0005", "pdno": "TQQQ", "sll_buy_dvsn_cd": "01", "nccs_qty": "4", "ft_ord_unpr3": "61.00"},  # 2주 체결
+        {"odno": "0006", "pdno": "TQQQ", "sll_buy_dvsn_cd": "02", "nccs_qty": "3", "ft_ord_unpr3": "49.00"},  # 직접 낸 주문
+        {"odno": "0007", "pdno": "TQQQ", "sll_buy_dvsn_cd": "02", "nccs_qty": "3", "ft_ord_unpr3": "50.12"},  # 유형이 다름
+    ]
+
+    matches = match_open_orders(planned_orders, open_orders, "TQQQ", known_orders)
+    pairs = [(planned["comment"] if planned else None, open_order["odno"]) for planned, open_order in matches]
+    print(f"\n짝지어진 주문: {pairs}")
+
+    if pairs != [("평단 매수", "0001"), ("큰수 매수", "0002"), (None, "0004"), ("익절", "0005"), (None, "0007")]:
+        print("❌ 매수/매도, 주문 유형, 주문 설명이 같은 봇의 주문끼리만 짝지어야 합니다.")
+        return False
+
+    replace_requests = build_replace_requests(matches, "TQQQ", "NASD")
+    for replace_request in replace_requests:
+        print(f"  - {replace_request['odno']} {replace_request['comment']}: "
+              f"{replace_request['quantity']}주 → {replace_request['new_price'] or '취소'}")
+
+    expected = [("0001", 3, 49.80), ("0004", 2, None), ("0005", 4, 60.00), ("0007", 3, None)]
+    if [(request["odno"], request["quantity"], request["new_price"]) for request in replace_requests] != expected:
+        print("❌ 가격이 바뀐 주문은 남은 수량으로 정정하고, 계획에 없는 주문은 취소해야 합니다.")
+        return False
+
+    results = cancel_replace_orders(replace_requests, trade_mode="DRY")
+
+    for result in results:
+        print(f"  - {result['comment']}: {result['action']} 성공={result['success']}")
+
+    if not all(result["success"] for result in results):
+        print("❌ DRY 모드 정정이 실패했습니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_cancel_replace()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,145 @@
+"""
+매매 비용 모델(costs) 테스트
+
+1. 매수/매도 1건의 수수료, SEC 수수료, FINRA TAF(최대 금액 포함), 슬리피지, 현금 흐름
+2. 미국 외 거래소에는 SEC 수수료/FINRA TAF가 붙지 않는지
+3. 시뮬레이터 결과(미체결 제외)와 실제 체결 기록에 같은 방식으로 쓰이는지
+4. 환전 스프레드와 양도소득세
+5. 체결 100만 건을 한 번에 계산하는 시간
+을 확인합니다. API를 호출하지 않습니다.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from array import array
+from pathlib import Path
+
+temp_folder = tempfile.mkdtemp()
+os.environ["LOG_DIR"] = temp_folder
+os.environ["COMMISSION_RATE"] = "0.0025"
+os.environ["SEC_FEE_RATE"] = "0.0000278"
+os.environ["FINRA_TAF_PER_SHARE"] = "0.000166"
+os.environ["FINRA_TAF_MAX"] = "8.30"
+os.environ["FX_SPREAD_RATE"] = "0.01"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from costs import trade_arrays, trade_costs, fill_costs, to_krw, summarize_costs, capital_gains_tax
+from money import to_units, from_units
+
+
+def fill(side, quantity, price, **fields):
+    return dict({"side": side, "quantity": quantity, "price": price}, **fields)
+
+
+def test_costs():
+    """1건 비용 → 거래소 → 시뮬레이터 결과 → 환전/세금 → 성능을 확인합니다."""
+
+    print("=" * 60)
+    print("매매 비용 모델 테스트")
+    print("=" * 60)
+
+    # Step 1: 1건 비용
+    print("\n[Step 1] 매수 / 매도 / 큰 매도 1건씩")
+    costs = fill_costs([
+        fill("BUY", 100, 50.00),
+        fill("SELL", 100, 50.00),
+        fill("SELL", 100000, 1.00),
+    ])
+    for index in range(3):
+        print("  " + ", ".join(f"{name}={from_units(values[index])}" for name, values in costs.items()))
+
+    # 매도 $5,000: 수수료 $12.50, SEC $0.139 → $0.14, TAF 100 × $0.000166 → $0.02
+    # 매도 100,000주 × $1: SEC $2.78, TAF $16.60 → 최대 $8.30
+    expected = {
+        "commission": [12.50, 12.50, 250.00],
+        "sec_fee": [0, 0.14, 2.78],
+        "taf": [0, 0.02, 8.30],
+        "cash": [-5012.50, 4987.34, 99738.92],
+    }
+    for name, values in expected.items():
+        if list(costs[name]) != [to_units(value) for value in values]:
+            print(f"❌ {name}: {values}이어야 합니다.")
+            return False
+
+    slipped = fill_costs([fill("BUY", 100, 50.00), fill("SELL", 100, 50.00)], slippage_rate=0.001)
+    print(f"슬리피지 0.1%: 체결가 {[from_units(price) for price in slipped['price']]}, 슬리피지 {from_units(sum(slipped['slippage']))}")
+    if list(slipped["price"]) != [to_units(50.05), to_units(49.95)] or sum(slipped["slippage"]) != to_units(10.0):
+        print("❌ 매수는 비싸게, 매도는 싸게 체결된 것으로 봐야 합니다.")
+        return False
+
+    # Step 2: 미국 외 거래소
+    print("\n[Step 2] 홍콩 거래소 매도")
+    hk = fill_costs([fill("SELL", 1000, 20.00)], exchange_code="HKS")
+    print(f"  수수료 {from_units(hk['commission'][0])}, SEC {hk['sec_fee'][0]}, TAF {hk['taf'][0]}")
+    if hk["sec_fee"][0] != 0 or hk["taf"][0] != 0 or hk["commission"][0] != to_units(50.0):
+        print("❌ 미국 외 거래소에는 수수료만 붙어야 합니다.")
+        return False
+
+    # Step 3: 시뮬레이터 결과
+    print("\n[Step 3] 시뮬레이터 결과 (미체결 제외)")
+    results = [
+        fill("BUY", 10, 49.0, filled=True, fill_price=48.80),
+        fill("BUY", 10, 48.0, filled=False, fill_price=None),
+        fill("SELL", 0, 51.0, filled=True, fill_price=51.0),
+    ]
+    signs, quantities, price_units = trade_arrays(results, price_field="fill_price")
+    print(f"  체결 {len(signs)}건: {list(signs)}, {list(quantities)}, {list(price_units)}")
+    if (list(signs), list(quantities), list(price_units)) != ([1], [10], [to_units(48.80)]):
+        print("❌ 체결된 주문만, 체결 가격으로 계산해야 합니다.")
+        return False
+
+    # Step 4: 환전과 양도소득세
+    print("\n[Step 4] 환전 스프레드와 양도소득세")
+    krw = to_krw(array("q", [to_units(-100.0), to_units(100.0)]), "1350.00")
+    print(f"  $100 매수 → {from_units(krw[0])}원, $100 매도 → {from_units(krw[1])}원")
+    if list(krw) != [to_units(-136350.0), to_units(133650.0)]:
+        print("❌ 매수는 1% 비싸게, 매도는 1% 싸게 환전해야 합니다.")
+        return False
+
+    per_trade = to_krw(array("q", [to_units(-100.0), to_units(100.0)]), ["1300", "1400"], fx_spread_rate=0)
+    if list(per_trade) != [to_units(-130000.0), to_units(140000.0)]:
+        print("❌ 체결마다 다른 환율을 써야 합니다.")
+        return False
+
+    tax = capital_gains_tax(3_500_000)
+    print(f"  실현 이익 350만원 → 양도소득세 {tax}원")
+    if tax != 220_000 or capital_gains_tax(2_000_000) != 0 or capital_gains_tax(-1_000_000) != 0:
+        print("❌ 기본공제 250만원을 뺀 이익의 22%여야 합니다.")
+        return False
+
+    # Step 5: 100만 건
+    print("\n[Step 5] 체결 100만 건")
+    generator = random.Random(45)
+    count = 1_000_000
+    signs = array("b", [generator.choice((1, -1)) for _ in range(count)])
+    quantities = array("q", [generator.randint(1, 500) for _ in range(count)])
+    price_units = array("q", [generator.randint(1_000_000, 100_000_000) for _ in range(count)])
+
+    started_at = time.perf_counter()
+    costs = trade_costs(signs, quantities, price_units, slippage_rate=0.0005)
+    elapsed = time.perf_counter() - started_at
+    summary = summarize_costs(costs)
+    print(f"  걸린 시간 {elapsed:.2f}초, 비용 합계 ${summary['total_cost']:,.2f}, 슬리피지 ${summary['slippage']:,.2f}")
+
+    if summary["trades"] != count:
+        print("❌ 모든 체결을 계산해야 합니다.")
+        return False
+    for index in generator.sample(range(count), 100):
+        single = trade_costs(signs[index:index + 1], quantities[index:index + 1], price_units[index:index + 1],
+                             slippage_rate=0.0005)
+        if any(single[name][0] != costs[name][index] for name in costs):
+            print("❌ 한 건씩 계산한 결과와 같아야 합니다.")
+            return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_costs()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,138 @@
+"""
+사이클 색인(cycle_index) 테스트
+
+1. 매도로 사이클이 나뉘고, 진행 중인 사이클의 체결/매수 수량 분포/최빈 수량을 찾는지
+2. 같은 주문이 더 체결되면 수량만 고치고, 예전 체결이 늦게 와도 제 사이클에 들어가는지
+3. 파일을 다시 읽으면 같은 색인이 만들어지는지
+4. 체결내역 조회 결과(최신순)를 넣으면 새 주문만 들어가는지
+5. 체결 10만 건에서 사이클 조회가 빠른지
+를 확인합니다. API를 호출하지 않습니다.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+temp_folder = tempfile.mkdtemp()
+os.environ["LOG_DIR"] = temp_folder
+os.environ["CYCLE_INDEX_PATH"] = os.path.join(temp_folder, "cycle_index.jsonl")
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from cycle_index import CycleIndex, get_cycle_index, load_cycle_index, record_fill, sync_order_history
+
+
+def test_cycle_index():
+    """사이클 나누기 → 수량 고침/늦은 체결 → 다시 읽기 → 체결내역 → 성능을 확인합니다."""
+
+    print("=" * 60)
+    print("사이클 색인 테스트")
+    print("=" * 60)
+
+    # Step 1: 사이클 나누기
+    print("\n[Step 1] 매도로 사이클 나누기")
+    fills = [
+        ("2024-01-02T05:30:00", "BUY", 8, "A1"),   # 첫 진입 (2배)
+        ("2024-01-03T05:30:00", "BUY", 4, "A2"),
+        ("2024-01-03T05:30:01", "BUY", 4, "A3"),
+        ("2024-01-04T05:30:00", "BUY", 4, "A4"),
+        ("2024-01-05T23:00:00", "SELL", 20, "A5"),  # 익절
+        ("2024-01-08T05:30:00", "BUY", 10, "B1"),
+        ("2024-01-09T05:30:00", "BUY", 5, "B2"),
+        ("2024-01-09T05:30:01", "BUY", 5, "B3"),
+    ]
+    for fill in fills:
+        record_fill("TQQQ", *fill)
+
+    index = get_cycle_index("TQQQ")
+    print(f"사이클 {index.current_cycle + 1}개, 진행 중 분포 {index.histogram()}, 최빈 수량 {index.unit_quantity()}")
+
+    if index.current_cycle != 1 or index.histogram(0) != {8: 1, 4: 3} or index.unit_quantity() != 5:
+        print("❌ 매도 뒤 매수만으로 1회 매수 수량을 정해야 합니다.")
+        return False
+    if [fill["odno"] for fill in index.cycle_fills()] != ["B1", "B2", "B3"]:
+        print("❌ 진행 중인 사이클의 체결은 마지막 매도 이후여야 합니다.")
+        return False
+    if [fill["odno"] for fill in index.cycle_fills(0)] != ["A1", "A2", "A3", "A4", "A5"]:
+        print("❌ 매도는 그 매도로 끝나는 사이클에 속해야 합니다.")
+        return False
+    if (index.cycle_at(20240103000000), index.cycle_at(20240105230000), index.cycle_at(20240106000000)) != (0, 0, 1):
+        print("❌ 날짜가 속한 사이클을 찾아야 합니다.")
+        return False
+    if index.histogram(5) != {} or index.cycle_fills(-1) != []:
+        print("❌ 없는 사이클은 비어 있어야 합니다.")
+        return False
+
+    # Step 2: 수량 고침과 늦은 체결
+    print("\n[Step 2] 부분 체결 수량 고침 / 늦게 들어온 예전 체결")
+    changed = record_fill("TQQQ", "2024-01-10T05:30:00", "BUY", 10, "B3")  # B3가 5주 → 10주
+    unchanged = record_fill("TQQQ", "2024-01-10T05:30:00", "BUY", 10, "B3")
+    print(f"수량 고침: {changed}, 같은 수량 다시: {unchanged}, 분포 {index.histogram()}")
+    if not changed or unchanged or index.histogram() != {10: 2, 5: 1} or len(index) != 8:
+        print("❌ 같은 주문은 수량만 고쳐야 합니다.")
+        return False
+
+    record_fill("TQQQ", "2024-01-04T06:00:00", "BUY", 4, "A6")
+    print(f"늦은 체결 뒤 사이클 0 분포 {index.histogram(0)}, 진행 중 분포 {index.histogram()}")
+    if index.histogram(0) != {8: 1, 4: 4} or index.histogram() != {10: 2, 5: 1} or index.boundaries != [5]:
+        print("❌ 예전 체결은 시각에 맞는 사이클에 들어가야 합니다.")
+        return False
+
+    # Step 3: 다시 읽기
+    print("\n[Step 3] 파일 다시 읽기")
+    snapshot = (index.times, index.sides, index.quantities, index.odnos, index.boundaries, index.histograms)
+    count = load_cycle_index(os.environ["CYCLE_INDEX_PATH"])
+    reloaded = get_cycle_index("TQQQ")
+    print(f"기록 {count}줄 → 체결 {len(reloaded)}건, 경계 {reloaded.boundaries}")
+    if (reloaded.times, reloaded.sides, reloaded.quantities, reloaded.odnos, reloaded.boundaries, reloaded.histograms) != snapshot:
+        print("❌ 다시 읽은 색인이 같아야 합니다.")
+        return False
+
+    # Step 4: 체결내역 조회 결과
+    print("\n[Step 4] 체결내역(최신순) 넣기")
+    order_history = [
+        {"ord_dt": "20240111", "ord_tmd": "053000", "odno": "B4", "sll_buy_dvsn_cd_name": "매수", "ft_ccld_qty": "5"},
+        {"ord_dt": "20240109", "ord_tmd": "053001", "odno": "B3", "sll_buy_dvsn_cd_name": "매수", "ft_ccld_qty": "10"},
+        {"ord_dt": "20240105", "ord_tmd": "230000", "odno": "A5", "sll_buy_dvsn_cd_name": "매도", "ft_ccld_qty": "20"},
+        {"ord_dt": "20240111", "ord_tmd": "053001", "odno": "B5", "sll_buy_dvsn_cd_name": "매수", "ft_ccld_qty": "0"},
+    ]
+    added = sync_order_history("TQQQ", order_history)
+    print(f"새로 넣은 주문 {added}건, 진행 중 분포 {reloaded.histogram()}")
+    if added != 1 or reloaded.histogram() != {10: 2, 5: 2}:
+        print("❌ 체결된 새 주문만 넣어야 합니다.")
+        return False
+
+    # Step 5: 10만 건
+    print("\n[Step 5] 체결 10만 건")
+    big = CycleIndex()
+    started_at = time.perf_counter()
+    for number in range(100_000):
+        day = 20200101000000 + number * 100
+        if number % 40 == 39:
+            big.add(day, -1, 400, f"S{number}")
+        else:
+            big.add(day, 1, 10 + number % 3, f"B{number}")
+    added_at = time.perf_counter()
+
+    queries = 10_000
+    for number in range(queries):
+        cycle = big.cycle_at(20200101000000 + number * 1000)
+        big.histogram(cycle)
+    queried_at = time.perf_counter()
+    print(f"사이클 {big.current_cycle + 1:,}개, 넣기 {added_at - started_at:.2f}초, "
+          f"조회 {queries:,}번 {(queried_at - added_at) * 1000:.1f}ms")
+
+    if big.current_cycle != 2500 or big.cycle_at(20200101000000 + 39 * 100) != 0 or big.cycle_at(20200101000000 + 40 * 100) != 1:
+        print("❌ 10만 건의 사이클 경계가 맞지 않습니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_cycle_index()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,192 @@
+"""
+분봉 체결 시뮬레이터(fill_simulator) 테스트
+
+1. LIMIT / LOC / MOC / LOO / MOO 주문이 분봉에 맞게 체결되는지 (가격, 시각, 여유)
+2. 익절 LIMIT 매도가 LOC 매수보다 먼저 체결된 것으로 나오는지
+3. 장 중에 낸 주문은 그 뒤 분봉으로만 체결되는지
+4. 1년치(252일 × 390분) 분봉을 돌리는 시간과, 분봉을 하나씩 확인한 결과와 같은지
+를 확인합니다. API를 호출하지 않습니다.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+temp_folder = tempfile.mkdtemp()
+os.environ["LOG_DIR"] = temp_folder
+os.environ["BARS_DIR"] = os.path.join(temp_folder, "bars")
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from minute_bars import RECORD, bar_path, read_bar_columns
+from fill_simulator import simulate_day, replay
+from money import to_units, from_units
+
+
+def write_day(symbol, trade_date, bars):
+    """[(시각, 시가, 고가, 저가, 종가), ...]를 분봉 파일로 씁니다."""
+    path = bar_path(symbol, "NAS", trade_date)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as file:
+        for bar_time, open_price, high, low, close in bars:
+            file.write(RECORD.pack(bar_time, to_units(open_price), to_units(high), to_units(low), to_units(close), 100))
+    return path
+
+
+def order(side, order_type, price, comment):
+    return {"side": side, "quantity": 1, "price": price, "order_type": order_type, "comment": comment}
+
+
+def naive_limit_fill(columns, side, price, first_index=0):
+    """분봉을 하나씩 확인하는 LIMIT 체결 (비교용)"""
+    price_units = to_units(price)
+    for index in range(first_index, len(columns["time"])):
+        if side == "BUY" and columns["low"][index] <= price_units:
+            return from_units(min(columns["open"][index], price_units)), columns["time"][index]
+        if side == "SELL" and columns["high"][index] >= price_units:
+            return from_units(max(columns["open"][index], price_units)), columns["time"][index]
+    return None, None
+
+
+def test_fill_simulator():
+    """체결 규칙 → 주문 시각 → 1년치 성능을 확인합니다."""
+
+    print("=" * 60)
+    print("분봉 체결 시뮬레이터 테스트")
+    print("=" * 60)
+
+    # 시각, 시가, 고가, 저가, 종가
+    columns = read_bar_columns(write_day("TEST", "20240105", [
+        (93000, 50.00, 50.20, 49.90, 50.10),
+        (93100, 50.10, 50.60, 50.00, 50.50),
+        (93200, 50.50, 51.10, 50.40, 51.00),  # 51.00 익절가 도달
+        (93300, 51.00, 50.90, 49.00, 49.20),  # 49.00에 닿기만 함
+        (93400, 48.80, 49.00, 48.50, 48.90),  # 48.80으로 갭 하락
+        (93500, 48.90, 49.50, 48.70, 49.40),  # 종가 49.40
+    ]))
+
+    # Step 1: 주문 유형별 체결
+    print("\n[Step 1] 주문 유형별 체결")
+    orders = [
+        order("BUY", "LOC", 49.50, "LOC 매수 체결"),
+        order("BUY", "LOC", 49.30, "LOC 매수 미체결"),
+        order("SELL", "LOC", 49.00, "LOC 매도 체결"),
+        order("SELL", "LIMIT", 51.00, "익절"),
+        order("BUY", "LIMIT", 48.90, "갭 하락 매수"),
+        order("BUY", "LIMIT", 49.00, "닿기만 한 매수"),
+        order("BUY", "MOC", None, "MOC"),
+        order("BUY", "LOO", 50.00, "LOO 체결"),
+        order("BUY", "LOO", 49.99, "LOO 미체결"),
+        order("SELL", "MOO", None, "MOO"),
+    ]
+    results = simulate_day(columns, orders)
+    for result in results:
+        margin = f", 여유 {result['margin']:+.4f}" if result["margin"] is not None else ""
+        print(f"  {result['comment']}: 체결={result['filled']} {result['fill_price']} @ {result['fill_time']}{margin} {result['reason']}")
+
+    by_comment = {result["comment"]: result for result in results}
+    expected = {
+        "LOC 매수 체결": (True, 49.40, 93500),
+        "LOC 매수 미체결": (False, None, None),
+        "LOC 매도 체결": (True, 49.40, 93500),
+        "익절": (True, 51.00, 93200),
+        "갭 하락 매수": (True, 48.80, 93400),
+        "닿기만 한 매수": (True, 49.00, 93300),
+        "MOC": (True, 49.40, 93500),
+        "LOO 체결": (True, 50.00, 93000),
+        "LOO 미체결": (False, None, None),
+        "MOO": (True, 50.00, 93000),
+    }
+    for comment, (filled, fill_price, fill_time) in expected.items():
+        result = by_comment[comment]
+        if (result["filled"], result["fill_price"], result["fill_time"]) != (filled, fill_price, fill_time):
+            print(f"❌ {comment}: {(filled, fill_price, fill_time)}이어야 합니다.")
+            return False
+
+    if abs(by_comment["LOC 매수 체결"]["margin"] - 0.10 / 49.40) > 1e-12 or by_comment["LOC 매수 미체결"]["margin"] >= 0:
+        print("❌ LOC 여유는 (지정가 - 종가) / 종가여야 합니다.")
+        return False
+
+    # Step 2: 체결 순서
+    print("\n[Step 2] 체결 순서")
+    sequence = [result["comment"] for result in results]
+    print(" → ".join(sequence))
+    if sequence.index("익절") > sequence.index("LOC 매수 체결") or sequence[-2:] != ["LOC 매수 미체결", "LOO 미체결"]:
+        print("❌ 익절이 LOC 매수보다 먼저, 미체결 주문은 맨 뒤에 있어야 합니다.")
+        return False
+
+    strict = {result["comment"]: result for result in simulate_day(columns, orders[5:6], strict=True)}
+    if (strict["닿기만 한 매수"]["fill_price"], strict["닿기만 한 매수"]["fill_time"]) != (48.80, 93400):
+        print("❌ strict이면 지정가를 뚫은 분봉에서 체결되어야 합니다.")
+        return False
+
+    try:
+        simulate_day(columns, [order("BUY", "STOP", 50.0, "모르는 주문")])
+        print("❌ 지원하지 않는 주문 유형은 에러가 나야 합니다.")
+        return False
+    except Exception as e:
+        print(f"지원하지 않는 주문 유형: {e}")
+
+    # Step 3: 장 중에 낸 주문
+    print("\n[Step 3] 09:33에 낸 주문")
+    late = {result["comment"]: result for result in simulate_day(columns, orders[3:4] + orders[7:8], submit_time=93300)}
+    print(f"  익절: {late['익절']['reason']}, LOO: {late['LOO 체결']['reason']}")
+    if late["익절"]["filled"] or late["LOO 체결"]["filled"]:
+        print("❌ 주문 전 분봉으로는 체결되지 않아야 합니다.")
+        return False
+
+    # Step 4: 1년치 분봉
+    print("\n[Step 4] 1년치 분봉 (252일 × 390분)")
+    generator = random.Random(44)
+    price = 50.0
+    for day in range(252):
+        bars = []
+        for minute in range(390):
+            hour, minute_of_hour = divmod(9 * 60 + 30 + minute, 60)
+            open_price = price
+            price = max(1.0, round(price + generator.gauss(0, 0.05), 2))
+            high = round(max(open_price, price) + generator.random() * 0.03, 2)
+            low = round(min(open_price, price) - generator.random() * 0.03, 2)
+            bars.append((hour * 10000 + minute_of_hour * 100, open_price, high, low, price))
+        write_day("YEAR", f"2023{day // 21 + 1:02d}{day % 21 + 1:02d}", bars)
+
+    def plan(trade_date, day_columns):
+        open_price = from_units(day_columns["open"][0])
+        return [
+            order("SELL", "LIMIT", round(open_price * 1.01, 2), "익절"),
+            order("BUY", "LIMIT", round(open_price * 0.99, 2), "평단 매수"),
+            order("BUY", "LOC", open_price, "큰수 매수"),
+            order("BUY", "LOC", round(open_price * 0.995, 2), "LOC"),
+        ]
+
+    started_at = time.perf_counter()
+    days = list(replay("YEAR", "NAS", plan, submit_time=100000))
+    elapsed = time.perf_counter() - started_at
+    filled = sum(result["filled"] for trade_date, results in days for result in results)
+    print(f"{len(days)}일, 주문 {len(days) * 4}건 중 {filled}건 체결, 걸린 시간 {elapsed:.2f}초")
+
+    if len(days) != 252:
+        print("❌ 252일을 모두 돌려야 합니다.")
+        return False
+
+    for trade_date, results in days[:30]:
+        day_columns = read_bar_columns(bar_path("YEAR", "NAS", trade_date))
+        first_index = list(day_columns["time"]).index(100000)
+        for result in results:
+            if result["order_type"] != "LIMIT":
+                continue
+            if (result["fill_price"], result["fill_time"]) != naive_limit_fill(day_columns, result["side"], result["price"], first_index):
+                print(f"❌ {trade_date} {result['comment']}: 분봉을 하나씩 확인한 결과와 다릅니다.")
+                return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_fill_simulator()
+    sys.exit(0 if success else 1)
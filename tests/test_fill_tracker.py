@@ -0,0 +1,91 @@
+"""
+체결 추적기 테스트
+
+가짜 주문 조회 함수를 사용하여, 부분 체결과 전량 체결이
+장부 파일과 알림으로 정확히 전달되는지 확인합니다.
+실제 API는 호출하지 않습니다.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 테스트용 장부 파일을 임시 폴더에 만듭니다 (config를 읽기 전에 설정해야 합니다)
+temp_folder = tempfile.mkdtemp()
+os.environ["LEDGER_PATH"] = os.path.join(temp_folder, "fills.jsonl")
+os.environ["CYCLE_INDEX_PATH"] = os.path.join(temp_folder, "cycle_index.jsonl")
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import fill_tracker
+from fill_tracker import track_fills
+from ledger import read_fills
+from cycle_index import get_cycle_index
+
+
+def test_fill_tracker():
+    """
+    조회할 때마다 체결이 조금씩 진행되는 상황을 흉내 내어 테스트합니다.
+    """
+
+    print("=" * 60)
+    print("체결 추적기 테스트")
+    print("=" * 60)
+
+    # 테스트가 빨리 끝나도록 조회 간격을 줄입니다
+    fill_tracker.MIN_POLL_INTERVAL = 0.01
+    fill_tracker.MAX_POLL_INTERVAL = 0.05
+
+    # 조회할 때마다 다음 상태를 돌려주는 가짜 조회 결과
+    snapshots = [
+        [],
+        [{"odno": "A1", "sll_buy_dvsn_cd": "02", "ft_ord_qty": "4", "ft_ccld_qty": "0", "ft_ccld_amt3": "0", "nccs_qty": "4"}],
+        [{"odno": "A1", "sll_buy_dvsn_cd": "02", "ft_ord_qty": "4", "ft_ccld_qty": "1", "ft_ccld_amt3": "50.00", "nccs_qty": "3",
+          "ord_dt": "20240102", "ord_tmd": "093000"}],
+        [{"odno": "A1", "sll_buy_dvsn_cd": "02", "ft_ord_qty": "4", "ft_ccld_qty": "4", "ft_ccld_amt3": "203.00", "nccs_qty": "0",
+          "ord_dt": "20240102", "ord_tmd": "093000"}],
+    ]
+    call_count = {"value": 0}
+
+    def fake_fetch_orders():
+        index = min(call_count["value"], len(snapshots) - 1)
+        call_count["value"] += 1
+        return snapshots[index]
+
+    messages = []
+
+    tracked_orders = [{"odno": "A1", "symbol": "TQQQ", "side": "BUY", "quantity": 4, "comment": "초기 진입"}]
+    fill_events = track_fills(tracked_orders, 5, fetch_orders=fake_fetch_orders, notify=messages.append)
+
+    print(f"\n조회 횟수: {call_count['value']}회")
+    print(f"체결 기록: {len(fill_events)}건, 알림: {len(messages)}건")
+
+    ledger_fills = read_fills("TQQQ")
+
+    if [event["quantity"] for event in fill_events] != [1, 3]:
+        print("❌ 부분 체결 1주, 나머지 3주가 순서대로 기록되어야 합니다.")
+        return False
+
+    if abs(fill_events[1]["price"] - 51.0) > 1e-9:
+        print("❌ 두 번째 체결 단가는 (203 - 50) / 3 = 51 이어야 합니다.")
+        return False
+
+    if len(ledger_fills) != 2 or len(messages) != 2:
+        print("❌ 체결마다 장부와 알림이 1건씩 남아야 합니다.")
+        return False
+
+    # 사이클 색인에는 이 컴퓨터의 시각이 아니라 KIS 주문일시로 들어가야 합니다
+    index = get_cycle_index("TQQQ")
+    if index.times != [20240102093000] or index.quantities != [4]:
+        print(f"❌ 사이클 색인은 KIS 주문일시(ord_dt+ord_tmd)로 기록되어야 합니다. {index.times}")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_fill_tracker()
+    sys.exit(0 if success else 1)
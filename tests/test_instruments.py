@@ -0,0 +1,135 @@
+"""
+종목 마스터(instruments) 테스트
+
+가짜 서버를 상대로
+1. 거래소 코드 변환이 한 곳(EXCHANGES)에서 나오고 trader / instruments가 같은 값을 쓰는지
+2. 거래소별 호가 단위를 찾는지
+3. 종목 정보를 한 번만 조회하고 파일에 저장한 뒤, 다시 읽으면 API를 부르지 않는지
+4. 조회에 실패하면 거래소 기본값을 쓰고 파일에는 저장하지 않는지
+확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+server = MockKisServer(cash=10000)
+server.set_market("TQQQ", open_price=50.0, last_price=51.0, name="PROSHARES ULTRAPRO QQQ")
+
+temp_folder = tempfile.mkdtemp()
+cache_path = os.path.join(temp_folder, "instruments.json")
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+os.environ["LOG_DIR"] = temp_folder
+os.environ["CYCLE_INDEX_PATH"] = os.path.join(temp_folder, "cycle_index.jsonl")
+os.environ["INSTRUMENT_CACHE_PATH"] = cache_path
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from instruments import EXCHANGES, default_instrument, load_instruments, get_instrument
+from money import to_units
+from tick import tick_units
+from trader import _convert_exchange_code
+
+PRODUCT_INFO_TR_ID = "CTPF1702R"
+
+
+def test_instruments():
+    """거래소 변환 → 호가 단위 → 종목 정보 캐시를 확인합니다."""
+
+    print("=" * 60)
+    print("종목 마스터 테스트")
+    print("=" * 60)
+
+    # Step 1: 거래소 코드 변환
+    print("\n[Step 1] 거래소 코드 변환")
+    for exchange_code in EXCHANGES:
+        order_code, currency = _convert_exchange_code(exchange_code)
+        if default_instrument("TEST", exchange_code).order_exchange != order_code:
+            print(f"❌ {exchange_code}: trader와 instruments의 주문용 거래소 코드가 다릅니다.")
+            return False
+    print(f"HNX → {_convert_exchange_code('HNX')}, HSX → {_convert_exchange_code('HSX')}")
+
+    if _convert_exchange_code("HNX") != ("HASE", "VND") or _convert_exchange_code("HSX") != ("VNSE", "VND"):
+        print("❌ 하노이는 HASE, 호치민은 VNSE여야 합니다.")
+        return False
+
+    # Step 2: 호가 단위
+    print("\n[Step 2] 거래소별 호가 단위")
+    cases = [
+        (0.98, "US", 0.0001), (56.37, "US", 0.01), (1.0, "US", 0.01),
+        (0.3, "HK", 0.005), (15.3, "HK", 0.02), (350.0, "HK", 0.2),
+        (2500, "JP", 1), (4000, "JP", 5), (12000, "JP", 10),
+        (12.34, "CN", 0.01), (25000, "VN_HSX", 50)
+    ]
+    for price, ladder, expected in cases:
+        actual = tick_units(to_units(price), ladder)
+        if actual != to_units(expected):
+            print(f"❌ {ladder} {price}의 호가 단위는 {expected}여야 합니다. (결과 {actual})")
+            return False
+    print(f"{len(cases)}개 가격 확인 완료")
+
+    # Step 3: 종목 정보 조회와 파일 저장
+    print("\n[Step 3] 종목 정보 조회 → 파일 저장 → 다시 읽기")
+    load_instruments()
+    instrument = get_instrument("TQQQ", "NAS")
+    get_instrument("TQQQ", "NAS")
+    print(f"{instrument.symbol}: {instrument.name}, {instrument.order_exchange}, {instrument.currency}, 매매 단위 {instrument.lot_size}주")
+
+    if (instrument.name, instrument.order_exchange, instrument.currency, instrument.lot_size, instrument.tick_ladder) != \
+            ("PROSHARES ULTRAPRO QQQ", "NASD", "USD", 1, "US"):
+        print("❌ 종목 정보가 틀립니다.")
+        return False
+    if server.call_counts.get(PRODUCT_INFO_TR_ID, 0) != 1:
+        print("❌ 같은 종목은 한 번만 조회해야 합니다.")
+        return False
+
+    with open(cache_path, "r", encoding="utf-8") as file:
+        saved_symbols = [record["symbol"] for record in json.load(file)]
+
+    calls_before = sum(server.call_counts.values())
+    loaded_count = load_instruments()
+    reloaded = get_instrument("TQQQ", "NAS")
+    print(f"저장된 종목: {saved_symbols}, 다시 읽은 종목 수: {loaded_count}, 추가 API 호출: {sum(server.call_counts.values()) - calls_before}회")
+
+    if saved_symbols != ["TQQQ"] or reloaded != instrument or sum(server.call_counts.values()) != calls_before:
+        print("❌ 파일에서 다시 읽은 종목 정보는 API 호출 없이 사용해야 합니다.")
+        return False
+
+    # 오래된 정보는 다시 조회합니다
+    get_instrument("TQQQ", "NAS", max_age_days=0)
+    if server.call_counts.get(PRODUCT_INFO_TR_ID, 0) != 2:
+        print("❌ 오래된 종목 정보는 다시 조회해야 합니다.")
+        return False
+
+    # Step 4: 조회 실패
+    print("\n[Step 4] 조회 실패 시 거래소 기본값")
+    fallback = get_instrument("UNKNOWN", "HKS")
+    print(f"{fallback.symbol}: {fallback.order_exchange}, {fallback.currency}, 매매 단위 {fallback.lot_size}주")
+
+    with open(cache_path, "r", encoding="utf-8") as file:
+        saved_symbols = [record["symbol"] for record in json.load(file)]
+
+    if (fallback.order_exchange, fallback.currency, fallback.tick_ladder) != ("SEHK", "HKD", "HK") or "UNKNOWN" in saved_symbols:
+        print("❌ 조회에 실패하면 거래소 기본값을 쓰고 파일에는 저장하지 않아야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_instruments()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,164 @@
+"""
+장 마감 전 주문 재평가(intraday) 테스트
+
+가짜 서버와 가짜 시계(1분씩 흐름)로 장 마감 20분 전부터 10분 전까지 실행하며
+1. 처음에 초기 진입 주문을 넣는지
+2. 현재가가 호가 단위 안에서만 움직이면(계획 입력 키가 같으면) 아무 주문도 보내지 않는지
+3. 현재가가 바뀌면 초기 진입 주문을 새 가격으로 정정하고, 저널에 새 주문번호를 남기는지
+4. 초기 진입이 체결되어 미체결 수량이 없으면 정정하지 않고 잔고를 다시 조회하여 LOC 주문을 넣는지
+5. 일부 체결된 주문은 남은 수량(nccs_qty)으로 정정하는지
+확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+server = MockKisServer(cash=10000)
+server.set_market("TQQQ", open_price=50.0, last_price=51.0)
+
+temp_folder = tempfile.mkdtemp()
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+os.environ["LOG_DIR"] = temp_folder
+os.environ["JOURNAL_PATH"] = os.path.join(temp_folder, "order_journal.jsonl")
+os.environ["CYCLE_INDEX_PATH"] = os.path.join(temp_folder, "cycle_index.jsonl")
+os.environ["NOTIFY_BACKENDS"] = "file"
+os.environ["NOTIFY_FILE_PATH"] = os.path.join(temp_folder, "notifications.jsonl")
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from intraday import MARKET_TIMEZONE, run_intraday_loop, diff_orders, apply_actions
+from order_journal import replay_journal
+from realtime import PriceBook
+from notifier import flush_notifications
+
+# 매 차례가 끝난 뒤(기다리는 동안) 가격표에 들어올 현재가
+# 가짜 서버의 현재가는 51.0이므로, 51.0 이상으로 정정한 매수 주문은 바로 체결됩니다
+SCRIPTED_LAST_PRICES = [50.0, 50.5, 50.503, 51.2, 51.5, 51.5, 51.7, 51.8, 51.9, 52.0]
+
+
+def test_diff_orders():
+    """계획과 걸려 있는 주문을 비교한 결과를 확인합니다."""
+    live_orders = {
+        "평단 매수": {"order": {"side": "BUY", "quantity": 2, "price": 50.0, "order_type": "LOC", "comment": "평단 매수"}, "odno": "1", "key": "a"},
+        "큰수 매수": {"order": {"side": "BUY", "quantity": 2, "price": 55.0, "order_type": "LOC", "comment": "큰수 매수"}, "odno": "2", "key": "b"},
+        "초기 진입": {"order": {"side": "BUY", "quantity": 4, "price": 50.0, "order_type": "LIMIT", "comment": "초기 진입"}, "odno": "3", "key": "c"}
+    }
+    planned_orders = [
+        {"side": "SELL", "quantity": 4, "price": 56.1, "order_type": "LIMIT", "comment": "익절"},
+        {"side": "BUY", "quantity": 2, "price": 50.0, "order_type": "LOC", "comment": "평단 매수"},
+        {"side": "BUY", "quantity": 2, "price": 55.5, "order_type": "LOC", "comment": "큰수 매수"}
+    ]
+
+    actions = [(action, (order or live["order"])["comment"]) for action, order, live in diff_orders(planned_orders, live_orders)]
+    print(f"비교 결과: {actions}")
+
+    return actions == [("PLACE", "익절"), ("REVISE", "큰수 매수"), ("CANCEL", "초기 진입")]
+
+
+def test_intraday():
+    """가짜 시계로 장 마감 전 20분 동안 재평가를 실행합니다."""
+
+    print("=" * 60)
+    print("장 마감 전 주문 재평가 테스트")
+    print("=" * 60)
+
+    print("\n[Step 1] 계획 비교")
+    if not test_diff_orders():
+        print("❌ 같은 주문은 그대로, 가격이 바뀐 주문은 정정, 없어진 주문은 취소해야 합니다.")
+        return False
+
+    price_book = PriceBook()
+    price_book.update("TQQQ", open=50.0, last=SCRIPTED_LAST_PRICES[0])
+
+    clock = {"now": datetime.now(MARKET_TIMEZONE).replace(hour=15, minute=40, second=0, microsecond=0)}
+    scripted_prices = list(SCRIPTED_LAST_PRICES[1:])
+
+    def fake_now():
+        return clock["now"]
+
+    def fake_sleep(seconds):
+        clock["now"] += timedelta(seconds=seconds)
+        if scripted_prices:
+            price_book.update("TQQQ", open=50.0, last=scripted_prices.pop(0))
+
+    print("\n[Step 2] 장 마감 20분 전 ~ 10분 전, 1분마다 재평가")
+    summary = run_intraday_loop(
+        "TQQQ", "NAS", "NASD",
+        splits=40, take_profit_rate=0.10, big_buy_range=0.10,
+        trade_mode="LIVE", price_book=price_book,
+        interval_seconds=60, window_minutes=30, cutoff_minutes=10,
+        now_func=fake_now, sleep_func=fake_sleep
+    )
+    flush_notifications()
+
+    print(f"\n확인 {summary['iterations']}회, 계획 변경 {summary['replanned']}회, 그대로 {summary['unchanged']}회")
+    print(f"신규 {summary['placed']}건, 정정 {summary['revised']}건, 실패 {len(summary['failed'])}건")
+    print(f"주문 API 호출: 신규 {server.call_counts.get('TTTT1002U', 0)}회, 정정/취소 {server.call_counts.get('TTTT1004U', 0)}회")
+
+    # 15:40 ~ 15:49 → 10회
+    if summary["iterations"] != 10:
+        print("❌ 장 마감 10분 전까지 1분마다 확인해야 합니다.")
+        return False
+
+    # 50.0 → 50.0 / 50.5 → 50.503 은 계획 입력 키가 같으므로 주문을 보내지 않습니다
+    # 초기 진입(50.0) + 정정 50.5, 51.2 + 체결되어 정정 실패 1회 + 잔고 재조회 후 LOC 2건
+    if summary["revised"] != 2 or summary["placed"] != 3 or len(summary["failed"]) != 1:
+        print("❌ 초기 진입 1건, 정정 2건, 정정 실패 1건 후 LOC 2건이어야 합니다.")
+        return False
+
+    # 체결된 주문은 미체결 조회로 알 수 있으므로 정정 API를 부르지 않습니다
+    if server.call_counts.get("TTTT1002U", 0) != 3 or server.call_counts.get("TTTT1004U", 0) != 2:
+        print("❌ 계획이 바뀌지 않은 차례에는 주문 API를 부르지 않아야 합니다.")
+        return False
+
+    comments = sorted(summary["live_orders"])
+    print(f"마지막 주문: {comments}")
+    if comments != ["큰수 매수", "평단 매수"]:
+        print("❌ 초기 진입 체결 후에는 LOC 주문이 걸려 있어야 합니다.")
+        return False
+
+    print("\n[Step 3] 저널에 정정된 주문번호 기록")
+    entries = replay_journal(os.environ["JOURNAL_PATH"])
+    entry = next(entry for key, entry in entries.items() if key.endswith(":초기 진입"))
+    revised = [order for order in server.orders if order["odno"] == entry["odno"]]
+    print(f"초기 진입: 주문번호 {entry['odno']}, 가격 ${entry['order']['price']}")
+
+    if not revised or revised[0]["ft_ord_unpr3"] != 51.2 or entry["order"]["price"] != 51.2:
+        print("❌ 저널에는 마지막으로 정정한 주문번호와 가격이 남아야 합니다.")
+        return False
+
+    print("\n[Step 4] 일부 체결된 주문은 남은 수량으로 정정")
+    key, entry = next((key, entry) for key, entry in entries.items() if key.endswith(":평단 매수"))
+    open_order = next(order for order in server.orders if order["odno"] == entry["odno"])
+    open_order["ft_ccld_qty"], open_order["nccs_qty"] = 1, open_order["ft_ord_qty"] - 1
+    live = {"order": entry["order"], "odno": entry["odno"], "key": key}
+    counts = apply_actions([("REVISE", {**entry["order"], "price": 49.0}, live)], "TQQQ", "NAS", "NASD",
+                           "", "LIVE", {entry["order"]["comment"]: live}, os.environ["JOURNAL_PATH"])
+    revised = [order for order in server.orders if order["orgn_odno"] == entry["odno"]]
+    print(f"주문 {open_order['ft_ord_qty']}주 중 1주 체결 → 정정 {revised[0]['ft_ord_qty'] if revised else '-'}주")
+
+    if counts["REVISE"] != 1 or not revised or revised[0]["ft_ord_qty"] != open_order["ft_ord_qty"] - 1:
+        print("❌ 계획 수량이 아니라 남은 수량으로 정정해야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_intraday()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,84 @@
+"""
+API 호출 통계(metrics) 테스트
+
+1. 걸린 시간 구간(bucket)으로 추정한 p50/p95/p99가 실제 값과 가까운지 확인합니다
+2. Prometheus 형식 출력에 필요한 항목이 모두 들어 있는지 확인합니다
+실제 API는 호출하지 않습니다.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from metrics import record_api_call, get_summary, format_prometheus, export_metrics, reset_metrics
+
+
+def test_metrics():
+    """
+    1ms ~ 1000ms 호출 1000건을 기록하고 통계를 확인합니다.
+    """
+
+    print("=" * 60)
+    print("API 호출 통계 테스트")
+    print("=" * 60)
+
+    reset_metrics()
+
+    # 1ms, 2ms, ..., 1000ms 호출을 1건씩 기록합니다
+    for i in range(1, 1001):
+        record_api_call("HHDFS76200200", i / 1000, 200, rt_cd="0", msg_cd="MCA00000", response_bytes=100)
+
+    # 초당 호출 한도 초과 응답 1건
+    record_api_call("TTTT1002U", 0.05, 500, rt_cd="1", msg_cd="EGW00201", response_bytes=80, retries=1)
+
+    summary = get_summary()
+    price_stats = summary["HHDFS76200200"]
+
+    print(f"\np50: {price_stats['latency_p50'] * 1000:.0f}ms (실제 500ms)")
+    print(f"p95: {price_stats['latency_p95'] * 1000:.0f}ms (실제 950ms)")
+    print(f"p99: {price_stats['latency_p99'] * 1000:.0f}ms (실제 990ms)")
+
+    # 구간 경계가 1.2배씩 늘어나므로 오차는 20% 이내여야 합니다
+    for key, expected in (("latency_p50", 0.5), ("latency_p95", 0.95), ("latency_p99", 0.99)):
+        if abs(price_stats[key] - expected) / expected > 0.2:
+            print(f"❌ {key} 추정값이 실제 값과 너무 다릅니다.")
+            return False
+
+    if price_stats["calls"] != 1000 or price_stats["bytes"] != 100000:
+        print("❌ 호출 수 또는 응답 크기 합계가 틀립니다.")
+        return False
+
+    order_stats = summary["TTTT1002U"]
+    if order_stats["errors"] != 1 or order_stats["msg_cd"].get("EGW00201") != 1 or order_stats["retries"] != 1:
+        print("❌ 실패 응답이 올바르게 기록되지 않았습니다.")
+        return False
+
+    prometheus_text = format_prometheus()
+    required_lines = [
+        'kis_request_duration_seconds_bucket{tr_id="HHDFS76200200",le="+Inf"} 1000',
+        'kis_request_duration_seconds_count{tr_id="TTTT1002U"} 1',
+        'kis_responses_total{tr_id="TTTT1002U",msg_cd="EGW00201"} 1',
+        'kis_retries_total{tr_id="TTTT1002U"} 1'
+    ]
+    for line in required_lines:
+        if line not in prometheus_text:
+            print(f"❌ Prometheus 출력에 다음 줄이 없습니다: {line}")
+            return False
+
+    folder = tempfile.mkdtemp()
+    export_metrics(folder)
+    if not os.path.exists(os.path.join(folder, "metrics.json")) or not os.path.exists(os.path.join(folder, "metrics.prom")):
+        print("❌ 통계 파일이 저장되지 않았습니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_metrics()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,143 @@
+"""
+분봉 다운로드(minute_bars) 테스트
+
+가짜 서버에 이틀치 1분봉을 만들어 두고
+1. 연속조회를 따라 모든 분봉을 받아 일자별 파일(44바이트 고정 레코드)에 시각 순으로 쓰는지
+2. 다시 받을 때는 새 분봉만 이어 쓰고, 저장된 분봉에 닿으면 더 조회하지 않는지
+3. 쓰다가 끊겨 끝에 반쪽 레코드가 남아도 다음에 받을 때 바로잡는지
+4. 파일을 열별 정수 배열로 읽는지
+확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+
+def make_bars(trade_date, count, start_minute=0, base_price=50.0):
+    """09:30부터 1분 간격의 분봉을 만듭니다."""
+    bars = []
+    for minute in range(start_minute, start_minute + count):
+        hour, minute_of_hour = divmod(9 * 60 + 30 + minute, 60)
+        price = round(base_price + minute * 0.01, 2)
+        bars.append((trade_date, f"{hour:02d}{minute_of_hour:02d}00", price, price + 0.05, price - 0.05, price + 0.01, 100 + minute))
+    return bars
+
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+server = MockKisServer(cash=10000)
+server.set_market("TQQQ", open_price=50.0, last_price=51.0)
+day1_bars = make_bars("20240104", 390)
+day2_bars = make_bars("20240105", 200, base_price=52.0)
+server.set_minute_bars("TQQQ", day1_bars + day2_bars)
+
+temp_folder = tempfile.mkdtemp()
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+os.environ["LOG_DIR"] = temp_folder
+os.environ["BARS_DIR"] = os.path.join(temp_folder, "bars")
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from minute_bars import RECORD_SIZE, bar_path, last_stored_time, download_minute_bars, iter_bars, read_bar_columns
+from money import to_units
+
+MINUTE_BARS_TR_ID = "HHDFS76950200"
+
+
+def minute_bar_calls():
+    return server.call_counts.get(MINUTE_BARS_TR_ID, 0)
+
+
+def test_minute_bars():
+    """분봉 받기 → 이어 받기 → 반쪽 레코드 → 읽기를 확인합니다."""
+
+    print("=" * 60)
+    print("분봉 다운로드 테스트")
+    print("=" * 60)
+
+    day1_path = bar_path("TQQQ", "NAS", "20240104")
+    day2_path = bar_path("TQQQ", "NAS", "20240105")
+
+    # Step 1: 처음 받기
+    print("\n[Step 1] 이틀치 분봉 받기 (590개, 페이지당 120개)")
+    written = download_minute_bars("TQQQ", "NAS")
+    print(f"저장: {written}, 분봉 조회 {minute_bar_calls()}회")
+
+    # 가장 최근 분봉은 아직 만들어지는 중일 수 있으므로 저장하지 않습니다
+    if written != {"20240104": 390, "20240105": 199}:
+        print("❌ 첫날 390개, 둘째 날은 마지막 분봉을 뺀 199개를 저장해야 합니다.")
+        return False
+    if minute_bar_calls() != 5:
+        print("❌ 590개는 연속조회 5페이지로 받아야 합니다.")
+        return False
+    if os.path.getsize(day1_path) != 390 * RECORD_SIZE or RECORD_SIZE != 44:
+        print("❌ 분봉 하나는 44바이트 고정 레코드여야 합니다.")
+        return False
+
+    times = [record[0] for record in iter_bars(day1_path)]
+    if times[0] != 93000 or times[-1] != 155900 or times != sorted(times):
+        print("❌ 파일 안의 분봉은 시각 오름차순이어야 합니다.")
+        return False
+
+    # Step 2: 이어 받기
+    print("\n[Step 2] 30분 뒤 다시 받기")
+    server.set_minute_bars("TQQQ", day1_bars + make_bars("20240105", 230, base_price=52.0))
+    calls_before = minute_bar_calls()
+    written = download_minute_bars("TQQQ", "NAS")
+    print(f"저장: {written}, 분봉 조회 {minute_bar_calls() - calls_before}회")
+
+    # 지난번에 건너뛴 분봉 1개 + 새 분봉 29개 (이번 마지막 분봉은 다시 건너뜀)
+    if written != {"20240105": 30} or minute_bar_calls() - calls_before != 1:
+        print("❌ 새 분봉 30개만 한 페이지 조회로 받아야 합니다.")
+        return False
+    if last_stored_time(day2_path) != 131800 or os.path.getsize(day1_path) != 390 * RECORD_SIZE:
+        print("❌ 둘째 날 파일에만 이어 써야 합니다.")
+        return False
+
+    # Step 3: 반쪽 레코드
+    print("\n[Step 3] 끝에 반쪽 레코드가 남은 파일")
+    with open(day2_path, "ab") as file:
+        file.write(b"\x00" * 10)
+    if last_stored_time(day2_path) != 131800:
+        print("❌ 반쪽 레코드는 무시해야 합니다.")
+        return False
+
+    server.set_minute_bars("TQQQ", day1_bars + make_bars("20240105", 232, base_price=52.0))
+    written = download_minute_bars("TQQQ", "NAS")
+    print(f"저장: {written}, 파일 크기: {os.path.getsize(day2_path)}바이트")
+    if written != {"20240105": 2} or os.path.getsize(day2_path) != 231 * RECORD_SIZE:
+        print("❌ 반쪽 레코드를 잘라 내고 새 분봉을 이어 써야 합니다.")
+        return False
+
+    # Step 4: 열별 배열로 읽기
+    print("\n[Step 4] 열별 정수 배열로 읽기")
+    columns = read_bar_columns(day2_path)
+    first = make_bars("20240105", 1, base_price=52.0)[0]
+    print(f"분봉 {len(columns['time'])}개, 첫 분봉 시가 {columns['open'][0]} (마이크로 단위)")
+
+    if len(columns["close"]) != 231 or list(columns["time"]) != sorted(columns["time"]):
+        print("❌ 모든 분봉을 시각 순서대로 읽어야 합니다.")
+        return False
+    if (columns["open"][0], columns["high"][0], columns["low"][0], columns["close"][0], columns["volume"][0]) != \
+            (to_units(first[2]), to_units(first[3]), to_units(first[4]), to_units(first[5]), first[6]):
+        print("❌ 가격은 마이크로 단위, 체결량은 정수로 읽어야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_minute_bars()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,154 @@
+"""
+가짜 한국투자증권 서버(mock_kis_server) 테스트
+
+실제 서버 대신 가짜 서버에 KIS_DOMAIN을 맞추고
+1. 전략(무상태_무한매수법)이 시세/잔고/체결내역을 읽어 주문 목록을 만드는지
+2. LIVE 주문이 접수되고, 장 마감 때 LOC 주문이 체결되는지
+3. 주문체결내역 연속조회(여러 페이지)가 모두 모이는지
+4. 초당 호출 한도(EGW00201)와 토큰 재발급 제한(EGW00133) 응답이 오는지
+확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+# 가짜 서버를 먼저 켜고, 그 주소를 KIS_DOMAIN으로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+server = MockKisServer(cash=10000, page_size=20, script=[{"TQQQ": {"last": 54.0}}])
+server.set_market("TQQQ", open_price=50.0, last_price=51.0)
+server.set_holding("TQQQ", quantity=8, avg_price=49.5)
+
+temp_folder = tempfile.mkdtemp()
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+os.environ["LOG_DIR"] = temp_folder
+os.environ["CYCLE_INDEX_PATH"] = os.path.join(temp_folder, "cycle_index.jsonl")
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from strategy import 무상태_무한매수법
+import trader
+from trader import OrderRejectedError, place_overseas_order, get_overseas_today_orders
+
+
+def test_mock_kis_server():
+    """가짜 서버를 상대로 조회 → 주문 → 체결 → 연속조회를 확인합니다."""
+
+    print("=" * 60)
+    print("가짜 한국투자증권 서버 테스트")
+    print("=" * 60)
+
+    today = datetime.now().strftime("%Y%m%d")
+    server.add_filled_order("TQQQ", "BUY", 4, 49.0, ord_dt=today, ord_tmd="050000")
+    server.add_filled_order("TQQQ", "SELL", 6, 55.0, ord_dt=today, ord_tmd="060000")
+    server.add_filled_order("TQQQ", "BUY", 4, 50.0, ord_dt=today, ord_tmd="070000")
+
+    # Step 1: 전략 실행
+    print("\n[Step 1] 전략 실행")
+    result = 무상태_무한매수법("TQQQ", "NAS", splits=40, take_profit_rate=0.10, big_buy_range=0.10)
+    print(f"현재가 ${result['last_price']}, 보유 {result['position_qty']}주, 단위 {result['unit_qty']}주")
+    for order in result["orders"]:
+        print(f"  {order['comment']}: {order['side']} {order['quantity']}주 @ {order['price']} ({order['order_type']})")
+
+    comments = [order["comment"] for order in result["orders"]]
+    if result["position_qty"] != 8 or result["last_price"] != 51.0 or comments != ["익절", "평단 매수", "큰수 매수"]:
+        print("❌ 가짜 서버의 시세/잔고로 주문 목록이 만들어져야 합니다.")
+        return False
+
+    # Step 2: LIVE 주문 → 장 마감 체결
+    print("\n[Step 2] LOC 매수 주문 후 장 마감")
+    big_buy = result["orders"][2]
+    ack = place_overseas_order("TQQQ", "NASD", "LOC", big_buy["quantity"], big_buy["price"], trade_mode="LIVE")
+
+    server.advance_market()  # 시나리오: 현재가 54.0 (큰수 기준가 55.0보다 낮음)
+    filled_count = server.close_market()
+
+    fills = [order for order in get_overseas_today_orders("NAS", "TQQQ") if order["odno"] == ack["odno"]]
+    print(f"주문번호 {ack['odno']}, 체결 {filled_count}건, 체결단가 {fills[0]['ft_ccld_unpr3'] if fills else '-'}")
+
+    if filled_count != 1 or not fills or fills[0]["nccs_qty"] != "0" or float(fills[0]["ft_ccld_unpr3"]) != 54.0:
+        print("❌ LOC 매수 주문이 종가 54.0에 체결되어야 합니다.")
+        return False
+
+    # 증권사가 거부한 주문은 OrderRejectedError, 응답을 받지 못한 주문은 TimeoutError (접수 여부 모름)
+    try:
+        place_overseas_order("TQQQ", "NASD", "LOC", 0, big_buy["price"], trade_mode="LIVE")
+        print("❌ 수량 0 주문은 거부되어야 합니다.")
+        return False
+    except OrderRejectedError as e:
+        print(f"거부된 주문: {e}")
+
+    domain = trader.KIS_DOMAIN
+    trader.KIS_DOMAIN = "http://127.0.0.1:1"  # 연결할 수 없는 주소
+    try:
+        place_overseas_order("TQQQ", "NASD", "LOC", 1, big_buy["price"], trade_mode="LIVE")
+        print("❌ 연결 실패는 예외가 나야 합니다.")
+        return False
+    except TimeoutError as e:
+        print(f"응답을 받지 못한 주문: {e}")
+    finally:
+        trader.KIS_DOMAIN = domain
+
+    # Step 3: 연속조회
+    print("\n[Step 3] 주문체결내역 연속조회 (한 페이지 20건)")
+    for i in range(45):
+        server.add_filled_order("TQQQ", "BUY", 1, 50.0, ord_dt=today, ord_tmd=f"08{i:04d}")
+
+    calls_before = server.call_counts.get("TTTS3035R", 0)
+    today_orders = get_overseas_today_orders("NAS", "TQQQ")
+    pages = server.call_counts["TTTS3035R"] - calls_before
+    print(f"모은 주문: {len(today_orders)}건, 조회 횟수: {pages}회")
+
+    if len(today_orders) != 49 or pages != 3 or len({order["odno"] for order in today_orders}) != 49:
+        print("❌ 49건이 3페이지에 걸쳐 중복 없이 모여야 합니다.")
+        return False
+
+    # 기본 조회 범위(어제~오늘) 밖의 주문은 start_date를 넘겨야 보입니다 (월요일에 보는 금요일 주문 등)
+    friday = (datetime.now() - timedelta(days=3)).strftime("%Y%m%d")
+    old_odno = server.add_filled_order("TQQQ", "SELL", 1, 52.0, ord_dt=friday, ord_tmd="100000")
+    default_odnos = {order["odno"] for order in get_overseas_today_orders("NAS", "TQQQ")}
+    wide_odnos = {order["odno"] for order in get_overseas_today_orders("NAS", "TQQQ", start_date=friday)}
+    if old_odno in default_odnos or old_odno not in wide_odnos or len(wide_odnos) != 50:
+        print("❌ start_date부터의 주문이 모두 조회되어야 합니다.")
+        return False
+
+    # Step 4: 호출 한도와 토큰 재발급 제한
+    print("\n[Step 4] 초당 호출 한도 / 토큰 재발급 제한")
+    server.calls_per_second = 2
+    responses = [
+        requests.get(f"{server.url}/uapi/overseas-price/v1/quotations/price", params={"EXCD": "NAS", "SYMB": "TQQQ"}, timeout=5).json()
+        for _ in range(3)
+    ]
+    server.calls_per_second = None
+
+    server.token_interval_seconds = 60
+    token_body = {"grant_type": "client_credentials", "appkey": "mock-app-key", "appsecret": "mock-app-secret"}
+    requests.post(f"{server.url}/oauth2/tokenP", json=token_body, timeout=5)
+    second_token = requests.post(f"{server.url}/oauth2/tokenP", json=token_body, timeout=5).json()
+
+    print(f"세 번째 호출: {responses[2].get('msg_cd')}, 토큰 재발급: {second_token.get('error_code')}")
+
+    if responses[2].get("msg_cd") != "EGW00201" or second_token.get("error_code") != "EGW00133":
+        print("❌ 초당 한도 초과는 EGW00201, 1분 안에 토큰 재발급은 EGW00133이어야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_mock_kis_server()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
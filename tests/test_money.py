@@ -0,0 +1,87 @@
+"""
+고정소수점 가격/금액(money) 테스트
+
+1. API 문자열과 float가 같은 마이크로 단위 정수로 바뀌는지
+2. 주문 요청 단가 문자열에 float 오차가 섞이지 않는지
+3. 익절가/큰수 기준가/단위 수량 계산이 정수로 정확한지
+4. 전략 주문 계획이 float 오차 없이 호가 단위 가격을 만드는지
+를 확인합니다. API를 호출하지 않습니다.
+"""
+
+import sys
+from pathlib import Path
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from money import to_units, from_units, to_units_array, format_units, format_price, apply_rate, share_count
+from strategy import plan_orders
+
+
+def test_money():
+    """마이크로 단위 변환과 정수 계산을 확인합니다."""
+
+    print("=" * 60)
+    print("고정소수점 가격/금액 테스트")
+    print("=" * 60)
+
+    # Step 1: API 문자열 / float → 마이크로 단위
+    print("\n[Step 1] 마이크로 단위 변환")
+    cases = [("56.37", 56.37), ("0.9876", 0.9876), ("10000.00", 10000.0), ("1.14", 1.14), ("0", 0.0)]
+    for text, number in cases:
+        if to_units(text) != to_units(number) or from_units(to_units(text)) != number:
+            print(f"❌ {text!r}와 {number!r}는 같은 마이크로 단위여야 합니다. ({to_units(text)}, {to_units(number)})")
+            return False
+    if list(to_units_array(["56.37", 1.14, 3000])) != [56370000, 1140000, 3000000000]:
+        print("❌ 가격 목록을 마이크로 단위 배열로 바꿔야 합니다.")
+        return False
+    print(f"{len(cases)}개 가격 확인 완료")
+
+    # Step 2: 주문 요청 단가 문자열
+    print("\n[Step 2] 주문 요청 단가 문자열")
+    formatted = [format_price(0.1 + 0.2), format_price(50.0 * 1.1), format_price(3000.0), format_price("51.2000"), format_price(0)]
+    print(f"str(0.1 + 0.2) = {str(0.1 + 0.2)!r}, format_price(0.1 + 0.2) = {formatted[0]!r}")
+    if formatted != ["0.3", "55", "3000", "51.2", "0"]:
+        print(f"❌ 단가 문자열에 float 오차가 없어야 합니다. (결과 {formatted})")
+        return False
+    if format_units(-1500000, 2) != "-1.50":
+        print("❌ 음수 금액도 정확히 바꿔야 합니다.")
+        return False
+
+    # Step 3: 정수 계산
+    print("\n[Step 3] 비율 적용과 수량 계산")
+    if apply_rate(to_units("50.0"), 0.10) != to_units("55") or apply_rate(to_units("19.99"), 0.10) != to_units("21.989"):
+        print("❌ 가격에 (1 + 비율)을 곱한 값이 정확해야 합니다.")
+        return False
+    # 10000 / 80 / 51.0 = 2.45... → 2주, 1000 / 2 / 0.5 = 1000 (float로는 999가 되기 쉬운 경계)
+    if share_count(to_units("10000"), to_units("51.0"), 80) != 2 or share_count(to_units("1000"), to_units("0.5"), 2) != 1000:
+        print("❌ 살 수 있는 주식 수는 버림해야 합니다.")
+        return False
+    if share_count(to_units("1000"), 0, 2) != 0:
+        print("❌ 가격이 0이면 0주여야 합니다.")
+        return False
+
+    # Step 4: 전략 주문 계획
+    print("\n[Step 4] 전략 주문 계획")
+    plan = plan_orders(
+        position_qty=10, avg_price=1.14, open_price=50.0, last_price=51.0, unit_qty=5,
+        splits=40, take_profit_rate=0.10, big_buy_range=0.10
+    )
+    prices = {order["comment"]: order["price"] for order in plan["orders"]}
+    print(prices)
+
+    # 1.14 * 1.1 = 1.254 → 1.25, 평단 1.14는 그대로, 50.0 * 1.1 = 55.00000000000001 → 55.0
+    if prices != {"익절": 1.25, "평단 매수": 1.14, "큰수 매수": 55.0}:
+        print("❌ 주문 가격이 호가 단위에 맞게 정확히 계산되어야 합니다.")
+        return False
+    if any(format_price(price) != format_units(to_units(str(price))) for price in prices.values()):
+        print("❌ 주문 가격은 그대로 요청 문자열로 바꿀 수 있어야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_money()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,133 @@
+"""
+알림(notifier) 테스트
+
+file 백엔드와 webhook 백엔드를 사용하여
+- 여러 알림이 백엔드별로 한 번에 묶여 전송되는지
+- webhook이 꺼져 있을 때 실패한 알림이 재시도 파일에 남는지
+- webhook이 다시 켜지면 남아 있던 알림까지 모두 전송되는지
+- 텔레그램 메시지 여러 개 중 일부만 실패하면 보내지 못한 알림만 남는지
+확인합니다. 텔레그램으로는 보내지 않습니다.
+"""
+
+import json
+import os
+import socket
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+# 비어 있는 포트를 하나 골라 webhook 주소로 사용합니다
+with socket.socket() as probe:
+    probe.bind(("127.0.0.1", 0))
+    webhook_port = probe.getsockname()[1]
+
+# 테스트용 설정 (config를 읽기 전에 설정해야 합니다)
+temp_folder = tempfile.mkdtemp()
+os.environ["NOTIFY_BACKENDS"] = "file,webhook"
+os.environ["NOTIFY_FILE_PATH"] = os.path.join(temp_folder, "notifications.jsonl")
+os.environ["NOTIFY_RETRY_PATH"] = os.path.join(temp_folder, "notify_retry.jsonl")
+os.environ["NOTIFY_WEBHOOK_URL"] = f"http://127.0.0.1:{webhook_port}/hook"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import notifier
+
+# webhook으로 받은 요청 목록
+received_batches = []
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    """받은 알림 묶음을 기록하는 간단한 webhook 서버"""
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", "0"))
+        received_batches.append(json.loads(self.rfile.read(length)))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def count_lines(path):
+    """파일의 줄 수를 셉니다 (파일이 없으면 0)."""
+    if not os.path.exists(path):
+        return 0
+    with open(path, "r", encoding="utf-8") as file:
+        return len([line for line in file if line.strip()])
+
+
+def test_notifier():
+    """webhook 장애와 복구 상황에서 알림이 사라지지 않는지 테스트합니다."""
+
+    print("=" * 60)
+    print("알림(notifier) 테스트")
+    print("=" * 60)
+
+    notifier.BATCH_SECONDS = 0.2
+
+    # Step 1: webhook 서버가 꺼진 상태에서 알림 30개 전송
+    print("\n[Step 1] webhook이 꺼진 상태에서 알림 30개 전송")
+    for i in range(30):
+        notifier.notify(f"체결 {i + 1}", event_type="fill", data={"index": i})
+    notifier.flush_notifications(deadline_seconds=10)
+
+    file_count = count_lines(os.environ["NOTIFY_FILE_PATH"])
+    retry_count = count_lines(os.environ["NOTIFY_RETRY_PATH"])
+    print(f"file 기록: {file_count}건, 재시도 대기: {retry_count}건")
+
+    if file_count != 30 or retry_count != 30:
+        print("❌ file에는 30건 기록, webhook 실패분 30건은 재시도 파일에 남아야 합니다.")
+        return False
+
+    # Step 2: webhook 서버를 켜고 알림 1개를 더 보내면, 남은 알림까지 함께 전송
+    print("[Step 2] webhook을 켜고 알림 1개 추가 전송")
+    server = HTTPServer(("127.0.0.1", webhook_port), WebhookHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    notifier.notify("복구 확인", event_type="info")
+    notifier.flush_notifications(deadline_seconds=10)
+    server.shutdown()
+
+    delivered = sum(len(batch["events"]) for batch in received_batches)
+    print(f"webhook 요청 횟수: {len(received_batches)}회, 전달된 알림: {delivered}건")
+
+    if delivered != 31 or len(received_batches) != 1:
+        print("❌ 31건이 webhook 요청 1회로 묶여 전달되어야 합니다.")
+        return False
+
+    if count_lines(os.environ["NOTIFY_RETRY_PATH"]) != 0:
+        print("❌ 전송에 성공하면 재시도 파일이 비어야 합니다.")
+        return False
+
+    # Step 3: 텔레그램 메시지 3개 중 두 번째가 실패하면 첫 메시지의 알림은 다시 보내지 않음
+    print("[Step 3] 텔레그램 메시지 일부 실패")
+    events = [{"id": str(i), "message": f"{i}" * 1500} for i in range(6)]
+    sent_parts = []
+
+    def send_fails_second(message):
+        sent_parts.append(message)
+        return len(sent_parts) != 2
+
+    original_send, original_interval = notifier.telegram.send_telegram, notifier.telegram.MIN_SEND_INTERVAL
+    notifier.telegram.send_telegram, notifier.telegram.MIN_SEND_INTERVAL = send_fails_second, 0
+    try:
+        undelivered = notifier._send_to_telegram(events)
+    finally:
+        notifier.telegram.send_telegram, notifier.telegram.MIN_SEND_INTERVAL = original_send, original_interval
+
+    print(f"보낸 메시지: {len(sent_parts)}개, 다시 보낼 알림: {[event['id'] for event in undelivered]}")
+    if [event["id"] for event in undelivered] != ["2", "3", "4", "5"]:
+        print("❌ 이미 보낸 메시지의 알림은 다시 보내지 않아야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_notifier()
+    sys.exit(0 if success else 1)
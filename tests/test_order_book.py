@@ -0,0 +1,117 @@
+"""
+호가 조회와 호가 기준 초기 진입 가격 테스트
+
+가짜 서버에 호가를 설정하고
+1. 호가 조회 결과가 매수/매도 호가 목록으로 정리되는지
+2. 캐시 시간 안에는 호가 API를 다시 부르지 않는지
+3. 초기 진입 주문 가격을 매수호가/매도호가/가운데로 정할 수 있는지
+4. 실시간 가격표에 호가가 있으면 호가 API를 부르지 않는지
+확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+server = MockKisServer(cash=10000)
+server.set_market("TQQQ", open_price=50.0, last_price=51.0)
+server.set_order_book("TQQQ", bids=[(50.96, 300), (50.95, 500), (50.9, 800)], asks=[(51.03, 200), (51.05, 400)])
+
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from trader import get_overseas_asking_price, get_cached_asking_price
+from strategy import 무상태_무한매수법
+from realtime import PriceBook
+
+ASKING_PRICE_TR_ID = "HHDFS76200100"
+
+
+def asking_price_calls():
+    return server.call_counts.get(ASKING_PRICE_TR_ID, 0)
+
+
+def test_order_book():
+    """호가 조회 → 캐시 → 호가 기준 초기 진입 가격을 확인합니다."""
+
+    print("=" * 60)
+    print("호가 조회 테스트")
+    print("=" * 60)
+
+    # Step 1: 호가 조회
+    print("\n[Step 1] 호가 조회")
+    snapshot = get_overseas_asking_price("TQQQ", "NAS")
+    print(f"매수호가 {snapshot['bids']}")
+    print(f"매도호가 {snapshot['asks']}")
+    print(f"최우선 {snapshot['bid']} / {snapshot['ask']}, 가운데 {snapshot['mid']}, 스프레드 {snapshot['spread']:.2f}")
+
+    if snapshot["bids"] != [(50.96, 300), (50.95, 500), (50.9, 800)] or snapshot["asks"] != [(51.03, 200), (51.05, 400)]:
+        print("❌ 비어 있는 호가 단계는 빼고 매수/매도 호가 목록을 만들어야 합니다.")
+        return False
+    if abs(snapshot["mid"] - 50.995) > 1e-9 or snapshot["last"] != 51.0:
+        print("❌ 가운데 가격과 현재가가 틀립니다.")
+        return False
+
+    # Step 2: 캐시
+    print("\n[Step 2] 캐시 시간 안에는 다시 조회하지 않음")
+    calls_before = asking_price_calls()
+    get_cached_asking_price("TQQQ", "NAS")
+    get_cached_asking_price("TQQQ", "NAS")
+    cached_calls = asking_price_calls() - calls_before
+    get_cached_asking_price("TQQQ", "NAS", max_age_seconds=0)
+    print(f"두 번 조회 → API {cached_calls}회, 캐시 시간 0초 → API {asking_price_calls() - calls_before - cached_calls}회")
+
+    if cached_calls != 1 or asking_price_calls() - calls_before != 2:
+        print("❌ 캐시 시간 안에는 API를 한 번만 불러야 합니다.")
+        return False
+
+    # Step 3: 초기 진입 가격 기준
+    print("\n[Step 3] 초기 진입 가격 기준 (last / bid / ask / mid)")
+    expected_prices = {"last": 51.0, "bid": 50.96, "ask": 51.03, "mid": 50.99}
+    calls_before = asking_price_calls()
+
+    for mode, expected_price in expected_prices.items():
+        result = 무상태_무한매수법("TQQQ", "NAS", 40, 0.10, 0.10, entry_price_mode=mode)
+        entry_order = result["orders"][0]
+        print(f"  {mode:>4}: 초기 진입 ${entry_order['price']} (기준가 {result['entry_price']})")
+        if entry_order["comment"] != "초기 진입" or entry_order["price"] != expected_price:
+            print(f"❌ {mode} 기준 초기 진입 가격은 ${expected_price}이어야 합니다.")
+            return False
+
+    # bid / ask / mid 세 번 실행해도 호가는 한 번만 조회합니다
+    if asking_price_calls() - calls_before > 1:
+        print("❌ 같은 실행 안에서는 호가를 다시 조회하지 않아야 합니다.")
+        return False
+
+    # Step 4: 실시간 가격표
+    print("\n[Step 4] 실시간 가격표의 호가 사용")
+    price_book = PriceBook()
+    price_book.update("TQQQ", open=50.0, last=51.1, bid=51.06, ask=51.14)
+
+    calls_before = asking_price_calls()
+    result = 무상태_무한매수법("TQQQ", "NAS", 40, 0.10, 0.10, price_book=price_book, entry_price_mode="mid")
+    print(f"초기 진입 ${result['orders'][0]['price']}, 호가 API 호출 {asking_price_calls() - calls_before}회")
+
+    if result["orders"][0]["price"] != 51.1 or asking_price_calls() != calls_before:
+        print("❌ 가격표에 최신 호가가 있으면 호가 API를 부르지 않아야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_order_book()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,169 @@
+"""
+주문 저널 테스트
+
+응답 시간 초과와 프로그램 중단 상황을 흉내 내어,
+같은 주문이 두 번 접수되지 않는지 확인합니다.
+실제 API는 호출하지 않습니다.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from order_journal import (
+    ACK,
+    FAILED,
+    NOT_FOUND,
+    NOT_SENT,
+    SUBMITTED,
+    INTENT,
+    make_order_key,
+    write_event,
+    replay_journal,
+    reconcile_journal,
+    submit_with_journal
+)
+from trader import OrderRejectedError
+
+
+def test_order_journal():
+    """
+    시간 초과 후 재시도, 중단 후 복구를 차례로 테스트합니다.
+    """
+
+    print("=" * 60)
+    print("주문 저널 테스트")
+    print("=" * 60)
+
+    journal_path = os.path.join(tempfile.mkdtemp(), "order_journal.jsonl")
+    order = {"side": "BUY", "quantity": 2, "price": 50.12, "order_type": "LOC", "comment": "평단 매수"}
+    order_key = make_order_key("20240101", "TQQQ", order)
+
+    # Step 1: 첫 시도는 시간 초과, 주문내역에 없음 → 즉시 재전송
+    print("\n[Step 1] 시간 초과 후 재전송")
+    submit_calls = {"value": 0}
+    submit_retries = []
+
+    def flaky_submit(retries):
+        submit_calls["value"] += 1
+        submit_retries.append(retries)
+        if submit_calls["value"] == 1:
+            raise TimeoutError("응답 없음")
+        return {"odno": "0001", "org_no": "", "ord_tmd": "223000"}
+
+    sleeps = []
+    result = submit_with_journal(order_key, order, flaky_submit, lambda: "", journal_path=journal_path,
+                                 grace_seconds=0.05, poll_seconds=0.01, sleep=sleeps.append)
+
+    if result["odno"] != "0001" or submit_calls["value"] != 2:
+        print("❌ 주문내역에 없으면 한 번 더 보내야 합니다.")
+        return False
+    if not sleeps:
+        print("❌ 다시 보내기 전에 주문내역을 몇 번 더 확인해야 합니다.")
+        return False
+    if submit_retries != [0, 1]:
+        print(f"❌ 다시 보낼 때 재시도 횟수를 넘겨야 합니다. {submit_retries}")
+        return False
+
+    # Step 2: 시간 초과였지만 실제로는 접수됨 → 다시 보내지 않음
+    print("[Step 2] 시간 초과였지만 이미 접수된 주문")
+    second_key = make_order_key("20240101", "TQQQ", {**order, "comment": "큰수 매수"})
+
+    def timeout_submit(retries):
+        raise TimeoutError("응답 없음")
+
+    result = submit_with_journal(second_key, order, timeout_submit, lambda: "0002", journal_path=journal_path,
+                                 sleep=lambda seconds: None)
+
+    if result["odno"] != "0002":
+        print("❌ 이미 접수된 주문번호를 그대로 사용해야 합니다.")
+        return False
+
+    # Step 2-1: 시간 초과된 주문이 주문내역에 늦게 나타남 → 기다렸다가 그 주문번호 사용
+    print("[Step 2-1] 주문내역에 늦게 나타나는 주문")
+    late_key = make_order_key("20240101", "TQQQ", {**order, "comment": "늦은 접수"})
+    lookups = iter(["", "", "0009"])
+    late_submits = {"value": 0}
+
+    def late_submit(retries):
+        late_submits["value"] += 1
+        raise TimeoutError("응답 없음")
+
+    result = submit_with_journal(late_key, order, late_submit, lambda: next(lookups), journal_path=journal_path,
+                                 grace_seconds=60, poll_seconds=0, sleep=lambda seconds: None)
+
+    if result["odno"] != "0009" or late_submits["value"] != 1:
+        print("❌ 늦게 나타난 주문은 다시 보내지 않고 그 주문번호를 써야 합니다.")
+        return False
+
+    # Step 2-2: 증권사가 거부한 주문은 FAILED, 보내기 전에 실패한 주문은 NOT_SENT
+    print("[Step 2-2] 거부된 주문 / 보내기 전에 실패한 주문")
+    rejected_key = make_order_key("20240101", "TQQQ", {**order, "comment": "거부"})
+
+    def rejected_submit(retries):
+        raise OrderRejectedError("주문 실패 (응답코드: APBK0919): 주문가능금액 부족")
+
+    def token_failed_submit(retries):
+        raise Exception("토큰 획득 실패")
+
+    not_sent_key = make_order_key("20240101", "TQQQ", {**order, "comment": "미전송"})
+    for key, submit, expected in ((rejected_key, rejected_submit, FAILED), (not_sent_key, token_failed_submit, NOT_SENT)):
+        try:
+            submit_with_journal(key, order, submit, lambda: "", journal_path=journal_path, sleep=lambda seconds: None)
+            print("❌ 실패한 주문은 예외를 그대로 알려야 합니다.")
+            return False
+        except Exception:
+            pass
+        if replay_journal(journal_path)[key]["state"] != expected:
+            print(f"❌ {key}는 {expected}로 기록되어야 합니다.")
+            return False
+
+    # Step 3: 전송 직후 프로그램이 죽은 상황 → 재실행 시 주문내역과 맞춰 봄
+    print("[Step 3] 전송 직후 중단된 주문 복구")
+    crashed_key = make_order_key("20240101", "TQQQ", {**order, "comment": "익절"})
+    crashed_order = {"side": "SELL", "quantity": 5, "price": 60.0, "order_type": "LIMIT", "comment": "익절"}
+    write_event(crashed_key, INTENT, {"order": crashed_order}, journal_path)
+    write_event(crashed_key, SUBMITTED, {"attempt": 1}, journal_path)
+
+    # 기록 도중 죽어서 잘린 줄
+    with open(journal_path, "a", encoding="utf-8") as file:
+        file.write('{"key": "20240101:TQQQ:BUY')
+
+    entries = replay_journal(journal_path)
+
+    if entries[crashed_key]["state"] != SUBMITTED:
+        print("❌ 중단된 주문은 SUBMITTED 상태로 복원되어야 합니다.")
+        return False
+
+    today_orders = [
+        {"odno": "0001", "pdno": "TQQQ", "sll_buy_dvsn_cd": "02", "ft_ord_qty": "2", "ft_ord_unpr3": "50.12"},
+        {"odno": "0003", "pdno": "TQQQ", "sll_buy_dvsn_cd": "01", "ft_ord_qty": "5", "ft_ord_unpr3": "60.0000"},
+    ]
+    reconcile_journal(entries, "TQQQ", today_orders, journal_path)
+
+    if entries[crashed_key]["state"] != ACK or entries[crashed_key]["odno"] != "0003":
+        print("❌ 주문내역에 있는 주문은 ACK로 복구되어야 합니다.")
+        return False
+
+    # 주문내역에 없으면 NOT_FOUND (다시 보내도 안전)
+    lost_key = make_order_key("20240102", "TQQQ", order)
+    write_event(lost_key, INTENT, {"order": order}, journal_path)
+    write_event(lost_key, SUBMITTED, {"attempt": 1}, journal_path)
+    entries = replay_journal(journal_path)
+    reconcile_journal({lost_key: entries[lost_key]}, "TQQQ", [], journal_path)
+
+    if replay_journal(journal_path)[lost_key]["state"] != NOT_FOUND:
+        print("❌ 주문내역에 없는 주문은 NOT_FOUND로 기록되어야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_order_journal()
+    sys.exit(0 if success else 1)
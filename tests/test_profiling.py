@@ -0,0 +1,95 @@
+"""
+성능 분석(profiling) 테스트
+
+1. PROFILE_ENABLED=1 일 때 여러 번 실행한 결과가 합쳐져 보고서로 저장되는지 확인합니다
+2. 측정 중인 함수 안에서 다른 측정 함수를 불러도 오류 없이 바깥 보고서에 포함되는지 확인합니다
+실제 API는 호출하지 않습니다.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 테스트용 설정 (config를 읽기 전에 설정해야 합니다)
+temp_folder = tempfile.mkdtemp()
+os.environ["PROFILE_ENABLED"] = "1"
+os.environ["LOG_DIR"] = temp_folder
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from profiling import profiled, write_reports, reset_profiles
+
+
+@profiled("inner")
+def build_prices(count):
+    """메모리를 조금 할당하는 계산"""
+    return [round(i * 1.01, 2) for i in range(count)]
+
+
+@profiled("outer")
+def run_symbols():
+    """여러 종목을 실행하는 것처럼 inner를 여러 번 부릅니다"""
+    return sum(len(build_prices(20000)) for _ in range(3))
+
+
+def test_profiling():
+    """
+    단독 실행과 중첩 실행의 보고서를 확인합니다.
+    """
+
+    print("=" * 60)
+    print("성능 분석 테스트")
+    print("=" * 60)
+
+    reset_profiles()
+
+    # 단독으로 2번 실행 (백테스트처럼 같은 함수를 반복 실행)
+    build_prices(50000)
+    build_prices(50000)
+
+    # 측정 중인 함수 안에서 측정 함수를 실행
+    if run_symbols() != 60000:
+        print("❌ 측정 중에도 함수 결과는 그대로여야 합니다.")
+        return False
+
+    paths = write_reports(temp_folder)
+    names = sorted(os.path.basename(path) for path in paths)
+    print(f"\n저장된 보고서: {names}")
+
+    if len(paths) != 6:
+        print("❌ inner/outer 각각 보고서 3개씩 저장되어야 합니다.")
+        return False
+
+    inner_report = next(path for path in paths if os.path.basename(path).startswith("profile_inner") and path.endswith(".txt"))
+    outer_report = next(path for path in paths if os.path.basename(path).startswith("profile_outer") and path.endswith(".txt"))
+    outer_alloc = next(path for path in paths if os.path.basename(path).startswith("alloc_outer"))
+
+    with open(inner_report, "r", encoding="utf-8") as file:
+        inner_text = file.read()
+    with open(outer_report, "r", encoding="utf-8") as file:
+        outer_text = file.read()
+    with open(outer_alloc, "r", encoding="utf-8") as file:
+        alloc_text = file.read()
+
+    # 중첩 실행은 inner에 따로 세지 않고 outer 보고서에 포함됩니다
+    if "실행 횟수: 2회" not in inner_text:
+        print("❌ inner 단독 실행 2회가 합쳐져야 합니다.")
+        return False
+
+    if "build_prices" not in outer_text:
+        print("❌ outer 보고서에 안쪽 함수 시간이 포함되어야 합니다.")
+        return False
+
+    if "최대 메모리 사용량" not in alloc_text:
+        print("❌ 메모리 보고서에 최대 사용량이 있어야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_profiling()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,156 @@
+"""
+실시간 시세(WebSocket) 클라이언트 테스트
+
+가짜 REST 서버(접속키 발급)와 가짜 WebSocket 서버를 켜고
+1. 종목 등록 후 체결가/호가가 가격표(PriceBook)에 저장되는지
+2. PINGPONG 메시지에 응답하는지
+3. 연결이 끊기면 다시 접속하여 종목을 다시 등록하는지
+4. 가격표에 최신 값이 있으면 전략이 현재가 조회 API를 부르지 않는지
+5. 등록 해제가 되는지
+6. 호가만 새로 들어와도 체결가는 오래된 것으로 보는지
+확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+from mock_kis_websocket import MockKisWebSocket
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+rest_server = MockKisServer(cash=10000)
+rest_server.set_market("TQQQ", open_price=50.0, last_price=51.0)
+ws_server = MockKisWebSocket()
+
+os.environ["KIS_DOMAIN"] = rest_server.start()
+os.environ["KIS_WS_DOMAIN"] = ws_server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from realtime import PriceBook, RealtimePriceClient, QUOTE_TR_ID, TRADE_TR_ID, make_tr_key
+from strategy import 무상태_무한매수법
+
+
+def wait_for(condition, timeout=5.0):
+    """condition()이 참이 될 때까지 기다립니다."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_realtime():
+    """가짜 서버를 상대로 등록 → 수신 → 재접속 → 해제를 확인합니다."""
+
+    print("=" * 60)
+    print("실시간 시세 클라이언트 테스트")
+    print("=" * 60)
+
+    client = RealtimePriceClient()
+    client.subscribe("TQQQ", "NAS")
+    client.start()
+    tr_key = make_tr_key("TQQQ", "NAS")
+
+    def subscribed(count):
+        """체결가와 호가가 모두 count개 등록되었는지 (호가 등록 전에 보낸 호가는 버려집니다)"""
+        return ws_server.subscriber_count(TRADE_TR_ID, tr_key) == count and ws_server.subscriber_count(QUOTE_TR_ID, tr_key) == count
+
+    try:
+        # Step 1: 체결가 / 호가 수신
+        print("\n[Step 1] 체결가 / 호가 수신")
+        if not client.wait_until_connected(5) or not wait_for(lambda: subscribed(1)):
+            print("❌ 연결 후 종목이 등록되어야 합니다.")
+            return False
+
+        approval_keys = {message["header"].get("approval_key") for message in ws_server.received_messages}
+        if approval_keys != {rest_server.approval_key}:
+            print("❌ 발급받은 접속키로 등록해야 합니다.")
+            return False
+
+        ws_server.push_trade("TQQQ", last=51.2, open_price=50.0, bid=51.19, ask=51.21)
+        ws_server.push_quote("TQQQ", bid=51.18, ask=51.22, bid_size=300, ask_size=200)
+
+        if not wait_for(lambda: getattr(client.price_book.get("TQQQ"), "bid_size", None) == 300):
+            print("❌ 체결가와 호가가 가격표에 저장되어야 합니다.")
+            return False
+
+        tick = client.price_book.get("TQQQ")
+        print(f"현재가 {tick.last}, 시가 {tick.open}, 매수호가 {tick.bid} ({tick.bid_size}), 매도호가 {tick.ask} ({tick.ask_size})")
+        if (tick.last, tick.open, tick.bid, tick.ask) != (51.2, 50.0, 51.18, 51.22):
+            print("❌ 가격표의 값이 틀립니다.")
+            return False
+
+        # Step 2: PINGPONG
+        print("\n[Step 2] PINGPONG 응답")
+        ws_server.send_pingpong()
+        if not wait_for(lambda: any(m["header"].get("tr_id") == "PINGPONG" for m in ws_server.received_messages)):
+            print("❌ PINGPONG 메시지를 그대로 돌려보내야 합니다.")
+            return False
+
+        # Step 3: 연결 끊김 → 재접속
+        print("\n[Step 3] 연결 끊김 후 재접속")
+        ws_server.drop_connections()
+        if not wait_for(lambda: ws_server.connection_count == 2 and subscribed(1), timeout=10):
+            print("❌ 다시 접속하여 종목을 다시 등록해야 합니다.")
+            return False
+
+        ws_server.push_trade("TQQQ", last=52.0, open_price=50.0)
+        if not wait_for(lambda: client.price_book.get("TQQQ").last == 52.0):
+            print("❌ 재접속 후에도 시세를 받아야 합니다.")
+            return False
+        print(f"재접속 횟수: {client.connect_count - 1}회, 현재가 {client.price_book.get('TQQQ').last}")
+
+        # Step 4: 전략이 가격표를 사용 (현재가상세 API 호출 없음)
+        print("\n[Step 4] 가격표를 사용한 전략 실행")
+        calls_before = rest_server.call_counts.get("HHDFS76200200", 0)
+        result = 무상태_무한매수법("TQQQ", "NAS", 40, 0.10, 0.10, price_book=client.price_book)
+        calls_after = rest_server.call_counts.get("HHDFS76200200", 0)
+        print(f"전략 현재가 {result['last_price']}, 현재가상세 API 호출 {calls_after - calls_before}회")
+
+        if result["last_price"] != 52.0 or calls_after != calls_before:
+            print("❌ 가격표에 최신 값이 있으면 현재가상세 API를 부르지 않아야 합니다.")
+            return False
+
+        # Step 5: 등록 해제
+        print("\n[Step 5] 등록 해제")
+        client.unsubscribe("TQQQ", "NAS")
+        if not wait_for(lambda: subscribed(0)):
+            print("❌ 등록 해제 후에는 시세를 받지 않아야 합니다.")
+            return False
+
+        # Step 6: 체결가 / 호가 묶음별 신선도
+        print("\n[Step 6] 묶음별 신선도")
+        price_book = PriceBook()
+        price_book.update("TQQQ", last=51.0, open=50.0)
+        time.sleep(0.2)
+        price_book.update("TQQQ", bid=51.1, ask=51.3)
+        trade_tick = price_book.get("TQQQ", max_age_seconds=0.1, group="trade")
+        quote_tick = price_book.get("TQQQ", max_age_seconds=0.1, group="quote")
+        print(f"체결가 {'최신' if trade_tick else '오래됨'}, 호가 {'최신' if quote_tick else '오래됨'}")
+        if trade_tick is not None or quote_tick is None:
+            print("❌ 호가만 새로 들어왔으면 체결가는 오래된 것으로 봐야 합니다.")
+            return False
+
+    finally:
+        client.stop()
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_realtime()
+    finally:
+        ws_server.stop()
+        rest_server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,141 @@
+"""
+주문 대사(reconcile) 테스트
+
+1. 계획/접수/체결을 맞춰 체결, 일부 체결, 미체결, 초과 체결, 찾을 수 없음, 보내지 않음을 구분하는지
+2. 확인이 필요한 주문만 골라내는지
+3. 실행별 결과를 파일에 저장하고 날짜/종목으로 다시 읽는지
+4. 주문 1만 건을 맞추는 시간
+을 확인합니다. API를 호출하지 않습니다.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+# 테스트용 보고서 파일을 임시 폴더에 만듭니다 (config를 읽기 전에 설정해야 합니다)
+temp_folder = tempfile.mkdtemp()
+os.environ["RECONCILE_PATH"] = os.path.join(temp_folder, "reconcile.jsonl")
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from reconcile import reconcile_orders, needs_attention, save_report, read_reports
+
+
+def planned(comment, side, quantity, price, order_type="LIMIT"):
+    return {"side": side, "quantity": quantity, "price": price, "order_type": order_type, "comment": comment}
+
+
+def status(odno, filled_qty, order_qty, price=50.0, state="완료", reject=""):
+    return {
+        "odno": odno, "sll_buy_dvsn_cd": "02", "ft_ord_qty": str(order_qty), "ft_ccld_qty": str(filled_qty),
+        "ft_ccld_unpr3": str(price if filled_qty else 0), "nccs_qty": str(max(order_qty - filled_qty, 0)),
+        "prcs_stat_name": state, "rjct_rson_name": reject
+    }
+
+
+def test_reconcile():
+    """주문별 결과 → 확인 대상 → 저장/읽기 → 성능을 확인합니다."""
+
+    print("=" * 60)
+    print("주문 대사 테스트")
+    print("=" * 60)
+
+    # Step 1: 주문별 결과
+    print("\n[Step 1] 계획 / 접수 / 체결 맞추기")
+    plan = [
+        planned("익절", "SELL", 20, 55.0),
+        planned("평단 매수", "BUY", 5, 50.0, "LOC"),
+        planned("큰수 매수", "BUY", 5, 52.0, "LOC"),
+        planned("초기 진입", "BUY", 10, 50.0),
+        planned("추가 매수", "BUY", 4, 49.0),
+        planned("이상 체결", "BUY", 2, 50.0),
+    ]
+    acks = [
+        {"comment": "평단 매수", "odno": "0001"},
+        {"comment": "큰수 매수", "odno": "0002"},
+        {"comment": "초기 진입", "odno": "0003"},
+        {"comment": "추가 매수", "odno": "0004"},
+        {"comment": "이상 체결", "odno": "0005"},
+    ]
+    today_orders = [
+        status("0002", 0, 5, state="거부", reject="주문가능금액 부족"),
+        status("0001", 5, 5, price=49.5),
+        status("0003", 4, 10),
+        status("0005", 3, 2),
+        status("9999", 7, 7),   # 다른 실행의 주문은 결과에 나오지 않아야 함
+    ]
+    not_sent = [{"comment": "익절", "reason": "매도 주문 미지원"}]
+
+    report = reconcile_orders(plan, acks, today_orders, not_sent)
+    for row in report["orders"]:
+        print(f"  {row['status']:<10} {row['comment']}: {row['filled_qty']}/{row['quantity']}주 "
+              f"주문번호 {row['odno'] or '-'} {row['reason']}")
+
+    statuses = [row["status"] for row in report["orders"]]
+    if statuses != ["NOT_SENT", "FILLED", "UNFILLED", "PARTIAL", "NOT_FOUND", "OVERFILLED"]:
+        print(f"❌ 주문별 결과가 맞지 않습니다: {statuses}")
+        return False
+
+    rows = {row["comment"]: row for row in report["orders"]}
+    if rows["익절"]["reason"] != "매도 주문 미지원" or rows["큰수 매수"]["reason"] != "주문가능금액 부족":
+        print("❌ 보내지 않은 이유와 거부 사유를 남겨야 합니다.")
+        return False
+    if rows["평단 매수"]["avg_price"] != 49.5 or rows["초기 진입"]["unfilled_qty"] != 6 or rows["이상 체결"]["unfilled_qty"] != 0:
+        print("❌ 체결 단가와 미체결 수량이 맞지 않습니다.")
+        return False
+    if report["counts"]["FILLED"] != 1 or sum(report["counts"].values()) != len(plan):
+        print("❌ 결과별 주문 수가 맞지 않습니다.")
+        return False
+
+    # Step 2: 확인 대상
+    print("\n[Step 2] 확인이 필요한 주문")
+    attention = [row["comment"] for row in needs_attention(report)]
+    print(f"  {attention}")
+    if attention != ["초기 진입", "추가 매수", "이상 체결"]:
+        print("❌ 일부 체결, 찾을 수 없음, 초과 체결만 골라야 합니다.")
+        return False
+
+    # Step 3: 저장과 읽기
+    print("\n[Step 3] 저장 / 읽기")
+    save_report(report, "TQQQ", "LIVE", "20240102")
+    save_report(reconcile_orders([planned("초기 진입", "BUY", 2, 30.0)], [], []), "SOXL", "LIVE")
+    with open(os.environ["RECONCILE_PATH"], "a", encoding="utf-8") as file:
+        file.write('{"time": "끊긴 줄\n')
+
+    today = datetime.now().strftime("%Y-%m-%d")
+    reports = read_reports(today, "TQQQ")
+    print(f"  오늘 TQQQ 보고서 {len(reports)}건, 전체 {len(read_reports())}건")
+    if (len(reports) != 1 or reports[0]["orders"] != report["orders"] or reports[0]["trade_date"] != "20240102"
+            or len(read_reports()) != 2):
+        print("❌ 저장한 보고서를 그대로 다시 읽어야 합니다.")
+        return False
+    if read_reports("2000-01-01"):
+        print("❌ 다른 날짜의 보고서는 읽지 않아야 합니다.")
+        return False
+
+    # Step 4: 1만 건
+    print("\n[Step 4] 주문 1만 건")
+    count = 10_000
+    big_plan = [planned(f"#{number}", "BUY", 10, 50.0) for number in range(count)]
+    big_acks = [{"comment": f"#{number}", "odno": f"{number:010d}"} for number in range(count)]
+    big_status = [status(f"{number:010d}", number % 12, 10) for number in reversed(range(count))]
+
+    started_at = time.perf_counter()
+    big_report = reconcile_orders(big_plan, big_acks, big_status)
+    elapsed = time.perf_counter() - started_at
+    print(f"  {big_report['counts']} ({elapsed * 1000:.1f}ms)")
+    if big_report["counts"]["OVERFILLED"] != sum(1 for number in range(count) if number % 12 > 10) or elapsed > 1.0:
+        print("❌ 큰 목록도 주문번호로 빠르게 맞춰야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_reconcile()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,169 @@
+"""
+주문 전 위험 점검(risk) 테스트
+
+1. 전략이 만든 정상적인 주문 목록은 그대로 통과하는지
+2. 형식(주문 유형, 수량, 매매 단위, 호가 단위)이 틀린 주문을 빼는지
+3. 중복 주문과 현재가보다 불리한 쪽으로 동떨어진 지정가를 빼는지 (손실 구간의 익절/평단 매수는 통과)
+4. 주문 가능 금액, 최대 포지션, 보유 수량, 종목/계좌 한도를 목록 전체로 누적해서 보는지
+5. 주문 1만 건 목록을 점검하는 시간
+을 확인합니다. API를 호출하지 않습니다.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from risk import check_orders
+from strategy import plan_orders
+
+
+def order(side, quantity, price, order_type="LIMIT", comment="테스트"):
+    return {"side": side, "quantity": quantity, "price": price, "order_type": order_type, "comment": comment}
+
+
+def snapshot(last_price=50.0, position_qty=0, orderable_cash=10000.0, max_position=None):
+    return {"last_price": last_price, "position_qty": position_qty, "orderable_cash": orderable_cash, "max_position": max_position}
+
+
+def reasons(result):
+    return [rejected["comment"] for rejected in result["rejected"]]
+
+
+def test_risk():
+    """정상 계획 → 형식 → 중복/가격 범위 → 누적 한도 → 성능을 확인합니다."""
+
+    print("=" * 60)
+    print("주문 전 위험 점검 테스트")
+    print("=" * 60)
+
+    # Step 1: 전략이 만든 주문 목록
+    print("\n[Step 1] 전략 주문 목록")
+    plan = plan_orders(position_qty=20, avg_price=48.0, open_price=49.0, last_price=50.0, unit_qty=5,
+                       splits=40, take_profit_rate=0.10, big_buy_range=0.10)
+    context = snapshot(position_qty=20, max_position=plan["max_position"])
+    result = check_orders(plan["orders"], context)
+    print(f"주문 {len(plan['orders'])}개 → 통과 {len(result['accepted'])}개")
+    if result["accepted"] != plan["orders"] or result["rejected"]:
+        print("❌ 정상적인 계획은 모두 통과해야 합니다.")
+        return False
+
+    # Step 2: 형식
+    print("\n[Step 2] 주문 형식")
+    orders = [
+        order("BUY", 1, 50.0, "STOP", "유형"),
+        order("HOLD", 1, 50.0, comment="방향"),
+        order("BUY", 0, 50.0, comment="수량0"),
+        order("BUY", 1.5, 50.0, comment="소수수량"),
+        order("BUY", 1, None, comment="지정가없음"),
+        order("BUY", 1, 50.005, comment="호가"),
+        order("BUY", 1, 0, "MOC", "시장가"),
+    ]
+    result = check_orders(orders, snapshot())
+    for rejected in result["rejected"]:
+        print(f"  - {rejected['comment']}: {rejected['reason']}")
+    if reasons(result) != ["유형", "방향", "수량0", "소수수량", "지정가없음", "호가"] or len(result["accepted"]) != 1:
+        print("❌ 형식이 틀린 주문만 빼야 합니다.")
+        return False
+
+    result = check_orders([order("BUY", 150, 50.0, comment="단위"), order("BUY", 200, 50.0)],
+                          snapshot(orderable_cash=100000), lot_size=100)
+    if reasons(result) != ["단위"]:
+        print("❌ 매매 단위의 배수가 아닌 수량을 빼야 합니다.")
+        return False
+
+    # Step 3: 중복과 가격 범위
+    print("\n[Step 3] 중복 / 가격 범위")
+    orders = [
+        order("BUY", 1, 50.0, comment="평단 매수"),
+        order("BUY", 1, 50.0, comment="평단 매수"),
+        order("BUY", 1, 50.0, comment="큰수 매수"),
+        order("BUY", 1, 65.01, comment="비싼 매수"),
+        order("BUY", 1, 65.0, comment="범위 끝"),
+        order("BUY", 1, 20.0, comment="싼 매수"),
+        order("BUY", 1, 80.0, "LOC", "LOC 매수"),
+        order("SELL", 1, 34.99, comment="싼 매도"),
+        order("SELL", 1, 90.0, comment="비싼 매도"),
+        order("SELL", 1, 20.0, "LOC", "LOC 매도"),
+    ]
+    result = check_orders(orders, snapshot(position_qty=3))
+    for rejected in result["rejected"]:
+        print(f"  - {rejected['comment']}: {rejected['reason']}")
+    if reasons(result) != ["평단 매수", "비싼 매수", "싼 매도"]:
+        print("❌ 같은 주문 두 번째와 현재가보다 30% 넘게 불리한 지정가만 빼야 합니다.")
+        return False
+
+    # 손실 구간: 평단 $100, 현재가 $70 → 익절 $110 LIMIT 매도, 평단 $100 LOC 매수도 나가야 함
+    plan = plan_orders(position_qty=20, avg_price=100.0, open_price=72.0, last_price=70.0, unit_qty=5,
+                       splits=40, take_profit_rate=0.10, big_buy_range=0.10)
+    result = check_orders(plan["orders"], snapshot(last_price=70.0, position_qty=20, max_position=plan["max_position"]))
+    print(f"  손실 구간 계획: 통과 {[accepted['comment'] for accepted in result['accepted']]}")
+    if result["accepted"] != plan["orders"]:
+        print(f"❌ 손실 구간의 익절/평단 매수를 빼면 안 됩니다. {result['rejected']}")
+        return False
+
+    # Step 4: 누적 한도
+    print("\n[Step 4] 목록 전체의 누적 한도")
+    orders = [
+        order("BUY", 100, 50.0, comment="1"),   # $5,000
+        order("BUY", 100, 49.0, comment="2"),   # $4,900 (누적 9,900)
+        order("BUY", 3, 48.0, comment="3"),     # $144 → 금액 부족
+        order("BUY", 2, 48.0, comment="4"),     # $96 (누적 9,996)
+    ]
+    result = check_orders(orders, snapshot())
+    if reasons(result) != ["3"]:
+        print(f"❌ 주문 가능 금액을 누적해서 봐야 합니다. {result['rejected']}")
+        return False
+
+    # 시장가 매수는 현재가 + 30%로 금액을 잡음: 100주 × $65 = $6,500
+    result = check_orders([order("BUY", 100, 0, "MOC", "시장가")], snapshot(orderable_cash=6499))
+    if reasons(result) != ["시장가"]:
+        print("❌ 시장가 매수는 가격 범위 끝으로 금액을 잡아야 합니다.")
+        return False
+
+    result = check_orders([order("BUY", 5, 50.0, "LOC", "1"), order("BUY", 5, 45.0, "LOC", "2")],
+                          snapshot(position_qty=35, max_position=40))
+    if reasons(result) != ["2"]:
+        print("❌ 최대 포지션을 넘는 매수를 빼야 합니다.")
+        return False
+
+    result = check_orders([order("SELL", 6, 50.0, comment="1"), order("SELL", 5, 51.0, comment="2")],
+                          snapshot(position_qty=10))
+    if reasons(result) != ["2"]:
+        print("❌ 보유 수량보다 많이 팔 수 없어야 합니다.")
+        return False
+
+    # 종목: 보유 10주 × $50 = $500 + 매수 → 한도 $1,000
+    result = check_orders([order("BUY", 8, 50.0, comment="1"), order("BUY", 3, 50.0, comment="2")],
+                          snapshot(position_qty=10), max_symbol_exposure=1000)
+    if reasons(result) != ["2"]:
+        print("❌ 종목 보유 금액 한도를 넘는 매수를 빼야 합니다.")
+        return False
+
+    result = check_orders([order("BUY", 8, 50.0, comment="1")], snapshot(), account_exposure=9700,
+                          max_account_exposure=10000)
+    if reasons(result) != ["1"] or "계좌 한도" not in result["rejected"][0]["reason"]:
+        print("❌ 계좌 보유 금액 한도를 넘는 매수를 빼야 합니다.")
+        return False
+
+    # Step 5: 1만 건
+    print("\n[Step 5] 주문 1만 건")
+    big = [order("BUY" if number % 2 else "SELL", 1, round(40 + (number % 2000) * 0.01, 2), comment=f"#{number}")
+           for number in range(10_000)]
+    started_at = time.perf_counter()
+    result = check_orders(big, snapshot(position_qty=3000, orderable_cash=100000))
+    elapsed = time.perf_counter() - started_at
+    print(f"통과 {len(result['accepted']):,}개, 제외 {len(result['rejected']):,}개, {elapsed * 1000:.1f}ms")
+    if len(result["accepted"]) + len(result["rejected"]) != 10_000 or elapsed > 1.0:
+        print("❌ 큰 목록도 빠르게 점검해야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_risk()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,123 @@
+"""
+종목 스캐너(scanner) 테스트
+
+가짜 서버에 100개 종목을 만들어 두고
+1. 모든 종목을 동시에 조회하면서도 서버의 초당 호출 한도를 넘지 않는지
+2. 없는 종목은 실패 목록에, 주문할 수 없는 종목은 순위에서 빠지는지
+3. 거래대금이 크고, 변동폭이 크고, 시가 대비 많이 내린 종목이 1위인지
+4. 차례로 조회하는 것보다 빠른지
+확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+SYMBOL_COUNT = 100
+LATENCY = 0.1
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+# 요청이 서버에 닿는 시각이 조금씩 어긋나도 서버 한도(초당 100건)를 넘지 않도록 여유 있게 설정합니다
+server = MockKisServer(cash=10000, latency=LATENCY, calls_per_second=100)
+for number in range(SYMBOL_COUNT):
+    # 시가 50, 현재가는 종목마다 조금씩 다르게 (49.00 ~ 51.98), 거래량도 종목마다 다르게
+    server.set_market(f"ETF{number:03d}", open_price=50.0, last_price=49.0 + (number % 100) * 0.02,
+                      exchange="AMS" if number % 2 else "NAS", volume=100000 + number * 1000)
+
+# 크게 내렸고, 변동폭이 크고, 거래량이 가장 많은 종목
+server.set_market("DIPX", open_price=50.0, last_price=45.0, exchange="NAS", volume=5000000)
+server.market["DIPX"]["high"] = 52.0
+# 가장 많이 내렸지만 주문할 수 없는 종목
+server.set_market("HALT", open_price=50.0, last_price=40.0, exchange="NAS", volume=9000000, tradable=False)
+
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+os.environ["LOG_DIR"] = tempfile.mkdtemp()
+os.environ["API_CALLS_PER_SECOND"] = "60"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from scanner import parse_universe, scan_universe
+
+QUOTATION_TR_ID = "HHDFS00000300"
+PRICE_DETAIL_TR_ID = "HHDFS76200200"
+
+
+def test_scanner():
+    """유니버스 조회 → 실패 처리 → 순위를 확인합니다."""
+
+    print("=" * 60)
+    print("종목 스캐너 테스트")
+    print("=" * 60)
+
+    # Step 1: 유니버스 문자열
+    print("\n[Step 1] 유니버스 문자열 해석")
+    if parse_universe(" tqqq:nas, SOXL:AMS,,AAPL ") != [("TQQQ", "NAS"), ("SOXL", "AMS"), ("AAPL", "NAS")]:
+        print("❌ \"종목:거래소\" 목록을 해석하지 못했습니다.")
+        return False
+
+    # Step 2: 동시 조회
+    universe = [(symbol, quote["exchange"]) for symbol, quote in server.market.items()]
+    universe.append(("NOPE", "NAS"))
+    print(f"\n[Step 2] {len(universe)}개 종목 동시 조회")
+
+    result = scan_universe(universe, top_n=5)
+    calls = server.call_counts.get(QUOTATION_TR_ID, 0) + server.call_counts.get(PRICE_DETAIL_TR_ID, 0)
+    sequential_seconds = calls * LATENCY
+    print(f"걸린 시간: {result['elapsed']:.2f}초 (차례로 조회하면 최소 {sequential_seconds:.2f}초), 시세 조회 {calls}회")
+
+    if calls != 2 * len(universe):
+        print("❌ 종목마다 현재체결가와 현재가상세를 한 번씩 조회해야 합니다.")
+        return False
+    if server.rate_limited_count:
+        print(f"❌ 서버의 초당 호출 한도를 {server.rate_limited_count}번 넘었습니다.")
+        return False
+    if result["elapsed"] >= sequential_seconds:
+        print("❌ 동시에 조회하면 차례로 조회하는 것보다 빨라야 합니다.")
+        return False
+
+    # Step 3: 실패 / 주문 불가 종목
+    print("\n[Step 3] 실패 / 주문 불가 종목")
+    print(f"실패: {result['failed']}")
+    if result["failed"] != [("NOPE", "NAS", "시세 없음")]:
+        print("❌ 없는 종목은 실패 목록에 있어야 합니다.")
+        return False
+
+    ranked_symbols = [row["symbol"] for row in result["ranked"]]
+    if "HALT" in ranked_symbols:
+        print("❌ 주문할 수 없는 종목은 순위에서 빠져야 합니다.")
+        return False
+
+    # Step 4: 순위
+    print("\n[Step 4] 순위")
+    for row in result["ranked"]:
+        print(f"  {row['rank']}. {row['symbol']} 시가대비 {row['gap_from_open']:+.2%} 변동폭 {row['day_range']:.2%} 점수 {row['score']:.3f}")
+
+    if len(result["ranked"]) != 5 or ranked_symbols[0] != "DIPX":
+        print("❌ 거래대금/변동폭/하락폭이 모두 큰 DIPX가 1위여야 합니다.")
+        return False
+    top = result["ranked"][0]
+    if abs(top["gap_from_open"] + 0.10) > 1e-12 or abs(top["day_range"] - 0.14) > 1e-12:
+        print("❌ 시가 대비 -10%, 변동폭 14%여야 합니다.")
+        return False
+    if [row["score"] for row in result["ranked"]] != sorted((row["score"] for row in result["ranked"]), reverse=True):
+        print("❌ 점수가 높은 순서여야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_scanner()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,156 @@
+"""
+그림자 전략(shadow) 테스트
+
+1. 전략을 한 번 실행한 스냅샷으로 그림자 계획을 여러 개 세워도 API 호출이 늘지 않는지
+2. 그림자 계획이 같은 파라미터로 전략을 직접 실행한 결과와 같은지
+3. 잔고 부족처럼 계획을 세울 수 없는 파라미터는 이유만 남기는지
+4. 기록을 저장/읽고, 분봉으로 계획별 체결과 손익을 흉내 내는지
+를 확인합니다. 인터넷 연결 없이 실행됩니다.
+"""
+
+import os
+import sys
+import tempfile
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from mock_kis_server import MockKisServer
+
+# 가짜 서버를 먼저 켜고, 그 주소로 설정합니다 (config를 읽기 전에 설정해야 합니다)
+server = MockKisServer(cash=10000)
+server.set_market("TQQQ", open_price=49.0, last_price=50.0)
+server.set_holding("TQQQ", quantity=20, avg_price=48.0)
+
+temp_folder = tempfile.mkdtemp()
+os.environ["KIS_DOMAIN"] = server.start()
+os.environ["KIS_APP_KEY"] = "mock-app-key"
+os.environ["KIS_APP_SECRET"] = "mock-app-secret"
+os.environ["KIS_ACCOUNT_NO"] = "12345678"
+os.environ["LOG_DIR"] = temp_folder
+os.environ["CYCLE_INDEX_PATH"] = os.path.join(temp_folder, "cycle_index.jsonl")
+os.environ["SHADOW_PATH"] = os.path.join(temp_folder, "shadow.jsonl")
+# 손익을 손으로 계산하기 쉽도록 비용을 없앱니다
+os.environ["COMMISSION_RATE"] = "0"
+os.environ["SEC_FEE_RATE"] = "0"
+os.environ["FINRA_TAF_PER_SHARE"] = "0"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from money import to_units
+from strategy import 무상태_무한매수법
+from shadow import parse_shadow_params, plan_shadows, live_shadow, save_shadows, read_shadows, simulate_shadows
+
+
+def total_calls():
+    return sum(server.call_counts.values())
+
+
+def bar_columns(bars):
+    """(시각, 시가, 고가, 저가, 종가) 목록을 분봉 열로 바꿉니다."""
+    columns = {"time": array("q"), "open": array("q"), "high": array("q"), "low": array("q"), "close": array("q"), "volume": array("q")}
+    for bar_time, *prices in bars:
+        columns["time"].append(bar_time)
+        for name, price in zip(("open", "high", "low", "close"), prices):
+            columns[name].append(to_units(price))
+        columns["volume"].append(1000)
+    return columns
+
+
+def test_shadow():
+    """API 호출 수 → 직접 실행과 비교 → 잔고 부족 → 저장/흉내를 확인합니다."""
+
+    print("=" * 60)
+    print("그림자 전략 테스트")
+    print("=" * 60)
+
+    today = datetime.now().strftime("%Y%m%d")
+    for number in range(4):
+        server.add_filled_order("TQQQ", "BUY", 5, 48.0, ord_dt=today, ord_tmd=f"05{number:02d}00")
+
+    # Step 1: API 호출 수
+    print("\n[Step 1] 그림자 계획의 API 호출 수")
+    result = 무상태_무한매수법("TQQQ", "NAS", splits=40, take_profit_rate=0.10, big_buy_range=0.10)
+    calls_after_live = total_calls()
+
+    param_sets = parse_shadow_params(",".join(f"{splits}/0.{rate:02d}/0.10" for splits in (4, 20, 40, 80) for rate in range(1, 26)))
+    shadows = plan_shadows(result, param_sets)
+    print(f"실제 계획 API 호출 {calls_after_live}회, 그림자 {len(shadows)}개 뒤 {total_calls()}회")
+    if total_calls() != calls_after_live or len(shadows) != 100:
+        print("❌ 그림자 계획은 API를 부르지 않아야 합니다.")
+        return False
+
+    # Step 2: 직접 실행과 비교
+    print("\n[Step 2] 직접 실행한 결과와 비교")
+    by_name = {shadow["name"]: shadow for shadow in shadows}
+    direct = 무상태_무한매수법("TQQQ", "NAS", splits=20, take_profit_rate=0.02, big_buy_range=0.10)
+    shadow = by_name["20/0.02/0.10"]
+    for order in shadow["orders"]:
+        print(f"  {order['comment']}: {order['side']} {order['quantity']}주 @ {order['price']} ({order['order_type']})")
+    if shadow["orders"] != direct["orders"] or shadow["unit_qty"] != direct["unit_qty"] or shadow["max_position"] != 100:
+        print("❌ 그림자 계획은 같은 파라미터로 직접 실행한 결과와 같아야 합니다.")
+        return False
+    if by_name["4/0.10/0.10"]["buy_qty"] != 0 or by_name["40/0.10/0.10"]["orders"] != result["orders"]:
+        print("❌ 최대 포지션에 닿은 파라미터는 추가 매수가 없어야 합니다.")
+        return False
+
+    # Step 3: 잔고 부족
+    print("\n[Step 3] 계획을 세울 수 없는 파라미터")
+    empty = dict(result, position_qty=0, avg_price=0.0, orderable_cash=100.0, cycle_unit_qty=None, entry_price=50.0)
+    empty_shadows = plan_shadows(empty, parse_shadow_params("1/0.10/0.10,40/0.10/0.10"))
+    for empty_shadow in empty_shadows:
+        print(f"  {empty_shadow['name']}: 단위 {empty_shadow['unit_qty']}주 {empty_shadow['error']}")
+    if empty_shadows[0]["error"] or empty_shadows[0]["buy_qty"] != 2 or "잔고 부족" not in empty_shadows[1]["error"]:
+        print("❌ 잔고가 부족한 파라미터만 이유를 남겨야 합니다.")
+        return False
+
+    try:
+        parse_shadow_params("20/0.05")
+        print("❌ 형식이 틀린 파라미터는 예외가 나야 합니다.")
+        return False
+    except Exception as e:
+        print(f"  형식 오류: {e}")
+
+    # Step 4: 저장과 흉내
+    print("\n[Step 4] 저장 / 분봉으로 흉내")
+    live = live_shadow(result, 40, 0.10, 0.10)
+    save_shadows(result, [live, by_name["20/0.02/0.10"], by_name["4/0.10/0.10"]])
+    records = read_shadows(datetime.now().strftime("%Y-%m-%d"), "TQQQ")
+    if len(records) != 1 or [shadow["name"] for shadow in records[0]["shadows"]] != ["live", "20/0.02/0.10", "4/0.10/0.10"]:
+        print("❌ 저장한 기록을 다시 읽어야 합니다.")
+        return False
+
+    columns = bar_columns([
+        (93000, 49.00, 49.50, 48.90, 49.20),
+        (93100, 49.20, 49.30, 47.80, 48.00),
+        (155900, 48.00, 48.10, 47.40, 47.50),  # 종가 47.50
+    ])
+    outcomes = {outcome["name"]: outcome for outcome in simulate_shadows(records[0], columns)}
+    for outcome in outcomes.values():
+        print(f"  {outcome['name']}: 체결 {outcome['filled']}, 매수 {outcome['bought']}, 매도 {outcome['sold']}, "
+              f"보유 {outcome['position_qty']}, 손익 {outcome['trade_pnl']}")
+
+    # 실제: 평단(48.00)/큰수(53.90) LOC 매수가 종가 47.50에 체결, 익절(52.80) 미체결 → 종가 평가 손익 0
+    # 20/0.02: 익절 48.96이 첫 분봉 시가 49.00에 체결 → 20주 × (49.00 - 47.50) = 30
+    if (outcomes["live"]["bought"], outcomes["live"]["sold"], outcomes["live"]["trade_pnl"]) != (10, 0, 0.0):
+        print("❌ 실제 계획은 LOC 매수 2건만 체결되어야 합니다.")
+        return False
+    if (outcomes["20/0.02/0.10"]["sold"], outcomes["20/0.02/0.10"]["position_qty"], outcomes["20/0.02/0.10"]["trade_pnl"]) != (20, 10, 30.0):
+        print("❌ 익절이 낮은 그림자는 익절 매도가 체결되어야 합니다.")
+        return False
+    if outcomes["4/0.10/0.10"]["filled"] != 0 or outcomes["4/0.10/0.10"]["cash"] != result["orderable_cash"]:
+        print("❌ 체결이 없으면 현금이 그대로여야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    try:
+        success = test_shadow()
+    finally:
+        server.stop()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,127 @@
+"""
+호가 단위 맞춤(tick) 테스트
+
+1. float 오차로 한 호가 내려가던 가격(1.14, 8.29, 56.37 등)이 그대로 유지되는지
+2. 미국/홍콩/도쿄/중국 호가 단위표에 맞게 버림/올림/반올림되는지
+3. 가격 목록을 한 번에 맞춘 결과가 하나씩 맞춘 결과, Decimal로 계산한 결과와 같은지
+4. 마이크로 단위 가격을 주문 요청용 문자열로 바꾸는지
+5. 가격 100만 개를 한 번에 맞추는 시간
+을 확인합니다. API를 호출하지 않습니다.
+"""
+
+import random
+import sys
+import time
+from array import array
+from decimal import Decimal, ROUND_FLOOR
+from pathlib import Path
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from money import to_units, format_units
+from tick import FLOOR, CEIL, NEAREST, round_price, round_prices, round_units, round_units_array
+from strategy import adjust_price_to_tick
+
+
+def decimal_floor(text, tick_text):
+    """Decimal로 계산한 버림 결과 (비교용)"""
+    price = Decimal(text)
+    tick = Decimal(tick_text)
+    return float((price / tick).to_integral_value(ROUND_FLOOR) * tick)
+
+
+def test_tick():
+    """호가 단위 맞춤이 정확한지 확인합니다."""
+
+    print("=" * 60)
+    print("호가 단위 맞춤 테스트")
+    print("=" * 60)
+
+    # Step 1: float 오차
+    print("\n[Step 1] float 오차로 내려가던 가격")
+    exact_prices = [1.14, 1.15, 8.29, 56.37, 0.29, 4.35]
+    for price in exact_prices:
+        if adjust_price_to_tick(price) != price:
+            print(f"❌ {price}는 이미 호가 단위에 맞으므로 그대로여야 합니다. (결과 {adjust_price_to_tick(price)})")
+            return False
+    print(f"{exact_prices} 그대로 유지")
+
+    if adjust_price_to_tick(0.98769) != 0.9876 or adjust_price_to_tick(56.378) != 56.37:
+        print("❌ 호가 단위 아래 자리는 버려야 합니다.")
+        return False
+
+    # Step 2: 거래소별 호가 단위표
+    print("\n[Step 2] 거래소별 호가 단위")
+    cases = [
+        # (가격, 호가 단위표, 방식, 기대값)
+        (56.375, "US", FLOOR, 56.37),
+        (56.371, "US", CEIL, 56.38),
+        (56.375, "US", NEAREST, 56.38),
+        (0.98765, "US", NEAREST, 0.9877),
+        (15.33, "HK", FLOOR, 15.32),      # 10~20: 0.02
+        (0.333, "HK", FLOOR, 0.33),       # 0.25~0.5: 0.005
+        (0.499, "HK", CEIL, 0.5),
+        (250.3, "HK", NEAREST, 250.4),    # 200~500: 0.2
+        (3012, "JP", FLOOR, 3010),        # 3000~5000: 5
+        (2999.5, "JP", CEIL, 3000),
+        (31234, "JP", NEAREST, 31250),    # 30000~50000: 50
+        (12.345, "CN", FLOOR, 12.34),
+        (12.345, "CN", NEAREST, 12.35),
+        (12.341, "CN", CEIL, 12.35),
+    ]
+    for price, ladder, mode, expected in cases:
+        actual = round_price(price, ladder, mode)
+        if actual != expected:
+            print(f"❌ {ladder} {price} {mode}: {expected}이어야 합니다. (결과 {actual})")
+            return False
+    print(f"{len(cases)}개 확인 완료")
+
+    # Step 3: 목록 처리 = 하나씩 처리 = Decimal 계산
+    print("\n[Step 3] 목록 처리 결과 비교")
+    generator = random.Random(40)
+    texts = [f"{generator.uniform(0.5, 300):.6f}" for _ in range(20000)]
+
+    for ladder in ("US", "HK", "JP", "CN"):
+        units_list = array("q", [to_units(text) for text in texts])
+        for mode in (FLOOR, CEIL, NEAREST):
+            rounded = round_units_array(units_list, ladder, mode)
+            one_by_one = [round_units(units, ladder, mode) for units in units_list]
+            if list(rounded) != one_by_one:
+                print(f"❌ {ladder} {mode}: 목록 처리 결과가 하나씩 처리한 결과와 다릅니다.")
+                return False
+
+    us_tick = lambda text: "0.0001" if Decimal(text) < 1 else "0.01"
+    expected = [decimal_floor(text, us_tick(text)) for text in texts]
+    if round_prices(texts) != expected:
+        print("❌ 미국 호가 버림 결과가 Decimal 계산과 다릅니다.")
+        return False
+    print(f"가격 {len(texts)}개 × 4개 거래소 × 3개 방식 일치")
+
+    # Step 4: 주문 요청용 문자열
+    print("\n[Step 4] 주문 요청용 문자열")
+    formatted = [format_units(to_units("56.37")), format_units(to_units(56.37), 4), format_units(to_units("3000")), format_units(to_units("0.0001"))]
+    print(formatted)
+    if formatted != ["56.37", "56.3700", "3000", "0.0001"]:
+        print("❌ 마이크로 단위 가격을 정확한 문자열로 바꿔야 합니다.")
+        return False
+
+    # Step 5: 100만 개
+    print("\n[Step 5] 가격 100만 개 버림 (미국 호가 단위)")
+    units_list = array("q", (generator.randrange(500_000, 300_000_000) for _ in range(1_000_000)))
+    started_at = time.perf_counter()
+    rounded = round_units_array(units_list, "US", FLOOR)
+    elapsed = time.perf_counter() - started_at
+    print(f"걸린 시간: {elapsed:.2f}초 ({len(rounded) / elapsed / 1e6:.1f}백만 개/초)")
+
+    if len(rounded) != 1_000_000 or any(units % 100 for units in rounded[:1000]):
+        print("❌ 100만 개 모두 호가 단위에 맞아야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_tick()
+    sys.exit(0 if success else 1)
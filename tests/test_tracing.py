@@ -0,0 +1,102 @@
+"""
+트레이스(tracing) 테스트
+
+1. 안쪽 span이 바깥 span 안에 들어가도록 시각이 기록되는지 확인합니다
+2. 다른 스레드에서 기록한 span도 스레드 이름과 함께 저장되는지 확인합니다
+3. 저장한 파일이 Chrome trace 형식(traceEvents)인지 확인합니다
+4. 기록이 TRACE_MAX_EVENTS개를 넘으면 오래된 구간부터 버리는지 확인합니다
+실제 API는 호출하지 않습니다.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# 트레이스 기록을 켭니다 (tracing을 읽기 전에 설정해야 합니다)
+os.environ["TRACE_ENABLED"] = "1"
+
+# src 디렉토리를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tracing import span, export_trace, reset_trace, TRACE_MAX_EVENTS
+
+
+def test_tracing():
+    """
+    바깥/안쪽 span과 다른 스레드의 span을 기록하고 저장된 파일을 확인합니다.
+    """
+
+    print("=" * 60)
+    print("트레이스 테스트")
+    print("=" * 60)
+
+    reset_trace()
+
+    with span("strategy", symbol="TQQQ"):
+        with span("fetch.quotation", symbol="TQQQ"):
+            time.sleep(0.01)
+
+    def send():
+        with span("notify.telegram", category="notify"):
+            time.sleep(0.01)
+
+    worker = threading.Thread(target=send, name="telegram-sender")
+    worker.start()
+    worker.join()
+
+    path = os.path.join(tempfile.mkdtemp(), "trace.json")
+    saved_count = export_trace(path)
+
+    with open(path, "r", encoding="utf-8") as file:
+        trace = json.load(file)
+
+    events = {event["name"]: event for event in trace["traceEvents"] if event["ph"] == "X"}
+    thread_names = [event["args"]["name"] for event in trace["traceEvents"] if event["ph"] == "M"]
+
+    print(f"\n저장된 구간: {saved_count}개")
+    for name, event in events.items():
+        print(f"  {name}: 시작 {event['ts'] / 1000:.1f}ms, 길이 {event['dur'] / 1000:.1f}ms")
+
+    if saved_count != 3 or set(events) != {"strategy", "fetch.quotation", "notify.telegram"}:
+        print("❌ 구간 3개가 모두 저장되어야 합니다.")
+        return False
+
+    outer = events["strategy"]
+    inner = events["fetch.quotation"]
+    if inner["ts"] < outer["ts"] or inner["ts"] + inner["dur"] > outer["ts"] + outer["dur"]:
+        print("❌ 안쪽 구간이 바깥 구간 안에 들어 있어야 합니다.")
+        return False
+
+    if inner["dur"] < 10000 or inner["args"] != {"symbol": "TQQQ"}:
+        print("❌ 걸린 시간(마이크로초) 또는 함께 기록한 정보가 틀립니다.")
+        return False
+
+    if events["notify.telegram"]["tid"] == outer["tid"] or "telegram-sender" not in thread_names:
+        print("❌ 다른 스레드의 구간은 해당 스레드 이름과 함께 저장되어야 합니다.")
+        return False
+
+    # 오래 도는 실행에서도 최근 TRACE_MAX_EVENTS개만 남아야 합니다
+    reset_trace()
+    for number in range(TRACE_MAX_EVENTS + 10):
+        with span(f"tick-{number}"):
+            pass
+    saved_count = export_trace(path)
+    with open(path, "r", encoding="utf-8") as file:
+        names = [event["name"] for event in json.load(file)["traceEvents"] if event["ph"] == "X"]
+
+    print(f"구간 {TRACE_MAX_EVENTS + 10:,}개 기록 → 저장 {saved_count:,}개")
+    if saved_count != TRACE_MAX_EVENTS or names[0] != "tick-10" or names[-1] != f"tick-{TRACE_MAX_EVENTS + 9}":
+        print("❌ 기록이 가득 차면 가장 오래된 구간부터 버려야 합니다.")
+        return False
+
+    print("\n✅ 테스트 성공!")
+    return True
+
+
+if __name__ == "__main__":
+    success = test_tracing()
+    sys.exit(0 if success else 1)
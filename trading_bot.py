@@ -10,41 +10,305 @@
 향후 텔레그램 알림 기능을 추가할 예정입니다.
 """
 
+import os
 import sys
+from datetime import datetime
 sys.path.append("src")
 
-from config import SYMBOL, EXCHANGE, TRADE_MODE, SPLITS, TAKE_PROFIT, BIG_BUY_RANGE
+from tracing import span, export_trace
+
+# 설정(.env) 읽기에 걸리는 시간도 트레이스에 기록합니다
+with span("config.load"):
+    from config import SYMBOL, EXCHANGE, TRADE_MODE, SPLITS, TAKE_PROFIT, BIG_BUY_RANGE, FILL_TRACK_SECONDS, LOG_DIR, SHADOW_PARAMS
 from strategy import 무상태_무한매수법
-from trader import place_overseas_order
-from telegram import send_telegram
+from trader import place_overseas_order, get_overseas_open_orders, get_overseas_today_orders, today_orders_start_date
+from notifier import notify, flush_notifications
+from metrics import export_metrics, print_summary
+from profiling import profiled
+from instruments import load_instruments, get_instrument
+from cancel_replace import match_open_orders, build_replace_requests, cancel_replace_orders
+from fill_tracker import track_fills
+from costs import fill_costs, summarize_costs
+from risk import check_orders
+from reconcile import reconcile_orders, save_report, needs_attention
+from shadow import parse_shadow_params, plan_shadows, live_shadow, save_shadows
+from intraday import MARKET_TIMEZONE, session_date
+from order_journal import (
+    ACK,
+    CANCELLED,
+    FAILED,
+    UNKNOWN_STATES,
+    make_order_key,
+    replay_journal,
+    write_event,
+    reconcile_journal,
+    find_matching_kis_order,
+    submit_with_journal
+)
 
 
-def convert_exchange_code(exchange_code):
+def reprice_open_orders(orders, order_exchange_code, journal_entries):
     """
-    거래소 코드를 주문 API용 코드로 변환합니다.
+    이미 걸려 있는 미체결 주문을 새 주문 계획에 맞춰 정정하거나 취소합니다.
     
-    조회용 거래소 코드와 주문용 거래소 코드가 다릅니다.
-    예: NAS (조회용) -> NASD (주문용)
+    같은 날 봇을 다시 실행하면 예전 가격의 주문이 그대로 남아 있습니다.
+    이 함수는 저널에 남은 주문번호로 봇이 낸 미체결 주문을 찾아
+    계획과 짝이 맞는 주문은 가격이 바뀐 것만 정정하고, 계획에서 빠진 주문은 취소합니다.
+    짝이 맞은 주문은 새로 넣지 않도록 남은 주문만 돌려줍니다.
+    정정/취소 결과는 저널에도 남깁니다. (정정하면 주문번호가 바뀌기 때문)
     
     Parameters:
-        exchange_code (str): 조회용 거래소 코드 (예: "NAS", "NYS")
+        orders (list): 전략이 만든 주문 목록
+        order_exchange_code (str): 주문용 거래소 코드 (예: "NASD")
+        journal_entries (dict): 주문 키별 저널 상태 (recover_journal()의 결과, 이 함수가 고칩니다)
     
     Returns:
-        str: 주문용 거래소 코드 (예: "NASD", "NYSE")
+        list: 새로 주문해야 하는 주문 목록
     """
-    exchange_map = {
-        "NAS": "NASD",  # 나스닥
-        "NYS": "NYSE",  # 뉴욕
-        "AMS": "AMEX",  # 아멕스
-        "HKS": "SEHK",  # 홍콩
-        "TSE": "TKSE",  # 도쿄
-        "SHS": "SHAA",  # 상해
-        "SZS": "SZAA"   # 심천
-    }
-    
-    return exchange_map.get(exchange_code, exchange_code)
+    # 저널에서 접수된 주문의 주문번호 → 주문 키
+    keys_by_odno = {}
+    for order_key, entry in journal_entries.items():
+        if entry["state"] == ACK and entry["odno"]:
+            keys_by_odno[entry["odno"]] = order_key
+    
+    if not keys_by_odno:
+        return orders
+    
+    try:
+        open_orders = get_overseas_open_orders(EXCHANGE)
+    except Exception as e:
+        # 미체결 조회에 실패해도 새 주문은 계속 진행합니다
+        print(f"⚠️ 미체결 주문 조회 실패, 정정 없이 진행합니다: {str(e)}")
+        return orders
+    
+    known_orders = {odno: journal_entries[order_key]["order"] for odno, order_key in keys_by_odno.items()}
+    matches = match_open_orders(orders, open_orders, SYMBOL, known_orders)
+    
+    if not matches:
+        return orders
+    
+    print(f"\n이미 걸려 있는 주문 {len(matches)}개를 찾았습니다.")
+    
+    replace_requests = build_replace_requests(matches, SYMBOL, order_exchange_code)
+    results = cancel_replace_orders(replace_requests, trade_mode=TRADE_MODE)
+    planned_by_odno = {open_order["odno"]: planned_order for planned_order, open_order in matches}
+    
+    for result in results:
+        action_name = "취소" if result["action"] == "CANCEL" else "정정"
+        if not result["success"]:
+            print(f"✗ 주문 {action_name} 실패: {result['comment']} ({result['error']})")
+            continue
+        
+        order_key = keys_by_odno[result["odno"]]
+        if result["action"] == "CANCEL":
+            print(f"✓ 주문 취소: {result['comment']} (주문번호 {result['odno']})")
+            write_event(order_key, CANCELLED, {"odno": result["odno"]})
+            journal_entries[order_key] = dict(journal_entries[order_key], state=CANCELLED)
+        else:
+            print(f"✓ 주문 정정: {result['comment']} → ${result['new_price']} (주문번호 {result['odno']})")
+            new_odno = result["new_odno"] or result["odno"]
+            order = planned_by_odno[result["odno"]]
+            write_event(order_key, ACK, {"odno": new_odno, "order": order, "revised_from": result["odno"]})
+            journal_entries[order_key] = dict(journal_entries[order_key], order=order, odno=new_odno)
+    
+    # 짝이 맞은 주문은 이미 걸려 있으므로 새로 주문하지 않습니다
+    matched_orders = [planned_order for planned_order, open_order in matches if planned_order is not None]
+    remaining_orders = []
+    for order in orders:
+        if not any(order is matched_order for matched_order in matched_orders):
+            remaining_orders.append(order)
+    
+    return remaining_orders
+
 
+def recover_journal(trade_date):
+    """
+    주문 저널을 읽어 오늘 이 종목의 주문 상태를 복원합니다.
+    
+    지난 실행이 주문 도중 멈췄다면 접수 여부를 모르는 주문이 남아 있습니다.
+    이런 주문은 증권사의 오늘 주문내역과 맞춰 보고,
+    이미 접수된 주문은 다시 보내지 않도록 표시합니다.
+    
+    Parameters:
+        trade_date (str): 거래일 (예: "20240101")
+    
+    Returns:
+        dict: 주문 키별 상태 (order_journal.replay_journal 형식)
+    """
+    all_entries = replay_journal()
+    
+    key_prefix = f"{trade_date}:{SYMBOL}:"
+    journal_entries = {}
+    for order_key, entry in all_entries.items():
+        if order_key.startswith(key_prefix):
+            journal_entries[order_key] = entry
+    
+    has_unknown = False
+    for entry in journal_entries.values():
+        if entry["state"] in UNKNOWN_STATES:
+            has_unknown = True
+    
+    if has_unknown:
+        print(f"\n지난 실행에서 접수 여부를 모르는 주문이 있어 주문내역과 맞춰 봅니다...")
+        today_orders = get_overseas_today_orders(EXCHANGE, SYMBOL)
+        reconcile_journal(journal_entries, SYMBOL, today_orders)
+    
+    return journal_entries
 
+
+def find_submitted_odno(order, journal_entries):
+    """
+    증권사 오늘 주문내역에서 이 주문이 이미 접수되었는지 찾아 주문번호를 돌려줍니다.
+    
+    주문 응답이 시간 초과되었을 때, 다시 보내도 되는지 확인하는 데 사용합니다.
+    """
+    today_orders = get_overseas_today_orders(EXCHANGE, SYMBOL)
+    
+    claimed_odnos = set()
+    for entry in journal_entries.values():
+        if entry["odno"]:
+            claimed_odnos.add(entry["odno"])
+    
+    return find_matching_kis_order(order, SYMBOL, today_orders, claimed_odnos)
+
+
+def previous_session_entries(trade_date):
+    """
+    주문 저널에서 이번 거래일 바로 전 거래일에 접수된 이 종목 주문을 찾습니다.
+    
+    한국시간 오전 실행은 미국 장이 열리기 전이라 이번 주문의 체결은 아직 없고,
+    지난 실행에서 낸 주문은 그 사이 정규장에서 체결이 끝났습니다.
+    그래서 대사할 때 지난 거래일의 주문도 함께 맞춰 봅니다.
+    
+    Returns:
+        tuple: (지난 거래일, 주문 키별 저널 상태) (없으면 ("", {}))
+    """
+    entries_by_date = {}
+    for order_key, entry in replay_journal().items():
+        entry_date, entry_symbol = order_key.split(":")[:2]
+        if entry_symbol == SYMBOL and entry_date < trade_date and entry["state"] == ACK and entry["odno"]:
+            entries_by_date.setdefault(entry_date, {})[order_key] = entry
+    
+    if not entries_by_date:
+        return "", {}
+    
+    previous_date = max(entries_by_date)
+    return previous_date, entries_by_date[previous_date]
+
+
+def _save_and_print_report(report, trade_date, title):
+    """대사 결과를 저장하고 출력한 뒤, 확인이 필요한 주문이 있으면 알립니다."""
+    try:
+        save_report(report, SYMBOL, TRADE_MODE, trade_date)
+    except OSError as e:
+        print(f"⚠️ 주문 대사 결과 저장 실패: {e}")
+    
+    print(f"\n[{title}] 거래일 {trade_date}")
+    for row in report["orders"]:
+        print(f"  {row['status']:<10} {row['comment']}: 체결 {row['filled_qty']}/{row['quantity']}주"
+              + (f" (주문번호 {row['odno']})" if row['odno'] else "")
+              + (f" - {row['reason']}" if row['reason'] else ""))
+    
+    attention = needs_attention(report)
+    if attention:
+        notify(
+            f"🔎 {title} 확인 필요 {len(attention)}건 (거래일 {trade_date})\n"
+            + "\n".join(f"{row['comment']}: {row['status']} {row['filled_qty']}/{row['quantity']}주" for row in attention),
+            event_type="reconcile",
+            data={"trade_date": trade_date, "counts": report["counts"]}
+        )
+
+
+def reconcile_run(planned_orders, acks, not_sent_orders, trade_date, journal_entries, today_orders=None):
+    """
+    이번 실행의 주문 계획, 접수, 체결을 맞춰 보고 결과를 저장합니다.
+    
+    이번에 보낸 주문과 정정한 주문(acks), 지난 실행에서 이미 접수되어 건너뛴 주문(저널의 ACK)을
+    주문체결내역과 주문번호로 맞춥니다. 지난 거래일에 접수된 주문도 같은 조회 결과로 따로 맞춥니다.
+    지난 거래일이 기본 조회 범위(한국 날짜 어제~오늘)보다 앞서면 (월요일, 휴장일 다음 실행)
+    그 날짜부터 조회해야 주문이 보이므로, 조회 시작일을 지난 거래일로 당깁니다.
+    
+    체결 확인(track_fills)이 마지막 주문 뒤에 조회한 결과(today_orders)가 있으면 그것을 다시 쓰고,
+    없을 때만 주문체결내역을 1회 조회합니다. (체결 확인을 하지 않는 기본 설정에서는
+    이번 실행의 주문을 보낸 뒤 체결내역을 보는 조회가 이것뿐이므로 호출 1회가 늘어납니다)
+    
+    Parameters:
+        planned_orders (list): 전략이 만든 주문 목록 (위험 점검 전)
+        acks (list): 이번에 접수/정정된 주문 목록 [{"comment", "odno", ...}]
+        not_sent_orders (list): 보내지 않은 주문 목록 (건너뜀 + 실패)
+        trade_date (str): 거래일 (예: "20240101")
+        journal_entries (dict): 주문 키별 저널 상태
+        today_orders (list): 마지막 주문 뒤에 조회한 주문체결내역 (없으면 None)
+    
+    Returns:
+        dict: reconcile.reconcile_orders()의 결과 (조회 실패 시 None)
+    """
+    acks = list(acks)
+    acked_comments = {ack["comment"] for ack in acks}
+    for order in planned_orders:
+        entry = journal_entries.get(make_order_key(trade_date, SYMBOL, order))
+        if order["comment"] not in acked_comments and entry and entry["state"] == ACK:
+            acks.append({"comment": order["comment"], "odno": entry["odno"]})
+    
+    previous_date, previous_entries = previous_session_entries(trade_date)
+    
+    # 지난 거래일 주문이 기본 조회 범위 밖이면 그 날짜부터 조회합니다
+    start_date = None
+    if previous_entries and previous_date < today_orders_start_date():
+        start_date = previous_date
+    
+    previous_session_orders = today_orders
+    if today_orders is None and (acks or previous_entries):
+        try:
+            today_orders = get_overseas_today_orders(EXCHANGE, SYMBOL, start_date=start_date)
+        except Exception as e:
+            print(f"⚠️ 체결내역 조회 실패, 주문 대사를 건너뜁니다: {str(e)}")
+            return None
+        previous_session_orders = today_orders
+    elif previous_entries and start_date:
+        try:
+            previous_session_orders = get_overseas_today_orders(EXCHANGE, SYMBOL, start_date=start_date)
+        except Exception as e:
+            print(f"⚠️ 지난 거래일 체결내역 조회 실패, 지난 거래일 주문 대사를 건너뜁니다: {str(e)}")
+            previous_entries = {}
+    
+    report = reconcile_orders(planned_orders, acks, today_orders or [], not_sent_orders)
+    _save_and_print_report(report, trade_date, "주문 대사")
+    
+    if previous_entries:
+        previous_orders = [entry["order"] for entry in previous_entries.values()]
+        previous_acks = [{"comment": entry["order"]["comment"], "odno": entry["odno"]} for entry in previous_entries.values()]
+        _save_and_print_report(reconcile_orders(previous_orders, previous_acks, previous_session_orders),
+                               previous_date, "지난 거래일 주문 대사")
+    
+    return report
+
+
+def record_shadow_plans(strategy_result):
+    """
+    실제 전략이 조회한 스냅샷으로 그림자 파라미터(SHADOW_PARAMS)의 계획을 세워 기록합니다.
+    
+    API를 다시 부르지 않으므로 그림자를 몇 개 더해도 호출 수는 같습니다.
+    실패해도 실제 주문에는 영향을 주지 않습니다.
+    """
+    try:
+        shadows = [live_shadow(strategy_result, SPLITS, TAKE_PROFIT, BIG_BUY_RANGE)]
+        shadows += plan_shadows(strategy_result, parse_shadow_params(SHADOW_PARAMS))
+        save_shadows(strategy_result, shadows)
+    except Exception as e:
+        print(f"⚠️ 그림자 전략 기록 실패: {str(e)}")
+        return
+    
+    print(f"\n[그림자 전략] {len(shadows) - 1}개")
+    for shadow in shadows:
+        if shadow["error"]:
+            print(f"  {shadow['name']}: {shadow['error']}")
+            continue
+        print(f"  {shadow['name']}: 단위 {shadow['unit_qty']}주, 주문 {len(shadow['orders'])}개 "
+              f"(매수 {shadow['buy_qty']}주 ${shadow['buy_amount']:.2f}, 매도 {shadow['sell_qty']}주)")
+
+
+@profiled("main")
 def main():
     """
     자동매매 봇의 메인 실행 함수입니다.
@@ -61,15 +325,19 @@ def main():
         print("자동매매 봇 시작")
         print("="*60)
         
-        # 텔레그램으로 시작 알림 전송
-        send_telegram("🚀 자동매매 시작")
+        # 시작 알림 전송
+        notify("🚀 자동매매 시작", event_type="start")
+        
+        # 저장해 둔 종목 정보를 읽어 둡니다 (없으면 이번에 한 번만 조회합니다)
+        load_instruments()
+        instrument = get_instrument(SYMBOL, EXCHANGE)
         
         # ========================================
         # Step 1: 환경변수 확인
         # ========================================
         print(f"\n[설정 정보]")
-        print(f"종목 코드: {SYMBOL}")
-        print(f"거래소: {EXCHANGE}")
+        print(f"종목 코드: {SYMBOL} ({instrument.name})")
+        print(f"거래소: {EXCHANGE} (통화 {instrument.currency}, 매매 단위 {instrument.lot_size}주)")
         print(f"분할 수: {SPLITS}")
         print(f"익절률: {TAKE_PROFIT*100}%")
         print(f"큰수 상승률: {BIG_BUY_RANGE*100}%")
@@ -80,13 +348,14 @@ def main():
         # ========================================
         print(f"\n[Step 1] 전략 실행 중...")
         
-        strategy_result = 무상태_무한매수법(
-            symbol=SYMBOL,
-            exchange_code=EXCHANGE,
-            splits=SPLITS,
-            take_profit_rate=TAKE_PROFIT,
-            big_buy_range=BIG_BUY_RANGE
-        )
+        with span("strategy", symbol=SYMBOL):
+            strategy_result = 무상태_무한매수법(
+                symbol=SYMBOL,
+                exchange_code=EXCHANGE,
+                splits=SPLITS,
+                take_profit_rate=TAKE_PROFIT,
+                big_buy_range=BIG_BUY_RANGE
+            )
         
         # 전략 결과 출력
         print(f"✓ 전략 실행 완료")
@@ -96,6 +365,10 @@ def main():
         print(f"  주문 가능 금액: ${strategy_result['orderable_cash']:.2f}")
         print(f"  단위 수량: {strategy_result['unit_qty']}주")
         
+        # 그림자 전략 (같은 스냅샷으로 다른 파라미터의 계획을 세워 기록만 합니다)
+        if SHADOW_PARAMS:
+            record_shadow_plans(strategy_result)
+        
         # ========================================
         # Step 3: 주문 목록 출력
         # ========================================
@@ -120,19 +393,63 @@ def main():
             else:
                 print(f"  가격: 시장가")
         
+        planned_orders = orders
+        
+        # 주문 전 위험 점검 (API를 부르지 않고 전략 결과만으로 주문 목록 전체를 점검)
+        risk_result = check_orders(
+            orders,
+            strategy_result,
+            lot_size=instrument.lot_size,
+            tick_ladder=instrument.tick_ladder
+        )
+        orders = risk_result['accepted']
+        if risk_result['rejected']:
+            print(f"\n⚠️ 위험 점검에서 {len(risk_result['rejected'])}개 주문을 뺐습니다:")
+            for rejected in risk_result['rejected']:
+                print(f"  - {rejected['comment']}: {rejected['reason']}")
+            notify(
+                f"⚠️ 위험 점검으로 주문 {len(risk_result['rejected'])}건 제외\n"
+                + "\n".join(f"{rejected['comment']}: {rejected['reason']}" for rejected in risk_result['rejected']),
+                event_type="risk",
+                data={"rejected": [{"comment": rejected['comment'], "reason": rejected['reason']} for rejected in risk_result['rejected']]}
+            )
+        
         # ========================================
         # Step 4: 주문 실행
         # ========================================
         print(f"\n[Step 3] 주문 실행 중...")
         print("-" * 60)
         
-        # 주문용 거래소 코드 변환
-        order_exchange_code = convert_exchange_code(EXCHANGE)
+        # 주문용 거래소 코드 (종목 정보에 있는 값을 사용합니다)
+        order_exchange_code = instrument.order_exchange
+        
+        # LIVE 모드에서는 주문 저널을 복원하고,
+        # 이미 걸려 있는 주문을 먼저 새 가격으로 정정합니다
+        # (같은 주문을 두 번 넣지 않기 위함)
+        # 거래일은 주문이 들어갈 미국 정규장 날짜입니다 (장 마감 전 재평가와 같은 저널 키를 쓰기 위함)
+        trade_date = session_date(datetime.now(MARKET_TIMEZONE))
+        journal_entries = {}
+        if TRADE_MODE == "LIVE":
+            journal_entries = recover_journal(trade_date)
+            checked_orders = orders
+            orders = reprice_open_orders(orders, order_exchange_code, journal_entries)
+            repriced_orders = [order for order in checked_orders if not any(order is remaining for remaining in orders)]
+        else:
+            repriced_orders = []
+        
+        # 정정(또는 그대로 유지)한 주문은 주문번호를 알고 있으므로 접수된 주문으로 봅니다
+        repriced_acks = [
+            {"comment": order['comment'], "odno": journal_entries[make_order_key(trade_date, SYMBOL, order)]['odno']}
+            for order in repriced_orders
+        ]
         
         # 각 주문 실행
         executed_orders = []
         failed_orders = []
-        skipped_orders = []
+        skipped_orders = [
+            {"comment": rejected['comment'], "reason": f"위험 점검: {rejected['reason']}"}
+            for rejected in risk_result['rejected']
+        ]
         
         for i, order in enumerate(orders, 1):
             print(f"\n주문 {i}/{len(orders)} 실행: {order['comment']}")
@@ -147,37 +464,78 @@ def main():
                 # TODO: 매도 주문 API 추가 구현 필요
                 continue
             
+            # 저널에 이미 접수된 주문으로 남아 있으면 다시 보내지 않습니다
+            order_key = make_order_key(trade_date, SYMBOL, order)
+            journal_entry = journal_entries.get(order_key)
+            if journal_entry and journal_entry["state"] == ACK:
+                print(f"⊘ 이미 접수된 주문입니다 (주문번호 {journal_entry['odno']}). 건너뜁니다.")
+                skipped_orders.append({
+                    "comment": order['comment'],
+                    "reason": f"이미 접수됨 (주문번호 {journal_entry['odno']})"
+                })
+                continue
+            
+            # 오늘 증권사가 거부한 주문은 같은 이유로 다시 거부되므로 다시 보내지 않습니다
+            if journal_entry and journal_entry["state"] == FAILED:
+                print(f"⊘ 증권사가 거부한 주문입니다. 건너뜁니다.")
+                skipped_orders.append({
+                    "comment": order['comment'],
+                    "reason": "증권사 거부됨 (다시 보내지 않음)"
+                })
+                continue
+            
             try:
                 # 주문 가격 설정 (시장가인 경우 0으로 설정)
                 order_price = order['price'] if order['price'] else 0
                 
-                # 주문 실행
-                result = place_overseas_order(
-                    symbol=SYMBOL,
-                    exchange_code=order_exchange_code,
-                    order_type=order['order_type'],
-                    quantity=order['quantity'],
-                    price=order_price,
-                    trade_mode=TRADE_MODE
-                )
+                # 주문 실행 함수
+                def submit_order(retries=0):
+                    return place_overseas_order(
+                        symbol=SYMBOL,
+                        exchange_code=order_exchange_code,
+                        order_type=order['order_type'],
+                        quantity=order['quantity'],
+                        price=order_price,
+                        trade_mode=TRADE_MODE,
+                        retries=retries
+                    )
+                
+                with span("order", comment=order['comment']):
+                    if TRADE_MODE == "LIVE":
+                        # LIVE 모드: 저널에 기록하면서 주문 (시간 초과 시 안전하게 재시도)
+                        result = submit_with_journal(
+                            order_key,
+                            order,
+                            submit_order,
+                            lambda: find_submitted_odno(order, journal_entries)
+                        )
+                    else:
+                        result = submit_order()
                 
                 if result:
+                    # 이번 실행에서 접수된 주문도 저널 상태에 넣어 둡니다
+                    # (다음 주문이 시간 초과될 때 이 주문번호를 다른 주문으로 착각하지 않도록)
+                    journal_entries[order_key] = {"state": ACK, "order": order, "odno": result['odno'], "attempts": 1}
+                    
                     # LIVE 모드일 때 주문번호 저장
                     executed_orders.append({
                         "comment": order['comment'],
                         "odno": result['odno'],
-                        "ord_tmd": result['ord_tmd']
+                        "ord_tmd": result['ord_tmd'],
+                        "symbol": SYMBOL,
+                        "side": order['side'],
+                        "quantity": order['quantity']
                     })
                     print(f"✓ 주문 성공")
                     
-                    # 텔레그램으로 주문 성공 알림 전송
+                    # 주문 성공 알림 전송
                     message = f"""✅ 주문 성공
 
 {order['comment']}
 수량: {order['quantity']}주
 주문번호: {result['odno']}
 시각: {result['ord_tmd']}"""
-                    send_telegram(message)
+                    notify(message, event_type="order", data={"comment": order['comment'], "odno": result['odno']})
                 else:
                     # DRY 모드일 때
                     print(f"✓ 주문 정보 출력 완료")
@@ -191,16 +549,38 @@ def main():
                     "error": str(e)
                 })
                 
-                # 텔레그램으로 주문 실패 알림 전송
+                # 주문 실패 알림 전송
                 message = f"""⚠️ 주문 실패
 
 {order['comment']}
 에러: {str(e)}"""
-                send_telegram(message)
+                notify(message, event_type="order_failed", data={"comment": order['comment'], "error": str(e)})
                 
                 # 주문 실패 시에도 다음 주문을 계속 진행
                 continue
         
+        # 체결 확인 (LIVE 모드에서 FILL_TRACK_SECONDS가 설정된 경우)
+        # 마지막으로 조회한 주문체결내역 (주문 대사에서 다시 조회하지 않기 위함)
+        latest_today_orders = {}
+        
+        def fetch_today_orders():
+            latest_today_orders["orders"] = get_overseas_today_orders(EXCHANGE, SYMBOL)
+            return latest_today_orders["orders"]
+        
+        if executed_orders and FILL_TRACK_SECONDS > 0:
+            print(f"\n[체결 확인] 최대 {FILL_TRACK_SECONDS}초 동안 체결 여부를 확인합니다...")
+            fill_events = track_fills(executed_orders, FILL_TRACK_SECONDS, fetch_orders=fetch_today_orders)
+            print(f"✓ 체결 확인 완료 (체결 {len(fill_events)}건)")
+            if fill_events:
+                costs = summarize_costs(fill_costs(fill_events, EXCHANGE))
+                print(f"  예상 비용: 수수료 ${costs['commission']:.2f}, "
+                      f"SEC ${costs['sec_fee']:.2f}, TAF ${costs['taf']:.2f} (합계 ${costs['total_cost']:.2f})")
+        
+        # 주문 대사 (LIVE 모드: 계획/접수/체결을 주문번호로 맞춰 저장)
+        if TRADE_MODE == "LIVE":
+            reconcile_run(planned_orders, executed_orders + repriced_acks, skipped_orders + failed_orders, trade_date,
+                          journal_entries, today_orders=latest_today_orders.get("orders"))
+        
         # ========================================
         # Step 5: 결과 요약
         # ========================================
@@ -221,6 +601,8 @@ def main():
             print(f"   총 {len(orders)}개 주문 중:")
             print(f"   - 성공: {len(executed_orders)}개")
             print(f"   - 실패: {len(failed_orders)}개")
+            if repriced_acks:
+                print(f"   - 이미 걸려 있음(정정/유지): {len(repriced_acks)}개")
             if skipped_orders:
                 print(f"   - 건너뜀: {len(skipped_orders)}개")
             
@@ -251,11 +633,11 @@ def main():
         print("="*60)
         print(f"에러: {str(e)}")
         
-        # 텔레그램으로 치명적 에러 알림 전송
+        # 치명적 에러 알림 전송
         message = f"""🚨 치명적 에러 발생
 
 {str(e)}"""
-        send_telegram(message)
+        notify(message, event_type="error", data={"error": str(e)})
         
         # 상세 에러 정보 출력
         import traceback
@@ -264,6 +646,25 @@ def main():
         
         print(f"\n프로그램을 에러와 함께 종료합니다.")
         sys.exit(1)
+    
+    finally:
+        # API 호출 통계를 출력하고 파일로 저장합니다
+        # (어떤 API가 시간을 가장 많이 쓰는지 확인하기 위함)
+        print_summary()
+        try:
+            export_metrics(LOG_DIR)
+        except OSError as e:
+            print(f"⚠️ API 호출 통계 저장 실패: {e}")
+        
+        # 대기열에 남은 알림을 보내고 종료합니다 (최대 10초 대기)
+        flush_notifications()
+        
+        # 단계별 걸린 시간을 트레이스 파일로 저장합니다
+        # (chrome://tracing 또는 https://ui.perfetto.dev 에서 열어볼 수 있습니다)
+        try:
+            export_trace(os.path.join(LOG_DIR, "trace.json"))
+        except OSError as e:
+            print(f"⚠️ 트레이스 저장 실패: {e}")
 
 
 if __name__ == "__main__":